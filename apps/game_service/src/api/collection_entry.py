@@ -6,7 +6,7 @@ import logging
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from src.api.dependencies import get_current_user, get_igdb_auth
+from src.api.dependencies import get_current_user, get_igdb_client_options
 from src.core.database import get_db
 from src.igdb.client import IGDBClient
 from src.schemas.collection_entry import (
@@ -40,7 +40,7 @@ def create_collection_entry(
     entry_data: CollectionEntryCreate,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
-    igdb_auth=Depends(get_igdb_auth),
+    igdb_client_options: dict = Depends(get_igdb_client_options),
 ):
     """
     Create a new collection entry for a given collection and user.
@@ -55,7 +55,7 @@ def create_collection_entry(
     )
 
     # Create IGDB client and service
-    igdb_client = IGDBClient(auth=igdb_auth)
+    igdb_client = IGDBClient(**igdb_client_options)
     service = CollectionEntryService(igdb_client=igdb_client)
 
     try:
@@ -5,7 +5,7 @@ Includes DB session and user authentication.
 
 # pylint: disable=wrong-import-order
 
-from typing import Dict
+from typing import Any, Dict
 
 from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
@@ -59,3 +59,16 @@ def get_igdb_auth() -> IGDBAuth:
     Dependency that provides an IGDBAuth instance for IGDB API access.
     """
     return IGDBAuth()
+
+
+def get_igdb_client_options(
+    request: Request, igdb_auth: IGDBAuth = Depends(get_igdb_auth)
+) -> Dict[str, Any]:
+    """
+    Dependency that provides keyword arguments for building an IGDBClient: the
+    IGDB auth plus the app's long-lived resources (pooled transport,
+    single-flight group). Only the auth is provided when the app lifespan has
+    not run (e.g. in unit tests).
+    """
+    options = getattr(request.app.state, "igdb_client_options", None) or {}
+    return {**options, "auth": igdb_auth}
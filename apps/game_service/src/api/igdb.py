@@ -1,22 +1,154 @@
 """
 FastAPI routes for IGDB endpoints: search, game details, genres, and platforms.
+
+Routes are async and await AsyncIGDBClient, so in-flight IGDB requests wait on
+the event loop instead of holding threadpool slots needed by other routes.
+Game responses are serialized directly by src/igdb/records.py instead of being
+validated through GameOut again; response_model still documents them. When the
+client caches payloads (IGDB_CACHE_PAYLOAD), cache hits are sent as the stored
+bytes without decoding them.
+
+With the image proxy enabled (IGDB_IMAGE_PROXY_ENABLED), cover URLs in game
+responses point at /igdb/images, which serves cached copies of IGDB images.
+
+GET responses carry a strong ETag (stored with payload cache entries, hashed
+otherwise) and a Cache-Control derived from the TTLs of the client's cache;
+a matching If-None-Match is answered with 304.
 """
 
-from fastapi import APIRouter, Query, HTTPException, Depends, Path
-from src.igdb.auth import IGDBAuth
-from src.igdb.client import IGDBClient
-from src.igdb.schemas import GameOut, GenreOut, PlatformOut
+import json
+import logging
+import math
+from typing import Annotated, Optional
 
+from fastapi import APIRouter, Query, HTTPException, Depends, Path, Request, Response
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+from src.igdb.auth import IGDBAuth
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.client import IGDBBatchError
+from src.igdb.http_cache import (
+    cache_control,
+    etag_matches,
+    etag_of,
+    is_stale,
+    parse_http_date,
+)
+from src.igdb.images import (
+    IMAGE_CACHE_CONTROL,
+    ImageNotFound,
+    ImageProxy,
+    image_etag,
+)
+from src.igdb.ratelimit import RateLimitExceeded
+from src.igdb.records import dump_game, dump_games
+from src.igdb.resilience import CircuitOpenError
+from src.igdb.revalidate import GAME_TTL, SEARCH_TTL, VOCABULARY_TTL
+from src.igdb.schemas import (
+    FilteredSearchRequest,
+    GameFilters,
+    GameOut,
+    GameSearchQuery,
+    GenreOut,
+    PlatformOut,
+    SuggestionOut,
+)
+from src.igdb.suggest import MAX_SUGGEST_LIMIT, SUGGEST_LIMIT
+from src.igdb.vocabulary import IGDB, Vocabulary, VocabularyStore
 
 router = APIRouter()
 
+logger = logging.getLogger("api.igdb")
+
+# Cache-Control per route, tied to the TTLs of the entries the client caches
+GAME_CACHE_CONTROL = cache_control(*GAME_TTL)
+SEARCH_CACHE_CONTROL = cache_control(*SEARCH_TTL)
+# Stale search results are being refreshed, so clients revalidate them next time
+STALE_SEARCH_CACHE_CONTROL = cache_control(0, 0)
+VOCABULARY_CACHE_CONTROL = cache_control(*VOCABULARY_TTL)
+# The bundled snapshot may be out of date; clients revalidate it on every use
+SNAPSHOT_CACHE_CONTROL = "no-cache"
+
+
+def get_igdb_client(request: Request) -> AsyncIGDBClient:
+    """
+    Dependency provider for AsyncIGDBClient.
+
+    Returns the long-lived client (sharing the pooled transport) created by the
+    app lifespan, or a standalone client with default auth if it is not running.
+    """
+    client = getattr(request.app.state, "igdb_async_client", None)
+    if client is None:
+        client = AsyncIGDBClient(auth=IGDBAuth())
+    return client
+
+
+def upstream_error(exc: Exception) -> HTTPException:
+    """
+    Map an IGDB client error to an HTTP error.
+
+    Requests shed by the rate limiter or an open circuit breaker become 503
+    with a Retry-After header so clients back off; anything else is a 500.
+    """
+    if isinstance(exc, (RateLimitExceeded, CircuitOpenError)):
+        retry_after = max(1, math.ceil(exc.retry_after))
+        return HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": str(retry_after)}
+        )
+    return HTTPException(status_code=500, detail=str(exc))
+
+
+def json_response(body: bytes, headers: Optional[dict] = None) -> Response:
+    """Return a response for an already serialized JSON body."""
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def get_vocabularies(request: Request) -> Optional[VocabularyStore]:
+    """Dependency provider for the preloaded vocabularies, if the lifespan runs."""
+    return getattr(request.app.state, "igdb_vocabularies", None)
+
+
+def cacheable_response(request: Request, body: bytes, policy: str) -> Response:
+    """
+    Return a JSON body with its ETag and Cache-Control, or 304 if the client has it.
+
+    Args:
+        request (Request): Incoming request, for If-None-Match.
+        body (bytes): Serialized JSON; a TaggedBody brings its stored ETag.
+        policy (str): Cache-Control value of the route.
+
+    Returns:
+        Response: 200 with the body, or 304 without it.
+    """
+    headers = {"ETag": etag_of(body), "Cache-Control": policy}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return json_response(body, headers)
+
 
-def get_igdb_client() -> IGDBClient:
+def vocabulary_response(request: Request, vocabulary: Vocabulary) -> Response:
     """
-    Dependency provider for IGDBClient, using default auth.
+    Return a preloaded vocabulary, cached for a day once loaded from IGDB.
+
+    Until then the bundled snapshot is sent with no-cache, so clients pick up
+    the live table as soon as it is loaded.
     """
-    auth = IGDBAuth()
-    return IGDBClient(auth=auth)
+    if vocabulary.source == IGDB:
+        policy = VOCABULARY_CACHE_CONTROL
+    else:
+        policy = SNAPSHOT_CACHE_CONTROL
+    return cacheable_response(request, vocabulary.body, policy)
+
+
+def get_image_proxy(request: Request) -> Optional[ImageProxy]:
+    """Dependency provider for the cover image proxy, if enabled."""
+    return getattr(request.app.state, "igdb_image_proxy", None)
+
+
+def proxied(request: Request, body: bytes) -> bytes:
+    """Point the cover URLs of a game response body at the image proxy, if enabled."""
+    proxy = get_image_proxy(request)
+    return body if proxy is None else proxy.rewrite(body)
 
 
 @router.get(
@@ -25,24 +157,33 @@ def get_igdb_client() -> IGDBClient:
     summary="Batch fetch game details by IGDB IDs",
     responses={
         200: {"description": "List of games for the provided IDs."},
+        304: {"description": "Unchanged since the If-None-Match ETag."},
         500: {
             "description": "Internal server error.",
             "content": {
                 "application/json": {"example": {"detail": "Internal server error."}}
             },
         },
+        503: {"description": "IGDB rate limited or unavailable; see Retry-After."},
     },
 )
-def get_games_by_ids(
+async def get_games_by_ids(
+    request: Request,
     ids: str = Query(..., description="Comma-separated list of IGDB game IDs"),
-    client: IGDBClient = Depends(get_igdb_client),
+    client: AsyncIGDBClient = Depends(get_igdb_client),
 ):
     """
     Batch fetch game details by IGDB IDs.
 
+    Large id lists are fetched from IGDB in parallel 500-id chunks. If only some
+    chunks fail, the games that were fetched are returned and the
+    X-IGDB-Failed-Chunks header reports "<failed>/<total>" chunks, and such
+    partial responses are not cacheable.
+
     Args:
+        request (Request): Incoming request, for If-None-Match.
         ids (str): Comma-separated list of IGDB game IDs.
-        client (IGDBClient): Injected IGDB client.
+        client (AsyncIGDBClient): Injected IGDB client.
 
     Returns:
         List[GameOut]: List of game details.
@@ -51,10 +192,25 @@ def get_games_by_ids(
         # Only allow strictly positive integers
         id_list = [int(i) for i in ids.split(",") if i.strip().isdigit() and int(i) > 0]
         if not id_list:
-            return []
-        return client.get_games_by_ids(id_list)
+            return cacheable_response(request, dump_games([]), GAME_CACHE_CONTROL)
+        body = await client.cached_games_body(id_list)
+        if body is None:
+            body = dump_games(await client.get_games_by_ids(id_list))
+        return cacheable_response(request, proxied(request, body), GAME_CACHE_CONTROL)
+    except IGDBBatchError as e:
+        for failure in e.failures:
+            logger.warning(
+                "IGDB chunk of %d ids failed: %s", len(failure.game_ids), failure.error
+            )
+        if not e.games:
+            raise HTTPException(status_code=500, detail=str(e)) from e
+        failed_chunks = f"{len(e.failures)}/{e.chunk_count}"
+        return json_response(
+            proxied(request, dump_games(e.games)),
+            {"X-IGDB-Failed-Chunks": failed_chunks, "Cache-Control": "no-store"},
+        )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e
+        raise upstream_error(e) from e
 
 
 @router.get(
@@ -63,28 +219,43 @@ def get_games_by_ids(
     summary="List all game genres from IGDB",
     responses={
         200: {"description": "List of genres."},
+        304: {"description": "Unchanged since the If-None-Match ETag."},
         500: {
             "description": "Internal server error.",
             "content": {
                 "application/json": {"example": {"detail": "Internal server error."}}
             },
         },
+        503: {"description": "IGDB rate limited or unavailable; see Retry-After."},
     },
 )
-def get_genres(client: IGDBClient = Depends(get_igdb_client)):
+async def get_genres(
+    request: Request,
+    client: AsyncIGDBClient = Depends(get_igdb_client),
+    vocabularies: Optional[VocabularyStore] = Depends(get_vocabularies),
+):
     """
     List all game genres from IGDB.
 
+    Served from the vocabulary preloaded at startup, with a strong ETag
+    (If-None-Match answers 304) and, once loaded from IGDB, a long
+    Cache-Control, so no request waits on IGDB. Without the app lifespan the
+    client is asked instead.
+
     Args:
-        client (IGDBClient): Injected IGDB client.
+        request (Request): Incoming request, for If-None-Match.
+        client (AsyncIGDBClient): Injected IGDB client.
+        vocabularies (VocabularyStore): Injected preloaded vocabularies.
 
     Returns:
         List[GenreOut]: List of genres.
     """
+    if vocabularies is not None:
+        return vocabulary_response(request, vocabularies.get("genres"))
     try:
-        return client.get_genres()
+        return await client.get_genres()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e
+        raise upstream_error(e) from e
 
 
 @router.get(
@@ -93,28 +264,43 @@ def get_genres(client: IGDBClient = Depends(get_igdb_client)):
     summary="List all platforms from IGDB",
     responses={
         200: {"description": "List of platforms."},
+        304: {"description": "Unchanged since the If-None-Match ETag."},
         500: {
             "description": "Internal server error.",
             "content": {
                 "application/json": {"example": {"detail": "Internal server error."}}
             },
         },
+        503: {"description": "IGDB rate limited or unavailable; see Retry-After."},
     },
 )
-def get_platforms(client: IGDBClient = Depends(get_igdb_client)):
+async def get_platforms(
+    request: Request,
+    client: AsyncIGDBClient = Depends(get_igdb_client),
+    vocabularies: Optional[VocabularyStore] = Depends(get_vocabularies),
+):
     """
     List all platforms from IGDB.
 
+    Served from the vocabulary preloaded at startup, with a strong ETag
+    (If-None-Match answers 304) and, once loaded from IGDB, a long
+    Cache-Control, so no request waits on IGDB. Without the app lifespan the
+    client is asked instead.
+
     Args:
-        client (IGDBClient): Injected IGDB client.
+        request (Request): Incoming request, for If-None-Match.
+        client (AsyncIGDBClient): Injected IGDB client.
+        vocabularies (VocabularyStore): Injected preloaded vocabularies.
 
     Returns:
         List[PlatformOut]: List of platforms.
     """
+    if vocabularies is not None:
+        return vocabulary_response(request, vocabularies.get("platforms"))
     try:
-        return client.get_platforms()
+        return await client.get_platforms()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e
+        raise upstream_error(e) from e
 
 
 @router.get(
@@ -123,6 +309,7 @@ def get_platforms(client: IGDBClient = Depends(get_igdb_client)):
     summary="Get details for a specific game by IGDB ID",
     responses={
         200: {"description": "Game details for the given ID."},
+        304: {"description": "Unchanged since the If-None-Match ETag."},
         404: {
             "description": "Game not found.",
             "content": {
@@ -138,31 +325,67 @@ def get_platforms(client: IGDBClient = Depends(get_igdb_client)):
                 "application/json": {"example": {"detail": "Internal server error."}}
             },
         },
+        503: {"description": "IGDB rate limited or unavailable; see Retry-After."},
     },
 )
-def get_game_by_id(
+async def get_game_by_id(
+    request: Request,
     game_id: int = Path(
         ..., gt=0, description="IGDB game ID (must be positive integer)"
     ),
-    client: IGDBClient = Depends(get_igdb_client),
+    client: AsyncIGDBClient = Depends(get_igdb_client),
 ):
     """
     Get details for a specific game by IGDB ID.
 
     Args:
+        request (Request): Incoming request, for If-None-Match.
         game_id (int): IGDB game ID.
-        client (IGDBClient): Injected IGDB client.
+        client (AsyncIGDBClient): Injected IGDB client.
 
     Returns:
         GameOut: Game details.
     """
     try:
-        game = client.get_game_by_id(game_id)
-        return game
+        body = await client.cached_game_body(game_id)
+        if body is None:
+            body = dump_game(await client.get_game_by_id(game_id))
+        return cacheable_response(request, proxied(request, body), GAME_CACHE_CONTROL)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e
+        raise upstream_error(e) from e
+
+
+async def run_search(
+    client: AsyncIGDBClient, q: str, filters: Optional[GameFilters]
+) -> bytes:
+    """
+    Run a plain or filtered search, mapping client errors to HTTP errors.
+
+    Args:
+        client (AsyncIGDBClient): IGDB client.
+        q (str): Game search query string.
+        filters (GameFilters, optional): Filters applied by IGDB.
+
+    Returns:
+        bytes: JSON list of games; a TaggedBody, marked stale if it is being
+        refreshed, when served from the cache.
+    """
+    # Reject queries that are only whitespace
+    if not q.strip():
+        raise HTTPException(
+            status_code=422, detail="Query cannot be empty or whitespace."
+        )
+    try:
+        body = await client.cached_search_body(q, filters)
+        if body is not None:
+            return body
+        if filters is None:
+            return dump_games(await client.search_games(q))
+        return dump_games(await client.search_games_filtered(q, filters))
+    except Exception as e:
+        raise upstream_error(e) from e
 
 
 @router.get(
@@ -171,37 +394,220 @@ def get_game_by_id(
     summary="Search for games using the IGDB API",
     responses={
         200: {"description": "List of games matching the search query."},
+        304: {"description": "Unchanged since the If-None-Match ETag."},
         500: {
             "description": "Internal server error.",
             "content": {
                 "application/json": {"example": {"detail": "Internal server error."}}
             },
         },
+        503: {"description": "IGDB rate limited or unavailable; see Retry-After."},
     },
 )
-def search_games(
-    q: str = Query(..., min_length=1, description="Game search query"),
-    client: IGDBClient = Depends(get_igdb_client),
+async def search_games(
+    request: Request,
+    params: Annotated[GameSearchQuery, Query()],
+    client: AsyncIGDBClient = Depends(get_igdb_client),
 ):
     """
-    Search for games using the IGDB API.
+    Search for games using the IGDB API, optionally filtered.
+
+    Filters are given as query parameters (see GameFilterQuery): list filters
+    are repeated parameters (?platforms=6&platforms=48) and the year range is
+    given as year_start and year_end. They are applied by IGDB, and results
+    are cached per canonical query and filter set.
 
     Args:
-        q (str): Game search query string.
-        client (IGDBClient): Injected IGDB client.
+        request (Request): Incoming request, for If-None-Match.
+        params (GameSearchQuery): Search query and filters.
+        client (AsyncIGDBClient): Injected IGDB client.
 
     Returns:
         List[GameOut]: List of search results.
     """
     try:
-        # Reject queries that are only whitespace
-        if not q.strip():
-            raise HTTPException(
-                status_code=422, detail="Query cannot be empty or whitespace."
-            )
-        results = client.search_games(q)
-        return results
-    except HTTPException:
-        raise
+        filters = params.to_filters()
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    body = await run_search(client, params.q, filters)
+    policy = STALE_SEARCH_CACHE_CONTROL if is_stale(body) else SEARCH_CACHE_CONTROL
+    return cacheable_response(request, proxied(request, body), policy)
+
+
+@router.post(
+    "/search",
+    response_model=list[GameOut],
+    summary="Search for games with filters given as a JSON body",
+    responses={
+        200: {"description": "List of games matching the search query and filters."},
+        500: {
+            "description": "Internal server error.",
+            "content": {
+                "application/json": {"example": {"detail": "Internal server error."}}
+            },
+        },
+        503: {"description": "IGDB rate limited or unavailable; see Retry-After."},
+    },
+)
+async def search_games_filtered(
+    request: FilteredSearchRequest,
+    http_request: Request,
+    client: AsyncIGDBClient = Depends(get_igdb_client),
+):
+    """
+    Search for games with GameFilters given as a JSON body.
+
+    Args:
+        request (FilteredSearchRequest): Query and filters.
+        http_request (Request): Incoming HTTP request.
+        client (AsyncIGDBClient): Injected IGDB client.
+
+    Returns:
+        List[GameOut]: List of search results.
+    """
+    body = await run_search(client, request.q, request.filters)
+    return json_response(proxied(http_request, body))
+
+
+@router.get(
+    "/suggest",
+    response_model=list[SuggestionOut],
+    summary="Suggest game names for a typed prefix",
+    responses={
+        200: {"description": "Games with a name word starting with the prefix."},
+        404: {"description": "Suggestions are disabled (IGDB_SUGGEST_ENABLED)."},
+    },
+)
+async def suggest_games(
+    q: str = Query(..., min_length=1, description="Text typed so far"),
+    limit: int = Query(
+        SUGGEST_LIMIT, ge=1, le=MAX_SUGGEST_LIMIT, description="Maximum suggestions"
+    ),
+    client: AsyncIGDBClient = Depends(get_igdb_client),
+):
+    """
+    Suggest games for a typeahead from the in-process prefix index.
+
+    Never calls IGDB; the index learns names from the catalog mirror and from
+    searches, so it can answer before the first search for a title.
+
+    Args:
+        q (str): Text typed so far.
+        limit (int): Maximum number of suggestions.
+        client (AsyncIGDBClient): Injected IGDB client.
+
+    Returns:
+        List[SuggestionOut]: Suggested games, best first.
+    """
+    suggest_index = getattr(client, "suggest_index", None)
+    if suggest_index is None:
+        raise HTTPException(status_code=404, detail="Suggestions are disabled.")
+    suggestions = suggest_index.suggest(q, limit)
+    return json_response(
+        json.dumps(suggestions, ensure_ascii=False, separators=(",", ":")).encode()
+    )
+
+
+async def not_modified(
+    request: Request, proxy: ImageProxy, size: str, image_id: str, etag: str
+) -> bool:
+    """
+    True if a conditional GET for an image can be answered with 304.
+
+    If-None-Match takes precedence; If-Modified-Since is compared with the
+    mtime of the cached file and never matches an image that is not cached.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    since = parse_http_date(request.headers.get("if-modified-since"))
+    if since is None:
+        return False
+    modified = await proxy.modified(size, image_id)
+    # HTTP dates have a resolution of one second
+    return modified is not None and int(modified) <= since
+
+
+@router.get(
+    "/images/{size}/{filename}",
+    response_class=FileResponse,
+    summary="Cover image through the caching image proxy",
+    responses={
+        200: {"content": {"image/jpeg": {}}, "description": "The image."},
+        304: {"description": "Unchanged since the If-None-Match ETag or date."},
+        404: {"description": "Unknown image, or the image proxy is disabled."},
+        500: {"description": "Downloading the image from IGDB failed."},
+    },
+)
+async def get_image(
+    request: Request,
+    size: str = Path(..., description="IGDB image size, e.g. t_cover_big, or blur"),
+    filename: str = Path(..., description="IGDB image id with .jpg, e.g. co1r6b.jpg"),
+    proxy: Optional[ImageProxy] = Depends(get_image_proxy),
+):
+    """
+    Serve an IGDB image from the on-disk image cache, downloading it on a miss.
+
+    Images never change for a given size and id, so they are sent with an
+    immutable Cache-Control, and a matching If-None-Match is answered with 304
+    without touching the disk. If-Modified-Since gets 304 only for a cached
+    image stored no later than the given date.
+
+    Args:
+        request (Request): Incoming request, for its conditional headers.
+        size (str): IGDB image size, or "blur" for a placeholder.
+        filename (str): IGDB image id followed by ".jpg".
+        proxy (ImageProxy): Injected image proxy.
+
+    Returns:
+        FileResponse: The JPEG file.
+    """
+    image_id, _, extension = filename.rpartition(".")
+    try:
+        if proxy is None:
+            raise ImageNotFound("The image proxy is disabled.")
+        if extension != "jpg":
+            raise ImageNotFound(f"Unknown image type {extension!r}")
+        proxy.validate(size, image_id)
+    except ImageNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    headers = {"ETag": image_etag(size, image_id), "Cache-Control": IMAGE_CACHE_CONTROL}
+    if await not_modified(request, proxy, size, image_id, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    try:
+        lease = await proxy.get(size, image_id)
+    except ImageNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e
+        raise upstream_error(e) from e
+    return FileResponse(
+        lease,
+        media_type="image/jpeg",
+        headers=headers,
+        background=BackgroundTask(proxy.store.release, lease),
+    )
+
+
+@router.get(
+    "/stats",
+    summary="Runtime counters for the IGDB client",
+    responses={200: {"description": "Counters keyed by IGDB client component."}},
+)
+async def get_igdb_stats(
+    client: AsyncIGDBClient = Depends(get_igdb_client),
+    proxy: Optional[ImageProxy] = Depends(get_image_proxy),
+):
+    """
+    Return runtime counters for the IGDB client (e.g. coalesced upstream calls).
+
+    Args:
+        client (AsyncIGDBClient): Injected IGDB client.
+        proxy (ImageProxy): Injected image proxy, if enabled.
+
+    Returns:
+        dict: Counters keyed by component name.
+    """
+    stats = client.stats()
+    if proxy is not None:
+        stats["images"] = proxy.stats()
+    return stats
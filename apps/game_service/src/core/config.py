@@ -3,12 +3,31 @@ Configuration loader for IGDB credentials and other settings.
 """
 
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file (if present)
 load_dotenv()
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment ("1", "true", "yes" are truthy)."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer from the environment, falling back to the default."""
+    return int(os.getenv(name, str(default)))
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float from the environment, falling back to the default."""
+    return float(os.getenv(name, str(default)))
+
+
 # pylint: disable=too-few-public-methods
 class Settings:
     """Loads environment variables and secrets for the game service."""
@@ -16,3 +35,109 @@ class Settings:
     IGDB_CLIENT_ID: str = os.getenv("IGDB_CLIENT_ID", "")
     IGDB_CLIENT_SECRET: str = os.getenv("IGDB_CLIENT_SECRET", "")
     IGDB_BASE_URL: str = os.getenv("IGDB_BASE_URL", "https://api.igdb.com/v4")
+
+    # Shared, connection-pooled HTTP transport used for every IGDB/Twitch call
+    IGDB_HTTP2: bool = _env_bool("IGDB_HTTP2", False)
+    IGDB_MAX_CONNECTIONS: int = _env_int("IGDB_MAX_CONNECTIONS", 20)
+    IGDB_MAX_KEEPALIVE_CONNECTIONS: int = _env_int("IGDB_MAX_KEEPALIVE_CONNECTIONS", 10)
+    IGDB_KEEPALIVE_EXPIRY: float = _env_float("IGDB_KEEPALIVE_EXPIRY", 30.0)
+    IGDB_CONNECT_TIMEOUT: float = _env_float("IGDB_CONNECT_TIMEOUT", 5.0)
+    IGDB_READ_TIMEOUT: float = _env_float("IGDB_READ_TIMEOUT", 10.0)
+    IGDB_POOL_TIMEOUT: float = _env_float("IGDB_POOL_TIMEOUT", 5.0)
+
+    # Micro-batching window for get_game_by_id lookups (0 disables batching)
+    IGDB_BATCH_WINDOW_MS: float = _env_float("IGDB_BATCH_WINDOW_MS", 5.0)
+
+    # Parallel 500-id chunks fetched by a single get_games_by_ids call
+    IGDB_MAX_CONCURRENT_CHUNKS: int = _env_int("IGDB_MAX_CONCURRENT_CHUNKS", 4)
+
+    # Global IGDB rate limit (0 disables the limiter) and concurrency cap
+    IGDB_RATE_LIMIT_RPS: float = _env_float("IGDB_RATE_LIMIT_RPS", 4.0)
+    IGDB_RATE_LIMIT_BURST: float = _env_float("IGDB_RATE_LIMIT_BURST", 4.0)
+    IGDB_MAX_CONCURRENT_REQUESTS: int = _env_int("IGDB_MAX_CONCURRENT_REQUESTS", 8)
+    # Interactive requests expected to queue longer than this fail fast with 503
+    IGDB_RATE_LIMIT_MAX_WAIT: float = _env_float("IGDB_RATE_LIMIT_MAX_WAIT", 5.0)
+    # Enforce the limits across workers through the redis cache backend
+    IGDB_RATE_LIMIT_SHARED: bool = _env_bool("IGDB_RATE_LIMIT_SHARED", True)
+
+    # Retries of transient IGDB failures (total attempts; 1 disables retries)
+    IGDB_RETRY_ATTEMPTS: int = _env_int("IGDB_RETRY_ATTEMPTS", 3)
+    IGDB_RETRY_BASE_DELAY: float = _env_float("IGDB_RETRY_BASE_DELAY", 0.2)
+    IGDB_RETRY_MAX_DELAY: float = _env_float("IGDB_RETRY_MAX_DELAY", 2.0)
+    # Per-endpoint circuit breaker (an open time of 0 disables it)
+    IGDB_BREAKER_FAILURE_RATE: float = _env_float("IGDB_BREAKER_FAILURE_RATE", 0.5)
+    IGDB_BREAKER_MIN_CALLS: int = _env_int("IGDB_BREAKER_MIN_CALLS", 10)
+    IGDB_BREAKER_WINDOW: float = _env_float("IGDB_BREAKER_WINDOW", 30.0)
+    IGDB_BREAKER_OPEN_SECONDS: float = _env_float("IGDB_BREAKER_OPEN_SECONDS", 15.0)
+
+    # Answer longer searches from a cached complete result of a prefix
+    IGDB_SEARCH_PREFIX_REUSE: bool = _env_bool("IGDB_SEARCH_PREFIX_REUSE", False)
+
+    # Share the IGDB access token between workers through the cache backend
+    IGDB_SHARE_TOKEN: bool = _env_bool("IGDB_SHARE_TOKEN", True)
+
+    # IGDB response cache: "memory" (per process), "redis" (shared) or "none"
+    IGDB_CACHE_BACKEND: str = os.getenv("IGDB_CACHE_BACKEND", "memory")
+    IGDB_CACHE_URL: str = os.getenv("IGDB_CACHE_URL", "redis://localhost:6379/0")
+    IGDB_CACHE_KEY_PREFIX: str = os.getenv("IGDB_CACHE_KEY_PREFIX", "igdb:")
+    IGDB_CACHE_TIMEOUT: float = _env_float("IGDB_CACHE_TIMEOUT", 0.5)
+    # Per-process L1 in front of the redis backend (0 disables the L1 tier)
+    IGDB_CACHE_L1_TTL: float = _env_float("IGDB_CACHE_L1_TTL", 10.0)
+    IGDB_CACHE_L1_MAX_ENTRIES: int = _env_int("IGDB_CACHE_L1_MAX_ENTRIES", 1000)
+    IGDB_CACHE_L1_MAX_BYTES: int = _env_int("IGDB_CACHE_L1_MAX_BYTES", 8 * 1024 * 1024)
+    # Approximate in-memory byte budgets (0 disables a byte budget)
+    IGDB_CACHE_MAX_ENTRIES: int = _env_int("IGDB_CACHE_MAX_ENTRIES", 10000)
+    IGDB_CACHE_MAX_BYTES: int = _env_int("IGDB_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+    IGDB_CACHE_SEARCH_MAX_ENTRIES: int = _env_int("IGDB_CACHE_SEARCH_MAX_ENTRIES", 2000)
+    IGDB_CACHE_SEARCH_MAX_BYTES: int = _env_int(
+        "IGDB_CACHE_SEARCH_MAX_BYTES", 16 * 1024 * 1024
+    )
+    IGDB_CACHE_SWEEP_INTERVAL: float = _env_float("IGDB_CACHE_SWEEP_INTERVAL", 60.0)
+    # Cache search results and games as encoded bytes: "" (off), "json" or "msgpack"
+    IGDB_CACHE_PAYLOAD: str = os.getenv("IGDB_CACHE_PAYLOAD", "")
+    # zlib-compress payload bodies of at least this many bytes (0 disables it)
+    IGDB_CACHE_COMPRESS_MIN_BYTES: int = _env_int("IGDB_CACHE_COMPRESS_MIN_BYTES", 1024)
+
+    # Local mirror of the IGDB games catalog, kept current by delta syncs
+    IGDB_CATALOG_ENABLED: bool = _env_bool("IGDB_CATALOG_ENABLED", False)
+    # Database holding the mirror; empty uses GAME_SERVICE_DATABASE_URL
+    IGDB_CATALOG_DATABASE_URL: str = os.getenv("IGDB_CATALOG_DATABASE_URL", "")
+    # Seconds between sync rounds (0 disables background syncing)
+    IGDB_CATALOG_SYNC_INTERVAL: float = _env_float("IGDB_CATALOG_SYNC_INTERVAL", 900.0)
+    IGDB_CATALOG_PAGE_SIZE: int = _env_int("IGDB_CATALOG_PAGE_SIZE", 500)
+    # Answer searches from a full-text index over the catalog (needs the mirror)
+    IGDB_SEARCH_INDEX: bool = _env_bool("IGDB_SEARCH_INDEX", False)
+    # Score from which local matches answer a search without IGDB
+    IGDB_SEARCH_INDEX_MIN_SCORE: float = _env_float("IGDB_SEARCH_INDEX_MIN_SCORE", 0.8)
+    # Lowest score of a local match served when IGDB fails
+    IGDB_SEARCH_INDEX_MATCH_SCORE: float = _env_float(
+        "IGDB_SEARCH_INDEX_MATCH_SCORE", 0.3
+    )
+    # In-process prefix index behind /igdb/suggest, fed by searches and the mirror
+    IGDB_SUGGEST_ENABLED: bool = _env_bool("IGDB_SUGGEST_ENABLED", False)
+    # Seconds between refreshes from the catalog mirror (0 disables them)
+    IGDB_SUGGEST_REFRESH_INTERVAL: float = _env_float(
+        "IGDB_SUGGEST_REFRESH_INTERVAL", 60.0
+    )
+    # Seconds between background reloads of the genre/platform vocabularies
+    # (0 loads them once at startup)
+    IGDB_VOCABULARY_REFRESH_INTERVAL: float = _env_float(
+        "IGDB_VOCABULARY_REFRESH_INTERVAL", 3600.0
+    )
+
+    # Cover image proxy at /igdb/images, backed by an on-disk LRU cache
+    IGDB_IMAGE_PROXY_ENABLED: bool = _env_bool("IGDB_IMAGE_PROXY_ENABLED", False)
+    # Upstream image CDN the proxy fetches from
+    IGDB_IMAGE_BASE_URL: str = os.getenv(
+        "IGDB_IMAGE_BASE_URL", "https://images.igdb.com/igdb/image/upload"
+    )
+    # Public URL of the proxy that cover URLs in game responses are rewritten to
+    IGDB_IMAGE_PROXY_URL: str = os.getenv("IGDB_IMAGE_PROXY_URL", "/igdb/images")
+    IGDB_IMAGE_CACHE_DIR: str = os.getenv(
+        "IGDB_IMAGE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "igdb-images")
+    )
+    IGDB_IMAGE_CACHE_MAX_BYTES: int = _env_int(
+        "IGDB_IMAGE_CACHE_MAX_BYTES", 512 * 1024 * 1024
+    )
+    # Serve blurred placeholders at /igdb/images/blur (needs Pillow)
+    IGDB_IMAGE_PLACEHOLDERS: bool = _env_bool("IGDB_IMAGE_PLACEHOLDERS", False)
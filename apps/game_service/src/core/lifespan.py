@@ -0,0 +1,157 @@
+"""
+Application lifespan for game_service.
+
+Owns the long-lived resources shared by every request: the pooled IGDB HTTP
+transports (sync and async), the IGDB response cache, rate limiter, retry
+policy and circuit breakers, the optional local IGDB catalog mirror, its
+search index and background sync, the typeahead suggestion index, the
+preloaded genre/platform vocabularies, the optional cover image proxy, the
+async IGDB client used by the routes and the options used to build
+short-lived sync IGDB clients. Resources are created on startup, stored on
+``app.state`` and released on shutdown.
+"""
+
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+from fastapi import FastAPI
+from src.core.config import Settings
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.auth import IGDBAuth
+from src.igdb.cache_factory import create_cache
+from src.igdb.catalog import create_catalog
+from src.igdb.catalog_sync import CatalogSync
+from src.igdb.client import IGDBClient
+from src.igdb.http import create_async_http_client, create_http_client
+from src.igdb.images import create_image_proxy
+from src.igdb.loader import AsyncGameBatchLoader, GameBatchLoader
+from src.igdb.payload import create_payload_codec
+from src.igdb.ratelimit import create_rate_limiter
+from src.igdb.resilience import create_circuit_breakers, create_retry_policy
+from src.igdb.revalidate import Revalidator
+from src.igdb.search_index import create_search_index
+from src.igdb.singleflight import SingleFlight
+from src.igdb.suggest import create_suggest_index
+from src.igdb.vocabulary import VocabularyStore
+
+
+def _create_auth(settings: Settings, http_client, async_http_client, cache) -> IGDBAuth:
+    """Return the IGDB auth, using the pooled clients and sharing tokens if enabled."""
+    auth = IGDBAuth()
+    auth.http_client = http_client
+    auth.async_http_client = async_http_client
+    # One worker's token refresh serves every worker sharing the cache
+    auth.cache = cache if settings.IGDB_SHARE_TOKEN else None
+    return auth
+
+
+def _shared_client_options(settings: Settings, cache) -> Dict[str, Any]:
+    """Return the keyword arguments shared by the sync and async IGDB clients."""
+    catalog = create_catalog(settings)
+    return {
+        "base_url": settings.IGDB_BASE_URL,
+        "cache": cache,
+        "max_concurrent_chunks": settings.IGDB_MAX_CONCURRENT_CHUNKS,
+        # One limiter for the sync and async clients so they share IGDB's budget
+        "rate_limiter": create_rate_limiter(settings, cache),
+        "retry_policy": create_retry_policy(settings),
+        "circuit_breakers": create_circuit_breakers(settings),
+        "search_prefix_reuse": settings.IGDB_SEARCH_PREFIX_REUSE,
+        "payload_codec": create_payload_codec(settings),
+        "catalog": catalog,
+        "search_index": create_search_index(settings, catalog),
+        "suggest_index": create_suggest_index(settings),
+    }
+
+
+def _start_background_tasks(app: FastAPI, settings: Settings, auth: IGDBAuth) -> list:
+    """
+    Start the catalog sync, suggestion index and vocabulary threads.
+
+    Returns:
+        list: The started tasks, each with a close() method, in shutdown order.
+    """
+    options = app.state.igdb_client_options
+    catalog = options["catalog"]
+    suggest_index = options["suggest_index"]
+    # Served from the bundled snapshot until the first load from IGDB succeeds
+    vocabularies = VocabularyStore()
+    vocabularies.start(
+        IGDBClient(auth=auth, **options), settings.IGDB_VOCABULARY_REFRESH_INTERVAL
+    )
+    app.state.igdb_vocabularies = vocabularies
+    tasks = [vocabularies]
+    catalog_sync = None
+    if catalog is not None and settings.IGDB_CATALOG_SYNC_INTERVAL > 0:
+        catalog_sync = CatalogSync(
+            IGDBClient(auth=auth, **options),
+            catalog,
+            page_size=settings.IGDB_CATALOG_PAGE_SIZE,
+            # Only the worker holding the lease in the shared cache syncs
+            lease=app.state.igdb_cache,
+        )
+        catalog_sync.start(settings.IGDB_CATALOG_SYNC_INTERVAL)
+        tasks.append(catalog_sync)
+    app.state.igdb_catalog_sync = catalog_sync
+    if suggest_index is not None:
+        # Also indexes search results, so it runs without a catalog too
+        suggest_index.start(catalog, settings.IGDB_SUGGEST_REFRESH_INTERVAL)
+        tasks.append(suggest_index)
+    return tasks
+
+
+def _clear_state(app: FastAPI, auth: IGDBAuth) -> None:
+    """Drop the shared resources from app.state and the auth before closing them."""
+    auth.http_client = None
+    auth.async_http_client = None
+    auth.cache = None
+    app.state.igdb_async_client = None
+    app.state.igdb_client_options = None
+    app.state.igdb_http_client = None
+    app.state.igdb_cache = None
+    app.state.igdb_catalog_sync = None
+    app.state.igdb_vocabularies = None
+    app.state.igdb_image_proxy = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared IGDB resources on startup and close them on shutdown."""
+    settings = Settings()
+    http_client = create_http_client(settings)
+    async_http_client = create_async_http_client(settings)
+    cache = create_cache(settings)
+    auth = _create_auth(settings, http_client, async_http_client, cache)
+    shared = _shared_client_options(settings, cache)
+    batch_window = settings.IGDB_BATCH_WINDOW_MS / 1000.0
+
+    app.state.igdb_http_client = http_client
+    app.state.igdb_cache = cache
+    # Keyword arguments for the short-lived sync IGDBClients built per request
+    app.state.igdb_client_options = {
+        **shared,
+        "http_client": http_client,
+        "single_flight": SingleFlight(),
+        "game_loader": GameBatchLoader(batch_window) if batch_window > 0 else None,
+        "revalidator": Revalidator(),
+    }
+    app.state.igdb_async_client = AsyncIGDBClient(
+        auth=auth,
+        http_client=async_http_client,
+        game_loader=AsyncGameBatchLoader(batch_window) if batch_window > 0 else None,
+        **shared,
+    )
+    background_tasks = _start_background_tasks(app, settings, auth)
+    app.state.igdb_image_proxy = create_image_proxy(settings, async_http_client)
+    try:
+        yield
+    finally:
+        _clear_state(app, auth)
+        for task in background_tasks:
+            task.close()
+        if shared["catalog"] is not None:
+            shared["catalog"].close()
+        if cache is not None:
+            cache.close()
+        http_client.close()
+        await async_http_client.aclose()
@@ -0,0 +1,475 @@
+"""
+Native asyncio IGDB client built on httpx.AsyncClient.
+
+AsyncIGDBClient exposes the same surface as IGDBClient (search_games,
+get_game_by_id, get_games_by_ids, get_genres, get_platforms) as coroutines, so
+the async IGDB routes can hold many concurrent upstream waits on one worker
+without occupying Starlette threadpool slots. Query building, caching helpers
+and response mapping are inherited from IGDBClient; with a cache that blocks
+on network I/O (RedisCache, TieredCache) the caching helpers run on worker
+threads, so a slow or unreachable cache server never stalls the event loop.
+"""
+
+import asyncio
+from contextlib import nullcontext
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+import httpx
+from src.igdb.client import (
+    DEFAULT_MAX_CONCURRENT_CHUNKS,
+    DEFAULT_TIMEOUT,
+    UPSTREAM_ERRORS,
+    VOCABULARY_PAGE_SIZE,
+    ChunkFailure,
+    IGDBBatchError,
+    IGDBClient,
+    chunk_ids,
+)
+from src.igdb.catalog import CatalogStore
+from src.igdb.loader import AsyncGameBatchLoader
+from src.igdb.payload import PayloadCodec
+from src.igdb.query_builder import build_igdb_query
+from src.igdb.ratelimit import RateLimiter
+from src.igdb.resilience import CircuitBreakers, RetryPolicy
+from src.igdb.revalidate import VOCABULARY_TTL, AsyncRevalidator
+from src.igdb.schemas import GameFilters
+from src.igdb.search import (
+    canonicalize_filters,
+    canonicalize_query,
+    filtered_search_cache_key,
+    search_cache_key,
+)
+from src.igdb.search_index import IndexResult, SearchIndex
+from src.igdb.singleflight import AsyncSingleFlight
+from src.igdb.suggest import SuggestIndex
+
+T = TypeVar("T")
+
+
+# pylint: disable=invalid-overridden-method
+class AsyncIGDBClient(IGDBClient):
+    """
+    Asyncio client for the IGDB API.
+
+    Mirrors IGDBClient but awaits every network call, including calls to a
+    cache whose backend is blocking; InMemoryCache is used inline.
+    """
+
+    def __init__(
+        self,
+        auth,
+        base_url: str = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        cache=None,
+        single_flight: Optional[AsyncSingleFlight] = None,
+        game_loader: Optional[AsyncGameBatchLoader] = None,
+        max_concurrent_chunks: int = DEFAULT_MAX_CONCURRENT_CHUNKS,
+        revalidator: Optional[AsyncRevalidator] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        search_prefix_reuse: bool = False,
+        payload_codec: Optional[PayloadCodec] = None,
+        catalog: Optional[CatalogStore] = None,
+        search_index: Optional[SearchIndex] = None,
+        suggest_index: Optional[SuggestIndex] = None,
+    ) -> None:
+        """
+        Initialize the AsyncIGDBClient.
+
+        Args:
+            auth: IGDBAuth instance for authentication (must provide aget_token).
+            base_url (str, optional): Override IGDB API base URL.
+            http_client (httpx.AsyncClient, optional): Shared pooled async client. When
+                omitted, each request opens a short-lived AsyncClient.
+            cache (CacheBackend, optional): Cache used for IGDB responses.
+            single_flight (AsyncSingleFlight, optional): Group used to coalesce
+                concurrent identical lookups.
+            game_loader (AsyncGameBatchLoader, optional): Micro-batching loader that
+                merges concurrent get_game_by_id misses into one IGDB query.
+            max_concurrent_chunks (int): How many 500-id chunks of a large
+                get_games_by_ids call are awaited concurrently.
+            revalidator (AsyncRevalidator, optional): Runs background refresh tasks
+                for stale search and genre/platform entries, at most one per key.
+            rate_limiter (RateLimiter, optional): Limits requests per second and in
+                flight; may be shared with a sync IGDBClient. None means unlimited.
+            retry_policy (RetryPolicy, optional): Retries transient failures with
+                jittered backoff; None means no retries.
+            circuit_breakers (CircuitBreakers, optional): Per-endpoint breakers,
+                may be shared with a sync IGDBClient; None disables circuit breaking.
+            search_prefix_reuse (bool): Answer a search from the cached complete
+                result of one of its prefixes, filtered locally, when possible.
+            payload_codec (PayloadCodec, optional): Caches search results and games
+                as encoded bytes; None caches them as dicts, stored with the ETag
+                of their body.
+            catalog (CatalogStore, optional): Local IGDB catalog mirror that answers
+                game lookups missing from the cache; queried on a worker thread.
+            search_index (SearchIndex, optional): Local full-text index over the
+                catalog for confident and failed searches; queried on a worker thread.
+            suggest_index (SuggestIndex, optional): Typeahead prefix index that
+                learns the names of games returned by IGDB searches.
+        """
+        super().__init__(
+            auth=auth,
+            base_url=base_url,
+            cache=cache,
+            game_loader=game_loader,
+            max_concurrent_chunks=max_concurrent_chunks,
+            revalidator=revalidator or AsyncRevalidator(),
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            circuit_breakers=circuit_breakers,
+            search_prefix_reuse=search_prefix_reuse,
+            payload_codec=payload_codec,
+            catalog=catalog,
+            search_index=search_index,
+            suggest_index=suggest_index,
+        )
+        self.http_client = http_client
+        self.single_flight = single_flight or AsyncSingleFlight()
+
+    async def _cache_io(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Call a helper that reads or writes the cache.
+
+        Blocking backends (see CacheBackend.blocking) are called on a worker
+        thread; in-process caches are called inline.
+        """
+        if getattr(self.cache, "blocking", False):
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def _aget_revalidating(
+        self, key: str, refresh: Callable[[], Any]
+    ) -> Optional[Any]:
+        """Read a stale-while-revalidate entry, refreshing it in the background if stale."""
+        found = await self._cache_io(self._read_revalidating, key)
+        if found is None:
+            return None
+        value, stale = found
+        if stale:
+            self._refresh(key, refresh)
+        return value
+
+    async def _headers(self) -> Dict[str, str]:
+        """Build the authenticated IGDB request headers."""
+        return self._headers_for_token(await self.auth.aget_token())
+
+    async def _post(self, endpoint: str, body: str) -> Any:
+        """
+        POST an Apicalypse query to an IGDB endpoint and return the decoded JSON.
+
+        Transient failures are retried by the retry policy, inside the endpoint's
+        circuit breaker.
+
+        Args:
+            endpoint (str): IGDB endpoint name, e.g. "games" or "genres".
+            body (str): Apicalypse query body.
+
+        Raises:
+            RateLimitExceeded: If the rate limiter cannot grant a slot within budget.
+            CircuitOpenError: If the endpoint's circuit is open.
+        """
+        url = f"{self.base_url}/{endpoint}"
+        breakers = self.circuit_breakers
+        with breakers.get(endpoint).protect() if breakers else nullcontext():
+            if self.retry_policy is None:
+                return await self._request(url, body)
+            return await self.retry_policy.acall(partial(self._request, url, body))
+
+    async def _request(self, url: str, body: str) -> Any:
+        """
+        Make one IGDB request and return the decoded JSON.
+
+        If IGDB rejects the access token (401), the token is invalidated and the
+        request is repeated once with a freshly obtained one.
+        """
+        token = await self.auth.aget_token()
+        response = await self._send(url, token, body)
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code != 401:
+                raise
+            await self.auth.ainvalidate_token(token)
+            response = await self._send(url, await self.auth.aget_token(), body)
+            response.raise_for_status()
+        return response.json()
+
+    async def _send(self, url: str, token: str, body: str) -> httpx.Response:
+        """Send one rate-limited request to IGDB with the given access token."""
+        headers = self._headers_for_token(token)
+        limiter = self.rate_limiter
+        async with limiter.acquire_async() if limiter is not None else nullcontext():
+            if self.http_client is None:
+                async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
+                    return await client.post(url, headers=headers, content=body)
+            return await self.http_client.post(url, headers=headers, content=body)
+
+    async def _fetch_chunk(self, game_ids: List[int]) -> List[dict]:
+        """Fetch one chunk (at most 500 ids) from IGDB and return mapped games."""
+        api_results = await self._post("games", self._games_query(game_ids))
+        return [self._map_game(game) for game in api_results]
+
+    async def _fetch_games_from_api(self, game_ids):
+        """
+        Fetch games from IGDB API and return mapped games.
+
+        Id lists larger than IGDB's 500-result cap are split into chunks awaited
+        concurrently under a semaphore of max_concurrent_chunks. If any chunk
+        fails, IGDBBatchError reports the failed chunks alongside the fetched games.
+        """
+        if not game_ids:
+            return []
+        chunks = chunk_ids(game_ids)
+        if len(chunks) == 1:
+            return await self._fetch_chunk(chunks[0])
+        semaphore = asyncio.Semaphore(self.max_concurrent_chunks)
+
+        async def fetch_bounded(chunk):
+            async with semaphore:
+                return await self._fetch_chunk(chunk)
+
+        results = await asyncio.gather(
+            *(fetch_bounded(chunk) for chunk in chunks), return_exceptions=True
+        )
+        games, failures = [], []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                failures.append(ChunkFailure(chunk, result))
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                games.extend(result)
+        if failures:
+            raise IGDBBatchError(games, failures, len(chunks))
+        return games
+
+    async def _aget_games_from_catalog(self, game_ids: List[int]):
+        """Look ids up in the catalog on a worker thread, off the event loop."""
+        if self.catalog is None or not game_ids:
+            return [], game_ids
+        return await asyncio.to_thread(self._get_games_from_catalog, game_ids)
+
+    async def _asearch_locally(self, canonical_query: str) -> Optional[IndexResult]:
+        """Search the local index on a worker thread, off the event loop."""
+        if self.search_index is None or not canonical_query:
+            return None
+        return await asyncio.to_thread(self.search_index.search, canonical_query)
+
+    async def get_games_by_ids(self, game_ids: List[int]) -> List[dict]:
+        """
+        Batch fetch game details by a list of IGDB IDs, using cache for each ID if available.
+        Ids missing from the cache are looked up in the catalog mirror, if any,
+        before IGDB.
+
+        Raises:
+            IGDBBatchError: If some chunks of a large request failed upstream.
+        """
+        if not game_ids:
+            return []
+        cached_games, ids_to_fetch = await self._cache_io(
+            self._get_games_from_cache, game_ids, self.cache
+        )
+        mirrored_games, ids_to_fetch = await self._aget_games_from_catalog(ids_to_fetch)
+        cached_games += mirrored_games
+        failure = None
+        try:
+            fetched_games = await self._fetch_games_from_api(ids_to_fetch)
+        except IGDBBatchError as exc:
+            fetched_games, failure = exc.games, exc
+        return await self._cache_io(
+            self._finish_batch,
+            game_ids,
+            ids_to_fetch,
+            cached_games,
+            fetched_games,
+            failure,
+        )
+
+    async def _get_vocabulary(self, endpoint: str) -> List[dict]:
+        """
+        Fetch a small id/name vocabulary (genres or platforms).
+
+        Fresh for 24 hours, then served stale while refreshing for up to a week.
+        """
+        fetch = partial(self._fetch_vocabulary, endpoint)
+        cached = await self._aget_revalidating(endpoint, fetch)
+        if cached is not None:
+            return cached
+        return await self.single_flight.do(endpoint, fetch)
+
+    async def _fetch_vocabulary(self, endpoint: str) -> List[dict]:
+        """Fetch every page of a vocabulary from IGDB and cache it."""
+        rows: List[dict] = []
+        while True:
+            page = await self._post(endpoint, self._vocabulary_query(len(rows)))
+            rows.extend(page)
+            if len(page) < VOCABULARY_PAGE_SIZE:
+                break
+        await self._cache_io(self._set_revalidating, endpoint, rows, VOCABULARY_TTL)
+        return rows
+
+    async def get_genres(self) -> List[dict]:
+        """
+        Fetch all game genres from IGDB, using cache if available.
+
+        Returns:
+            List[dict]: List of genre dictionaries with 'id' and 'name'.
+        """
+        return await self._get_vocabulary("genres")
+
+    async def get_platforms(self) -> List[dict]:
+        """
+        Fetch all platforms from IGDB, using cache if available.
+
+        Returns:
+            List[dict]: List of platform dictionaries with 'id' and 'name'.
+        """
+        return await self._get_vocabulary("platforms")
+
+    async def get_game_by_id(self, game_id: int) -> dict:
+        """
+        Get details for a specific game by IGDB ID, using cache if available.
+        Includes cover, summary, release date, genres, and platforms.
+        Concurrent misses for the same ID share one upstream request, and ids
+        IGDB does not know are remembered for a minute.
+        """
+        cached_games, ids_to_fetch = await self._cache_io(
+            self._get_games_from_cache, [game_id], self.cache
+        )
+        if cached_games:
+            return cached_games[0]
+        if not ids_to_fetch:
+            raise ValueError(f"Game with id {game_id} not found")
+        mirrored_games, _ = await self._aget_games_from_catalog(ids_to_fetch)
+        if mirrored_games:
+            return mirrored_games[0]
+        return await self.single_flight.do(
+            f"game:{game_id}", lambda: self._fetch_game(game_id)
+        )
+
+    async def _fetch_game(self, game_id: int) -> dict:
+        """Fetch one game from IGDB and cache it, raising ValueError if unknown."""
+        if self.game_loader is not None:
+            game = await self.game_loader.load(game_id, self._fetch_games_from_api)
+            fetched_games = [game] if game is not None else []
+        else:
+            fetched_games = await self._fetch_games_from_api([game_id])
+        if not fetched_games:
+            if self.cache:
+                await self._cache_io(self._cache_not_found, [game_id], self.cache)
+            raise ValueError(f"Game with id {game_id} not found")
+        if self.cache:
+            await self._cache_io(self._cache_games, fetched_games, self.cache)
+        return fetched_games[0]
+
+    async def search_games(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Search for games using the IGDB API, returning expanded fields. Uses cache if available.
+        The query is canonicalized first, so case and whitespace variants share
+        one cache entry. With search_prefix_reuse, a cached complete result of a
+        prefix of the query is filtered locally instead of searching IGDB.
+        With a search_index, confident local matches are returned without
+        searching IGDB, and weaker ones when IGDB fails.
+        Concurrent misses for the same query share one upstream request; results
+        older than 5 minutes are served stale while one background refresh runs.
+
+        Args:
+            query (str): Search query string.
+
+        Returns:
+            List[dict]: List of mapped game data dictionaries.
+        """
+        canonical = canonicalize_query(query)
+        cache_key = search_cache_key(canonical)
+        fetch = partial(self._fetch_search, canonical)
+        cached = await self._aget_revalidating(cache_key, fetch)
+        if cached is not None:
+            return cached
+        reused = await self._cache_io(self._search_from_prefix, canonical)
+        if reused is not None:
+            return reused
+        local = await self._asearch_locally(canonical)
+        if local is not None and local.confident:
+            self.search_index_hits += 1
+            return local.games
+        try:
+            return await self.single_flight.do(cache_key, fetch)
+        except UPSTREAM_ERRORS as exc:
+            return self._fall_back_to_index(local, canonical, exc)
+
+    async def _fetch_search(self, query: str) -> List[Dict[str, Any]]:
+        """Run a search for a canonical query against IGDB, map the results and cache them."""
+        results = await self._post("games", self._search_query(query))
+        mapped = [self._map_game(game) for game in results]
+        await self._cache_io(self._cache_search, search_cache_key(query), mapped)
+        return mapped
+
+    async def search_games_filtered(
+        self, query: str, filters: Optional[GameFilters]
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for games matching filters, with the IGDB query built by build_igdb_query.
+        Query and filters are canonicalized first, so equivalent filter sets in
+        any order share one cache entry and one upstream request. Without any
+        filter set this is a plain search_games call.
+
+        Args:
+            query (str): Search query string.
+            filters (GameFilters, optional): Filters to apply upstream.
+
+        Returns:
+            List[dict]: List of mapped game data dictionaries.
+        """
+        canonical_filters = canonicalize_filters(filters)
+        if canonical_filters is None:
+            return await self.search_games(query)
+        canonical = canonicalize_query(query)
+        cache_key = filtered_search_cache_key(canonical, canonical_filters)
+        fetch = partial(
+            self._fetch_filtered_search, canonical, canonical_filters, cache_key
+        )
+        cached = await self._aget_revalidating(cache_key, fetch)
+        if cached is not None:
+            return cached
+        return await self.single_flight.do(cache_key, fetch)
+
+    async def _fetch_filtered_search(
+        self, query: str, filters: GameFilters, cache_key: str
+    ) -> List[Dict[str, Any]]:
+        """Run a filtered search against IGDB, map the results and cache them."""
+        results = await self._post("games", build_igdb_query(query, filters))
+        mapped = [self._map_game(game) for game in results]
+        await self._cache_io(self._cache_search, cache_key, mapped)
+        return mapped
+
+    async def cached_search_body(
+        self, query: str, filters: Optional[GameFilters] = None
+    ) -> Optional[bytes]:
+        """
+        Return the cached response body of a plain or filtered search.
+
+        A stale body is returned, marked stale, while it is refreshed in the
+        background.
+
+        Returns:
+            TaggedBody | None: GameOut JSON array with its stored ETag, or None
+            if the caller has to search.
+        """
+        if not self.cache:
+            return None
+        cache_key, fetch = self._search_target(query, filters)
+        body = await self._cache_io(self._read_body, cache_key)
+        if body is not None and body.stale:
+            self._refresh(cache_key, fetch)
+        return body
+
+    async def cached_games_body(self, game_ids: List[int]) -> Optional[bytes]:
+        """Return the cached response body of a batch game lookup, or None."""
+        return await self._cache_io(super().cached_games_body, game_ids)
+
+    async def cached_game_body(self, game_id: int) -> Optional[bytes]:
+        """Return the cached response body of one game, or None."""
+        return await self._cache_io(super().cached_game_body, game_id)
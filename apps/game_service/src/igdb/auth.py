@@ -1,16 +1,48 @@
 """
 IGDB OAuth authentication logic for token retrieval and refresh.
 Handles caching and automatic refresh of the IGDB API access token.
+
+Refreshes are single-flight: when the token expires under load one caller
+fetches a new token while the others wait for it, instead of every request
+hitting the Twitch OAuth endpoint at once. Shortly before expiry the token is
+refreshed in the background while the current one keeps being served. When a
+cache backend is attached (see src/core/lifespan.py), the token is also shared
+through it, so one worker's refresh serves every worker.
 """
 
+import asyncio
+import logging
 import os
+import threading
 import time
+from typing import Any, Callable, Optional, TypeVar
 
 import httpx
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger("igdb.auth")
+
+# Cache keys used to share the token between workers
+TOKEN_CACHE_KEY = "auth:token"
+REFRESH_LOCK_KEY = "auth:refresh_lock"
+
+# Seconds subtracted from the token lifetime reported by Twitch
+EXPIRY_BUFFER = 60
+# Refresh in the background this share of the lifetime before expiry...
+REFRESH_AHEAD_FRACTION = 0.1
+# ...but no earlier than this many seconds before expiry
+MAX_REFRESH_AHEAD = 300
+
+# How long a worker holds the shared refresh lock at most
+REFRESH_LOCK_TTL = 10
+# How long a worker without a valid token waits for another worker's refresh
+SHARED_REFRESH_WAIT = 2.0
+SHARED_REFRESH_POLL = 0.05
+
+T = TypeVar("T")
+
 
 class IGDBAuth:
     """
@@ -38,29 +70,273 @@ class IGDBAuth:
             self._access_token = None
         if not hasattr(self, "_expires_at"):
             self._expires_at = 0
+        if not hasattr(self, "_refresh_at"):
+            self._refresh_at = 0
+        if not hasattr(self, "http_client"):
+            # Shared pooled clients, injected by the app lifespan when running
+            self.http_client = None
+        if not hasattr(self, "async_http_client"):
+            self.async_http_client = None
+        if not hasattr(self, "cache"):
+            # Cache backend used to share the token between workers
+            self.cache = None
+        if not hasattr(self, "_lock"):
+            self._lock = threading.Lock()
+            # Guards _refreshing only, so callers never wait behind a fetch
+            self._refreshing_lock = threading.Lock()
+            self._refreshing = False
+            self._async_refresh: Optional[asyncio.Task] = None
+            self.fetches = 0
+
+    def _has_valid_token(self, now: float) -> bool:
+        """True if the in-memory token has not expired."""
+        return bool(self._access_token) and now < self._expires_at
 
     def get_token(self) -> str:
-        """Returns a valid access token, refreshing if needed."""
-        if not self._access_token or time.time() >= self._expires_at:
-            self._fetch_token()
+        """
+        Returns a valid access token, refreshing if needed.
+
+        Concurrent callers share one refresh. A token close to expiry is
+        returned as-is while a background refresh replaces it.
+        """
+        now = time.time()
+        if self._has_valid_token(now):
+            if now >= self._refresh_at:
+                self._start_background_refresh()
+            return self._access_token
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._has_valid_token(time.time()) or self._refresh():
+                return self._access_token
+        return self._wait_for_shared_token()
+
+    async def aget_token(self) -> str:
+        """Async variant of get_token that does not block the event loop."""
+        now = time.time()
+        if self._has_valid_token(now):
+            if now >= self._refresh_at:
+                self._start_async_refresh()
+            return self._access_token
+        await asyncio.shield(self._start_async_refresh())
         return self._access_token
 
-    def _fetch_token(self) -> None:
-        """Fetches a new token from Twitch/IGDB and updates cache."""
-        data = {
+    def invalidate_token(self, token: str) -> None:
+        """
+        Drop a token that IGDB rejected (401) so the next call fetches a new one.
+
+        Only the given token is dropped: if a concurrent caller already replaced
+        it, the newer token is kept.
+        """
+        with self._lock:
+            if self._access_token == token:
+                self.clear_token()
+        self._drop_shared_token(token)
+
+    async def ainvalidate_token(self, token: str) -> None:
+        """
+        Async variant of invalidate_token that does not block the event loop.
+
+        Runs on a worker thread: a sync caller may hold self._lock for the
+        whole of a blocking token fetch.
+        """
+        await asyncio.to_thread(self.invalidate_token, token)
+
+    def _drop_shared_token(self, token: str) -> None:
+        """Remove the shared token if it is the given one."""
+        if self.cache is not None:
+            shared = self.cache.get(TOKEN_CACHE_KEY)
+            if isinstance(shared, dict) and shared.get("access_token") == token:
+                self.cache.delete(TOKEN_CACHE_KEY)
+
+    async def _acache(self, fn: Callable[..., T], *args: Any) -> T:
+        """Call a helper that uses the cache, on a worker thread if the backend is blocking."""
+        if getattr(self.cache, "blocking", False):
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    def _start_background_refresh(self) -> None:
+        """Refresh a still-valid token on a daemon thread, at most one at a time."""
+        with self._refreshing_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run() -> None:
+            try:
+                with self._lock:
+                    # Skipped if another worker is already refreshing
+                    if time.time() >= self._refresh_at:
+                        self._refresh()
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                logger.warning("Background IGDB token refresh failed: %s", exc)
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="igdb-token-refresh", daemon=True).start()
+
+    def _start_async_refresh(self) -> asyncio.Task:
+        """Return the in-flight refresh task for this event loop, starting one if needed."""
+        task = self._async_refresh
+        loop = asyncio.get_running_loop()
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(self._arefresh())
+            task.add_done_callback(self._log_async_refresh_error)
+            self._async_refresh = task
+        return task
+
+    def _log_async_refresh_error(self, task: asyncio.Task) -> None:
+        """Log failed refreshes, including proactive ones that no caller awaits."""
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("IGDB token refresh failed: %s", task.exception())
+
+    def _refresh(self) -> bool:
+        """
+        Obtain a new token unless another worker is fetching one; the caller holds self._lock.
+
+        A fresh token shared by another worker is adopted instead of fetching.
+
+        Returns:
+            bool: True if a token was adopted or fetched, False if another
+            worker holds the shared refresh lock.
+        """
+        if self._adopt_shared_token():
+            return True
+        if not self._claim_refresh():
+            return False
+        try:
+            self._fetch_token()
+            self._share_token()
+        finally:
+            self._release_refresh()
+        return True
+
+    def _wait_for_shared_token(self) -> str:
+        """
+        Wait briefly for the token another worker is fetching, then fetch one.
+
+        The lock is only taken to check for the token between polls, so other
+        callers are not held up while this one waits.
+        """
+        deadline = time.monotonic() + SHARED_REFRESH_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(SHARED_REFRESH_POLL)
+            with self._lock:
+                if self._has_valid_token(time.time()) or self._adopt_shared_token():
+                    return self._access_token
+        with self._lock:
+            if not self._has_valid_token(time.time()):
+                self._fetch_token()
+                self._share_token()
+            return self._access_token
+
+    async def _arefresh(self) -> None:
+        """Async variant of _refresh, run as a single task per event loop."""
+        if await self._acache(self._adopt_shared_token):
+            return
+        claimed = await self._acache(self._claim_refresh)
+        if not claimed:
+            if self._has_valid_token(time.time()):
+                return
+            deadline = time.monotonic() + SHARED_REFRESH_WAIT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(SHARED_REFRESH_POLL)
+                if await self._acache(self._adopt_shared_token):
+                    return
+        try:
+            await self._afetch_token()
+            await self._acache(self._share_token)
+        finally:
+            if claimed:
+                await self._acache(self._release_refresh)
+
+    def _adopt_shared_token(self) -> bool:
+        """Use the shared token if it is not yet due for refresh."""
+        if self.cache is None:
+            return False
+        shared = self.cache.get(TOKEN_CACHE_KEY)
+        if not isinstance(shared, dict) or time.time() >= shared.get("refresh_at", 0):
+            return False
+        self._access_token = shared["access_token"]
+        self._expires_at = shared["expires_at"]
+        self._refresh_at = shared["refresh_at"]
+        return True
+
+    def _share_token(self) -> None:
+        """Publish the current token for other workers."""
+        if self.cache is None:
+            return
+        ttl = int(self._expires_at - time.time())
+        if ttl > 0:
+            self.cache.set(
+                TOKEN_CACHE_KEY,
+                {
+                    "access_token": self._access_token,
+                    "expires_at": self._expires_at,
+                    "refresh_at": self._refresh_at,
+                },
+                ttl=ttl,
+            )
+
+    def _claim_refresh(self) -> bool:
+        """
+        Take the cross-worker refresh lock.
+
+        Returns True without a cache, or if the cache is unavailable, so the
+        worker falls back to refreshing on its own.
+        """
+        if self.cache is None:
+            return True
+        count = self.cache.incr(REFRESH_LOCK_KEY, 1, ttl=REFRESH_LOCK_TTL)
+        return count is None or count == 1
+
+    def _release_refresh(self) -> None:
+        """Release the cross-worker refresh lock."""
+        if self.cache is not None:
+            self.cache.delete(REFRESH_LOCK_KEY)
+
+    def _token_request_data(self) -> dict:
+        """Form data for the client-credentials token request."""
+        return {
             "client_id": self.client_id,
             "client_secret": self.client_secret,
             "grant_type": "client_credentials",
         }
-        response = httpx.post(self.token_url, data=data, timeout=10)
+
+    def _fetch_token(self) -> None:
+        """Fetches a new token from Twitch/IGDB and updates cache."""
+        data = self._token_request_data()
+        if self.http_client is None:
+            response = httpx.post(self.token_url, data=data, timeout=10)
+        else:
+            response = self.http_client.post(self.token_url, data=data)
         response.raise_for_status()
-        token_data = response.json()
+        self._store_token(response.json())
+
+    async def _afetch_token(self) -> None:
+        """Fetches a new token using the async client and updates cache."""
+        data = self._token_request_data()
+        if self.async_http_client is None:
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.post(self.token_url, data=data)
+        else:
+            response = await self.async_http_client.post(self.token_url, data=data)
+        response.raise_for_status()
+        self._store_token(response.json())
+
+    def _store_token(self, token_data: dict) -> None:
+        """Store the access token, its expiry and its proactive refresh time."""
+        now = time.time()
+        lifetime = token_data["expires_in"] - EXPIRY_BUFFER  # buffer before expiry
+        self.fetches += 1
         self._access_token = token_data["access_token"]
-        self._expires_at = (
-            time.time() + token_data["expires_in"] - 60
-        )  # buffer before expiry
+        self._expires_at = now + lifetime
+        self._refresh_at = self._expires_at - min(
+            MAX_REFRESH_AHEAD, lifetime * REFRESH_AHEAD_FRACTION
+        )
 
     def clear_token(self) -> None:
         """Clears the cached token (for testing or force refresh)."""
         self._access_token = None
         self._expires_at = 0
+        self._refresh_at = 0
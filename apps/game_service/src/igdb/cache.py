@@ -1,47 +1,381 @@
 """
 In-memory cache implementation for IGDB client.
 Provides basic get/set/delete/clear operations with TTL support.
-Not suitable for production use—see README for Redis recommendation.
+
+The cache can be bounded by entry count and approximate size in bytes, evicting
+least-recently-used entries when a budget is exceeded. Keys are grouped into
+namespaces by their prefix (``search:zelda`` -> ``search``); a namespace can get
+its own budget so that, for example, search results can never evict games.
+Expired entries are removed lazily on read and by an optional background sweep.
+
+CacheBackend is the interface IGDBClient relies on; InMemoryCache is the
+per-process implementation and src/igdb/redis_cache.py the shared one.
 """
 
-from typing import Any, Optional
-import time
+import sys
 import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
 
 
-class InMemoryCache:
+def approximate_size(value: Any) -> int:
     """
-    Simple in-memory cache with TTL support. Not thread-safe for production, but fine for local/dev.
+    Approximate the memory footprint of a cached value in bytes.
+
+    Walks lists, tuples, sets and dicts recursively; other objects use sys.getsizeof.
     """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(
+            approximate_size(key) + approximate_size(item)
+            for key, item in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approximate_size(item) for item in value)
+    return size
+
+
+def namespace_of(key: str) -> str:
+    """Return the namespace of a cache key (the part before the first ':')."""
+    return key.split(":", 1)[0]
+
+
+class CacheBudget:
+    """Limits for a cache partition; None means unlimited."""
+
+    def __init__(
+        self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+
+class _Partition:
+    """An LRU-ordered group of entries sharing one budget."""
+
+    def __init__(self, budget: CacheBudget) -> None:
+        self.budget = budget
+        # key -> (value, expire_at, size); order is least to most recently used
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def remove(self, key: str) -> None:
+        """Remove a key if present and release its bytes."""
+        item = self.entries.pop(key, None)
+        if item is not None:
+            self.bytes -= item[2]
+
+    def over_budget(self) -> bool:
+        """Return True if the partition exceeds its entry or byte budget."""
+        budget = self.budget
+        if budget.max_entries is not None and len(self.entries) > budget.max_entries:
+            return True
+        return budget.max_bytes is not None and self.bytes > budget.max_bytes
+
+    def evict(self) -> None:
+        """Evict least-recently-used entries until the partition fits its budget."""
+        while self.entries and self.over_budget():
+            _, (_, _, size) = self.entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def sweep(self, now: float) -> int:
+        """Remove expired entries and return how many were removed."""
+        expired = [
+            key
+            for key, (_, expire_at, _) in self.entries.items()
+            if expire_at and expire_at < now
+        ]
+        for key in expired:
+            self.remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, int]:
+        """Return size and eviction counters for this partition."""
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class CacheBackend(ABC):
+    """Interface for IGDB response caches: get/set/delete/clear with TTLs in seconds."""
+
+    # True when calls wait on network I/O; async callers then run them on a
+    # worker thread instead of the event loop
+    blocking = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value from the cache, or None if not found or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: int = 60) -> None:
+        """Set a value in the cache with a time-to-live (in seconds)."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete a key from the cache."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Clear the entire cache."""
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several values at once.
+
+        Backends override this to fetch all keys in one operation.
 
-    def __init__(self):
-        self._store = {}
+        Returns:
+            dict: Found keys mapped to their values; missing or expired keys are omitted.
+        """
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl: int = 60) -> None:
+        """Set several values sharing one time-to-live (in seconds)."""
+        for key, value in items.items():
+            self.set(key, value, ttl=ttl)
+
+    def incr(
+        self, key: str, amount: int = 1, ttl: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Add amount to an integer counter (missing counts as 0) and return the new value.
+
+        A TTL, when given, is applied when the call creates the counter, so a
+        counter that is never left at zero still expires. The default
+        implementation is not atomic and re-applies the TTL on every call;
+        backends shared between processes override it.
+
+        Returns:
+            int | None: The new value, or None if the backend is unavailable.
+        """
+        value = (self.get(key) or 0) + amount
+        self.set(key, value, ttl=ttl or 0)
+        return value
+
+    def expire(self, key: str, ttl: int) -> Optional[bool]:
+        """
+        Reset the time-to-live of an existing key, e.g. to renew a lease.
+
+        The default implementation is not atomic: it re-sets the current value.
+
+        Returns:
+            bool | None: False if the key does not exist, None if the backend
+            is unavailable.
+        """
+        value = self.get(key)
+        if value is None:
+            return False
+        self.set(key, value, ttl=ttl)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return backend statistics; empty unless the backend tracks any."""
+        return {}
+
+    def close(self) -> None:
+        """Release background threads or connections held by the backend."""
+
+
+class InMemoryCache(CacheBackend):
+    """
+    Thread-safe in-memory cache with TTL support and optional LRU size bounds.
+
+    Without arguments the cache is unbounded, matching local/dev usage. Each
+    process has its own copy; see the README for shared cache options.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        namespace_budgets: Optional[Dict[str, CacheBudget]] = None,
+        sweep_interval: Optional[float] = None,
+    ):
+        """
+        Args:
+            max_entries (int, optional): Entry budget for keys without a namespace budget.
+            max_bytes (int, optional): Approximate byte budget for those keys.
+            namespace_budgets (dict, optional): Separate budgets keyed by namespace,
+                e.g. {"search": CacheBudget(max_entries=1000)}.
+            sweep_interval (float, optional): Seconds between background sweeps of
+                expired entries. No sweeper thread is started when omitted.
+        """
         self._lock = threading.Lock()
+        self._default = _Partition(CacheBudget(max_entries, max_bytes))
+        self._partitions = {
+            namespace: _Partition(budget)
+            for namespace, budget in (namespace_budgets or {}).items()
+        }
+        self.hits = 0
+        self.misses = 0
+        self._stop_sweeper = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        if sweep_interval:
+            self.start_sweeper(sweep_interval)
+
+    def _partition_for(self, key: str) -> _Partition:
+        """Return the partition that owns the given key."""
+        return self._partitions.get(namespace_of(key), self._default)
 
     def set(self, key: str, value: Any, ttl: int = 60) -> None:
         """Set a value in the cache with a time-to-live (in seconds)."""
+        self.set_many({key: value}, ttl=ttl)
+
+    def set_many(self, items: Dict[str, Any], ttl: int = 60) -> None:
+        """Set several values under one lock acquisition."""
         expire_at = time.time() + ttl if ttl else None
+        sized = [
+            (key, value, approximate_size(value), self._partition_for(key))
+            for key, value in items.items()
+        ]
         with self._lock:
-            self._store[key] = (value, expire_at)
+            for key, value, size, partition in sized:
+                partition.remove(key)
+                partition.entries[key] = (value, expire_at, size)
+                partition.bytes += size
+                partition.evict()
 
     def get(self, key: str) -> Optional[Any]:
         """Get a value from the cache, or None if not found or expired."""
+        partition = self._partition_for(key)
         with self._lock:
-            item = self._store.get(key)
-            if not item:
-                return None
-            value, expire_at = item
-            if expire_at and expire_at < time.time():
-                del self._store[key]
-                return None
+            return self._get_locked(key, partition, time.time())
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        """Atomically add amount to an integer counter, applying ttl if it creates it."""
+        partition = self._partition_for(key)
+        now = time.time()
+        with self._lock:
+            item = partition.entries.get(key)
+            live = item is not None and not (item[1] and item[1] < now)
+            value = (item[0] if live else 0) + amount
+            if live:
+                expire_at = item[1]
+            else:
+                expire_at = now + ttl if ttl else None
+            size = approximate_size(value)
+            partition.remove(key)
+            partition.entries[key] = (value, expire_at, size)
+            partition.bytes += size
+            partition.evict()
             return value
 
+    def expire(self, key: str, ttl: int) -> bool:
+        """Atomically reset the time-to-live of a live key."""
+        partition = self._partition_for(key)
+        now = time.time()
+        with self._lock:
+            item = partition.entries.get(key)
+            if item is None or (item[1] and item[1] < now):
+                return False
+            partition.entries[key] = (item[0], now + ttl if ttl else None, item[2])
+            return True
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values under one lock acquisition."""
+        found = {}
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                value = self._get_locked(key, self._partition_for(key), now)
+                if value is not None:
+                    found[key] = value
+        return found
+
+    def _get_locked(self, key: str, partition: _Partition, now: float) -> Optional[Any]:
+        """Look up a key, expiring it if needed; the caller holds the lock."""
+        item = partition.entries.get(key)
+        if not item:
+            self.misses += 1
+            return None
+        value, expire_at, _ = item
+        if expire_at and expire_at < now:
+            partition.remove(key)
+            partition.expirations += 1
+            self.misses += 1
+            return None
+        partition.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
     def delete(self, key: str) -> None:
         """Delete a key from the cache."""
+        partition = self._partition_for(key)
         with self._lock:
-            self._store.pop(key, None)
+            partition.remove(key)
 
     def clear(self) -> None:
         """Clear the entire cache."""
         with self._lock:
-            self._store.clear()
+            for partition in self._all_partitions():
+                partition.entries.clear()
+                partition.bytes = 0
+
+    def sweep(self) -> int:
+        """Remove all expired entries now and return how many were removed."""
+        now = time.time()
+        with self._lock:
+            return sum(partition.sweep(now) for partition in self._all_partitions())
+
+    def start_sweeper(self, interval: float) -> None:
+        """Start a daemon thread that sweeps expired entries every interval seconds."""
+        if self._sweeper is not None:
+            return
+        self._stop_sweeper.clear()
+
+        def run() -> None:
+            while not self._stop_sweeper.wait(interval):
+                self.sweep()
+
+        self._sweeper = threading.Thread(
+            target=run, name="igdb-cache-sweeper", daemon=True
+        )
+        self._sweeper.start()
+
+    def close(self) -> None:
+        """Stop the background sweeper, if running."""
+        self._stop_sweeper.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=1)
+            self._sweeper = None
+
+    def _all_partitions(self):
+        """Return the default partition followed by every namespace partition."""
+        return [self._default, *self._partitions.values()]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache statistics: totals plus a breakdown per budgeted namespace.
+
+        Returns:
+            dict: size, bytes, hits, misses, evictions and expirations.
+        """
+        with self._lock:
+            partitions = self._all_partitions()
+            return {
+                "size": sum(len(p.entries) for p in partitions),
+                "bytes": sum(p.bytes for p in partitions),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": sum(p.evictions for p in partitions),
+                "expirations": sum(p.expirations for p in partitions),
+                "namespaces": {
+                    namespace: partition.stats()
+                    for namespace, partition in self._partitions.items()
+                },
+            }
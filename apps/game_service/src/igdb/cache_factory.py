@@ -0,0 +1,64 @@
+"""
+Factory for the IGDB response cache selected by IGDB_CACHE_BACKEND.
+
+The app lifespan builds one cache on startup and injects it into every IGDB
+client it constructs (see src/core/lifespan.py).
+"""
+
+from typing import Optional
+
+from src.core.config import Settings
+from src.igdb.cache import CacheBackend, CacheBudget, InMemoryCache
+from src.igdb.redis_cache import RedisCache
+from src.igdb.tiered_cache import TieredCache
+
+CACHE_BACKENDS = ("memory", "redis", "none")
+
+
+def create_cache(settings: Optional[Settings] = None) -> Optional[CacheBackend]:
+    """
+    Create the configured IGDB cache backend.
+
+    Args:
+        settings (Settings, optional): Settings to read; defaults to Settings().
+
+    Returns:
+        CacheBackend | None: The cache, or None when caching is disabled.
+    """
+    settings = settings or Settings()
+    backend = settings.IGDB_CACHE_BACKEND.strip().lower()
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(
+            f"Unknown IGDB_CACHE_BACKEND {backend!r}; expected one of {CACHE_BACKENDS}"
+        )
+    if backend == "none":
+        return None
+    if backend == "redis":
+        shared = RedisCache.from_url(
+            settings.IGDB_CACHE_URL,
+            key_prefix=settings.IGDB_CACHE_KEY_PREFIX,
+            timeout=settings.IGDB_CACHE_TIMEOUT,
+        )
+        if settings.IGDB_CACHE_L1_TTL <= 0:
+            return shared
+        return TieredCache(
+            shared,
+            l1=InMemoryCache(
+                max_entries=settings.IGDB_CACHE_L1_MAX_ENTRIES or None,
+                max_bytes=settings.IGDB_CACHE_L1_MAX_BYTES or None,
+            ),
+            l1_ttl=settings.IGDB_CACHE_L1_TTL,
+            channel=f"{settings.IGDB_CACHE_KEY_PREFIX}invalidate",
+        )
+    return InMemoryCache(
+        max_entries=settings.IGDB_CACHE_MAX_ENTRIES or None,
+        max_bytes=settings.IGDB_CACHE_MAX_BYTES or None,
+        namespace_budgets={
+            namespace: CacheBudget(
+                max_entries=settings.IGDB_CACHE_SEARCH_MAX_ENTRIES or None,
+                max_bytes=settings.IGDB_CACHE_SEARCH_MAX_BYTES or None,
+            )
+            for namespace in ("search", "fsearch")
+        },
+        sweep_interval=settings.IGDB_CACHE_SWEEP_INTERVAL or None,
+    )
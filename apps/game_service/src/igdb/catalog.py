@@ -0,0 +1,223 @@
+"""
+Local mirror of the IGDB games catalog.
+
+CatalogStore keeps mapped games (the GameOut-shaped dicts the IGDB client
+returns) in the ``igdb_catalog`` table, keyed by IGDB id together with IGDB's
+``updated_at`` and the local time the row was written (``synced_at``), plus
+named sync checkpoints in ``igdb_catalog_sync``. The tables
+are defined in db/models/catalog.py and created by the Alembic migrations;
+create_tables is only meant for tests and throwaway SQLite databases.
+
+The catalog is filled by src/igdb/catalog_sync.py. IGDB clients given a catalog
+answer game lookups that miss the cache from it and only ask IGDB for ids it
+does not hold.
+"""
+
+# pylint: disable=wrong-import-order
+
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from src.core.config import Settings
+from src.core.database import get_engine
+
+from db.models.catalog import CatalogGame, CatalogSyncState
+
+_GAMES = CatalogGame.__table__
+_STATE = CatalogSyncState.__table__
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# Sync checkpoints stored in the catalog
+BULK_CURSOR = "bulk_cursor"
+BULK_STARTED_AT = "bulk_started_at"
+BULK_COMPLETE = "bulk_complete"
+UPDATED_AT = "updated_at"
+
+# Ids per SELECT ... WHERE igdb_id IN (...), below SQLite's variable limit
+LOOKUP_CHUNK_SIZE = 500
+
+
+class CatalogStore:
+    """Mirrored IGDB games and sync checkpoints in a SQL database."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        owns_engine: bool = False,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Args:
+            engine (Engine): SQLAlchemy engine of the database holding the catalog.
+            owns_engine (bool): Dispose of the engine on close(); leave False
+                for an engine shared with the rest of the service.
+            clock (Callable): Returns the current Unix time, stored as synced_at.
+        """
+        self.engine = engine
+        self.owns_engine = owns_engine
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+
+    def create_tables(self) -> None:
+        """Create the catalog tables if they do not exist, without the migrations."""
+        CatalogGame.metadata.create_all(self.engine, tables=[_GAMES, _STATE])
+
+    def get_many(self, game_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Return mirrored games by IGDB id.
+
+        Returns:
+            dict: Found ids mapped to their games; unknown ids are omitted.
+        """
+        game_ids = list(dict.fromkeys(game_ids))
+        found = {}
+        with self.engine.connect() as conn:
+            for start in range(0, len(game_ids), LOOKUP_CHUNK_SIZE):
+                end = start + LOOKUP_CHUNK_SIZE
+                chunk = game_ids[start:end]
+                query = select(_GAMES.c.igdb_id, _GAMES.c.data).where(
+                    _GAMES.c.igdb_id.in_(chunk)
+                )
+                found.update(conn.execute(query).all())
+        self.hits += len(found)
+        self.misses += len(game_ids) - len(found)
+        return found
+
+    def upsert_many(self, games: List[Tuple[Dict[str, Any], Optional[int]]]) -> None:
+        """
+        Insert or replace mirrored games.
+
+        Args:
+            games (list): (mapped game, IGDB updated_at) pairs.
+        """
+        if not games:
+            return
+        synced_at = int(self.clock())
+        rows = [
+            {
+                "igdb_id": game["id"],
+                "name": game.get("name"),
+                "updated_at": updated_at,
+                "synced_at": synced_at,
+                "data": game,
+            }
+            for game, updated_at in games
+        ]
+        with self.engine.begin() as conn:
+            insert = _UPSERT_DIALECTS.get(self.engine.dialect.name)
+            if insert is None:
+                conn.execute(
+                    _GAMES.delete().where(
+                        _GAMES.c.igdb_id.in_([row["igdb_id"] for row in rows])
+                    )
+                )
+                conn.execute(_GAMES.insert(), rows)
+                return
+            statement = insert(_GAMES)
+            conn.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[_GAMES.c.igdb_id],
+                    set_={
+                        "name": statement.excluded.name,
+                        "updated_at": statement.excluded.updated_at,
+                        "synced_at": statement.excluded.synced_at,
+                        "data": statement.excluded.data,
+                    },
+                ),
+                rows,
+            )
+
+    def iter_names(
+        self, since: Optional[int] = None, chunk_size: int = LOOKUP_CHUNK_SIZE
+    ) -> Iterator[Tuple[int, Optional[str], Optional[int]]]:
+        """
+        Yield the mirrored games' names in id order, one query per chunk.
+
+        Args:
+            since (int, optional): Only games written to the catalog (synced_at)
+                from this Unix time on, whatever their IGDB updated_at.
+            chunk_size (int): Rows read per query.
+
+        Yields:
+            tuple: (igdb_id, name, synced_at).
+        """
+        after = None
+        while True:
+            query = (
+                select(_GAMES.c.igdb_id, _GAMES.c.name, _GAMES.c.synced_at)
+                .order_by(_GAMES.c.igdb_id)
+                .limit(chunk_size)
+            )
+            if since is not None:
+                query = query.where(_GAMES.c.synced_at >= since)
+            if after is not None:
+                query = query.where(_GAMES.c.igdb_id > after)
+            with self.engine.connect() as conn:
+                rows = conn.execute(query).all()
+            yield from rows
+            if len(rows) < chunk_size:
+                return
+            after = rows[-1][0]
+
+    def count(self) -> int:
+        """Return the number of mirrored games."""
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(_GAMES)).scalar_one()
+
+    def get_state(self, name: str) -> Optional[int]:
+        """Return a sync checkpoint, or None if it was never set."""
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(_STATE.c.value).where(_STATE.c.name == name)
+            ).scalar_one_or_none()
+
+    def set_state(self, name: str, value: int) -> None:
+        """Set a sync checkpoint."""
+        with self.engine.begin() as conn:
+            updated = conn.execute(
+                _STATE.update().where(_STATE.c.name == name).values(value=value)
+            )
+            if not updated.rowcount:
+                conn.execute(_STATE.insert().values(name=name, value=value))
+
+    def is_complete(self) -> bool:
+        """Return True once a bulk load has mirrored the whole IGDB catalog."""
+        return bool(self.get_state(BULK_COMPLETE))
+
+    def stats(self) -> Dict[str, int]:
+        """Return lookup counters observed by this process."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        """Dispose of the engine's connection pool if the store created the engine."""
+        if self.owns_engine:
+            self.engine.dispose()
+
+
+def create_catalog(settings: Optional[Settings] = None) -> Optional[CatalogStore]:
+    """
+    Create the catalog store selected by IGDB_CATALOG_ENABLED.
+
+    The catalog lives in IGDB_CATALOG_DATABASE_URL, or in the service database
+    (GAME_SERVICE_DATABASE_URL) when that is empty. Its tables are created by
+    the Alembic migrations.
+
+    Args:
+        settings (Settings, optional): Settings to read; defaults to Settings().
+
+    Returns:
+        CatalogStore | None: The store, or None when the mirror is disabled.
+    """
+    settings = settings or Settings()
+    if not settings.IGDB_CATALOG_ENABLED:
+        return None
+    url = settings.IGDB_CATALOG_DATABASE_URL
+    if not url:
+        return CatalogStore(get_engine())
+    return CatalogStore(create_engine(url, pool_pre_ping=True), owns_engine=True)
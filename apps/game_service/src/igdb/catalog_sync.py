@@ -0,0 +1,270 @@
+"""
+Bulk load and incremental delta sync of the local IGDB catalog mirror.
+
+The first rounds page through every IGDB game in id order (keyset pagination,
+``where id > cursor``), storing the cursor after each page so an interrupted
+bulk load resumes where it stopped. Once it completes, each round pulls the
+games IGDB changed since the ``updated_at`` checkpoint, again in id pages.
+
+The checkpoint never moves past the start of the previous round minus
+SYNC_OVERLAP, so games changed while a round was paging are picked up by the
+next one; replaying a game is harmless because rows are upserted. Upstream
+calls go through the IGDB client (rate limiter, retries, circuit breakers) in
+the background priority lane.
+
+With a shared cache, each round first takes a lease (an incr on
+SYNC_LEASE_KEY, as the token refresh lock in auth.py does), so only one worker
+syncs at a time. The lease is renewed after every page and released when the
+round ends; other workers skip their round while it is held.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.igdb.cache import CacheBackend
+from src.igdb.catalog import (
+    BULK_COMPLETE,
+    BULK_CURSOR,
+    BULK_STARTED_AT,
+    UPDATED_AT,
+    CatalogStore,
+)
+from src.igdb.client import GAME_FIELDS, IGDBClient
+from src.igdb.loader import MAX_BATCH_SIZE
+from src.igdb.ratelimit import background_priority
+from src.igdb.records import map_game
+
+logger = logging.getLogger("igdb.catalog")
+
+# Seconds of updated_at replayed by each delta round
+SYNC_OVERLAP = 300
+
+# Cross-worker sync lease, renewed after each page; expires if its holder dies
+SYNC_LEASE_KEY = "catalog:sync_lease"
+SYNC_LEASE_TTL = 120
+
+
+class CatalogSync:
+    """Fills a CatalogStore from IGDB and keeps it current."""
+
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def __init__(
+        self,
+        client: IGDBClient,
+        store: CatalogStore,
+        page_size: int = MAX_BATCH_SIZE,
+        overlap: int = SYNC_OVERLAP,
+        clock: Callable[[], float] = time.time,
+        lease: Optional[CacheBackend] = None,
+        lease_ttl: int = SYNC_LEASE_TTL,
+    ) -> None:
+        """
+        Args:
+            client (IGDBClient): Sync client used for the upstream page queries.
+            store (CatalogStore): Catalog to fill.
+            page_size (int): Games per IGDB page (IGDB returns at most 500).
+            overlap (int): Seconds of updated_at replayed by each delta round.
+            clock (Callable): Returns the current Unix time.
+            lease (CacheBackend, optional): Cache shared by the workers, used to
+                let only one of them sync at a time.
+            lease_ttl (int): Seconds the lease survives without a renewal.
+        """
+        self.client = client
+        self.store = store
+        self.page_size = max(1, min(page_size, MAX_BATCH_SIZE))
+        self.overlap = overlap
+        self.clock = clock
+        self.lease = lease
+        self.lease_ttl = lease_ttl
+        self._holds_lease = False
+        self.pages = 0
+        self.games = 0
+        self.errors = 0
+        self.skipped = 0
+        self.last_sync: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _claim_lease(self) -> bool:
+        """
+        Take the cross-worker sync lease.
+
+        Returns True without a lease cache, or if the cache is unavailable, so
+        the worker falls back to syncing on its own.
+        """
+        if self.lease is None:
+            return True
+        count = self.lease.incr(SYNC_LEASE_KEY, 1, ttl=self.lease_ttl)
+        self._holds_lease = count == 1
+        return count is None or count == 1
+
+    def _release_lease(self) -> None:
+        """Release the sync lease if this worker still holds it."""
+        if self._holds_lease:
+            self._holds_lease = False
+            self.lease.delete(SYNC_LEASE_KEY)
+
+    def _keep_going(self) -> bool:
+        """
+        True while the sync should fetch another page.
+
+        Stops after close() and, when a lease is held, renews it; a lease that
+        already expired may have been taken by another worker, so the round
+        stops instead.
+        """
+        if self._stop.is_set():
+            return False
+        if not self._holds_lease:
+            return True
+        if self.lease.expire(SYNC_LEASE_KEY, self.lease_ttl) is False:
+            self._holds_lease = False
+            logger.warning("IGDB catalog sync lease expired; stopping this round")
+            return False
+        return True
+
+    def _fetch_page(self, where: str) -> List[Dict[str, Any]]:
+        """Fetch one id-ordered page of raw IGDB games matching a where clause."""
+        body = (
+            f"fields {GAME_FIELDS},updated_at; where {where}; "
+            f"sort id asc; limit {self.page_size};"
+        )
+        rows = self.client._post("games", body)  # pylint: disable=protected-access
+        self.pages += 1
+        return rows
+
+    def _store_page(self, rows: List[Dict[str, Any]]) -> None:
+        """Map and upsert one page of raw IGDB games."""
+        self.store.upsert_many(
+            [(map_game(row).as_dict(), row.get("updated_at")) for row in rows]
+        )
+        self.games += len(rows)
+
+    def bulk_load(self, max_pages: Optional[int] = None) -> int:
+        """
+        Load the whole IGDB catalog, resuming from the stored cursor.
+
+        Args:
+            max_pages (int, optional): Stop after this many pages; the next call
+                continues from there. The load also stops after the current
+                page when close() is called.
+
+        Returns:
+            int: Number of games stored by this call.
+        """
+        if self.store.get_state(BULK_STARTED_AT) is None:
+            self.store.set_state(BULK_STARTED_AT, int(self.clock()))
+        cursor = self.store.get_state(BULK_CURSOR) or 0
+        loaded = 0
+        pages = 0
+        while (max_pages is None or pages < max_pages) and self._keep_going():
+            rows = self._fetch_page(f"id > {cursor}")
+            pages += 1
+            self._store_page(rows)
+            loaded += len(rows)
+            if rows:
+                cursor = max(row["id"] for row in rows)
+                self.store.set_state(BULK_CURSOR, cursor)
+            if len(rows) < self.page_size:
+                started_at = self.store.get_state(BULK_STARTED_AT)
+                self.store.set_state(UPDATED_AT, started_at - self.overlap)
+                self.store.set_state(BULK_COMPLETE, 1)
+                logger.info("IGDB catalog bulk load complete at id %d", cursor)
+                break
+        return loaded
+
+    def sync_deltas(self, max_pages: Optional[int] = None) -> int:
+        """
+        Pull the games IGDB changed since the updated_at checkpoint.
+
+        Args:
+            max_pages (int, optional): Stop after this many pages without
+                advancing the checkpoint; the next call starts the round over.
+                The round also stops that way when close() is called.
+
+        Returns:
+            int: Number of games stored by this call.
+        """
+        checkpoint = self.store.get_state(UPDATED_AT) or 0
+        started_at = int(self.clock())
+        newest = checkpoint
+        cursor = 0
+        synced = 0
+        pages = 0
+        while (max_pages is None or pages < max_pages) and self._keep_going():
+            rows = self._fetch_page(f"updated_at >= {checkpoint} & id > {cursor}")
+            pages += 1
+            self._store_page(rows)
+            synced += len(rows)
+            if rows:
+                cursor = max(row["id"] for row in rows)
+                newest = max(newest, *(row.get("updated_at") or 0 for row in rows))
+            if len(rows) < self.page_size:
+                next_checkpoint = min(newest, started_at - self.overlap)
+                self.store.set_state(UPDATED_AT, max(checkpoint, next_checkpoint))
+                break
+        return synced
+
+    def run_once(self) -> int:
+        """
+        Run one sync round: the next part of the bulk load, or a delta sync.
+
+        The round is skipped while another worker holds the sync lease.
+
+        Returns:
+            int: Number of games stored.
+        """
+        if not self._claim_lease():
+            self.skipped += 1
+            return 0
+        try:
+            with background_priority():
+                if self.store.is_complete():
+                    synced = self.sync_deltas()
+                else:
+                    synced = self.bulk_load()
+        finally:
+            self._release_lease()
+        self.last_sync = self.clock()
+        return synced
+
+    def start(self, interval: float) -> None:
+        """Start a daemon thread running a sync round every interval seconds."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run() -> None:
+            while True:
+                try:
+                    self.run_once()
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    self.errors += 1
+                    logger.warning("IGDB catalog sync failed: %s", exc)
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(
+            target=run, name="igdb-catalog-sync", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the background sync thread, if running."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return page, game, error and skipped-round counters and the sync checkpoints."""
+        return {
+            "pages": self.pages,
+            "games": self.games,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "last_sync": self.last_sync,
+            "bulk_complete": self.store.is_complete(),
+            "updated_at": self.store.get_state(UPDATED_AT),
+        }
@@ -0,0 +1,87 @@
+"""
+Factory for the shared, connection-pooled HTTP transport used by the IGDB client.
+
+A single long-lived httpx.Client (and its httpx.AsyncClient twin for the async
+routes) keeps TCP/TLS connections alive between IGDB
+round trips instead of paying a fresh handshake for every call. The app lifespan
+owns the clients (see src/core/lifespan.py) and hands them to the IGDB clients and IGDBAuth.
+"""
+
+import importlib.util
+import logging
+
+import httpx
+from src.core.config import Settings
+
+logger = logging.getLogger("igdb.http")
+
+
+def http2_available() -> bool:
+    """Return True if the optional 'h2' package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_limits(settings: Settings) -> httpx.Limits:
+    """Build connection pool limits from settings."""
+    return httpx.Limits(
+        max_connections=settings.IGDB_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.IGDB_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.IGDB_KEEPALIVE_EXPIRY,
+    )
+
+
+def build_timeout(settings: Settings) -> httpx.Timeout:
+    """Build request timeouts from settings."""
+    return httpx.Timeout(
+        settings.IGDB_READ_TIMEOUT,
+        connect=settings.IGDB_CONNECT_TIMEOUT,
+        pool=settings.IGDB_POOL_TIMEOUT,
+    )
+
+
+def use_http2(settings: Settings) -> bool:
+    """Return whether HTTP/2 should be enabled, warning if it was requested but unavailable."""
+    if not settings.IGDB_HTTP2:
+        return False
+    if not http2_available():
+        logger.warning(
+            "IGDB_HTTP2 is enabled but 'h2' is not installed; using HTTP/1.1"
+        )
+        return False
+    return True
+
+
+def create_http_client(settings: Settings = None) -> httpx.Client:
+    """
+    Create the pooled, keep-alive HTTP client shared by all IGDB code paths.
+
+    Args:
+        settings (Settings, optional): Settings to read pool limits and timeouts from.
+
+    Returns:
+        httpx.Client: Client that must be closed by its owner.
+    """
+    settings = settings or Settings()
+    return httpx.Client(
+        http2=use_http2(settings),
+        limits=build_limits(settings),
+        timeout=build_timeout(settings),
+    )
+
+
+def create_async_http_client(settings: Settings = None) -> httpx.AsyncClient:
+    """
+    Create the pooled, keep-alive async HTTP client used by AsyncIGDBClient.
+
+    Args:
+        settings (Settings, optional): Settings to read pool limits and timeouts from.
+
+    Returns:
+        httpx.AsyncClient: Client that must be closed (aclose) by its owner.
+    """
+    settings = settings or Settings()
+    return httpx.AsyncClient(
+        http2=use_http2(settings),
+        limits=build_limits(settings),
+        timeout=build_timeout(settings),
+    )
@@ -0,0 +1,118 @@
+"""
+HTTP validators and freshness headers for IGDB read endpoints.
+
+Response bodies get strong ETags from a 16-byte BLAKE2b digest. Cached search
+results and games store the ETag of their body, in the payload header with
+IGDB_CACHE_PAYLOAD (payload.py) and next to the value otherwise, so a cached
+body is read back as a TaggedBody whose ETag was computed once, when the entry
+was written. Bodies built per request, including batches of cached games, are
+hashed when they are sent.
+
+Cache-Control values are derived from the TTLPolicy of the cache entries a
+route serves, as in cache_control(*SEARCH_TTL): max-age is the soft TTL and
+stale-while-revalidate covers the rest of the hard TTL, so browsers and CDNs
+revalidate on the same schedule as the IGDB cache.
+"""
+
+import hashlib
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Optional
+
+DIGEST_SIZE = 16
+
+
+def digest(body: bytes) -> bytes:
+    """Return the digest an ETag is formatted from."""
+    return hashlib.blake2b(body, digest_size=DIGEST_SIZE).digest()
+
+
+def format_etag(body_digest: bytes) -> str:
+    """Return the strong ETag header value of a digest."""
+    return f'"{body_digest.hex()}"'
+
+
+def body_etag(body: bytes) -> str:
+    """Return the strong ETag of a response body."""
+    return format_etag(digest(body))
+
+
+def combined_etag(etags: Iterable[str]) -> str:
+    """
+    Return an ETag for a body concatenated from parts with the given ETags.
+
+    Args:
+        etags (Iterable[str]): ETags of the parts, in body order.
+
+    Returns:
+        str: Strong ETag that changes whenever a part or their order changes.
+    """
+    return body_etag(",".join(etags).encode())
+
+
+class TaggedBody(bytes):
+    """A response body carrying the ETag stored with its cache entry."""
+
+    etag: str
+    # Set when the entry was read past its soft TTL and is being refreshed
+    stale: bool = False
+
+    def __new__(cls, body: bytes, etag: str, stale: bool = False) -> "TaggedBody":
+        tagged = super().__new__(cls, body)
+        tagged.etag = etag
+        tagged.stale = stale
+        return tagged
+
+
+def etag_of(body: bytes) -> str:
+    """Return the stored ETag of a TaggedBody, or hash any other body."""
+    if isinstance(body, TaggedBody):
+        return body.etag
+    return body_etag(body)
+
+
+def is_stale(body: bytes) -> bool:
+    """True if a body was read from a cache entry past its soft TTL."""
+    return isinstance(body, TaggedBody) and body.stale
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True if an If-None-Match header matches an ETag.
+
+    Uses the weak comparison required for If-None-Match, so W/"x" matches "x".
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
+
+def parse_http_date(value: Optional[str]) -> Optional[float]:
+    """Return the Unix time of an HTTP date header, or None if it is missing or invalid."""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def cache_control(soft: float, hard: float) -> str:
+    """
+    Return the Cache-Control of responses served from entries with given TTLs.
+
+    Args:
+        soft (float): Seconds the cache entries stay fresh.
+        hard (float): Seconds until they expire.
+
+    Returns:
+        str: "public, max-age=<soft>", plus stale-while-revalidate for the
+        remainder of the hard TTL when there is one.
+    """
+    value = f"public, max-age={int(soft)}"
+    if hard > soft:
+        value += f", stale-while-revalidate={int(hard - soft)}"
+    return value
@@ -0,0 +1,407 @@
+"""
+Caching proxy for IGDB cover images.
+
+ImageProxy fetches an image from the IGDB image CDN once, through the pooled
+async HTTP client, and keeps it in an ImageStore: a directory of files bounded
+by total size, evicting the least recently served files first. Concurrent
+misses for the same image share one download. Files are written to a temporary
+name and renamed into place, so a reader never sees a partial image and
+workers may share the directory; each worker bounds the files it knows about,
+and files evicted by another worker are treated as misses. A hit is served
+from a hard link (a lease) made under the store's lock on a worker thread, so
+the file can be sent with zero-copy FileResponse and an image evicted while it
+is served is never cut short; the lease is removed once the response is sent.
+
+IGDB image URLs are immutable (a new cover gets a new image id), so served
+images carry a year-long immutable Cache-Control and an ETag derived from the
+size and image id, which If-None-Match is answered against without touching
+the disk. If-Modified-Since is answered against the stored file's mtime.
+
+With placeholders enabled, /igdb/images/blur/{image_id}.jpg serves a tiny
+blurred JPEG made from the t_thumb image; this needs the optional Pillow
+package.
+"""
+
+import asyncio
+import importlib.util
+import io
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+from src.core.config import Settings
+from src.igdb.http_cache import TaggedBody, combined_etag, etag_of
+from src.igdb.records import IMAGE_BASE_URL
+from src.igdb.singleflight import AsyncSingleFlight
+
+# IGDB image sizes the proxy serves
+IMAGE_SIZES = frozenset(
+    {
+        "t_micro",
+        "t_thumb",
+        "t_cover_small",
+        "t_cover_big",
+        "t_logo_med",
+        "t_screenshot_med",
+        "t_screenshot_big",
+        "t_screenshot_huge",
+        "t_720p",
+        "t_1080p",
+    }
+)
+
+# Pseudo-size of blurred placeholders
+PLACEHOLDER_SIZE = "blur"
+PLACEHOLDER_WIDTH = 16
+
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_IMAGE_ID = re.compile(r"^[a-z0-9]{1,64}$")
+_TEMP_SUFFIX = ".tmp"
+_LEASE_SUFFIX = ".lease"
+
+# Temp files and leases older than this are left over from a crashed worker;
+# younger ones may belong to a worker sharing the directory
+STALE_FILE_SECONDS = 3600
+
+# Downloads of an image evicted again before it could be served
+MAX_FETCH_ATTEMPTS = 3
+
+
+class ImageNotFound(Exception):
+    """Raised when IGDB has no image for a size and image id."""
+
+
+def pillow_available() -> bool:
+    """Return True if the optional 'Pillow' package is installed."""
+    return importlib.util.find_spec("PIL") is not None
+
+
+def image_etag(size: str, image_id: str) -> str:
+    """Return the ETag of an immutable image."""
+    return f'"{size}-{image_id}"'
+
+
+def make_placeholder(data: bytes, width: int = PLACEHOLDER_WIDTH) -> bytes:
+    """
+    Shrink and blur an image into a tiny JPEG placeholder.
+
+    Args:
+        data (bytes): Source image.
+        width (int): Placeholder width in pixels.
+
+    Returns:
+        bytes: JPEG placeholder, typically a few hundred bytes.
+    """
+    # pylint: disable=import-outside-toplevel
+    from PIL import Image, ImageFilter
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGB")
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height)).filter(ImageFilter.GaussianBlur(1))
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=40)
+    return output.getvalue()
+
+
+class ImageStore:
+    """Size-bounded LRU of image files in one directory, safe to share between threads."""
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        """
+        Index the files already in directory, oldest first.
+
+        Args:
+            directory (str): Directory holding the files; created if missing.
+            max_bytes (int): Total file size kept before evicting.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # File name -> size, least recently used first
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        found = []
+        stale_before = time.time() - STALE_FILE_SECONDS
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                if entry.name.endswith((_TEMP_SUFFIX, _LEASE_SUFFIX)):
+                    # Left behind by an interrupted write or response; making a
+                    # lease changes the ctime of a file it links to
+                    if max(stat.st_mtime, stat.st_ctime) < stale_before:
+                        self._remove(entry.name)
+                    continue
+                found.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(found):
+            self._files[name] = size
+            self.bytes += size
+        with self._lock:
+            self._evict()
+
+    def path(self, name: str) -> str:
+        """Return the path of a file name in the store."""
+        return os.path.join(self.directory, name)
+
+    def checkout(self, name: str, record: bool = True) -> Optional[str]:
+        """
+        Lease a stored file, marking it recently used.
+
+        The lease is a hard link to the file, so it stays readable if the file
+        is evicted; pass it to release once it has been served. Blocks on the
+        disk.
+
+        Args:
+            name (str): File name in the store.
+            record (bool): Count the lookup as a hit or miss.
+
+        Returns:
+            str | None: Path of the lease, or None if the file is not stored.
+        """
+        lease = self.path(f"{name}.{uuid.uuid4().hex}{_LEASE_SUFFIX}")
+        with self._lock:
+            size = self._files.get(name)
+            if size is not None:
+                try:
+                    os.link(self.path(name), lease)
+                except FileNotFoundError:
+                    # Evicted by another worker sharing the directory
+                    del self._files[name]
+                    self.bytes -= size
+                    size = None
+            if size is None:
+                self.misses += record
+                return None
+            self._files.move_to_end(name)
+            self.hits += record
+        return lease
+
+    @staticmethod
+    def release(lease: str) -> None:
+        """Remove a lease returned by checkout."""
+        try:
+            os.remove(lease)
+        except FileNotFoundError:
+            pass
+
+    def modified(self, name: str) -> Optional[float]:
+        """
+        Return the mtime of a stored file, or None if it is not stored.
+
+        Blocks on the disk; the file is checked without holding the lock.
+        """
+        with self._lock:
+            if name not in self._files:
+                return None
+        try:
+            return os.stat(self.path(name)).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def put(self, name: str, data: bytes) -> str:
+        """
+        Store a file atomically and evict old files beyond max_bytes.
+
+        Returns:
+            str: The path of the stored file.
+        """
+        temp = f"{name}.{uuid.uuid4().hex}{_TEMP_SUFFIX}"
+        with open(self.path(temp), "wb") as file:
+            file.write(data)
+        os.replace(self.path(temp), self.path(name))
+        with self._lock:
+            self.bytes -= self._files.pop(name, 0)
+            self._files[name] = len(data)
+            self.bytes += len(data)
+            self._evict()
+        return self.path(name)
+
+    def _evict(self) -> None:
+        """Remove least recently used files until under max_bytes; the caller holds the lock."""
+        while self.bytes > self.max_bytes and len(self._files) > 1:
+            name, size = self._files.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+            self._remove(name)
+
+    def _remove(self, name: str) -> None:
+        """Delete a file, ignoring one already gone."""
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number and total size of files, and hit, miss and eviction counters."""
+        return {
+            "files": len(self._files),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class ImageProxy:
+    """Fetches IGDB images into an ImageStore and rewrites cover URLs to the proxy."""
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        store: ImageStore,
+        http_client: httpx.AsyncClient,
+        base_url: str = IMAGE_BASE_URL,
+        public_url: str = "/igdb/images",
+        placeholders: bool = False,
+    ) -> None:
+        """
+        Args:
+            store (ImageStore): Where fetched images are kept.
+            http_client (httpx.AsyncClient): Pooled client used for downloads.
+            base_url (str): Image CDN URL that "/{size}/{image_id}.jpg" is appended to.
+            public_url (str): URL of the proxy route, used in rewritten cover URLs.
+            placeholders (bool): Serve blurred placeholders (needs Pillow).
+        """
+        if placeholders and not pillow_available():
+            raise RuntimeError("Image placeholders need the 'Pillow' package")
+        self.store = store
+        self.http_client = http_client
+        self.base_url = base_url.rstrip("/")
+        self.public_url = public_url.rstrip("/")
+        self.placeholders = placeholders
+        self.single_flight = AsyncSingleFlight()
+        self.fetches = 0
+        self._image_prefix = (IMAGE_BASE_URL + "/").encode()
+        self._proxy_prefix = (self.public_url + "/").encode()
+
+    @staticmethod
+    def validate(size: str, image_id: str) -> None:
+        """Raise ImageNotFound unless size and image_id name a servable image."""
+        if size not in IMAGE_SIZES and size != PLACEHOLDER_SIZE:
+            raise ImageNotFound(f"Unknown image size {size!r}")
+        if not _IMAGE_ID.match(image_id):
+            raise ImageNotFound(f"Invalid image id {image_id!r}")
+
+    async def get(self, size: str, image_id: str) -> str:
+        """
+        Lease an image file, downloading the image on a miss.
+
+        Args:
+            size (str): IGDB size such as "t_cover_big", or "blur".
+            image_id (str): IGDB image id such as "co1r6b".
+
+        Returns:
+            str: Path of a lease on the stored JPEG; pass it to store.release
+            once the file has been served.
+
+        Raises:
+            ImageNotFound: The size or id is invalid, IGDB has no such image,
+                placeholders are disabled, or the image kept being evicted
+                before it could be served.
+            httpx.HTTPError: The download failed.
+        """
+        self.validate(size, image_id)
+        if size == PLACEHOLDER_SIZE and not self.placeholders:
+            raise ImageNotFound("Image placeholders are disabled")
+        name = f"{size}_{image_id}.jpg"
+        lease = await asyncio.to_thread(self.store.checkout, name)
+        attempts = 0
+        while lease is None:
+            if attempts == MAX_FETCH_ATTEMPTS:
+                raise ImageNotFound(f"Image {name!r} was evicted before it was served")
+            attempts += 1
+            await self.single_flight.do(name, lambda: self._fetch(name, size, image_id))
+            lease = await asyncio.to_thread(self.store.checkout, name, record=False)
+        return lease
+
+    async def modified(self, size: str, image_id: str) -> Optional[float]:
+        """Return the mtime of a stored image, or None if it is not stored."""
+        self.validate(size, image_id)
+        return await asyncio.to_thread(self.store.modified, f"{size}_{image_id}.jpg")
+
+    async def _fetch(self, name: str, size: str, image_id: str) -> None:
+        """Download an image (or build a placeholder) and store it."""
+        if size == PLACEHOLDER_SIZE:
+            thumb = await self.get("t_thumb", image_id)
+            try:
+                data = await asyncio.to_thread(
+                    lambda: make_placeholder(Path(thumb).read_bytes())
+                )
+            finally:
+                await asyncio.to_thread(self.store.release, thumb)
+        else:
+            data = await self._download(size, image_id)
+        await asyncio.to_thread(self.store.put, name, data)
+
+    async def _download(self, size: str, image_id: str) -> bytes:
+        """Download one image from the CDN."""
+        self.fetches += 1
+        response = await self.http_client.get(f"{self.base_url}/{size}/{image_id}.jpg")
+        if response.status_code == 404:
+            raise ImageNotFound(f"No {size} image {image_id!r} on IGDB")
+        response.raise_for_status()
+        if not response.headers.get("content-type", "").startswith("image/"):
+            raise ImageNotFound(f"IGDB returned no image for {image_id!r}")
+        return response.content
+
+    def rewrite(self, body: bytes) -> bytes:
+        """
+        Point the IGDB cover URLs of a game response body at the proxy.
+
+        Returns:
+            bytes: The rewritten body, tagged with an ETag derived from the
+            original one and the proxy URL; the body itself if it has no
+            IGDB image URL.
+        """
+        if self._image_prefix not in body:
+            return body
+        return TaggedBody(
+            body.replace(self._image_prefix, self._proxy_prefix),
+            combined_etag((etag_of(body), self.public_url)),
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """Return store counters, downloads and coalesced requests."""
+        stats = self.store.stats()
+        stats["fetches"] = self.fetches
+        stats["coalesced"] = self.single_flight.coalesced
+        return stats
+
+
+def create_image_proxy(
+    settings: Optional[Settings], http_client: httpx.AsyncClient
+) -> Optional[ImageProxy]:
+    """
+    Create the cover image proxy selected by IGDB_IMAGE_PROXY_ENABLED.
+
+    Args:
+        settings (Settings, optional): Settings to read; defaults to Settings().
+        http_client (httpx.AsyncClient): Pooled client used for downloads.
+
+    Returns:
+        ImageProxy | None: The proxy, or None when it is disabled.
+    """
+    settings = settings or Settings()
+    if not settings.IGDB_IMAGE_PROXY_ENABLED:
+        return None
+    return ImageProxy(
+        ImageStore(settings.IGDB_IMAGE_CACHE_DIR, settings.IGDB_IMAGE_CACHE_MAX_BYTES),
+        http_client,
+        base_url=settings.IGDB_IMAGE_BASE_URL,
+        public_url=settings.IGDB_IMAGE_PROXY_URL,
+        placeholders=settings.IGDB_IMAGE_PLACEHOLDERS,
+    )
@@ -0,0 +1,217 @@
+"""
+DataLoader-style micro-batching for IGDB game-by-id lookups.
+
+Single-game lookups arriving within a short window (a few milliseconds) are
+collected and sent to IGDB as one ``where id = (...)`` query. Each caller then
+receives its own game from the shared response. GameBatchLoader serves threaded
+callers; AsyncGameBatchLoader serves coroutines on one event loop.
+
+The batch function is passed to load() rather than bound at construction, so a
+loader can be shared by several short-lived clients with the same configuration.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# IGDB returns at most 500 results per query
+MAX_BATCH_SIZE = 500
+
+
+class _Slot:
+    """A pending game lookup waiting for its batch to complete."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[dict] = None
+        self.error: BaseException | None = None
+
+
+class _LoaderStats:
+    """Counters shared by the sync and async loaders."""
+
+    def __init__(self) -> None:
+        self.loads = 0
+        self.batches = 0
+        self.largest_batch = 0
+
+    def record_batch(self, size: int) -> None:
+        """Record a dispatched batch of the given size."""
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, size)
+
+    def stats(self) -> Dict[str, int]:
+        """Return load and batch counters."""
+        return {
+            "loads": self.loads,
+            "batches": self.batches,
+            "largest_batch": self.largest_batch,
+        }
+
+
+def _index_games(games: List[dict]) -> Dict[int, dict]:
+    """Index mapped games by IGDB ID."""
+    return {game["id"]: game for game in games}
+
+
+class GameBatchLoader(_LoaderStats):
+    """
+    Thread-safe micro-batching loader.
+
+    The first caller of a window waits out the window, then dispatches every
+    id collected meanwhile in one upstream call. Other callers just wait.
+    """
+
+    def __init__(self, window: float = 0.005, max_batch_size: int = MAX_BATCH_SIZE):
+        """
+        Args:
+            window (float): Seconds to collect lookups before dispatching a batch.
+            max_batch_size (int): Maximum ids per batch; a full batch dispatches early.
+        """
+        super().__init__()
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self._batch_full = threading.Event()
+        self._pending: Dict[int, _Slot] = {}
+        self._scheduled = False
+
+    def load(
+        self, game_id: int, fetch_many: Callable[[List[int]], List[dict]]
+    ) -> Optional[dict]:
+        """
+        Load one game, batching it with other lookups in the same window.
+
+        Args:
+            game_id (int): IGDB game ID.
+            fetch_many (Callable): Fetches and maps a list of ids in one call.
+
+        Returns:
+            dict | None: The mapped game, or None if IGDB does not know the id.
+        """
+        with self._lock:
+            self.loads += 1
+            slot = self._pending.get(game_id)
+            if slot is None:
+                slot = _Slot()
+                self._pending[game_id] = slot
+            leader = not self._scheduled
+            if leader:
+                self._scheduled = True
+                self._batch_full.clear()
+            elif len(self._pending) >= self.max_batch_size:
+                self._batch_full.set()
+
+        if leader:
+            self._batch_full.wait(timeout=self.window)
+            self._dispatch(fetch_many)
+
+        slot.done.wait()
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def _dispatch(self, fetch_many: Callable[[List[int]], List[dict]]) -> None:
+        """Send the collected batch upstream and fan results out to each slot."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._scheduled = False
+            self.record_batch(len(batch))
+        try:
+            games = _index_games(fetch_many(list(batch)))
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            for slot in batch.values():
+                slot.error = exc
+                slot.done.set()
+            return
+        for game_id, slot in batch.items():
+            slot.result = games.get(game_id)
+            slot.done.set()
+
+
+class AsyncGameBatchLoader(_LoaderStats):
+    """
+    Asyncio micro-batching loader.
+
+    The first lookup of a window schedules a dispatch after the window; every
+    lookup awaits a future resolved from the shared batch response.
+    """
+
+    def __init__(self, window: float = 0.005, max_batch_size: int = MAX_BATCH_SIZE):
+        """
+        Args:
+            window (float): Seconds to collect lookups before dispatching a batch.
+            max_batch_size (int): Maximum ids per batch; a full batch dispatches early.
+        """
+        super().__init__()
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def load(
+        self,
+        game_id: int,
+        fetch_many: Callable[[List[int]], Awaitable[List[dict]]],
+    ) -> Optional[dict]:
+        """
+        Load one game, batching it with other lookups in the same window.
+
+        Args:
+            game_id (int): IGDB game ID.
+            fetch_many (Callable): Coroutine function fetching a list of ids in one call.
+
+        Returns:
+            dict | None: The mapped game, or None if IGDB does not know the id.
+        """
+        loop = asyncio.get_running_loop()
+        self.loads += 1
+        future = self._pending.get(game_id)
+        if future is None:
+            future = loop.create_future()
+            self._pending[game_id] = future
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch(fetch_many)
+        elif self._handle is None:
+            self._handle = loop.call_later(self.window, self._dispatch, fetch_many)
+        return await asyncio.shield(future)
+
+    def _dispatch(self, fetch_many: Callable[..., Any]) -> None:
+        """Start the upstream call for the collected batch."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        self.record_batch(len(batch))
+        task = asyncio.ensure_future(self._run_batch(batch, fetch_many))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _run_batch(
+        batch: Dict[int, asyncio.Future], fetch_many: Callable[..., Any]
+    ) -> None:
+        """
+        Fetch a batch and resolve each caller's future.
+
+        If the batch task is cancelled (or fails with a BaseException), the
+        futures still pending are cancelled so no caller waits forever.
+        """
+        try:
+            games = _index_games(await fetch_many(list(batch)))
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        except BaseException:
+            for future in batch.values():
+                future.cancel()
+            raise
+        for game_id, future in batch.items():
+            if not future.done():
+                future.set_result(games.get(game_id))
@@ -0,0 +1,198 @@
+"""
+Pre-serialized cache payloads for search results and games.
+
+With IGDB_CACHE_PAYLOAD set, ``search:``, ``fsearch:`` and ``game:`` entries
+are cached as compact bytes instead of lists of dicts: a small header followed
+by the digest of the encoded body and the body itself, zlib-compressed when
+it is at least compress_min_bytes long and compression makes it smaller.
+
+    magic (2 bytes) | format (1 byte) | fresh_until (float64) | digest | body
+
+The digest (see http_cache.py) is computed once when the entry is written and
+becomes the ETag of every response served from it, as the ETag stored next to
+the value does for entries cached without a codec. Payloads written before
+digests were stored lack it and are hashed when read.
+
+The "json" format stores the GameOut JSON written by records.dump_games, so a
+cache hit can be returned as the response body without decoding and
+re-serializing it (see json_body). The "msgpack" format is smaller before
+compression but has to be converted to JSON on every hit; it needs the optional
+msgpack package.
+
+Payloads describe their own format, so entries written with another setting
+(or before payloads were disabled) can still be read. The magic never starts a
+JSON document, which lets RedisCache store payloads as they are.
+"""
+
+import importlib.util
+import json
+import struct
+import zlib
+from typing import Any, Optional, Tuple
+
+from src.core.config import Settings
+from src.igdb.http_cache import DIGEST_SIZE, TaggedBody, digest, format_etag
+from src.igdb.records import dump_value
+
+# Leading bytes of every payload; no JSON document starts with a NUL byte
+PAYLOAD_MAGIC = b"\x00\xc7"
+
+# Cache namespaces stored as payloads when a codec is configured
+PAYLOAD_NAMESPACES = ("search", "fsearch", "game")
+
+PAYLOAD_FORMATS = ("json", "msgpack")
+
+# Format byte: body encoding, plus 1 when the body is zlib-compressed and 4
+# when the header is followed by the body digest
+_JSON = 0
+_MSGPACK = 2
+_COMPRESSED = 1
+_TAGGED = 4
+
+_HEADER = struct.Struct("<2sBd")
+
+
+def msgpack_available() -> bool:
+    """Return True if the optional 'msgpack' package is installed."""
+    return importlib.util.find_spec("msgpack") is not None
+
+
+def _msgpack():
+    """Import msgpack, raising a clear error if it is not installed."""
+    try:
+        import msgpack  # pylint: disable=import-outside-toplevel
+    except ImportError as exc:
+        raise RuntimeError(
+            "The msgpack cache payload format needs the 'msgpack' package"
+        ) from exc
+    return msgpack
+
+
+class PayloadCodec:
+    """Encodes search results and games into cache payloads."""
+
+    def __init__(
+        self,
+        payload_format: str = "json",
+        compress_min_bytes: int = 1024,
+        level: int = 6,
+    ) -> None:
+        """
+        Args:
+            payload_format (str): "json" or "msgpack".
+            compress_min_bytes (int): Bodies at least this long are zlib-compressed;
+                0 disables compression.
+            level (int): zlib compression level.
+        """
+        if payload_format not in PAYLOAD_FORMATS:
+            raise ValueError(
+                f"Unknown cache payload format {payload_format!r}; "
+                f"expected one of {PAYLOAD_FORMATS}"
+            )
+        if payload_format == "msgpack":
+            _msgpack()
+        self.payload_format = payload_format
+        self.compress_min_bytes = compress_min_bytes
+        self.level = level
+
+    def encode(self, value: Any, fresh_until: Optional[float] = None) -> bytes:
+        """
+        Encode a list of games or one game.
+
+        Args:
+            value (list | dict): Mapped games, or one mapped game.
+            fresh_until (float, optional): Time the entry turns stale; None for
+                entries without a stale-while-revalidate policy.
+
+        Returns:
+            bytes: The payload.
+        """
+        if self.payload_format == "msgpack":
+            kind, body = _MSGPACK, _msgpack().packb(value)
+        else:
+            kind, body = _JSON, dump_value(value)
+        body_digest = digest(body)
+        if self.compress_min_bytes and len(body) >= self.compress_min_bytes:
+            compressed = zlib.compress(body, self.level)
+            if len(compressed) < len(body):
+                kind, body = kind | _COMPRESSED, compressed
+        header = _HEADER.pack(PAYLOAD_MAGIC, kind | _TAGGED, fresh_until or 0.0)
+        return header + body_digest + body
+
+
+def is_payload(entry: Any) -> bool:
+    """Return True if a cached entry is a payload written by PayloadCodec."""
+    return isinstance(entry, bytes) and entry[:2] == PAYLOAD_MAGIC
+
+
+def _split(payload: bytes) -> Tuple[int, float, Optional[bytes], bytes]:
+    """Return (kind, fresh_until, stored digest or None, decompressed body) of a payload."""
+    _, kind, fresh_until = _HEADER.unpack_from(payload)
+    start = _HEADER.size
+    body_digest = None
+    if kind & _TAGGED:
+        end = start + DIGEST_SIZE
+        body_digest = payload[start:end]
+        start = end
+    body = memoryview(payload)[start:]
+    if kind & _COMPRESSED:
+        body = zlib.decompress(body)
+    return kind & ~(_COMPRESSED | _TAGGED), fresh_until, body_digest, body
+
+
+def payload_fresh_until(payload: bytes) -> Optional[float]:
+    """Return the time a payload turns stale, or None if it has no soft TTL."""
+    return _HEADER.unpack_from(payload)[2] or None
+
+
+def decode(payload: bytes) -> Tuple[Any, Optional[float]]:
+    """
+    Decode a payload.
+
+    Returns:
+        tuple: (value, fresh_until); fresh_until is None for entries without a
+        stale-while-revalidate policy.
+    """
+    kind, fresh_until, _, body = _split(payload)
+    if kind == _MSGPACK:
+        value = _msgpack().unpackb(body)
+    else:
+        value = json.loads(bytes(body))
+    return value, fresh_until or None
+
+
+def json_body(payload: bytes) -> bytes:
+    """
+    Return the GameOut JSON of a payload, ready to be sent as a response body.
+
+    JSON payloads are returned as stored (decompressed if needed); msgpack
+    payloads are decoded and serialized.
+
+    Returns:
+        TaggedBody: The JSON, carrying the ETag of the stored digest.
+    """
+    kind, _, body_digest, body = _split(payload)
+    if kind == _MSGPACK:
+        body = dump_value(_msgpack().unpackb(body))
+    if body_digest is None:
+        body_digest = digest(body)
+    return TaggedBody(body, format_etag(body_digest))
+
+
+def create_payload_codec(settings: Optional[Settings] = None) -> Optional[PayloadCodec]:
+    """
+    Create the codec selected by IGDB_CACHE_PAYLOAD.
+
+    Args:
+        settings (Settings, optional): Settings to read; defaults to Settings().
+
+    Returns:
+        PayloadCodec | None: The codec, or None when entries are cached as values.
+    """
+    settings = settings or Settings()
+    payload_format = settings.IGDB_CACHE_PAYLOAD.strip().lower()
+    if not payload_format:
+        return None
+    return PayloadCodec(
+        payload_format, compress_min_bytes=settings.IGDB_CACHE_COMPRESS_MIN_BYTES
+    )
@@ -3,501 +3,254 @@ IGDB query builder for constructing API queries.
 
 This module provides functionality to build IGDB API query strings
 from search terms and filters.
+
+Filters are first compiled into a hashable tuple of (field, value) pairs: id
+lists de-duplicated, discrete years sorted so adjacent years merge into single
+ranges. Clause fragments are memoized per (field, value) and whole queries are
+kept in an LRU keyed by the escaped search term and compiled filters, so
+repeated searches skip building entirely. Year boundaries come from a
+precomputed lookup table instead of datetime arithmetic.
 """
 
-from datetime import datetime, timezone
-from typing import Optional
+import calendar
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+
 from src.igdb.schemas import GameFilters
+from src.igdb.search import escape_search_term
+
+BASE_FIELDS = "id,name,cover.url,summary,first_release_date,genres.name,platforms.name"
+
+# Built queries kept in the query LRU
+QUERY_CACHE_SIZE = 1024
+
+# Memoized clause fragments
+FRAGMENT_CACHE_SIZE = 4096
+
+# UTC start-of-year timestamps for the years YearRange accepts (1970-2030),
+# plus the following year for exclusive range ends
+_YEAR_STARTS = {
+    year: calendar.timegm((year, 1, 1, 0, 0, 0)) for year in range(1970, 2032)
+}
+
+# Id-list filters and their Apicalypse conditions
+_ID_CLAUSES = {
+    "platforms": "platforms = ({})",
+    "genres": "genres = ({})",
+    "ratings": "age_ratings = ({})",
+    "game_modes": "game_modes = ({})",
+    "themes": "themes = ({})",
+    "player_perspectives": "player_perspectives = ({})",
+    "release_status": "status = ({})",
+    "franchises": "franchises = ({})",
+    # involved_companies catches both developers and publishers
+    "companies": "involved_companies.company = ({})",
+    "keywords": "keywords = ({})",
+    "multiplayer_modes": "multiplayer_modes = ({})",
+    # ESRB ratings are stored under age_ratings with category 1
+    "esrb_ratings": "age_ratings.category = 1 & age_ratings.rating = ({})",
+    "game_engines": "game_engines = ({})",
+    "collections": "collection = ({})",
+}
+
+# Order in which clauses are joined into the where clause
+_CLAUSE_ORDER = (
+    "platforms",
+    "years",
+    "year_range",
+    "genres",
+    "ratings",
+    "game_modes",
+    "themes",
+    "player_perspectives",
+    "release_status",
+    "franchises",
+    "companies",
+    "keywords",
+    "multiplayer_modes",
+    "rating_range",
+    "metacritic_range",
+    "esrb_ratings",
+    "game_engines",
+    "collections",
+)
+
+# Compiled range filters and their (minimum, maximum) GameFilters fields
+_RANGE_BOUNDS = {
+    "rating_range": ("min_rating", "max_rating"),
+    "metacritic_range": ("min_metacritic", "max_metacritic"),
+}
+
+CompiledFilters = Tuple[Tuple[str, Any], ...]
 
 
-# pylint: disable=too-many-branches,too-many-statements
 def build_igdb_query(search_term: str, filters: Optional[GameFilters] = None) -> str:
     """
     Build an IGDB API query string from search term and filters.
 
     Args:
-        search_term: The text to search for
+        search_term: The text to search for (escaped for the Apicalypse string)
         filters: GameFilters instance with validated filter parameters (optional)
 
     Returns:
         Complete IGDB query string ready for POST request
     """
-    base_fields = (
-        "id,name,cover.url,summary,first_release_date,genres.name,platforms.name"
-    )
-    base_query = f'search "{search_term}"; fields {base_fields}; limit 10;'
-
-    if not filters:
-        return base_query
-
-    where_clauses = []
-
-    # Handle platforms filter
-    if filters.platforms:
-        clause = _build_platforms_clause(filters.platforms)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle discrete years filter
-    if filters.years:
-        clause = _build_years_clause(filters.years)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle year range filter
-    if filters.year_range:
-        clause = _build_year_range_clause(filters.year_range)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle genres filter
-    if filters.genres:
-        clause = _build_genres_clause(filters.genres)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle ratings filter
-    if filters.ratings:
-        clause = _build_ratings_clause(filters.ratings)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle game modes filter
-    if filters.game_modes:
-        clause = _build_game_modes_clause(filters.game_modes)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle themes filter
-    if filters.themes:
-        clause = _build_themes_clause(filters.themes)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle player perspectives filter
-    if filters.player_perspectives:
-        clause = _build_player_perspectives_clause(filters.player_perspectives)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle release status filter
-    if filters.release_status:
-        clause = _build_release_status_clause(filters.release_status)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle franchises filter
-    if filters.franchises:
-        clause = _build_franchises_clause(filters.franchises)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle companies filter
-    if filters.companies:
-        clause = _build_companies_clause(filters.companies)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle keywords filter
-    if filters.keywords:
-        clause = _build_keywords_clause(filters.keywords)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle multiplayer modes filter
-    if filters.multiplayer_modes:
-        clause = _build_multiplayer_modes_clause(filters.multiplayer_modes)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle rating range filters
-    if filters.min_rating is not None or filters.max_rating is not None:
-        clause = _build_rating_range_clause(filters.min_rating, filters.max_rating)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle metacritic range filters
-    if filters.min_metacritic is not None or filters.max_metacritic is not None:
-        clause = _build_metacritic_range_clause(
-            filters.min_metacritic, filters.max_metacritic
-        )
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle ESRB ratings filter
-    if filters.esrb_ratings:
-        clause = _build_esrb_ratings_clause(filters.esrb_ratings)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle game engines filter
-    if filters.game_engines:
-        clause = _build_game_engines_clause(filters.game_engines)
-        if clause:
-            where_clauses.append(clause)
-
-    # Handle collections filter
-    if filters.collections:
-        clause = _build_collections_clause(filters.collections)
-        if clause:
-            where_clauses.append(clause)
-
-    where_clause = ""
-    if where_clauses:
-        where_clause = f" where {' & '.join(where_clauses)};"
-
-    return f'search "{search_term}";{where_clause} fields {base_fields}; limit 10;'
-
-
-# ===============================================
-# Private Helper Methods
-# ===============================================
-
-
-def _year_to_unix_range(year: int) -> tuple:
-    """Convert a year to Unix timestamp range (start of year to start of next year) in UTC."""
-    # Use UTC to avoid timezone issues
-    start_dt = datetime(year, 1, 1, tzinfo=timezone.utc)
-    end_dt = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
-    return int(start_dt.timestamp()), int(end_dt.timestamp())
-
-
-def _build_platforms_clause(platforms) -> str:
-    """
-    Build WHERE clause for platforms filter.
+    compiled = compile_filters(filters) if filters else ()
+    return _build_query(escape_search_term(search_term), compiled)
 
-    Args:
-        platforms: List of platform IDs
 
-    Returns:
-        WHERE clause string for platforms, or empty string if invalid
+def compile_filters(filters: GameFilters) -> CompiledFilters:
     """
-    try:
-        ids = ",".join(str(int(p)) for p in platforms)
-        return f"platforms = ({ids})"
-    except (ValueError, TypeError):
-        # If conversion fails (non-integer values), ignore the platforms filter
-        return ""
+    Compile filters into a hashable form.
 
-
-def _build_years_clause(years) -> str:
-    """
-    Build WHERE clause for discrete years filter.
+    Duplicate ids and empty lists do not change the result, and discrete years
+    are sorted. Id order is kept; callers wanting one entry per id set pass
+    canonical filters (see search.canonicalize_filters). Values that are not
+    integers are ignored, as the per-filter clause builders always did.
 
     Args:
-        years: List of year integers
+        filters: GameFilters instance with validated filter parameters
 
     Returns:
-        WHERE clause string for years, or empty string if invalid
-    """
-    year_conditions = []
-    try:
-        for year in years:
-            start_ts, end_ts = _year_to_unix_range(int(year))
-            year_conditions.append(
-                f"first_release_date >= {start_ts} & first_release_date < {end_ts}"
-            )
-
-        if year_conditions:
-            if len(year_conditions) == 1:
-                # Single year: no parentheses needed
-                return year_conditions[0]
-            # Multiple years: OR them together with parentheses
-            return " | ".join(f"({condition})" for condition in year_conditions)
-    except (ValueError, TypeError):
-        # If conversion fails, ignore the years filter
-        pass
-    return ""
-
-
-def _build_year_range_clause(year_range) -> str:
-    """
-    Build WHERE clause for year range filter.
-
-    Args:
-        year_range: YearRange Pydantic model with 'start' and 'end' attributes
+        Tuple of (field, value) pairs in clause order
+    """
+    data = vars(filters)
+    compiled = []
+    for field in _CLAUSE_ORDER:
+        if field in _RANGE_BOUNDS:
+            low, high = _RANGE_BOUNDS[field]
+            value = _int_bounds(data[low], data[high])
+        elif not data[field]:
+            continue
+        elif field == "year_range":
+            value = _year_bounds(data[field])
+        else:
+            value = _int_tuple(data[field], sort=field == "years")
+        if value:
+            compiled.append((field, value))
+    return tuple(compiled)
+
+
+def query_cache_info() -> dict:
+    """Return hit/miss counters of the query and clause fragment caches."""
+    return {
+        "queries": _build_query.cache_info()._asdict(),
+        "fragments": _clause.cache_info()._asdict(),
+    }
+
+
+def clear_query_caches() -> None:
+    """Empty the query and clause fragment caches."""
+    _build_query.cache_clear()
+    _clause.cache_clear()
 
-    Returns:
-        WHERE clause string for year range, or empty string if invalid
-    """
-    try:
-        # year_range is already validated by Pydantic
-        start_year = year_range.start
-        end_year = year_range.end
-        start_ts, _ = _year_to_unix_range(start_year)
-        _, end_ts = _year_to_unix_range(end_year)
-        return f"first_release_date >= {start_ts} & first_release_date < {end_ts}"
-    except (ValueError, TypeError, AttributeError):
-        # If conversion fails, ignore the year_range filter
-        pass
-    return ""
-
-
-def _build_genres_clause(genres) -> str:
-    """
-    Build WHERE clause for genres filter.
-
-    Args:
-        genres: List of genre IDs
 
-    Returns:
-        WHERE clause string for genres, or empty string if invalid
-    """
-    try:
-        ids = ",".join(str(int(g)) for g in genres)
-        return f"genres = ({ids})"
-    except (ValueError, TypeError):
-        # If conversion fails (non-integer values), ignore the genres filter
-        return ""
-
-
-def _build_ratings_clause(ratings) -> str:
-    """
-    Build WHERE clause for age ratings filter.
-
-    Args:
-        ratings: List of age rating IDs
-
-    Returns:
-        WHERE clause string for ratings, or empty string if invalid
-    """
-    try:
-        ids = ",".join(str(int(r)) for r in ratings)
-        return f"age_ratings = ({ids})"
-    except (ValueError, TypeError):
-        # If conversion fails (non-integer values), ignore the ratings filter
-        return ""
-
-
-def _build_game_modes_clause(game_modes) -> str:
-    """
-    Build WHERE clause for game modes filter.
-
-    Args:
-        game_modes: List of game mode IDs
-
-    Returns:
-        WHERE clause string for game modes, or empty string if invalid
-    """
-    try:
-        ids = ",".join(str(int(m)) for m in game_modes)
-        return f"game_modes = ({ids})"
-    except (ValueError, TypeError):
-        # If conversion fails (non-integer values), ignore the game modes filter
-        return ""
-
-
-def _build_themes_clause(themes) -> str:
-    """
-    Build WHERE clause for themes filter.
-
-    Args:
-        themes: List of theme IDs
-
-    Returns:
-        WHERE clause string for themes, or empty string if invalid
-    """
-    try:
-        ids = ",".join(str(int(t)) for t in themes)
-        return f"themes = ({ids})"
-    except (ValueError, TypeError):
-        return ""
-
-
-def _build_player_perspectives_clause(player_perspectives) -> str:
-    """
-    Build WHERE clause for player perspectives filter.
-
-    Args:
-        player_perspectives: List of player perspective IDs
-
-    Returns:
-        WHERE clause string for player perspectives, or empty string if invalid
-    """
-    try:
-        ids = ",".join(str(int(p)) for p in player_perspectives)
-        return f"player_perspectives = ({ids})"
-    except (ValueError, TypeError):
-        return ""
-
-
-def _build_release_status_clause(release_status) -> str:
-    """
-    Build WHERE clause for release status filter.
-
-    Args:
-        release_status: List of release status IDs
-
-    Returns:
-        WHERE clause string for release status, or empty string if invalid
-    """
-    try:
-        ids = ",".join(str(int(s)) for s in release_status)
-        return f"status = ({ids})"
-    except (ValueError, TypeError):
-        return ""
-
-
-def _build_franchises_clause(franchises) -> str:
-    """
-    Build WHERE clause for franchises filter.
-
-    Args:
-        franchises: List of franchise IDs
-
-    Returns:
-        WHERE clause string for franchises, or empty string if invalid
-    """
-    try:
-        ids = ",".join(str(int(f)) for f in franchises)
-        return f"franchises = ({ids})"
-    except (ValueError, TypeError):
-        return ""
-
-
-def _build_companies_clause(companies) -> str:
-    """
-    Build WHERE clause for companies filter.
-
-    Args:
-        companies: List of company IDs (developers/publishers)
-
-    Returns:
-        WHERE clause string for companies, or empty string if invalid
-    """
-    try:
-        ids = ",".join(str(int(c)) for c in companies)
-        # Use involved_companies to catch both developers and publishers
-        return f"involved_companies.company = ({ids})"
-    except (ValueError, TypeError):
-        return ""
-
-
-def _build_keywords_clause(keywords) -> str:
-    """
-    Build WHERE clause for keywords filter.
-
-    Args:
-        keywords: List of keyword IDs
-
-    Returns:
-        WHERE clause string for keywords, or empty string if invalid
-    """
-    try:
-        ids = ",".join(str(int(k)) for k in keywords)
-        return f"keywords = ({ids})"
-    except (ValueError, TypeError):
-        return ""
+# ===============================================
+# Private Helper Methods
+# ===============================================
 
 
-def _build_multiplayer_modes_clause(multiplayer_modes) -> str:
-    """
-    Build WHERE clause for multiplayer modes filter.
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _build_query(escaped_term: str, compiled: CompiledFilters) -> str:
+    """Build the query for an escaped search term and compiled filters."""
+    clauses = [_clause(field, value) for field, value in compiled]
+    where_clause = f" where {' & '.join(clauses)};" if clauses else ""
+    return f'search "{escaped_term}";{where_clause} fields {BASE_FIELDS}; limit 10;'
 
-    Args:
-        multiplayer_modes: List of multiplayer mode IDs
 
-    Returns:
-        WHERE clause string for multiplayer modes, or empty string if invalid
-    """
-    try:
-        ids = ",".join(str(int(m)) for m in multiplayer_modes)
-        return f"multiplayer_modes = ({ids})"
-    except (ValueError, TypeError):
-        return ""
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _clause(field: str, value: Any) -> str:
+    """Build the WHERE clause fragment for one compiled filter."""
+    if field in _ID_CLAUSES:
+        return _ID_CLAUSES[field].format(",".join(map(str, value)))
+    if field == "years":
+        return _build_years_clause(value)
+    if field == "year_range":
+        return _release_date_range(*value)
+    # Rating and Metacritic ranges both filter on aggregated_rating
+    low, high = value
+    bounds = []
+    if low is not None:
+        bounds.append(f"aggregated_rating >= {low}")
+    if high is not None:
+        bounds.append(f"aggregated_rating <= {high}")
+    return " & ".join(bounds)
 
 
-def _build_rating_range_clause(min_rating, max_rating) -> str:
-    """
-    Build WHERE clause for IGDB rating range filter.
+def _year_start(year: int) -> int:
+    """Return the UTC timestamp of January 1st of a year."""
+    start = _YEAR_STARTS.get(year)
+    if start is None:
+        start = calendar.timegm((year, 1, 1, 0, 0, 0))
+    return start
 
-    Args:
-        min_rating: Minimum rating (0-100), optional
-        max_rating: Maximum rating (0-100), optional
-
-    Returns:
-        WHERE clause string for rating range, or empty string if invalid
-    """
-    clauses = []
-    try:
-        if min_rating is not None:
-            clauses.append(f"aggregated_rating >= {int(min_rating)}")
-        if max_rating is not None:
-            clauses.append(f"aggregated_rating <= {int(max_rating)}")
-        return " & ".join(clauses) if clauses else ""
-    except (ValueError, TypeError):
-        return ""
 
+def _release_date_range(first_year: int, last_year: int) -> str:
+    """Return the condition for releases from first_year to last_year inclusive."""
+    start_ts = _year_start(first_year)
+    end_ts = _year_start(last_year + 1)
+    return f"first_release_date >= {start_ts} & first_release_date < {end_ts}"
 
-def _build_metacritic_range_clause(min_metacritic, max_metacritic) -> str:
-    """
-    Build WHERE clause for Metacritic score range filter.
-
-    Args:
-        min_metacritic: Minimum Metacritic score (0-100), optional
-        max_metacritic: Maximum Metacritic score (0-100), optional
 
-    Returns:
-        WHERE clause string for Metacritic range, or empty string if invalid
+def _build_years_clause(years: Tuple[int, ...]) -> str:
     """
-    clauses = []
-    try:
-        if min_metacritic is not None:
-            clauses.append(f"aggregated_rating >= {int(min_metacritic)}")
-        if max_metacritic is not None:
-            clauses.append(f"aggregated_rating <= {int(max_metacritic)}")
-        return " & ".join(clauses) if clauses else ""
-    except (ValueError, TypeError):
-        return ""
-
+    Build WHERE clause for discrete years filter.
 
-def _build_esrb_ratings_clause(esrb_ratings) -> str:
-    """
-    Build WHERE clause for ESRB ratings filter.
+    Adjacent years are merged into one range, so 2019, 2020, 2021 and 2023
+    become two conditions instead of four.
 
     Args:
-        esrb_ratings: List of ESRB rating IDs
+        years: Sorted, de-duplicated year integers
 
     Returns:
-        WHERE clause string for ESRB ratings, or empty string if invalid
-    """
+        WHERE clause string for years
+    """
+    runs = []
+    for year in years:
+        if runs and runs[-1][1] == year - 1:
+            runs[-1][1] = year
+        else:
+            runs.append([year, year])
+    conditions = [_release_date_range(first, last) for first, last in runs]
+    if len(conditions) == 1:
+        # Single range: no parentheses needed
+        return conditions[0]
+    # Multiple ranges: OR them together with parentheses
+    return " | ".join(f"({condition})" for condition in conditions)
+
+
+def _int_tuple(values, sort: bool = False) -> Optional[Tuple[int, ...]]:
+    """Return values as a tuple of unique ints, or None if empty or invalid."""
+    if not values:
+        return None
     try:
-        ids = ",".join(str(int(r)) for r in esrb_ratings)
-        # ESRB ratings are typically stored under age_ratings with specific category
-        return f"age_ratings.category = 1 & age_ratings.rating = ({ids})"
+        if sort:
+            return tuple(sorted(set(map(int, values))))
+        return tuple(dict.fromkeys(map(int, values)))
     except (ValueError, TypeError):
-        return ""
+        # If conversion fails (non-integer values), ignore the filter
+        return None
 
 
-def _build_game_engines_clause(game_engines) -> str:
-    """
-    Build WHERE clause for game engines filter.
-
-    Args:
-        game_engines: List of game engine IDs
-
-    Returns:
-        WHERE clause string for game engines, or empty string if invalid
-    """
+def _year_bounds(year_range) -> Optional[Tuple[int, int]]:
+    """Return (start, end) of a YearRange, or None if unset or invalid."""
+    if year_range is None:
+        return None
     try:
-        ids = ",".join(str(int(e)) for e in game_engines)
-        return f"game_engines = ({ids})"
-    except (ValueError, TypeError):
-        return ""
-
-
-def _build_collections_clause(collections) -> str:
-    """
-    Build WHERE clause for collections filter.
+        # year_range is already validated by Pydantic
+        return int(year_range.start), int(year_range.end)
+    except (ValueError, TypeError, AttributeError):
+        return None
 
-    Args:
-        collections: List of collection IDs
 
-    Returns:
-        WHERE clause string for collections, or empty string if invalid
-    """
+def _int_bounds(low, high) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """Return (low, high) truncated to ints, or None if neither is set or invalid."""
+    if low is None and high is None:
+        return None
     try:
-        ids = ",".join(str(int(c)) for c in collections)
-        return f"collection = ({ids})"
+        return (
+            None if low is None else int(low),
+            None if high is None else int(high),
+        )
     except (ValueError, TypeError):
-        return ""
+        return None
@@ -0,0 +1,513 @@
+"""
+Rate limiting and concurrency control for upstream IGDB calls.
+
+IGDB allows roughly 4 requests per second and 8 concurrent requests per client
+id; bursts beyond that come back as 429s. RateLimiter wraps every upstream call
+with a token bucket (requests per second) and a concurrency limit.
+
+Waiting callers are served by priority lane, so interactive requests go ahead
+of background cache refreshes, and FIFO within a lane. A caller whose expected
+wait exceeds its lane's budget fails fast with RateLimitExceeded instead of
+queueing. One limiter serves both threads (acquire) and coroutines
+(acquire_async), so the sync and async IGDB clients share one budget.
+
+With a shared cache backend (Redis), SharedLimits also enforces the rate and
+concurrency limits across worker processes using atomic counters. Those
+counters are claimed outside the limiter's lock, by one caller at a time, and
+on a worker thread for coroutines, so no thread or event loop waits on the
+network while holding the lock.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from src.core.config import Settings
+from src.igdb.redis_cache import RedisCache
+from src.igdb.tiered_cache import TieredCache
+
+# How long a caller waits before re-checking limits held by other processes
+SHARED_POLL_INTERVAL = 0.05
+
+
+class Priority(IntEnum):
+    """Priority lanes; lower values are served first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+# Lane used by upstream calls made in the current thread or task
+request_priority: ContextVar[Priority] = ContextVar(
+    "igdb_request_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def background_priority() -> Iterator[None]:
+    """Run the enclosed upstream calls in the background lane."""
+    token = request_priority.set(Priority.BACKGROUND)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when the expected wait for an IGDB slot exceeds the caller's budget.
+
+    Attributes:
+        retry_after (float): Expected wait in seconds.
+    """
+
+    def __init__(self, expected_wait: float, max_wait: float) -> None:
+        super().__init__(
+            f"IGDB rate limit: expected wait {expected_wait:.2f}s exceeds {max_wait:.2f}s"
+        )
+        self.retry_after = expected_wait
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate tokens per second."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Maximum tokens (burst size).
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Add tokens earned since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Return seconds until one token is available (0 if one is available now)."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        """Consume one token; call only after delay() returned 0."""
+        self._refill(now)
+        self.tokens -= 1
+
+
+class SharedLimits:
+    """
+    Rate and concurrency limits shared by every process using one cache backend.
+
+    The rate is enforced per one-second window with an atomic counter; the
+    concurrency limit with an in-flight counter whose TTL, set when the counter
+    is created, heals leaks from crashed workers. If the backend is unavailable
+    the shared limits are skipped.
+    """
+
+    def __init__(
+        self,
+        cache: Any,
+        rate: float,
+        max_concurrent: int,
+        key_prefix: str = "ratelimit:",
+        in_flight_ttl: int = 60,
+    ) -> None:
+        """
+        Args:
+            cache (CacheBackend): Shared backend providing incr().
+            rate (float): Requests per second allowed across all processes.
+            max_concurrent (int): Concurrent requests allowed across all processes.
+            key_prefix (str): Prefix for the counter keys.
+            in_flight_ttl (int): Seconds after its creation the in-flight counter expires.
+        """
+        self.cache = cache
+        self.per_window = max(1, math.floor(rate))
+        self.max_concurrent = max_concurrent
+        self.key_prefix = key_prefix
+        self.in_flight_ttl = in_flight_ttl
+
+    def _in_flight_key(self) -> str:
+        return f"{self.key_prefix}in_flight"
+
+    def try_acquire(self) -> float:
+        """
+        Try to claim a shared slot and a request in the current window.
+
+        Returns:
+            float: 0 if granted, otherwise seconds to wait before retrying.
+        """
+        in_flight = self.cache.incr(self._in_flight_key(), 1, ttl=self.in_flight_ttl)
+        if in_flight is not None and in_flight > self.max_concurrent:
+            self.release()
+            return SHARED_POLL_INTERVAL
+        now = time.time()
+        window = int(now)
+        window_key = f"{self.key_prefix}window:{window}"
+        count = self.cache.incr(window_key, 1, ttl=2)
+        if count is not None and count > self.per_window:
+            # A rejected poll must not use up the window
+            self.cache.incr(window_key, -1, ttl=2)
+            self.release()
+            return max(SHARED_POLL_INTERVAL, window + 1 - now)
+        return 0.0
+
+    def release(self) -> None:
+        """Give back a shared concurrency slot."""
+        self.cache.incr(self._in_flight_key(), -1, ttl=self.in_flight_ttl)
+
+    async def atry_acquire(self) -> float:
+        """try_acquire for coroutines; a blocking backend is called on a worker thread."""
+        if getattr(self.cache, "blocking", False):
+            return await asyncio.to_thread(self.try_acquire)
+        return self.try_acquire()
+
+    async def arelease(self) -> None:
+        """release for coroutines; a blocking backend is called on a worker thread."""
+        if getattr(self.cache, "blocking", False):
+            await asyncio.to_thread(self.release)
+        else:
+            self.release()
+
+
+class _Waiter:
+    """A caller queued for an IGDB slot."""
+
+    __slots__ = ("priority", "seq", "wake")
+
+    def __init__(self, priority: Priority, seq: int, wake: Callable[[], None]):
+        self.priority = priority
+        self.seq = seq
+        self.wake = wake
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class _LaneStats:
+    """Queue-time counters for one priority lane."""
+
+    def __init__(self) -> None:
+        self.acquired = 0
+        self.rejected = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        """Record a granted slot and how long the caller queued for it."""
+        self.acquired += 1
+        if wait > 0.001:
+            self.waited += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def stats(self, queued: int) -> Dict[str, Any]:
+        """Return the lane's counters."""
+        return {
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "waited": self.waited,
+            "queued": queued,
+            "avg_wait": (
+                round(self.total_wait / self.acquired, 4) if self.acquired else 0.0
+            ),
+            "max_wait": round(self.max_wait, 4),
+        }
+
+
+class RateLimiter:
+    """
+    Token bucket plus concurrency limit with priority lanes.
+
+    Use ``with limiter.acquire():`` from threads or
+    ``async with limiter.acquire_async():`` from coroutines around each upstream call.
+    """
+
+    def __init__(
+        self,
+        rate: float = 4.0,
+        burst: Optional[float] = None,
+        max_concurrent: int = 8,
+        max_wait: Optional[Dict[Priority, Optional[float]]] = None,
+        shared: Optional[SharedLimits] = None,
+    ) -> None:
+        """
+        Args:
+            rate (float): Requests per second.
+            burst (float, optional): Bucket capacity; defaults to rate.
+            max_concurrent (int): Maximum requests in flight.
+            max_wait (dict, optional): Fail-fast budget in seconds per lane; a lane
+                without a budget (None) waits as long as needed.
+            shared (SharedLimits, optional): Cross-process limits in a shared cache.
+        """
+        self.bucket = TokenBucket(rate, burst or rate)
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait or {}
+        self.shared = shared
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._waiting: List[_Waiter] = []
+        # Waiter claiming the shared limits; nobody else starts meanwhile
+        self._claimant: Optional[_Waiter] = None
+        self._seq = itertools.count()
+        self._lanes = {priority: _LaneStats() for priority in Priority}
+
+    def _expected_wait(self, priority: Priority, now: float) -> float:
+        """Estimate the queue time for a new caller from the tokens it must wait for."""
+        ahead = sum(1 for waiter in self._waiting if waiter.priority <= priority)
+        self.bucket.delay(now)  # refill
+        missing = ahead + 1 - self.bucket.tokens
+        return max(0.0, missing / self.bucket.rate)
+
+    def _enqueue(
+        self,
+        priority: Optional[Priority],
+        max_wait: Optional[float],
+        wake: Callable[[], None],
+    ) -> _Waiter:
+        """Queue a caller, or raise RateLimitExceeded if it would wait too long."""
+        priority = request_priority.get() if priority is None else priority
+        budget = self.max_wait.get(priority) if max_wait is None else max_wait
+        with self._lock:
+            if budget is not None:
+                expected = self._expected_wait(priority, time.monotonic())
+                if expected > budget:
+                    self._lanes[priority].rejected += 1
+                    raise RateLimitExceeded(expected, budget)
+            waiter = _Waiter(priority, next(self._seq), wake)
+            heapq.heappush(self._waiting, waiter)
+            return waiter
+
+    def _claim(self, waiter: _Waiter) -> Optional[float]:
+        """
+        Check the local limits for the waiter and claim its start if they allow.
+
+        Returns:
+            0 when claimed (the caller must then call _start), seconds to wait
+            for the next token, or None to wait for a wake-up (not first in
+            line, all slots busy, or another waiter claiming the shared limits).
+        """
+        with self._lock:
+            if (
+                self._claimant is not None
+                or self._waiting[0] is not waiter
+                or self.in_flight >= self.max_concurrent
+            ):
+                return None
+            delay = self.bucket.delay(time.monotonic())
+            if delay == 0:
+                self._claimant = waiter
+            return delay
+
+    def _start(self, waiter: _Waiter, shared_delay: float) -> float:
+        """
+        Start the claimant, or drop its claim if the shared limits refused.
+
+        Nobody else starts while a claim is held, so the token and slot checked
+        by _claim are still free.
+
+        Returns:
+            0 when started, otherwise shared_delay.
+        """
+        with self._lock:
+            self._claimant = None
+            if shared_delay == 0:
+                self.bucket.take(time.monotonic())
+                self._waiting.remove(waiter)
+                heapq.heapify(self._waiting)
+                self.in_flight += 1
+            head = self._waiting[0] if self._waiting else None
+        if head is not None and head is not waiter:
+            head.wake()
+        return shared_delay
+
+    def _try_start(self, waiter: _Waiter) -> Optional[float]:
+        """
+        Start the waiter if it is first in line and limits allow (threads).
+
+        Returns:
+            0 when started, seconds to wait before retrying, or None to wait
+            for a wake-up.
+        """
+        delay = self._claim(waiter)
+        if delay != 0:
+            return delay
+        # Outside the lock: the shared limits are a network round trip
+        shared_delay = self.shared.try_acquire() if self.shared is not None else 0.0
+        return self._start(waiter, shared_delay)
+
+    async def _atry_start(self, waiter: _Waiter) -> Optional[float]:
+        """Start the waiter if it is first in line and limits allow (coroutines)."""
+        delay = self._claim(waiter)
+        if delay != 0:
+            return delay
+        # On a worker thread: the shared limits are a network round trip
+        shared_delay = (
+            await self.shared.atry_acquire() if self.shared is not None else 0.0
+        )
+        return self._start(waiter, shared_delay)
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Remove a waiter that gave up (e.g. cancelled) and wake the others."""
+        with self._lock:
+            if self._claimant is waiter:
+                self._claimant = None
+            if waiter in self._waiting:
+                self._waiting.remove(waiter)
+                heapq.heapify(self._waiting)
+            waiters = list(self._waiting)
+        for other in waiters:
+            other.wake()
+
+    def _release(self) -> None:
+        """Free a local concurrency slot and wake queued callers."""
+        with self._lock:
+            self.in_flight -= 1
+            waiters = list(self._waiting)
+        for waiter in waiters:
+            waiter.wake()
+
+    @contextmanager
+    def acquire(
+        self, priority: Optional[Priority] = None, max_wait: Optional[float] = None
+    ) -> Iterator[None]:
+        """
+        Hold an IGDB slot for the duration of the with-block (blocking threads).
+
+        Args:
+            priority (Priority, optional): Lane; defaults to the current request_priority.
+            max_wait (float, optional): Overrides the lane's fail-fast budget.
+
+        Raises:
+            RateLimitExceeded: If the expected wait exceeds the budget.
+        """
+        event = threading.Event()
+        waiter = self._enqueue(priority, max_wait, event.set)
+        queued_at = time.monotonic()
+        try:
+            while True:
+                event.clear()
+                delay = self._try_start(waiter)
+                if delay == 0:
+                    break
+                event.wait(delay)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        self._record(waiter.priority, time.monotonic() - queued_at)
+        try:
+            yield
+        finally:
+            self._release()
+            if self.shared is not None:
+                self.shared.release()
+
+    @asynccontextmanager
+    async def acquire_async(
+        self, priority: Optional[Priority] = None, max_wait: Optional[float] = None
+    ) -> AsyncIterator[None]:
+        """
+        Hold an IGDB slot for the duration of the async with-block.
+
+        Waiting happens on the event loop; wake-ups from other threads are
+        delivered with call_soon_threadsafe, and shared limits are claimed and
+        released on a worker thread.
+
+        Args:
+            priority (Priority, optional): Lane; defaults to the current request_priority.
+            max_wait (float, optional): Overrides the lane's fail-fast budget.
+
+        Raises:
+            RateLimitExceeded: If the expected wait exceeds the budget.
+        """
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = self._enqueue(
+            priority, max_wait, lambda: loop.call_soon_threadsafe(event.set)
+        )
+        queued_at = time.monotonic()
+        try:
+            while True:
+                event.clear()
+                delay = await self._atry_start(waiter)
+                if delay == 0:
+                    break
+                try:
+                    await asyncio.wait_for(event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        self._record(waiter.priority, time.monotonic() - queued_at)
+        try:
+            yield
+        finally:
+            self._release()
+            if self.shared is not None:
+                await self.shared.arelease()
+
+    def _record(self, priority: Priority, wait: float) -> None:
+        """Record queue time for a granted slot."""
+        with self._lock:
+            self._lanes[priority].record(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return in-flight count and per-lane queue metrics."""
+        with self._lock:
+            queued = {priority: 0 for priority in Priority}
+            for waiter in self._waiting:
+                queued[waiter.priority] += 1
+            return {
+                "in_flight": self.in_flight,
+                "shared": self.shared is not None,
+                "lanes": {
+                    priority.name.lower(): lane.stats(queued[priority])
+                    for priority, lane in self._lanes.items()
+                },
+            }
+
+
+def create_rate_limiter(
+    settings: Optional[Settings] = None, cache: Any = None
+) -> Optional[RateLimiter]:
+    """
+    Create the IGDB rate limiter configured by settings.
+
+    Args:
+        settings (Settings, optional): Settings to read; defaults to Settings().
+        cache (CacheBackend, optional): The IGDB cache. A Redis-backed cache also
+            carries the cross-worker limits when IGDB_RATE_LIMIT_SHARED is set.
+
+    Returns:
+        RateLimiter | None: The limiter, or None when IGDB_RATE_LIMIT_RPS is 0.
+    """
+    settings = settings or Settings()
+    if settings.IGDB_RATE_LIMIT_RPS <= 0:
+        return None
+    shared = None
+    if settings.IGDB_RATE_LIMIT_SHARED and isinstance(cache, (RedisCache, TieredCache)):
+        shared = SharedLimits(
+            cache,
+            rate=settings.IGDB_RATE_LIMIT_RPS,
+            max_concurrent=settings.IGDB_MAX_CONCURRENT_REQUESTS,
+        )
+    max_wait = settings.IGDB_RATE_LIMIT_MAX_WAIT
+    return RateLimiter(
+        rate=settings.IGDB_RATE_LIMIT_RPS,
+        burst=settings.IGDB_RATE_LIMIT_BURST or None,
+        max_concurrent=settings.IGDB_MAX_CONCURRENT_REQUESTS,
+        max_wait={Priority.INTERACTIVE: max_wait if max_wait > 0 else None},
+        shared=shared,
+    )
@@ -0,0 +1,209 @@
+"""
+Compact game records, the single-pass IGDB game mapper and the response serializer.
+
+map_game turns a raw IGDB game into a slotted GameRecord in one pass: the cover
+image file name is cut out of the IGDB URL once and appended to precomputed
+per-size URL prefixes. The client still caches and returns
+GameOut-shaped dicts (GameRecord.as_dict), which Redis can store as JSON.
+
+dump_games writes the GameOut JSON for records or mapped dicts with
+pydantic-core's serializer, without validating every game through GameOut
+again, which is what FastAPI does for a response_model.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from pydantic import TypeAdapter
+
+IMAGE_BASE_URL = "https://images.igdb.com/igdb/image/upload"
+
+# Raw IGDB cover URLs look like //images.igdb.com/igdb/image/upload/t_thumb/co1r6b.jpg
+_IGDB_IMAGE_PREFIX = "//images.igdb.com/igdb/image/upload/"
+
+# Cover URL prefixes per response size, followed by "{image id}.jpg"
+_THUMB_URL = IMAGE_BASE_URL + "/t_thumb/"
+_SMALL_URL = IMAGE_BASE_URL + "/t_cover_small/"
+_MEDIUM_URL = IMAGE_BASE_URL + "/t_cover_big/"
+_LARGE_URL = IMAGE_BASE_URL + "/t_720p/"
+
+# IGDB size segments recognized in non-standard cover URLs
+_SIZE_SEGMENTS = ("t_thumb", "t_cover_small", "t_cover_big", "t_720p")
+
+
+@dataclass(slots=True)
+class CoverImageUrls:
+    """Responsive cover image URLs (see schemas.CoverImages)."""
+
+    thumb: Optional[str] = None
+    small: Optional[str] = None
+    medium: Optional[str] = None
+    large: Optional[str] = None
+
+
+NO_COVER_IMAGES = CoverImageUrls()
+
+
+@dataclass(slots=True)
+class GameRecord:
+    """A mapped game with the fields of schemas.GameOut, in the same order."""
+
+    id: int
+    name: Optional[str]
+    cover_url: Optional[str]
+    cover_images: Optional[CoverImageUrls]
+    summary: Optional[str]
+    release_date: Optional[int]
+    genres: Optional[Tuple[str, ...]]
+    platforms: Optional[Tuple[str, ...]]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return the GameOut-compatible dict cached and returned by the IGDB client.
+
+        A game without cover images maps cover_images to an empty dict.
+        """
+        images = self.cover_images
+        return {
+            "id": self.id,
+            "name": self.name,
+            "cover_url": self.cover_url,
+            "cover_images": (
+                {
+                    "thumb": images.thumb,
+                    "small": images.small,
+                    "medium": images.medium,
+                    "large": images.large,
+                }
+                if images is not None and images != NO_COVER_IMAGES
+                else {}
+            ),
+            "summary": self.summary,
+            "release_date": self.release_date,
+            "genres": list(self.genres) if self.genres is not None else None,
+            "platforms": list(self.platforms) if self.platforms is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, game: Mapping[str, Any]) -> "GameRecord":
+        """
+        Build a record from a GameOut-shaped dict, e.g. a cached game.
+
+        Missing optional fields become None and extra keys are ignored, as
+        validating through GameOut would do.
+        """
+        images = game.get("cover_images")
+        if images is not None:
+            images = CoverImageUrls(
+                images.get("thumb"),
+                images.get("small"),
+                images.get("medium"),
+                images.get("large"),
+            )
+        genres = game.get("genres")
+        platforms = game.get("platforms")
+        return cls(
+            game["id"],
+            game.get("name"),
+            game.get("cover_url"),
+            images,
+            game.get("summary"),
+            game.get("release_date"),
+            tuple(genres) if genres is not None else None,
+            tuple(platforms) if platforms is not None else None,
+        )
+
+
+def map_game(game: Mapping[str, Any]) -> GameRecord:
+    """
+    Map a raw IGDB game to a GameRecord in a single pass.
+
+    Args:
+        game (dict): Raw IGDB game with the fields in client.GAME_FIELDS.
+
+    Returns:
+        GameRecord: The mapped game.
+    """
+    cover = game.get("cover")
+    url = cover.get("url") if cover else None
+    if not url:
+        cover_url, images = None, NO_COVER_IMAGES
+    elif url.startswith(_IGDB_IMAGE_PREFIX) and url.endswith(".jpg"):
+        filename = url.rpartition("/")[2]
+        cover_url = _MEDIUM_URL + filename
+        images = CoverImageUrls(
+            _THUMB_URL + filename,
+            _SMALL_URL + filename,
+            cover_url,
+            _LARGE_URL + filename,
+        )
+    else:
+        cover_url, images = _map_other_cover(url)
+    genres = game.get("genres")
+    platforms = game.get("platforms")
+    return GameRecord(
+        game["id"],
+        game.get("name"),
+        cover_url,
+        images,
+        game.get("summary"),
+        game.get("first_release_date"),
+        tuple([g["name"] for g in genres if "name" in g]) if genres else None,
+        tuple([p["name"] for p in platforms if "name" in p]) if platforms else None,
+    )
+
+
+def _map_other_cover(url: str) -> Tuple[str, CoverImageUrls]:
+    """
+    Map a cover URL that is not a plain protocol-relative IGDB .jpg URL.
+
+    Protocol-relative URLs get https and the t_cover_big size; other URLs are
+    kept as they are. Responsive sizes are only derived for IGDB image URLs.
+    """
+    if url.startswith("//"):
+        url = f"https:{url}"
+        for segment in _SIZE_SEGMENTS:
+            if segment in url:
+                url = url.replace(segment, "t_cover_big")
+                break
+        else:
+            # No size found, add it before the filename
+            head, _, filename = url.rpartition("/")
+            url = f"{head}/t_cover_big/{filename}"
+    if "images.igdb.com/igdb/image/upload/" not in url:
+        return url, NO_COVER_IMAGES
+    filename = url.rpartition("/")[2]
+    if not filename.endswith(".jpg"):
+        filename += ".jpg"
+    return url, CoverImageUrls(
+        _THUMB_URL + filename,
+        _SMALL_URL + filename,
+        _MEDIUM_URL + filename,
+        _LARGE_URL + filename,
+    )
+
+
+_GAME = TypeAdapter(GameRecord)
+_GAME_LIST = TypeAdapter(List[GameRecord])
+
+Game = Union[GameRecord, Mapping[str, Any]]
+
+
+def _as_record(game: Game) -> GameRecord:
+    """Return game as a GameRecord."""
+    return game if isinstance(game, GameRecord) else GameRecord.from_dict(game)
+
+
+def dump_game(game: Game) -> bytes:
+    """Serialize one game (record or GameOut-shaped dict) to GameOut JSON."""
+    return _GAME.dump_json(_as_record(game))
+
+
+def dump_games(games: Iterable[Game]) -> bytes:
+    """Serialize games (records or GameOut-shaped dicts) to a GameOut JSON array."""
+    return _GAME_LIST.dump_json([_as_record(game) for game in games])
+
+
+def dump_value(value: Union[List[Game], Game]) -> bytes:
+    """Serialize a cached search result (a list of games) or one cached game."""
+    return dump_games(value) if isinstance(value, list) else dump_game(value)
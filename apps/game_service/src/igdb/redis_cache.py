@@ -0,0 +1,518 @@
+"""
+Redis-protocol shared cache backend for the IGDB client.
+
+RedisCache stores IGDB responses in any server speaking RESP (Redis, Valkey,
+KeyDB, Dragonfly), so every uvicorn worker and container replica shares one
+warm cache. Values are stored as compact JSON under a key prefix and expire via
+the server's own TTLs; cache payloads (see payload.py) are stored as they are.
+
+The protocol client is a small blocking RESP2 implementation on plain sockets
+with a pool of idle connections; it covers the handful of commands the cache
+needs and keeps the service free of an extra dependency. A cache that cannot
+reach its server degrades to misses instead of failing requests, and stops
+trying to connect for retry_interval after a failed attempt. Calls block on
+the network, so the async client runs them on worker threads (see
+CacheBackend.blocking). Pub/sub is supported through RedisSubscriber, used to
+invalidate per-process L1 caches.
+"""
+
+import json
+import logging
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from src.igdb.cache import CacheBackend
+from src.igdb.payload import PAYLOAD_MAGIC, is_payload
+
+logger = logging.getLogger("igdb.cache")
+
+DEFAULT_PORT = 6379
+
+
+class RedisError(Exception):
+    """Raised for error replies from the server or malformed protocol data."""
+
+
+def parse_redis_url(url: str) -> Dict[str, Any]:
+    """
+    Parse a redis:// URL into connection arguments.
+
+    Args:
+        url (str): URL such as "redis://:secret@cache:6379/2".
+
+    Returns:
+        dict: host, port, db, username and password.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme != "redis":
+        raise ValueError(f"Unsupported cache URL scheme: {parsed.scheme!r}")
+    path = parsed.path.lstrip("/")
+    return {
+        "host": parsed.hostname or "localhost",
+        "port": parsed.port or DEFAULT_PORT,
+        "db": int(path) if path else 0,
+        "username": unquote(parsed.username) if parsed.username else None,
+        "password": unquote(parsed.password) if parsed.password else None,
+    }
+
+
+def _encode_command(args: Tuple[Any, ...]) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode()
+        else:
+            data = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+class RedisConnection:
+    """One blocking RESP connection."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int = DEFAULT_PORT,
+        db: int = 0,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        timeout: float = 1.0,
+    ) -> None:
+        """
+        Open the socket and authenticate/select the database if needed.
+
+        Args:
+            host (str): Server host name.
+            port (int): Server port.
+            db (int): Logical database selected after connecting.
+            username (str, optional): ACL user name sent with AUTH.
+            password (str, optional): Password sent with AUTH.
+            timeout (float): Connect and read timeout in seconds.
+        """
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if password:
+            if username:
+                self.execute("AUTH", username, password)
+            else:
+                self.execute("AUTH", password)
+        if db:
+            self.execute("SELECT", db)
+
+    def execute(self, *args: Any) -> Any:
+        """Send one command and return its decoded reply."""
+        self._sock.sendall(_encode_command(args))
+        return self.read_reply()
+
+    def pipeline(self, commands: List[Tuple[Any, ...]]) -> List[Any]:
+        """Send several commands in one write and return their replies in order."""
+        self._sock.sendall(b"".join(_encode_command(args) for args in commands))
+        return [self.read_reply() for _ in commands]
+
+    def read_reply(self) -> Any:
+        """Read one RESP2 reply; error replies raise RedisError."""
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise RedisError("Connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            if len(data) != length + 2:
+                raise RedisError("Connection closed by server")
+            return data[:-2]
+        if kind == b"*":
+            count = int(payload)
+            if count < 0:
+                return None
+            return [self.read_reply() for _ in range(count)]
+        raise RedisError(f"Unexpected reply type: {line!r}")
+
+    def settimeout(self, timeout: Optional[float]) -> None:
+        """Change the socket timeout; None blocks indefinitely (used by subscribers)."""
+        self._sock.settimeout(timeout)
+
+    def shutdown(self) -> None:
+        """Shut the socket down, waking up a thread blocked in read_reply."""
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        """Close the socket."""
+        try:
+            self._reader.close()
+        finally:
+            self._sock.close()
+
+
+class RedisConnectionPool:
+    """
+    Thread-safe pool of idle RESP connections.
+
+    Connections are opened on demand and returned after use; a connection whose
+    with-block raised is discarded instead of returned. After a failed connect,
+    borrowing fails fast with ConnectionError until retry_interval has passed,
+    so an unreachable server costs one connect timeout per interval rather
+    than one per call.
+    """
+
+    def __init__(
+        self, max_idle: int = 10, retry_interval: float = 1.0, **connection_kwargs: Any
+    ) -> None:
+        """
+        Args:
+            max_idle (int): Idle connections kept open for reuse.
+            retry_interval (float): Seconds to wait after a failed connect before
+                connecting again.
+            **connection_kwargs: Arguments passed to RedisConnection.
+        """
+        self.max_idle = max_idle
+        self.retry_interval = retry_interval
+        self.connection_kwargs = connection_kwargs
+        self._lock = threading.Lock()
+        self._idle: List[RedisConnection] = []
+        self._down_until = 0.0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisConnectionPool":
+        """Build a pool from a redis:// URL."""
+        return cls(**parse_redis_url(url), **kwargs)
+
+    @contextmanager
+    def connection(self) -> Iterator[RedisConnection]:
+        """Borrow a connection for the duration of the with-block."""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._connect()
+        reusable = False
+        try:
+            yield conn
+            reusable = True
+        finally:
+            if not (reusable and self._release(conn)):
+                conn.close()
+
+    def _connect(self) -> RedisConnection:
+        """Open a new connection, failing fast while the server is marked down."""
+        if time.monotonic() < self._down_until:
+            raise ConnectionError("Redis server unreachable; waiting to reconnect")
+        try:
+            return RedisConnection(**self.connection_kwargs)
+        except OSError:
+            self._down_until = time.monotonic() + self.retry_interval
+            raise
+
+    def _release(self, conn: RedisConnection) -> bool:
+        """Return a connection to the idle list; False if the list is full."""
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return True
+        return False
+
+    def execute(self, *args: Any) -> Any:
+        """Run one command on a pooled connection."""
+        with self.connection() as conn:
+            return conn.execute(*args)
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class RedisSubscriber:
+    """
+    Background thread delivering messages from one pub/sub channel to a callback.
+
+    The subscriber owns a dedicated connection. If the connection drops it
+    reconnects after retry_interval and calls on_reconnect, since messages
+    published while disconnected are lost.
+    """
+
+    def __init__(
+        self,
+        pool: RedisConnectionPool,
+        channel: str,
+        callback: Callable[[bytes], None],
+        on_reconnect: Optional[Callable[[], None]] = None,
+        retry_interval: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            pool (RedisConnectionPool): Pool whose connection settings are reused.
+            channel (str): Channel to subscribe to.
+            callback (Callable): Called with each message payload.
+            on_reconnect (Callable, optional): Called after every resubscribe.
+            retry_interval (float): Seconds to wait before reconnecting.
+        """
+        self.pool = pool
+        self.channel = channel
+        self.callback = callback
+        self.on_reconnect = on_reconnect
+        self.retry_interval = retry_interval
+        self.ready = threading.Event()
+        self._stopped = threading.Event()
+        self._conn: Optional[RedisConnection] = None
+        self._thread = threading.Thread(
+            target=self._run, name=f"redis-subscriber-{channel}", daemon=True
+        )
+
+    def start(self) -> "RedisSubscriber":
+        """Start the subscriber thread."""
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        """Subscribe and dispatch messages until closed, reconnecting on errors."""
+        subscribed_before = False
+        while not self._stopped.is_set():
+            try:
+                self._conn = RedisConnection(**self.pool.connection_kwargs)
+                self._conn.settimeout(None)
+                self._conn.execute("SUBSCRIBE", self.channel)
+                if subscribed_before and self.on_reconnect is not None:
+                    self.on_reconnect()
+                subscribed_before = True
+                self.ready.set()
+                while True:
+                    reply = self._conn.read_reply()
+                    if isinstance(reply, list) and reply[0] == b"message":
+                        self.callback(reply[2])
+            except (OSError, ValueError, RedisError) as exc:
+                if not self._stopped.is_set():
+                    logger.warning(
+                        "Redis subscription to %s lost: %s", self.channel, exc
+                    )
+            finally:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+            self._stopped.wait(self.retry_interval)
+
+    def close(self) -> None:
+        """Stop the subscriber and close its connection."""
+        self._stopped.set()
+        conn = self._conn
+        if conn is not None:
+            conn.shutdown()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1)
+
+
+class RedisCache(CacheBackend):
+    """
+    Shared cache stored in a Redis-protocol server.
+
+    Keys are namespaced with a prefix so several services (or environments) can
+    share one server. Connection failures and undecodable values are logged and
+    treated as cache misses.
+    """
+
+    blocking = True
+
+    def __init__(self, pool: RedisConnectionPool, key_prefix: str = "igdb:") -> None:
+        """
+        Args:
+            pool (RedisConnectionPool): Connection pool for the cache server.
+            key_prefix (str): Prefix added to every key stored by this cache.
+        """
+        self.pool = pool
+        self.key_prefix = key_prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url: str, key_prefix: str = "igdb:", **pool_kwargs: Any):
+        """Build a RedisCache for a redis:// URL."""
+        return cls(RedisConnectionPool.from_url(url, **pool_kwargs), key_prefix)
+
+    def _key(self, key: str) -> str:
+        """Return the server-side key for a cache key."""
+        return self.key_prefix + key
+
+    def _record_error(self, operation: str, exc: Exception) -> None:
+        """Count and log a failed cache operation."""
+        self.errors += 1
+        logger.warning("Redis cache %s failed: %s", operation, exc)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value from the cache, or None if not found, expired or unreachable."""
+        try:
+            raw = self.pool.execute("GET", self._key(key))
+        except (OSError, RedisError) as exc:
+            self._record_error("GET", exc)
+            self.misses += 1
+            return None
+        value = None if raw is None else self._decode(raw)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def _decode(self, raw: bytes) -> Any:
+        """Decode a stored value; payloads are returned as bytes, corrupt values as None."""
+        if raw.startswith(PAYLOAD_MAGIC):
+            return raw
+        try:
+            return json.loads(raw)
+        except ValueError as exc:
+            self._record_error("decode", exc)
+            return None
+
+    def _set_command(self, key: str, value: Any, ttl: int) -> Tuple[Any, ...]:
+        """Build the SET command storing a value with an optional TTL."""
+        data = value if is_payload(value) else json.dumps(value, separators=(",", ":"))
+        args: Tuple[Any, ...] = ("SET", self._key(key), data)
+        if ttl:
+            args += ("EX", int(ttl))
+        return args
+
+    def set(self, key: str, value: Any, ttl: int = 60) -> None:
+        """Set a value in the cache with a time-to-live (in seconds)."""
+        try:
+            self.pool.execute(*self._set_command(key, value, ttl))
+        except (OSError, RedisError) as exc:
+            self._record_error("SET", exc)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values with a single MGET round trip."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            raws = self.pool.execute("MGET", *(self._key(key) for key in keys))
+        except (OSError, RedisError) as exc:
+            self._record_error("MGET", exc)
+            self.misses += len(keys)
+            return {}
+        decoded = (
+            (key, self._decode(raw)) for key, raw in zip(keys, raws) if raw is not None
+        )
+        found = {key: value for key, value in decoded if value is not None}
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl: int = 60) -> None:
+        """
+        Set several values in one round trip.
+
+        MSET cannot attach TTLs, so the SET commands are pipelined in one write.
+        """
+        if not items:
+            return
+        commands = [self._set_command(key, value, ttl) for key, value in items.items()]
+        try:
+            with self.pool.connection() as conn:
+                conn.pipeline(commands)
+        except (OSError, RedisError) as exc:
+            self._record_error("SET pipeline", exc)
+
+    def delete(self, key: str) -> None:
+        """Delete a key from the cache."""
+        try:
+            self.pool.execute("DEL", self._key(key))
+        except (OSError, RedisError) as exc:
+            self._record_error("DEL", exc)
+
+    def clear(self) -> None:
+        """Delete every key under this cache's prefix (other keys are untouched)."""
+        pattern = self.key_prefix + "*"
+        try:
+            with self.pool.connection() as conn:
+                cursor = b"0"
+                while True:
+                    cursor, keys = conn.execute(
+                        "SCAN", cursor, "MATCH", pattern, "COUNT", 500
+                    )
+                    if keys:
+                        conn.execute("DEL", *keys)
+                    if cursor == b"0":
+                        break
+        except (OSError, RedisError) as exc:
+            self._record_error("clear", exc)
+
+    def incr(
+        self, key: str, amount: int = 1, ttl: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Atomically add amount to a counter with INCRBY.
+
+        A TTL, when given, is set by a SET NX creating the counter at 0 in the
+        same pipeline, so it is never extended by later increments.
+        """
+        commands: List[Tuple[Any, ...]] = []
+        if ttl:
+            commands.append(("SET", self._key(key), 0, "EX", int(ttl), "NX"))
+        commands.append(("INCRBY", self._key(key), amount))
+        try:
+            with self.pool.connection() as conn:
+                return conn.pipeline(commands)[-1]
+        except (OSError, RedisError) as exc:
+            self._record_error("INCRBY", exc)
+            return None
+
+    def expire(self, key: str, ttl: int) -> Optional[bool]:
+        """Reset the time-to-live of an existing key with EXPIRE."""
+        try:
+            return bool(self.pool.execute("EXPIRE", self._key(key), int(ttl)))
+        except (OSError, RedisError) as exc:
+            self._record_error("EXPIRE", exc)
+            return None
+
+    def publish(self, channel: str, message: str) -> None:
+        """Publish a message on a pub/sub channel; failures are logged."""
+        try:
+            self.pool.execute("PUBLISH", channel, message)
+        except (OSError, RedisError) as exc:
+            self._record_error("PUBLISH", exc)
+
+    def subscribe(
+        self,
+        channel: str,
+        callback: Callable[[bytes], None],
+        on_reconnect: Optional[Callable[[], None]] = None,
+        retry_interval: float = 1.0,
+    ) -> RedisSubscriber:
+        """Start a RedisSubscriber for a channel on this cache's server."""
+        return RedisSubscriber(
+            self.pool, channel, callback, on_reconnect, retry_interval
+        ).start()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss and error counters observed by this process."""
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.pool.close()
@@ -0,0 +1,329 @@
+"""
+Retries and circuit breaking for upstream IGDB calls.
+
+Every IGDB call is an idempotent read (an Apicalypse query), so transient
+failures (timeouts, connection errors, 429 and 5xx responses) are retried with
+jittered exponential backoff by RetryPolicy.
+
+A CircuitBreaker per IGDB endpoint tracks the failure rate over a rolling
+window. Past the threshold it opens: calls fail fast with CircuitOpenError
+instead of waiting out timeouts against a degraded upstream, while stale cache
+entries keep being served (see src/igdb/revalidate.py). After a cool-down one
+probe call is let through (half-open); its outcome closes or re-opens the
+circuit.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+import httpx
+from src.core.config import Settings
+
+logger = logging.getLogger("igdb.resilience")
+
+# Upstream status codes worth retrying
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# IGDB endpoints with their own breaker
+ENDPOINTS = ("games", "genres", "platforms")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Return True for upstream failures that may succeed when retried."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(
+        exc, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+    )
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling IGDB while an endpoint's circuit is open.
+
+    Attributes:
+        endpoint (str): IGDB endpoint whose circuit is open.
+        retry_after (float): Seconds until a probe call is allowed.
+    """
+
+    def __init__(self, endpoint: str, retry_after: float) -> None:
+        super().__init__(
+            f"IGDB {endpoint} circuit is open; retry in {retry_after:.1f}s"
+        )
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class RetryPolicy:
+    """Retries transient failures with full-jitter exponential backoff."""
+
+    def __init__(
+        self, attempts: int = 3, base_delay: float = 0.2, max_delay: float = 2.0
+    ) -> None:
+        """
+        Args:
+            attempts (int): Total attempts per call, including the first.
+            base_delay (float): Backoff cap in seconds before the first retry.
+            max_delay (float): Upper bound for any single backoff.
+        """
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Return a random delay in [0, min(max_delay, base_delay * 2**attempt)]."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def _should_retry(self, exc: Exception, attempt: int) -> bool:
+        """Decide whether a failed attempt is retried, updating the counters."""
+        if not is_transient(exc):
+            return False
+        if attempt + 1 >= self.attempts:
+            self.exhausted += 1
+            return False
+        self.retries += 1
+        logger.info("Retrying IGDB call after %s (attempt %d)", exc, attempt + 1)
+        return True
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """Run fn, retrying transient failures."""
+        attempt = 0
+        while True:
+            try:
+                result = fn()
+            except Exception as exc:
+                if not self._should_retry(exc, attempt):
+                    raise
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            if attempt:
+                self.recovered += 1
+            return result
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn, retrying transient failures."""
+        attempt = 0
+        while True:
+            try:
+                result = await fn()
+            except Exception as exc:
+                if not self._should_retry(exc, attempt):
+                    raise
+                await asyncio.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            if attempt:
+                self.recovered += 1
+            return result
+
+    def stats(self) -> Dict[str, int]:
+        """Return retry counters."""
+        return {
+            "retries": self.retries,
+            "recovered": self.recovered,
+            "exhausted": self.exhausted,
+        }
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for one IGDB endpoint."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 10,
+        window: float = 30.0,
+        open_seconds: float = 15.0,
+    ) -> None:
+        """
+        Args:
+            name (str): Endpoint name, used in errors and logs.
+            failure_rate (float): Share of failed calls in the window that opens the circuit.
+            min_calls (int): Calls needed in the window before the rate is judged.
+            window (float): Rolling window in seconds.
+            open_seconds (float): How long the circuit stays open before a probe.
+        """
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._lock = threading.Lock()
+        self._calls: Deque[Tuple[float, bool]] = deque()
+        self._opened_at = 0.0
+        self._probing = False
+        self.rejected = 0
+        self.transitions: Dict[str, int] = {}
+
+    def _transition(self, state: str) -> None:
+        """Move to a new state and count the transition (lock held)."""
+        name = f"{self.state}->{state}"
+        self.transitions[name] = self.transitions.get(name, 0) + 1
+        log = logger.warning if state == OPEN else logger.info
+        log("IGDB %s circuit %s", self.name, name)
+        self.state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        self._calls.clear()
+        self._probing = False
+
+    def allow(self) -> None:
+        """
+        Admit a call or raise CircuitOpenError.
+
+        After the cool-down one probe call is admitted (half-open); others keep
+        failing fast until it finishes.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            if self.state == OPEN and remaining <= 0:
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            self.rejected += 1
+            raise CircuitOpenError(self.name, max(remaining, 0.0))
+
+    def _record(self, failed: Optional[bool]) -> None:
+        """Record a call outcome; None means the call said nothing about IGDB."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed is None:
+                    self._probing = False
+                else:
+                    self._transition(OPEN if failed else CLOSED)
+                return
+            if self.state != CLOSED or failed is None:
+                return
+            now = time.monotonic()
+            self._calls.append((now, failed))
+            while self._calls and self._calls[0][0] <= now - self.window:
+                self._calls.popleft()
+            failures = sum(1 for _, call_failed in self._calls if call_failed)
+            if (
+                len(self._calls) >= self.min_calls
+                and failures / len(self._calls) >= self.failure_rate
+            ):
+                self._transition(OPEN)
+
+    @contextmanager
+    def protect(self) -> Iterator[None]:
+        """
+        Guard one upstream call.
+
+        Transient upstream errors count as failures; any other HTTP response
+        (e.g. 404) shows IGDB is answering and counts as a success. Local errors
+        such as RateLimitExceeded are not counted.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+        """
+        self.allow()
+        try:
+            yield
+        except httpx.HTTPStatusError as exc:
+            self._record(is_transient(exc))
+            raise
+        except BaseException as exc:
+            self._record(True if is_transient(exc) else None)
+            raise
+        self._record(False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the state, window counts and transition counters."""
+        with self._lock:
+            failures = sum(1 for _, failed in self._calls if failed)
+            return {
+                "state": self.state,
+                "window_calls": len(self._calls),
+                "window_failures": failures,
+                "rejected": self.rejected,
+                "transitions": dict(self.transitions),
+            }
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per IGDB endpoint, created on first use."""
+
+    def __init__(self, **breaker_kwargs: Any) -> None:
+        """
+        Args:
+            **breaker_kwargs: Passed to every CircuitBreaker.
+        """
+        self._kwargs = breaker_kwargs
+        self._lock = threading.Lock()
+        self._breakers = {
+            endpoint: CircuitBreaker(endpoint, **breaker_kwargs)
+            for endpoint in ENDPOINTS
+        }
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        """Return the breaker for an endpoint."""
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    endpoint, CircuitBreaker(endpoint, **self._kwargs)
+                )
+        return breaker
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return stats keyed by endpoint."""
+        return {
+            endpoint: breaker.stats() for endpoint, breaker in self._breakers.items()
+        }
+
+
+def create_retry_policy(settings: Optional[Settings] = None) -> Optional[RetryPolicy]:
+    """
+    Create the retry policy configured by settings.
+
+    Returns:
+        RetryPolicy | None: The policy, or None when IGDB_RETRY_ATTEMPTS is 1 or less.
+    """
+    settings = settings or Settings()
+    if settings.IGDB_RETRY_ATTEMPTS <= 1:
+        return None
+    return RetryPolicy(
+        attempts=settings.IGDB_RETRY_ATTEMPTS,
+        base_delay=settings.IGDB_RETRY_BASE_DELAY,
+        max_delay=settings.IGDB_RETRY_MAX_DELAY,
+    )
+
+
+def create_circuit_breakers(
+    settings: Optional[Settings] = None,
+) -> Optional[CircuitBreakers]:
+    """
+    Create the per-endpoint circuit breakers configured by settings.
+
+    Returns:
+        CircuitBreakers | None: The breakers, or None when IGDB_BREAKER_OPEN_SECONDS is 0.
+    """
+    settings = settings or Settings()
+    if settings.IGDB_BREAKER_OPEN_SECONDS <= 0:
+        return None
+    return CircuitBreakers(
+        failure_rate=settings.IGDB_BREAKER_FAILURE_RATE,
+        min_calls=settings.IGDB_BREAKER_MIN_CALLS,
+        window=settings.IGDB_BREAKER_WINDOW,
+        open_seconds=settings.IGDB_BREAKER_OPEN_SECONDS,
+    )
@@ -0,0 +1,194 @@
+"""
+Stale-while-revalidate support for IGDB cache entries.
+
+Entries cached with a TTLPolicy carry a soft TTL inside the stored value and a
+hard TTL on the cache entry itself. Until the soft TTL the entry is fresh. Past
+it, callers still get the stale value immediately while one background refresh
+per key re-fetches it. Past the hard TTL the entry is gone and the next caller
+fetches synchronously.
+
+Entries are stored as plain JSON-compatible dicts so they work with every cache
+backend, or as payloads carrying the soft TTL in their header (see payload.py);
+values written without a policy are treated as always fresh.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from src.igdb.payload import decode, is_payload
+from src.igdb.ratelimit import background_priority
+
+logger = logging.getLogger("igdb.revalidate")
+
+# Key marking a cached value as a stale-while-revalidate entry
+FRESH_UNTIL = "swr_fresh_until"
+# Key holding the ETag of the response body of a wrapped search result or game
+ETAG = "etag"
+
+
+class TTLPolicy(NamedTuple):
+    """Soft and hard TTLs in seconds for one kind of cached data."""
+
+    soft: int
+    hard: int
+
+
+# Search results: fresh for 5 minutes, served stale for up to 30
+SEARCH_TTL = TTLPolicy(soft=300, hard=1800)
+# Genres and platforms: fresh for 24 hours, served stale for up to a week
+VOCABULARY_TTL = TTLPolicy(soft=86400, hard=7 * 86400)
+# Games: cached for 5 minutes and never served stale
+GAME_TTL = TTLPolicy(soft=300, hard=300)
+
+
+def wrap(
+    value: Any,
+    soft_ttl: float,
+    now: Optional[float] = None,
+    etag: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Wrap a value with the time after which it becomes stale, and its ETag if given."""
+    now = time.time() if now is None else now
+    entry = {FRESH_UNTIL: now + soft_ttl, "value": value}
+    if etag is not None:
+        entry[ETAG] = etag
+    return entry
+
+
+def unwrap(entry: Any, now: Optional[float] = None) -> Tuple[Any, bool]:
+    """
+    Unwrap a cached entry, decoding it first if it is a payload (see payload.py).
+
+    Returns:
+        tuple: (value, is_stale). Values cached without a policy are never stale.
+    """
+    if is_payload(entry):
+        value, fresh_until = decode(entry)
+        if fresh_until is None:
+            return value, False
+        now = time.time() if now is None else now
+        return value, fresh_until <= now
+    if not isinstance(entry, dict) or FRESH_UNTIL not in entry:
+        return entry, False
+    now = time.time() if now is None else now
+    return entry["value"], entry[FRESH_UNTIL] <= now
+
+
+class _RevalidatorStats:
+    """Counters shared by the sync and async revalidators."""
+
+    def __init__(self) -> None:
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def _record_error(self, key: str, exc: BaseException) -> None:
+        """Count and log a failed background refresh; the stale value stays served."""
+        self.refresh_errors += 1
+        logger.warning("Background refresh of %s failed: %s", key, exc)
+
+
+class Revalidator(_RevalidatorStats):
+    """
+    Runs at most one background refresh per key on daemon threads.
+
+    Refreshes run in the background rate-limit lane, behind interactive requests.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._in_progress: set = set()
+
+    def refresh(self, key: str, fn: Callable[[], Any]) -> bool:
+        """
+        Start a background refresh for a stale key unless one is already running.
+
+        Args:
+            key (str): Cache key being refreshed.
+            fn (Callable): Zero-argument function that re-fetches and re-caches the key.
+
+        Returns:
+            bool: True if a refresh was started by this call.
+        """
+        with self._lock:
+            self.stale_hits += 1
+            if key in self._in_progress:
+                return False
+            self._in_progress.add(key)
+            self.refreshes += 1
+
+        def run() -> None:
+            try:
+                with background_priority():
+                    fn()
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self._record_error(key, exc)
+            finally:
+                with self._lock:
+                    self._in_progress.discard(key)
+
+        threading.Thread(target=run, name=f"igdb-refresh-{key}", daemon=True).start()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Return stale hit, refresh and error counters."""
+        with self._lock:
+            in_progress = len(self._in_progress)
+        return {
+            "stale_hits": self.stale_hits,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "in_progress": in_progress,
+        }
+
+
+class AsyncRevalidator(_RevalidatorStats):
+    """Runs at most one background refresh per key as asyncio tasks."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def refresh(self, key: str, fn: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Start a background refresh task for a stale key unless one is already running.
+
+        Must be called from a running event loop.
+
+        Args:
+            key (str): Cache key being refreshed.
+            fn (Callable): Zero-argument coroutine function that re-fetches the key.
+
+        Returns:
+            bool: True if a refresh was started by this call.
+        """
+        self.stale_hits += 1
+        if key in self._tasks:
+            return False
+        self.refreshes += 1
+        # The task copies the current context, so its upstream calls queue in
+        # the background lane
+        with background_priority():
+            task = asyncio.ensure_future(fn())
+        self._tasks[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return True
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished refresh and record its failure, if any."""
+        self._tasks.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            self._record_error(key, task.exception())
+
+    def stats(self) -> Dict[str, int]:
+        """Return stale hit, refresh and error counters."""
+        return {
+            "stale_hits": self.stale_hits,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "in_progress": len(self._tasks),
+        }
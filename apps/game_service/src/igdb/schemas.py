@@ -97,6 +97,20 @@ class GameOut(BaseModel):
         }
 
 
+class SuggestionOut(BaseModel):
+    """
+    Pydantic schema for a typeahead suggestion.
+    """
+
+    id: int = Field(..., description="Unique game ID from IGDB.")
+    name: str = Field(..., description="Game title.")
+
+    class Config:
+        """Pydantic config for SuggestionOut schema."""
+
+        json_schema_extra = {"example": {"id": 1022, "name": "The Legend of Zelda"}}
+
+
 class YearRange(BaseModel):
     """
     Pydantic schema for year range filter.
@@ -257,3 +271,92 @@ class GameFilters(BaseModel):
                 "collections": [1, 2],
             }
         }
+
+
+class GameFilterQuery(BaseModel):
+    """
+    Pydantic schema for GameFilters given as query parameters.
+
+    List filters are repeated parameters (?platforms=6&platforms=48); the year
+    range is flattened into year_start and year_end.
+    """
+
+    platforms: Optional[List[int]] = Field(None, description="IGDB platform IDs")
+    years: Optional[List[int]] = Field(None, description="Discrete release years")
+    year_start: Optional[int] = Field(
+        None, ge=1970, le=2030, description="First year of a release year range"
+    )
+    year_end: Optional[int] = Field(
+        None, ge=1970, le=2030, description="Last year of a release year range"
+    )
+    genres: Optional[List[int]] = Field(None, description="IGDB genre IDs")
+    ratings: Optional[List[int]] = Field(None, description="IGDB age rating IDs")
+    game_modes: Optional[List[int]] = Field(None, description="IGDB game mode IDs")
+    themes: Optional[List[int]] = Field(None, description="IGDB theme IDs")
+    player_perspectives: Optional[List[int]] = Field(
+        None, description="IGDB player perspective IDs"
+    )
+    release_status: Optional[List[int]] = Field(
+        None, description="IGDB release status IDs"
+    )
+    franchises: Optional[List[int]] = Field(None, description="IGDB franchise IDs")
+    companies: Optional[List[int]] = Field(None, description="IGDB company IDs")
+    keywords: Optional[List[int]] = Field(None, description="IGDB keyword IDs")
+    multiplayer_modes: Optional[List[int]] = Field(
+        None, description="IGDB multiplayer mode IDs"
+    )
+    min_rating: Optional[float] = Field(None, ge=0.0, le=100.0)
+    max_rating: Optional[float] = Field(None, ge=0.0, le=100.0)
+    min_metacritic: Optional[int] = Field(None, ge=0, le=100)
+    max_metacritic: Optional[int] = Field(None, ge=0, le=100)
+    esrb_ratings: Optional[List[int]] = Field(None, description="ESRB rating IDs")
+    game_engines: Optional[List[int]] = Field(None, description="IGDB game engine IDs")
+    collections: Optional[List[int]] = Field(None, description="IGDB collection IDs")
+
+    def to_filters(self) -> Optional[GameFilters]:
+        """
+        Build GameFilters from the parameters that are set.
+
+        Returns:
+            GameFilters | None: The filters, or None if no parameter is set.
+
+        Raises:
+            ValueError: Only one of year_start and year_end is set.
+        """
+        values = self.model_dump(
+            include=set(GameFilters.model_fields), exclude_none=True
+        )
+        if (self.year_start is None) != (self.year_end is None):
+            raise ValueError("year_start and year_end must be given together.")
+        if self.year_start is not None:
+            values["year_range"] = YearRange(start=self.year_start, end=self.year_end)
+        return GameFilters(**values) if values else None
+
+
+class GameSearchQuery(GameFilterQuery):
+    """
+    Pydantic schema for the query parameters of a game search.
+    """
+
+    q: str = Field(..., min_length=1, description="Game search query")
+
+
+class FilteredSearchRequest(BaseModel):
+    """
+    Pydantic schema for a filtered game search sent as a JSON body.
+    """
+
+    q: str = Field(..., min_length=1, description="Game search query")
+    filters: Optional[GameFilters] = Field(
+        None, description="Filters applied by IGDB before results are returned"
+    )
+
+    class Config:
+        """Pydantic config for FilteredSearchRequest schema."""
+
+        json_schema_extra = {
+            "example": {
+                "q": "zelda",
+                "filters": {"platforms": [130, 6], "genres": [31]},
+            }
+        }
@@ -0,0 +1,140 @@
+"""
+Search query canonicalization and local reuse of cached search results.
+
+Queries are canonicalized before cache lookup and query building, so "Zelda",
+"zelda " and "ＺＥＬＤＡ" share one cache entry and one upstream request:
+
+1. Unicode NFKC normalization (full-width and compatibility characters)
+2. Case folding
+3. Whitespace trimmed and collapsed to single spaces
+
+Search terms are escaped before being embedded in an Apicalypse string literal.
+
+For typeahead clients a longer query can be answered from a cached result of
+one of its prefixes, provided that result was complete (IGDB returned fewer
+rows than the search limit), by filtering it locally.
+
+Filtered searches are cached under a hash of the canonical filter set (list
+values sorted and de-duplicated, empty values dropped), so the same filters in
+any order share one entry.
+"""
+
+import hashlib
+import json
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.igdb.schemas import GameFilters
+
+# Result limit of a plain game search; shorter results are complete
+SEARCH_LIMIT = 10
+
+# Shortest cached prefix considered for local reuse
+MIN_REUSE_PREFIX = 3
+
+
+def canonicalize_query(query: str) -> str:
+    """
+    Return the canonical form of a search query.
+
+    Args:
+        query (str): Raw query as typed by the user.
+
+    Returns:
+        str: NFKC-normalized, case-folded query with collapsed whitespace.
+    """
+    folded = unicodedata.normalize("NFKC", query).casefold()
+    # Case folding can produce characters that are not NFKC-normalized
+    folded = unicodedata.normalize("NFKC", folded)
+    return " ".join(folded.split())
+
+
+def escape_search_term(term: str) -> str:
+    """Escape a term for use inside a double-quoted Apicalypse string."""
+    return term.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def search_cache_key(canonical_query: str) -> str:
+    """Return the cache key of a canonical search query."""
+    return f"search:{canonical_query}"
+
+
+def canonicalize_filters(filters: Optional[GameFilters]) -> Optional[GameFilters]:
+    """
+    Return the canonical form of a filter set.
+
+    Args:
+        filters (GameFilters, optional): Filters as received from the client.
+
+    Returns:
+        GameFilters | None: Filters with sorted, de-duplicated lists and no
+        empty values, or None if no filter is set.
+    """
+    if filters is None:
+        return None
+    values = {}
+    for name, value in filters.model_dump(exclude_none=True).items():
+        if isinstance(value, list):
+            value = sorted(set(value))
+            if not value:
+                continue
+        values[name] = value
+    return GameFilters.model_validate(values) if values else None
+
+
+def filtered_search_cache_key(canonical_query: str, filters: GameFilters) -> str:
+    """
+    Return the cache key of a filtered search.
+
+    Args:
+        canonical_query (str): Canonical search query.
+        filters (GameFilters): Canonical filters (see canonicalize_filters).
+
+    Returns:
+        str: "fsearch:{filter hash}:{query}".
+    """
+    encoded = json.dumps(
+        filters.model_dump(exclude_none=True), sort_keys=True, separators=(",", ":")
+    )
+    digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+    return f"fsearch:{digest}:{canonical_query}"
+
+
+def reuse_candidates(canonical_query: str) -> List[str]:
+    """
+    Return cache keys of the query's prefixes that could answer it, longest first.
+
+    Only prefixes of at least MIN_REUSE_PREFIX characters that do not end in a
+    space are considered.
+    """
+    return [
+        search_cache_key(canonical_query[:length])
+        for length in range(len(canonical_query) - 1, MIN_REUSE_PREFIX - 1, -1)
+        if not canonical_query[length - 1].isspace()
+    ]
+
+
+def is_complete(results: List[Any]) -> bool:
+    """True if a search result holds every match (it is below the search limit)."""
+    return len(results) < SEARCH_LIMIT
+
+
+def filter_results(
+    results: Iterable[Dict[str, Any]], canonical_query: str
+) -> List[Dict[str, Any]]:
+    """
+    Keep the results whose name contains every word of the query.
+
+    Args:
+        results (Iterable[dict]): Mapped games from a complete prefix search.
+        canonical_query (str): Canonical form of the longer query.
+
+    Returns:
+        List[dict]: Matching games in their original order.
+    """
+    words = canonical_query.split()
+    return [
+        game
+        for game in results
+        if all(word in canonicalize_query(game.get("name") or "") for word in words)
+    ]
@@ -0,0 +1,321 @@
+"""
+Local full-text search over the IGDB catalog mirror.
+
+Candidates are retrieved by the database: an FTS5 trigram index on SQLite, and
+pg_trgm word similarity plus a ``simple`` tsvector match on PostgreSQL. Both
+are ranked in Python by the same trigram score, so results and confidence do
+not depend on the backend:
+
+- names and queries are split into canonical words without punctuation;
+- each query word scores 1.0 against an equal name word (or a name word it is a
+  prefix of, for the last word as typed), else its best pg_trgm-style trigram
+  similarity to any name word;
+- a game's score is the mean over the query words; ties go to shorter names.
+
+A result is confident when some games reach min_score and either the catalog
+has been bulk-loaded completely or a full page of them did. Confident results
+answer search_games without an IGDB call; weaker matches (from match_score on)
+are only served when IGDB fails.
+"""
+
+# pylint: disable=wrong-import-order
+
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import text
+from src.core.config import Settings
+from src.igdb.catalog import CatalogStore
+from src.igdb.search import SEARCH_LIMIT, canonicalize_query
+
+from db.models.catalog import CatalogGame
+
+_GAMES = CatalogGame.__table__
+
+# Defaults for IGDB_SEARCH_INDEX_MIN_SCORE and IGDB_SEARCH_INDEX_MATCH_SCORE
+DEFAULT_MIN_SCORE = 0.8
+DEFAULT_MATCH_SCORE = 0.3
+
+# Candidates fetched from the database per query before ranking
+CANDIDATE_LIMIT = 200
+
+# Seconds between checks of the bulk load flag while the catalog is incomplete
+COMPLETE_RECHECK = 60.0
+
+# Words of names and queries; punctuation separates them
+_WORD = re.compile(r"\w+")
+
+# Shortest query word the FTS5 trigram tokenizer can match
+MIN_TRIGRAM_WORD = 3
+
+SQLITE_FTS_TABLE = "igdb_catalog_fts"
+
+_SQLITE_SCHEMA = (
+    f"CREATE VIRTUAL TABLE {SQLITE_FTS_TABLE} USING fts5("
+    "name, content='igdb_catalog', content_rowid='igdb_id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON igdb_catalog "
+    f"BEGIN INSERT INTO {SQLITE_FTS_TABLE}(rowid, name) "
+    "VALUES (new.igdb_id, new.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON igdb_catalog "
+    f"BEGIN INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name) "
+    "VALUES ('delete', old.igdb_id, old.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE ON igdb_catalog "
+    f"BEGIN INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name) "
+    "VALUES ('delete', old.igdb_id, old.name); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, name) "
+    "VALUES (new.igdb_id, new.name); END",
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+)
+
+
+class IndexResult(NamedTuple):
+    """Ranked local matches for a search and whether they can replace IGDB's."""
+
+    games: List[Dict[str, Any]]
+    confident: bool
+
+
+def words(value: Optional[str]) -> List[str]:
+    """Split a name or query into canonical words, dropping punctuation."""
+    return _WORD.findall(canonicalize_query(value or ""))
+
+
+def trigrams(word: str) -> Set[str]:
+    """Return the trigrams of a word padded like pg_trgm ("  w" ... "d ")."""
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def word_score(query_word: str, name_word: str, prefix: bool = False) -> float:
+    """
+    Score how well a query word matches a name word.
+
+    Args:
+        query_word (str): Canonical query word.
+        name_word (str): Canonical name word.
+        prefix (bool): Count the query word as a full match when it starts the
+            name word (the word being typed).
+
+    Returns:
+        float: 1.0 for a match, else the trigram similarity in [0, 1).
+    """
+    if query_word == name_word or (prefix and name_word.startswith(query_word)):
+        return 1.0
+    query_grams = trigrams(query_word)
+    name_grams = trigrams(name_word)
+    return len(query_grams & name_grams) / len(query_grams | name_grams)
+
+
+def score(query_words: List[str], name: Optional[str]) -> float:
+    """
+    Score a game name against a canonical query split into words.
+
+    Returns:
+        float: Mean over the query words of their best word_score, in [0, 1].
+    """
+    name_words = words(name)
+    if not query_words or not name_words:
+        return 0.0
+    last = len(query_words) - 1
+    total = 0.0
+    for position, query_word in enumerate(query_words):
+        total += max(
+            word_score(query_word, name_word, prefix=position == last)
+            for name_word in name_words
+        )
+    return total / len(query_words)
+
+
+class SearchIndex(ABC):
+    """
+    Ranks catalog games for a search; subclasses retrieve the candidates.
+    """
+
+    def __init__(
+        self,
+        catalog: CatalogStore,
+        min_score: float = DEFAULT_MIN_SCORE,
+        match_score: float = DEFAULT_MATCH_SCORE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            catalog (CatalogStore): Catalog mirror to search.
+            min_score (float): Score from which a match can answer a search
+                without IGDB.
+            match_score (float): Lowest score of a match served when IGDB fails.
+            clock (Callable): Monotonic clock used to space bulk load checks.
+        """
+        self.catalog = catalog
+        self.engine = catalog.engine
+        self.min_score = min_score
+        self.match_score = match_score
+        self.clock = clock
+        self._complete = False
+        self._complete_checked: Optional[float] = None
+
+    def create(self) -> None:
+        """Create the index structures if they do not exist; a no-op by default."""
+
+    @abstractmethod
+    def _candidates(self, canonical_query: str) -> List[Tuple[Optional[str], Any]]:
+        """Return (name, game) pairs that may match a canonical query."""
+
+    def _catalog_complete(self) -> bool:
+        """Return the catalog's bulk load flag, re-read at most every COMPLETE_RECHECK."""
+        if self._complete:
+            return True
+        now = self.clock()
+        if (
+            self._complete_checked is None
+            or now - self._complete_checked >= COMPLETE_RECHECK
+        ):
+            self._complete_checked = now
+            self._complete = self.catalog.is_complete()
+        return self._complete
+
+    def search(self, canonical_query: str, limit: int = SEARCH_LIMIT) -> IndexResult:
+        """
+        Search the catalog for a canonical query.
+
+        Args:
+            canonical_query (str): Query as returned by canonicalize_query.
+            limit (int): Maximum number of games returned.
+
+        Returns:
+            IndexResult: Confident games, or the matches from match_score on.
+        """
+        query_words = words(canonical_query)
+        if not query_words:
+            return IndexResult([], False)
+        ranked = sorted(
+            (
+                (score(query_words, name), len(name or ""), game)
+                for name, game in self._candidates(canonical_query)
+            ),
+            key=lambda item: (-item[0], item[1], item[2]["id"]),
+        )
+        strong = [game for value, _, game in ranked if value >= self.min_score]
+        if strong and (len(strong) >= limit or self._catalog_complete()):
+            return IndexResult(strong[:limit], True)
+        matches = [game for value, _, game in ranked if value >= self.match_score]
+        return IndexResult(matches[:limit], False)
+
+
+class SQLiteSearchIndex(SearchIndex):
+    """Candidates from an FTS5 trigram index kept in sync by triggers."""
+
+    def create(self) -> None:
+        """Create the FTS5 table and its triggers, indexing existing games."""
+        with self.engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = :name"),
+                {"name": SQLITE_FTS_TABLE},
+            ).first()
+            if exists:
+                return
+            for statement in _SQLITE_SCHEMA:
+                conn.execute(text(statement))
+
+    @staticmethod
+    def match_expression(canonical_query: str) -> Optional[str]:
+        """
+        Build an FTS5 MATCH expression OR-ing the trigrams of the query words.
+
+        Returns:
+            str | None: The expression, or None if no word is long enough.
+        """
+        grams = sorted(
+            {
+                word[i : i + 3]
+                for word in words(canonical_query)
+                if len(word) >= MIN_TRIGRAM_WORD
+                for i in range(len(word) - 2)
+            }
+        )
+        if not grams:
+            return None
+        # Words hold no quotes, so the trigrams can be quoted as they are
+        return " OR ".join(f'"{gram}"' for gram in grams)
+
+    def _candidates(self, canonical_query: str) -> List[Tuple[Optional[str], Any]]:
+        expression = self.match_expression(canonical_query)
+        if expression is None:
+            return []
+        query = text(
+            f"SELECT c.name, c.data FROM {SQLITE_FTS_TABLE} "
+            f"JOIN igdb_catalog AS c ON c.igdb_id = {SQLITE_FTS_TABLE}.rowid "
+            f"WHERE {SQLITE_FTS_TABLE} MATCH :expression "
+            f"ORDER BY {SQLITE_FTS_TABLE}.rank LIMIT :limit"
+        ).columns(_GAMES.c.name, _GAMES.c.data)
+        with self.engine.connect() as conn:
+            return conn.execute(
+                query, {"expression": expression, "limit": CANDIDATE_LIMIT}
+            ).all()
+
+
+class PostgresSearchIndex(SearchIndex):
+    """
+    Candidates from pg_trgm word similarity and a simple tsvector match.
+
+    The pg_trgm extension and the GIN indexes on igdb_catalog.name come from
+    the Alembic migration 8c3d1e5f2a67, so create() runs no DDL at startup.
+    """
+
+    CANDIDATE_QUERY = text(
+        "SELECT name, data FROM igdb_catalog "
+        "WHERE :query <% name "
+        "OR to_tsvector('simple', coalesce(name, '')) "
+        "@@ plainto_tsquery('simple', :query) "
+        "ORDER BY word_similarity(:query, name) DESC LIMIT :limit"
+    ).columns(_GAMES.c.name, _GAMES.c.data)
+
+    # Scoped to the transaction the candidates are read in
+    THRESHOLD_QUERY = text(
+        "SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"
+    )
+
+    def _candidates(self, canonical_query: str) -> List[Tuple[Optional[str], Any]]:
+        with self.engine.begin() as conn:
+            conn.execute(self.THRESHOLD_QUERY, {"threshold": str(self.match_score)})
+            return conn.execute(
+                self.CANDIDATE_QUERY,
+                {"query": canonical_query, "limit": CANDIDATE_LIMIT},
+            ).all()
+
+
+_INDEXES = {"sqlite": SQLiteSearchIndex, "postgresql": PostgresSearchIndex}
+
+
+def create_search_index(
+    settings: Optional[Settings] = None, catalog: Optional[CatalogStore] = None
+) -> Optional[SearchIndex]:
+    """
+    Create the local search index selected by IGDB_SEARCH_INDEX.
+
+    Args:
+        settings (Settings, optional): Settings to read; defaults to Settings().
+        catalog (CatalogStore, optional): Catalog mirror to index.
+
+    Returns:
+        SearchIndex | None: The index, or None when it is disabled or there is
+        no catalog.
+
+    Raises:
+        ValueError: If the catalog database has no index implementation.
+    """
+    settings = settings or Settings()
+    if not settings.IGDB_SEARCH_INDEX or catalog is None:
+        return None
+    dialect = catalog.engine.dialect.name
+    if dialect not in _INDEXES:
+        raise ValueError(f"No local search index for {dialect} databases")
+    index = _INDEXES[dialect](
+        catalog,
+        min_score=settings.IGDB_SEARCH_INDEX_MIN_SCORE,
+        match_score=settings.IGDB_SEARCH_INDEX_MATCH_SCORE,
+    )
+    index.create()
+    return index
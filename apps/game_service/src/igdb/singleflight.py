@@ -0,0 +1,127 @@
+"""
+Single-flight request coalescing for IGDB lookups.
+
+When many callers miss the cache for the same key at once (e.g. a trending
+search), only the first caller (the leader) runs the upstream fetch. Everyone
+else waits for that in-flight call and receives the same result or exception.
+SingleFlight serves threaded callers; AsyncSingleFlight serves coroutines.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Call:
+    """An in-flight call shared by the leader and its waiters."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Thread-safe single-flight group.
+
+    Concurrent do() calls with the same key share one execution of fn.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once for all concurrent callers using the same key.
+
+        Args:
+            key (str): Coalescing key, e.g. "search:zelda" or "game:42".
+            fn (Callable): Zero-argument function performing the upstream call.
+
+        Returns:
+            The result of fn, shared with every coalesced caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for executed, coalesced and currently in-flight calls."""
+        with self._lock:
+            in_flight = len(self._calls)
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": in_flight,
+        }
+
+
+class AsyncSingleFlight:
+    """
+    Asyncio single-flight group.
+
+    The shared fetch runs as its own task, so a cancelled leader (e.g. a client
+    disconnect) does not cancel the call for the remaining waiters.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn once for all concurrent callers using the same key.
+
+        Args:
+            key (str): Coalescing key, e.g. "search:zelda" or "game:42".
+            fn (Callable): Zero-argument coroutine function performing the upstream call.
+
+        Returns:
+            The result of fn, shared with every coalesced caller.
+        """
+        task = self._tasks.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            self.executed += 1
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for executed, coalesced and currently in-flight calls."""
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._tasks),
+        }
@@ -0,0 +1,395 @@
+"""
+In-process prefix index over game names for typeahead suggestions.
+
+Every word suffix of a game's canonical name ("the legend of zelda", "legend of
+zelda", "of zelda", "zelda") is a key, so a prefix matches the start of any
+word. The keys form a suffix array: two parallel arrays holding, in key order,
+the name slot and the offset of each key into that name, so a million names
+cost a few bytes per key on top of the names themselves. Lookups binary-search
+the arrays and scan only the first SCAN_FACTOR * limit keys of the prefix's
+range, whatever the catalog size.
+
+New names go to a small sorted pending run that lookups also search. Once the
+run reaches a fraction of the main arrays it is spliced into copies of them
+outside the lock, so refreshes stay incremental. A renamed game gets a new
+slot; keys of its old slot are skipped by lookups and dropped once they add up
+to the same fraction.
+
+Names come from the catalog mirror and from the results of searches that
+reached IGDB. Both are indexed on a background thread: it re-reads the catalog
+rows written since its last refresh (by their local synced_at, so rows loaded
+late with an old IGDB updated_at are not missed), and search results are only
+queued on the request path.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from array import array
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.core.config import Settings
+from src.igdb.catalog import CatalogStore
+from src.igdb.search_index import words
+
+logger = logging.getLogger("igdb.suggest")
+
+_KEY = itemgetter(0)
+
+# Default and largest number of suggestions per lookup
+SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 20
+
+# Keys scanned per requested suggestion before ranking
+SCAN_FACTOR = 8
+
+# Pending keys are merged into the main arrays, and keys of renamed games
+# dropped, once they reach this many or 1/MERGE_FRACTION of the main arrays
+MERGE_MIN = 4096
+MERGE_FRACTION = 8
+
+# Mirrored names read per catalog query
+CATALOG_CHUNK_SIZE = 5000
+
+# Seconds of synced_at re-read by each refresh, covering rows written by
+# transactions that committed late and clock skew between workers
+REFRESH_OVERLAP = 60
+
+
+def suggest_key(name: Optional[str]) -> str:
+    """Return the canonical key of a name or typed prefix (words joined by spaces)."""
+    return " ".join(words(name))
+
+
+def word_starts(key: str) -> List[int]:
+    """Return the offsets of the words of a key."""
+    return [0] + [i + 1 for i, char in enumerate(key) if char == " "]
+
+
+class SuggestIndex:
+    """Suffix-array prefix index of game names, safe to share between threads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Canonical key, display name and game id per name slot
+        self._slot_keys: List[str] = []
+        self._slot_names: List[str] = []
+        self._slot_ids = array("q")
+        # Current slot of each game
+        self._slot_of: Dict[int, int] = {}
+        # Keys in sorted order as (slot, offset into the slot's key)
+        self._main_slots = array("I")
+        self._main_offsets = array("I")
+        # Sorted (key, slot, offset) entries not merged yet, and those being merged
+        self._pending: List[Tuple[str, int, int]] = []
+        self._merging: List[Tuple[str, int, int]] = []
+        # Keys left behind by renamed games
+        self._stale = 0
+        # Bumped by build(), so a merge started before it is discarded
+        self._generation = 0
+        # Games queued by searches for the background thread
+        self._queue_lock = threading.Lock()
+        self._queued: List[Tuple[int, Optional[str]]] = []
+        self._wake = threading.Event()
+        self._catalog_synced_at: Optional[int] = None
+        self.lookups = 0
+        self.merges = 0
+        self.refresh_errors = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        """Return the number of indexed games."""
+        return len(self._slot_of)
+
+    def _entries(self, games: Iterable[Tuple[int, Optional[str]]]):
+        """Give new and renamed games a slot and return their key entries."""
+        entries = []
+        for game_id, name in games:
+            key = suggest_key(name)
+            old = self._slot_of.get(game_id)
+            if not key or (old is not None and self._slot_keys[old] == key):
+                continue
+            if old is not None:
+                self._stale += len(word_starts(self._slot_keys[old]))
+            slot = len(self._slot_keys)
+            self._slot_keys.append(key)
+            self._slot_names.append(name)
+            self._slot_ids.append(game_id)
+            self._slot_of[game_id] = slot
+            entries.extend((key[offset:], slot, offset) for offset in word_starts(key))
+        return entries
+
+    def _is_live(self, slot: int) -> bool:
+        """True unless the slot's game was renamed since."""
+        return self._slot_of.get(self._slot_ids[slot]) == slot
+
+    def _install(self, entries: List[Tuple[str, int, int]]) -> None:
+        """Replace the main arrays with sorted entries; the caller holds the lock."""
+        self._main_slots = array("I", (slot for _, slot, _ in entries))
+        self._main_offsets = array("I", (offset for _, _, offset in entries))
+        self._pending = []
+        self._stale = 0
+
+    def _live_entries(self) -> List[Tuple[str, int, int]]:
+        """Return the sorted key entries of every game's current slot."""
+        entries = []
+        for slot in self._slot_of.values():
+            key = self._slot_keys[slot]
+            entries.extend((key[offset:], slot, offset) for offset in word_starts(key))
+        entries.sort(key=_KEY)
+        return entries
+
+    def build(self, games: Iterable[Tuple[int, Optional[str]]]) -> None:
+        """
+        Replace the index contents with one sort.
+
+        Args:
+            games (Iterable): (game id, display name) pairs.
+        """
+        with self._lock:
+            self._slot_keys, self._slot_names = [], []
+            self._slot_ids = array("q")
+            self._slot_of = {}
+            entries = self._entries(games)
+            entries.sort(key=_KEY)
+            self._install(entries)
+            # A merge in progress splices entries of the slots just dropped
+            self._merging = []
+            self._generation += 1
+
+    def add(self, games: Iterable[Tuple[int, Optional[str]]]) -> None:
+        """
+        Index new games and renames, merging the pending run when it is large.
+
+        Args:
+            games (Iterable): (game id, display name) pairs; unchanged names
+                are skipped.
+        """
+        with self._lock:
+            entries = self._entries(games)
+            if not entries:
+                return
+            entries.sort(key=_KEY)
+            # Both runs are sorted, which timsort merges in linear time
+            self._pending = sorted(self._pending + entries, key=_KEY)
+            threshold = max(MERGE_MIN, len(self._main_slots) // MERGE_FRACTION)
+            if self._merging:
+                return
+            if self._stale >= threshold:
+                self._install(self._live_entries())
+                return
+            if len(self._pending) < threshold:
+                return
+            self._merging, self._pending = self._pending, []
+            slots, offsets = self._main_slots, self._main_offsets
+            generation = self._generation
+        self._merge(slots, offsets, generation)
+
+    def queue(self, games: Iterable[Tuple[int, Optional[str]]]) -> None:
+        """
+        Queue games for the background thread to add, without indexing them here.
+
+        Args:
+            games (Iterable): (game id, display name) pairs.
+        """
+        with self._queue_lock:
+            self._queued.extend(games)
+        self._wake.set()
+
+    def drain(self) -> int:
+        """
+        Add the queued games to the index.
+
+        Returns:
+            int: Number of games taken from the queue.
+        """
+        with self._queue_lock:
+            games, self._queued = self._queued, []
+        if games:
+            self.add(games)
+        return len(games)
+
+    def _key_at(self, slots: array, offsets: array):
+        """Return a function mapping a main array position to its key."""
+        slot_keys = self._slot_keys
+        return lambda i: slot_keys[slots[i]][offsets[i] :]
+
+    def _merge(self, slots: array, offsets: array, generation: int) -> None:
+        """Splice the run being merged into copies of the main arrays and swap them in."""
+        key_at = self._key_at(slots, offsets)
+        positions = range(len(slots))
+        new_slots, new_offsets = array("I"), array("I")
+        previous = 0
+        for key, slot, offset in self._merging:
+            position = bisect.bisect_left(positions, key, lo=previous, key=key_at)
+            new_slots.extend(slots[previous:position])
+            new_offsets.extend(offsets[previous:position])
+            new_slots.append(slot)
+            new_offsets.append(offset)
+            previous = position
+        new_slots.extend(slots[previous:])
+        new_offsets.extend(offsets[previous:])
+        with self._lock:
+            if generation != self._generation:
+                # build() replaced the index meanwhile
+                return
+            self._main_slots, self._main_offsets = new_slots, new_offsets
+            self._merging = []
+            self.merges += 1
+
+    def suggest(
+        self, query: str, limit: int = SUGGEST_LIMIT
+    ) -> List[Dict[str, object]]:
+        """
+        Return games whose name has a word starting with the typed prefix.
+
+        Names starting with the prefix come first, then shorter names.
+
+        Args:
+            query (str): Text typed so far.
+            limit (int): Maximum number of suggestions.
+
+        Returns:
+            List[dict]: {"id", "name"} per suggested game.
+        """
+        prefix = suggest_key(query)
+        if not prefix or limit <= 0:
+            return []
+        count = limit * SCAN_FACTOR
+        with self._lock:
+            self.lookups += 1
+            slots = self._main_slots
+            key_at = self._key_at(slots, self._main_offsets)
+            start = bisect.bisect_left(range(len(slots)), prefix, key=key_at)
+            candidates = set()
+            for i in range(start, min(len(slots), start + count)):
+                if not key_at(i).startswith(prefix):
+                    break
+                candidates.add(slots[i])
+            for run in (self._merging, self._pending):
+                start = bisect.bisect_left(run, prefix, key=_KEY)
+                for key, slot, _ in run[start : start + count]:
+                    if not key.startswith(prefix):
+                        break
+                    candidates.add(slot)
+            slot_keys = self._slot_keys
+            ranked = sorted(
+                filter(self._is_live, candidates),
+                key=lambda slot: (
+                    not slot_keys[slot].startswith(prefix),
+                    len(slot_keys[slot]),
+                    slot_keys[slot],
+                    self._slot_ids[slot],
+                ),
+            )
+            return [
+                {"id": self._slot_ids[slot], "name": self._slot_names[slot]}
+                for slot in ranked[:limit]
+            ]
+
+    def refresh(self, catalog: CatalogStore) -> int:
+        """
+        Index the catalog's games written since the last refresh.
+
+        The first refresh builds the index from the whole catalog; later ones
+        read the rows whose synced_at is from REFRESH_OVERLAP seconds before the
+        newest one seen on.
+
+        Returns:
+            int: Number of catalog rows read.
+        """
+        newest = self._catalog_synced_at
+        since = None if newest is None else newest - REFRESH_OVERLAP
+        games = []
+        for game_id, name, synced_at in catalog.iter_names(
+            since=since, chunk_size=CATALOG_CHUNK_SIZE
+        ):
+            games.append((game_id, name))
+            if synced_at is not None and (newest is None or synced_at > newest):
+                newest = synced_at
+        if since is None and not self._slot_of:
+            self.build(games)
+        else:
+            self.add(games)
+        self._catalog_synced_at = newest
+        return len(games)
+
+    def start(
+        self, catalog: Optional[CatalogStore] = None, interval: float = 0
+    ) -> None:
+        """
+        Start a daemon thread adding queued games as they arrive.
+
+        Args:
+            catalog (CatalogStore, optional): Catalog mirror to refresh from.
+            interval (float): Seconds between catalog refreshes; 0 disables them.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        refreshes = catalog is not None and interval > 0
+
+        def run() -> None:
+            next_refresh = time.monotonic()
+            while True:
+                if refreshes and time.monotonic() >= next_refresh:
+                    next_refresh = time.monotonic() + interval
+                    self._run_step(self.refresh, catalog)
+                self._run_step(self.drain)
+                timeout = None
+                if refreshes:
+                    timeout = max(0.0, next_refresh - time.monotonic())
+                self._wake.wait(timeout)
+                # Cleared before the next drain, so no queued game is left waiting
+                self._wake.clear()
+                if self._stop.is_set():
+                    return
+
+        self._thread = threading.Thread(target=run, name="igdb-suggest", daemon=True)
+        self._thread.start()
+
+    def _run_step(self, step, *args) -> None:
+        """Run one step of the background thread, logging and counting failures."""
+        try:
+            step(*args)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self.refresh_errors += 1
+            logger.warning("Suggestion index refresh failed: %s", exc)
+
+    def close(self) -> None:
+        """Stop the background thread, if running."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        """Return index size and lookup, merge and refresh counters."""
+        return {
+            "games": len(self._slot_of),
+            "keys": len(self._main_slots) + len(self._pending) + len(self._merging),
+            "queued": len(self._queued),
+            "lookups": self.lookups,
+            "merges": self.merges,
+            "refresh_errors": self.refresh_errors,
+        }
+
+
+def create_suggest_index(settings: Optional[Settings] = None) -> Optional[SuggestIndex]:
+    """
+    Create the suggestion index selected by IGDB_SUGGEST_ENABLED.
+
+    Args:
+        settings (Settings, optional): Settings to read; defaults to Settings().
+
+    Returns:
+        SuggestIndex | None: An empty index, or None when suggestions are disabled.
+    """
+    settings = settings or Settings()
+    if not settings.IGDB_SUGGEST_ENABLED:
+        return None
+    return SuggestIndex()
@@ -0,0 +1,206 @@
+"""
+Two-tier IGDB cache: a small per-process L1 in front of the shared L2.
+
+Hot keys such as ``genres``, ``platforms`` and popular ``game:{id}`` entries are
+served from process memory without a network hop. L1 entries live at most
+``l1_ttl`` seconds. Every write or delete also publishes the key on an
+invalidation channel, so other workers drop their L1 copy at once instead of
+serving it until it expires.
+"""
+
+import json
+import logging
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.igdb.cache import CacheBackend, InMemoryCache
+from src.igdb.redis_cache import RedisCache
+
+logger = logging.getLogger("igdb.cache")
+
+# Invalidation message "keys" value meaning "drop the whole L1"
+CLEAR_ALL = None
+
+
+def hit_rate(hits: int, misses: int) -> float:
+    """Return hits / lookups, or 0.0 before the first lookup."""
+    lookups = hits + misses
+    return hits / lookups if lookups else 0.0
+
+
+class _TierStats:
+    """Hit and miss counters for one cache tier."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hits, misses and the hit rate."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(hit_rate(self.hits, self.misses), 4),
+        }
+
+
+class TieredCache(CacheBackend):
+    """
+    L1 in-process cache backed by a shared RedisCache (L2).
+
+    Reads check L1, then L2 (filling L1 on an L2 hit). Writes go to both tiers
+    and broadcast an invalidation that other processes apply to their L1.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        l2: RedisCache,
+        l1: Optional[InMemoryCache] = None,
+        l1_ttl: float = 10,
+        channel: str = "igdb:invalidate",
+        retry_interval: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            l2 (RedisCache): Shared cache that holds the authoritative entries.
+            l1 (InMemoryCache, optional): Per-process cache; a bounded default is
+                created when omitted.
+            l1_ttl (float): Maximum seconds an entry stays in L1.
+            channel (str): Pub/sub channel used for L1 invalidation.
+            retry_interval (float): Seconds between resubscribe attempts.
+        """
+        self.l1 = l1 if l1 is not None else InMemoryCache(max_entries=1000)
+        self.l2 = l2
+        self.l1_ttl = l1_ttl
+        self.channel = channel
+        self.instance_id = uuid.uuid4().hex
+        self.invalidations_received = 0
+        self._l1_stats = _TierStats()
+        self._l2_stats = _TierStats()
+        # Messages may have been missed while disconnected, so start L1 afresh
+        self._subscriber = l2.subscribe(
+            channel,
+            self._on_invalidate,
+            on_reconnect=self.l1.clear,
+            retry_interval=retry_interval,
+        )
+
+    def _publish(self, keys: Optional[List[str]]) -> None:
+        """Tell other processes to drop keys (or everything, for None) from their L1."""
+        message = {"from": self.instance_id, "keys": keys}
+        self.l2.publish(self.channel, json.dumps(message, separators=(",", ":")))
+
+    def _on_invalidate(self, message: bytes) -> None:
+        """Apply an invalidation published by another process."""
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            logger.warning("Ignoring malformed invalidation message %r", message)
+            return
+        if payload.get("from") == self.instance_id:
+            return
+        self.invalidations_received += 1
+        keys = payload.get("keys")
+        if keys is CLEAR_ALL:
+            self.l1.clear()
+            return
+        for key in keys:
+            self.l1.delete(key)
+
+    def _l1_ttl_for(self, ttl: int) -> float:
+        """L1 entries never outlive their L2 TTL or the L1 cap."""
+        return min(ttl, self.l1_ttl) if ttl else self.l1_ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value from L1, falling back to L2."""
+        value = self.l1.get(key)
+        if value is not None:
+            self._l1_stats.hits += 1
+            return value
+        self._l1_stats.misses += 1
+        value = self.l2.get(key)
+        if value is None:
+            self._l2_stats.misses += 1
+            return None
+        self._l2_stats.hits += 1
+        self.l1.set(key, value, ttl=self.l1_ttl)
+        return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values from L1, fetching the rest from L2 in one batch."""
+        keys = list(keys)
+        found = self.l1.get_many(keys)
+        self._l1_stats.hits += len(found)
+        missing = [key for key in keys if key not in found]
+        self._l1_stats.misses += len(missing)
+        if not missing:
+            return found
+        from_l2 = self.l2.get_many(missing)
+        self._l2_stats.hits += len(from_l2)
+        self._l2_stats.misses += len(missing) - len(from_l2)
+        if from_l2:
+            self.l1.set_many(from_l2, ttl=self.l1_ttl)
+            found.update(from_l2)
+        return found
+
+    def set(self, key: str, value: Any, ttl: int = 60) -> None:
+        """Write a value to both tiers and invalidate other processes' L1 copies."""
+        self.l2.set(key, value, ttl=ttl)
+        self.l1.set(key, value, ttl=self._l1_ttl_for(ttl))
+        self._publish([key])
+
+    def set_many(self, items: Dict[str, Any], ttl: int = 60) -> None:
+        """Write several values to both tiers with a single invalidation message."""
+        if not items:
+            return
+        self.l2.set_many(items, ttl=ttl)
+        self.l1.set_many(items, ttl=self._l1_ttl_for(ttl))
+        self._publish(list(items))
+
+    def incr(
+        self, key: str, amount: int = 1, ttl: Optional[int] = None
+    ) -> Optional[int]:
+        """Counters live only in the shared tier, so every process sees one value."""
+        return self.l2.incr(key, amount, ttl)
+
+    def expire(self, key: str, ttl: int) -> Optional[bool]:
+        """Reset a key's time-to-live in the shared tier, where counters live."""
+        return self.l2.expire(key, ttl)
+
+    def delete(self, key: str) -> None:
+        """Delete a key from both tiers and from other processes' L1."""
+        self.l2.delete(key)
+        self.l1.delete(key)
+        self._publish([key])
+
+    def clear(self) -> None:
+        """Clear both tiers and every other process's L1."""
+        self.l2.clear()
+        self.l1.clear()
+        self._publish(CLEAR_ALL)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return per-tier statistics.
+
+        Returns:
+            dict: L1 and L2 hits, misses and hit rates, plus invalidations received.
+        """
+        l1_stats = self._l1_stats.stats()
+        l1_stats.update(size=self.l1.stats()["size"])
+        l2_stats = self._l2_stats.stats()
+        l2_stats.update(errors=self.l2.stats()["errors"])
+        return {
+            "backend": "tiered",
+            "l1": l1_stats,
+            "l2": l2_stats,
+            "invalidations_received": self.invalidations_received,
+        }
+
+    def close(self) -> None:
+        """Stop the invalidation subscriber and close both tiers."""
+        self._subscriber.close()
+        self.l1.close()
+        self.l2.close()
@@ -0,0 +1,193 @@
+"""
+Genre and platform vocabularies preloaded at startup into frozen tables.
+
+Each Vocabulary holds its rows sorted by id, read-only id -> name and
+canonical name -> id maps, and the serialized JSON body with its strong ETag,
+so /igdb/genres and /igdb/platforms are answered from memory without an
+upstream call or re-serialization on the request path.
+
+VocabularyStore starts from the bundled snapshot (vocabulary_snapshot.py).
+A background thread loads both vocabularies through a sync IGDB client right
+after startup and then every refresh interval, going through the client's
+cache (so workers sharing a cache share one IGDB fetch) and its
+stale-while-revalidate refreshes. A failed load keeps the current table. Each
+load swaps in a new Vocabulary and never mutates one that is being served.
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from src.igdb import vocabulary_snapshot
+from src.igdb.client import IGDBClient
+from src.igdb.http_cache import TaggedBody, body_etag
+from src.igdb.ratelimit import background_priority
+from src.igdb.search import canonicalize_query
+
+logger = logging.getLogger("igdb.vocabulary")
+
+VOCABULARIES = ("genres", "platforms")
+
+# Where a vocabulary was loaded from
+SNAPSHOT = "snapshot"
+IGDB = "igdb"
+
+_SNAPSHOTS = {
+    "genres": vocabulary_snapshot.GENRES,
+    "platforms": vocabulary_snapshot.PLATFORMS,
+}
+
+
+@dataclass(frozen=True)
+class Vocabulary:
+    """An immutable id/name table with its response body and ETag."""
+
+    rows: Tuple[Tuple[int, str], ...]
+    by_id: Mapping[int, str]
+    by_name: Mapping[str, int]
+    body: TaggedBody
+    source: str
+    loaded_at: float
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[Tuple[int, str]], source: str, loaded_at: float
+    ) -> "Vocabulary":
+        """
+        Build a vocabulary from (id, name) pairs.
+
+        Args:
+            rows (Iterable): (id, name) pairs in any order.
+            source (str): SNAPSHOT or IGDB.
+            loaded_at (float): Unix time of the load.
+
+        Returns:
+            Vocabulary: Rows sorted by id, with their maps, body and ETag.
+        """
+        rows = tuple(sorted(dict(rows).items()))
+        serialized = json.dumps(
+            [{"id": row_id, "name": name} for row_id, name in rows],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode()
+        return cls(
+            rows=rows,
+            by_id=MappingProxyType(dict(rows)),
+            by_name=MappingProxyType(
+                {canonicalize_query(name): row_id for row_id, name in rows}
+            ),
+            body=TaggedBody(serialized, body_etag(serialized)),
+            source=source,
+            loaded_at=loaded_at,
+        )
+
+    @property
+    def etag(self) -> str:
+        """Return the strong ETag of the body."""
+        return self.body.etag
+
+    def id_of(self, name: str) -> Optional[int]:
+        """Return the id of a name, ignoring case and spacing, or None."""
+        return self.by_name.get(canonicalize_query(name))
+
+    def as_list(self) -> list:
+        """Return the rows as {"id", "name"} dicts."""
+        return [{"id": row_id, "name": name} for row_id, name in self.rows]
+
+
+def _pairs(rows: Iterable[Mapping[str, Any]]) -> Iterable[Tuple[int, str]]:
+    """Return (id, name) pairs of IGDB vocabulary rows that have both."""
+    return ((row["id"], row["name"]) for row in rows if "id" in row and row.get("name"))
+
+
+class VocabularyStore:
+    """The current genre and platform vocabularies, loaded in the background."""
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        """
+        Args:
+            clock (Callable): Returns the current Unix time.
+        """
+        self.clock = clock
+        self._vocabularies: Dict[str, Vocabulary] = {
+            name: Vocabulary.from_rows(_SNAPSHOTS[name], SNAPSHOT, clock())
+            for name in VOCABULARIES
+        }
+        self.loads = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self, name: str) -> Vocabulary:
+        """Return the current "genres" or "platforms" vocabulary."""
+        return self._vocabularies[name]
+
+    def load(self, client: IGDBClient) -> None:
+        """
+        Load both vocabularies through an IGDB client, keeping the current
+        table of any that fails or comes back empty.
+
+        Args:
+            client (IGDBClient): Sync client; its cache is read first.
+        """
+        for name in VOCABULARIES:
+            try:
+                rows = getattr(client, f"get_{name}")()
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self.errors += 1
+                logger.warning(
+                    "Loading IGDB %s failed, keeping the %s copy: %s",
+                    name,
+                    self._vocabularies[name].source,
+                    exc,
+                )
+                continue
+            vocabulary = Vocabulary.from_rows(_pairs(rows), IGDB, self.clock())
+            if vocabulary.rows:
+                self._vocabularies[name] = vocabulary
+                self.loads += 1
+
+    def start(self, client: IGDBClient, interval: float) -> None:
+        """
+        Start a daemon thread loading the vocabularies now and then every
+        interval seconds (once only if interval is 0).
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run() -> None:
+            while True:
+                with background_priority():
+                    self.load(client)
+                if interval <= 0 or self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=run, name="igdb-vocabulary", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the background load thread, if running."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return each vocabulary's source, size and ETag, and load counters."""
+        stats: Dict[str, Any] = {
+            name: {
+                "source": vocabulary.source,
+                "count": len(vocabulary.rows),
+                "etag": vocabulary.etag,
+                "loaded_at": vocabulary.loaded_at,
+            }
+            for name, vocabulary in self._vocabularies.items()
+        }
+        stats["loads"] = self.loads
+        stats["errors"] = self.errors
+        return stats
@@ -0,0 +1,73 @@
+"""
+Bundled snapshot of the IGDB genre and platform vocabularies.
+
+Served by the vocabulary store until the first load from IGDB (or the shared
+cache) succeeds, so /igdb/genres and /igdb/platforms answer even when IGDB is
+unreachable at startup. The ids of src/igdb/enums.py must appear here.
+
+Data fetched from IGDB API endpoints on 2025-10-01.
+"""
+
+GENRES = (
+    (2, "Point-and-click"),
+    (4, "Fighting"),
+    (5, "Shooter"),
+    (7, "Music"),
+    (8, "Platform"),
+    (9, "Puzzle"),
+    (10, "Racing"),
+    (11, "Real Time Strategy (RTS)"),
+    (12, "Role-playing (RPG)"),
+    (13, "Simulator"),
+    (14, "Sport"),
+    (15, "Strategy"),
+    (16, "Turn-based strategy (TBS)"),
+    (24, "Tactical"),
+    (25, "Hack and slash/Beat 'em up"),
+    (26, "Quiz/Trivia"),
+    (30, "Pinball"),
+    (31, "Adventure"),
+    (32, "Indie"),
+    (33, "Arcade"),
+    (34, "Visual Novel"),
+    (35, "Card & Board Game"),
+    (36, "MOBA"),
+)
+
+PLATFORMS = (
+    (3, "Linux"),
+    (4, "Nintendo 64"),
+    (5, "Wii"),
+    (6, "PC (Microsoft Windows)"),
+    (7, "PlayStation"),
+    (8, "PlayStation 2"),
+    (9, "PlayStation 3"),
+    (11, "Xbox"),
+    (12, "Xbox 360"),
+    (14, "Mac"),
+    (18, "Nintendo Entertainment System"),
+    (19, "Super Nintendo Entertainment System"),
+    (20, "Nintendo DS"),
+    (21, "Nintendo GameCube"),
+    (22, "Game Boy Color"),
+    (23, "Dreamcast"),
+    (24, "Game Boy Advance"),
+    (29, "Sega Mega Drive/Genesis"),
+    (32, "Sega Saturn"),
+    (33, "Game Boy"),
+    (34, "Android"),
+    (37, "Nintendo 3DS"),
+    (38, "PlayStation Portable"),
+    (39, "iOS"),
+    (41, "Wii U"),
+    (46, "PlayStation Vita"),
+    (48, "PlayStation 4"),
+    (49, "Xbox One"),
+    (130, "Nintendo Switch"),
+    (162, "Oculus VR"),
+    (163, "SteamVR"),
+    (165, "PlayStation VR"),
+    (167, "PlayStation 5"),
+    (169, "Xbox Series X|S"),
+    (390, "PlayStation VR2"),
+)
@@ -10,6 +10,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from src.api import igdb
 from src.api.collection_entry import router as collection_entry_router
 from src.api.collections import router as collections_router
+from src.core.lifespan import lifespan
 
 # Set up global logging configuration
 logging.basicConfig(
@@ -17,7 +18,7 @@ logging.basicConfig(
     format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
 )
 
-app = FastAPI(title="Game Data Service (IGDB)")
+app = FastAPI(title="Game Data Service (IGDB)", lifespan=lifespan)
 
 # Add CORS middleware to allow frontend access
 app.add_middleware(
@@ -7,13 +7,33 @@ import unittest
 from fastapi.testclient import TestClient
 from src.main import app
 from src.api.igdb import get_igdb_client
+from src.igdb.ratelimit import RateLimitExceeded
+from src.igdb.resilience import CircuitOpenError
+
+
+def _async_return(value):
+    """Build an async method that returns the given value."""
+
+    async def method(self):  # pylint: disable=unused-argument
+        return value
+
+    return method
+
+
+def _async_raise(error):
+    """Build an async method that raises the given error."""
+
+    async def method(self):  # pylint: disable=unused-argument
+        raise error
+
+    return method
 
 
 # --- Mock Clients ---
 class MockIGDBClient:
-    """Mock implementation of the IGDBClient for testing API endpoints."""
+    """Mock implementation of the AsyncIGDBClient for testing API endpoints."""
 
-    def get_games_by_ids(self, game_ids):
+    async def get_games_by_ids(self, game_ids):
         """Mock batch fetch of games by IDs."""
         if not game_ids:
             return []
@@ -34,20 +54,20 @@ class MockIGDBClient:
             for i in game_ids
         ]
 
-    def get_genres(self):
+    async def get_genres(self):
         """Mock fetch of genres."""
         return [{"id": 1, "name": "Action"}, {"id": 2, "name": "Adventure"}]
 
     # pylint: disable=broad-exception-raised
 
     # --- All API methods needed for all test classes ---
-    def get_platforms(self):
+    async def get_platforms(self):
         """Mock fetch of platforms."""
         return [{"id": 1, "name": "PC"}, {"id": 2, "name": "Switch"}]
 
     # pylint: disable=broad-exception-raised
 
-    def search_games(self, query):
+    async def search_games(self, query):
         """Mock search for games by query string."""
         if query == "empty":
             return []
@@ -76,7 +96,12 @@ class MockIGDBClient:
             },
         ]
 
-    def get_game_by_id(self, game_id):
+    async def search_games_filtered(self, query, filters):
+        """Mock filtered search; records the filters it was called with."""
+        MockIGDBClient.last_filters = filters
+        return (await self.search_games(query))[:1]
+
+    async def get_game_by_id(self, game_id):
         """Mock fetch of a single game by ID."""
         if game_id == 404:
             raise ValueError("Game not found")
@@ -92,6 +117,15 @@ class MockIGDBClient:
             "platforms": ["PlayStation"],
         }
 
+    async def cached_search_body(self, query, filters=None):
+        """Mock cached search body; payloads are never cached."""
+
+    async def cached_games_body(self, game_ids):
+        """Mock cached batch body; payloads are never cached."""
+
+    async def cached_game_body(self, game_id):
+        """Mock cached game body; payloads are never cached."""
+
 
 # pylint: disable=too-few-public-methods
 class BaseIGDBApiTest(unittest.TestCase):
@@ -161,7 +195,7 @@ class TestIGDBBatchGenresPlatformsApi(BaseIGDBApiTest):
         """Test /igdb/genres returns empty list when client returns none."""
         # Patch the client to return empty list
         original = MockIGDBClient.get_genres
-        MockIGDBClient.get_genres = lambda self: []
+        MockIGDBClient.get_genres = _async_return([])
         response = self.client.get("/igdb/genres")
         self.assertEqual(200, response.status_code)
         data = response.json()
@@ -172,19 +206,35 @@ class TestIGDBBatchGenresPlatformsApi(BaseIGDBApiTest):
         """Test /igdb/genres returns 500 on client error."""
         original = MockIGDBClient.get_genres
         # pylint: disable=broad-exception-raised
-        MockIGDBClient.get_genres = lambda self: (_ for _ in ()).throw(
-            Exception("Mock error")  # pylint: disable=broad-exception-raised
-        )
+        MockIGDBClient.get_genres = _async_raise(Exception("Mock error"))
         response = self.client.get("/igdb/genres")
         self.assertEqual(500, response.status_code)
         data = response.json()
         self.assertIn("detail", data)
         MockIGDBClient.get_genres = original
 
+    def test_genres_rate_limited(self):
+        """Test /igdb/genres returns 503 with Retry-After when the limiter sheds load."""
+        original = MockIGDBClient.get_genres
+        MockIGDBClient.get_genres = _async_raise(RateLimitExceeded(1.2, 0.5))
+        response = self.client.get("/igdb/genres")
+        self.assertEqual(503, response.status_code)
+        self.assertEqual("2", response.headers["Retry-After"])
+        MockIGDBClient.get_genres = original
+
+    def test_platforms_circuit_open(self):
+        """Test /igdb/platforms returns 503 while the IGDB circuit is open."""
+        original = MockIGDBClient.get_platforms
+        MockIGDBClient.get_platforms = _async_raise(CircuitOpenError("platforms", 9.5))
+        response = self.client.get("/igdb/platforms")
+        self.assertEqual(503, response.status_code)
+        self.assertEqual("10", response.headers["Retry-After"])
+        MockIGDBClient.get_platforms = original
+
     def test_platforms_empty(self):
         """Test /igdb/platforms returns empty list when client returns none."""
         original = MockIGDBClient.get_platforms
-        MockIGDBClient.get_platforms = lambda self: []
+        MockIGDBClient.get_platforms = _async_return([])
         response = self.client.get("/igdb/platforms")
         self.assertEqual(200, response.status_code)
         data = response.json()
@@ -195,9 +245,7 @@ class TestIGDBBatchGenresPlatformsApi(BaseIGDBApiTest):
         """Test /igdb/platforms returns 500 on client error."""
         original = MockIGDBClient.get_platforms
         # pylint: disable=broad-exception-raised
-        MockIGDBClient.get_platforms = lambda self: (_ for _ in ()).throw(
-            Exception("Mock error")  # pylint: disable=broad-exception-raised
-        )
+        MockIGDBClient.get_platforms = _async_raise(Exception("Mock error"))
         response = self.client.get("/igdb/platforms")
         self.assertEqual(500, response.status_code)
         data = response.json()
@@ -291,6 +339,61 @@ class TestIGDBSearchApi(BaseIGDBApiTest):
         response = self.client.get("/igdb/search?q=error")
         self.assertEqual(500, response.status_code)
 
+    def test_search_with_filter_params(self):
+        """Test /igdb/search passes query parameter filters to the client."""
+        response = self.client.get(
+            "/igdb/search?q=zelda&platforms=48&platforms=6&genres=31"
+            "&year_start=2000&year_end=2010&min_rating=70"
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, len(response.json()))
+        filters = MockIGDBClient.last_filters
+        self.assertEqual([48, 6], filters.platforms)
+        self.assertEqual([31], filters.genres)
+        self.assertEqual(
+            (2000, 2010), (filters.year_range.start, filters.year_range.end)
+        )
+        self.assertEqual(70.0, filters.min_rating)
+
+    def test_search_half_year_range(self):
+        """Test /igdb/search returns 422 if only one end of the year range is given."""
+        response = self.client.get("/igdb/search?q=zelda&year_start=2000")
+        self.assertEqual(422, response.status_code)
+
+    def test_search_filter_params_are_documented(self):
+        """Test each /igdb/search filter is its own query parameter in OpenAPI."""
+        operation = self.client.get("/openapi.json").json()["paths"]["/igdb/search"]
+        names = {param["name"] for param in operation["get"]["parameters"]}
+        self.assertLessEqual({"q", "platforms", "year_start", "collections"}, names)
+
+    def test_search_invalid_filter_param(self):
+        """Test /igdb/search returns 422 for an out-of-range filter value."""
+        response = self.client.get("/igdb/search?q=zelda&min_rating=101")
+        self.assertEqual(422, response.status_code)
+
+    def test_search_json_body(self):
+        """Test POST /igdb/search accepts GameFilters as a JSON body."""
+        response = self.client.post(
+            "/igdb/search",
+            json={"q": "zelda", "filters": {"themes": [17], "min_metacritic": 80}},
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, len(response.json()))
+        self.assertEqual([17], MockIGDBClient.last_filters.themes)
+        self.assertEqual(80, MockIGDBClient.last_filters.min_metacritic)
+
+    def test_search_json_body_whitespace_query(self):
+        """Test POST /igdb/search returns 422 for a whitespace-only query."""
+        response = self.client.post("/igdb/search", json={"q": "   "})
+        self.assertEqual(422, response.status_code)
+
+    def test_search_json_body_error(self):
+        """Test POST /igdb/search returns 500 if the client raises an error."""
+        response = self.client.post(
+            "/igdb/search", json={"q": "error", "filters": {"genres": [5]}}
+        )
+        self.assertEqual(500, response.status_code)
+
 
 # --- /igdb/games/{id} route tests ---
 class TestIGDBGetGameApi(BaseIGDBApiTest):
@@ -1,13 +1,14 @@
 """
 Unit tests for the InMemoryCache class used by the IGDB client.
-Tests set/get, expiry, delete, and clear operations.
+Tests set/get, expiry, delete, and clear operations, batch get_many/set_many,
+plus LRU bounds, per-namespace budgets, background sweeping and stats.
 
 """
 
 # pylint: disable=duplicate-code
 import unittest
 import time
-from src.igdb.cache import InMemoryCache
+from src.igdb.cache import CacheBudget, InMemoryCache, approximate_size
 
 
 class TestInMemoryCache(unittest.TestCase):
@@ -43,5 +44,136 @@ class TestInMemoryCache(unittest.TestCase):
         self.assertIsNone(self.cache.get("b"))
 
 
+class TestBoundedInMemoryCache(unittest.TestCase):
+    """Unit tests for LRU eviction, namespace budgets and stats."""
+
+    def test_max_entries_evicts_least_recently_used(self):
+        """The least recently used key should be evicted first."""
+        cache = InMemoryCache(max_entries=2)
+        cache.set("game:1", "a")
+        cache.set("game:2", "b")
+        cache.get("game:1")  # game:2 is now least recently used
+        cache.set("game:3", "c")
+        self.assertEqual("a", cache.get("game:1"))
+        self.assertIsNone(cache.get("game:2"))
+        self.assertEqual(1, cache.stats()["evictions"])
+
+    def test_max_bytes_evicts_until_within_budget(self):
+        """Entries should be evicted until the byte budget is met."""
+        payload = "x" * 1000
+        cache = InMemoryCache(max_bytes=approximate_size(payload) * 2)
+        for i in range(5):
+            cache.set(f"search:{i}", payload)
+        stats = cache.stats()
+        self.assertEqual(2, stats["size"])
+        self.assertLessEqual(stats["bytes"], approximate_size(payload) * 2)
+        self.assertEqual(3, stats["evictions"])
+
+    def test_namespace_budget_isolates_namespaces(self):
+        """Search keys filling their budget must not evict game keys."""
+        cache = InMemoryCache(
+            max_entries=10, namespace_budgets={"search": CacheBudget(max_entries=3)}
+        )
+        cache.set("game:1", {"id": 1})
+        for i in range(50):
+            cache.set(f"search:q{i}", [])
+        self.assertEqual({"id": 1}, cache.get("game:1"))
+        self.assertEqual(3, cache.stats()["namespaces"]["search"]["entries"])
+        self.assertEqual(47, cache.stats()["namespaces"]["search"]["evictions"])
+
+    def test_overwrite_does_not_double_count_bytes(self):
+        """Re-setting a key should replace, not add to, its byte count."""
+        cache = InMemoryCache()
+        cache.set("genres", [1, 2, 3])
+        first = cache.stats()["bytes"]
+        cache.set("genres", [1, 2, 3])
+        self.assertEqual(first, cache.stats()["bytes"])
+
+    def test_sweep_removes_expired_entries(self):
+        """sweep() should remove expired entries that were never read."""
+        cache = InMemoryCache()
+        cache.set("search:old", [], ttl=1)
+        cache.set("search:new", [], ttl=60)
+        time.sleep(1.1)
+        self.assertEqual(1, cache.sweep())
+        stats = cache.stats()
+        self.assertEqual(1, stats["size"])
+        self.assertEqual(1, stats["expirations"])
+
+    def test_background_sweeper(self):
+        """The sweeper thread should expire entries without any reads."""
+        cache = InMemoryCache(sweep_interval=0.2)
+        try:
+            cache.set("search:old", [], ttl=1)
+            time.sleep(1.5)
+            self.assertEqual(0, cache.stats()["size"])
+        finally:
+            cache.close()
+
+    def test_hit_and_miss_counters(self):
+        """Stats should count hits and misses."""
+        cache = InMemoryCache()
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("missing")
+        stats = cache.stats()
+        self.assertEqual(1, stats["hits"])
+        self.assertEqual(1, stats["misses"])
+
+
+class CountingLock:
+    """Lock wrapper counting acquisitions."""
+
+    def __init__(self, lock):
+        self.lock = lock
+        self.acquisitions = 0
+
+    def __enter__(self):
+        self.acquisitions += 1
+        return self.lock.__enter__()
+
+    def __exit__(self, *exc):
+        return self.lock.__exit__(*exc)
+
+
+class TestInMemoryCacheBatch(unittest.TestCase):
+    """Tests for get_many/set_many on InMemoryCache."""
+
+    def setUp(self):
+        self.cache = InMemoryCache()
+        self.lock = CountingLock(self.cache._lock)  # pylint: disable=protected-access
+        self.cache._lock = self.lock  # pylint: disable=protected-access
+
+    def test_set_many_and_get_many(self):
+        """Batch operations should round-trip and omit missing keys."""
+        self.cache.set_many({"game:1": {"id": 1}, "game:2": {"id": 2}}, ttl=60)
+        self.assertEqual(
+            {"game:1": {"id": 1}, "game:2": {"id": 2}},
+            self.cache.get_many(["game:1", "game:2", "game:3"]),
+        )
+        stats = self.cache.stats()
+        self.assertEqual((2, 1), (stats["hits"], stats["misses"]))
+
+    def test_single_lock_acquisition(self):
+        """Each batch call should take the lock once regardless of size."""
+        self.cache.set_many({f"game:{i}": {"id": i} for i in range(500)})
+        self.cache.get_many([f"game:{i}" for i in range(500)])
+        self.assertEqual(2, self.lock.acquisitions)
+
+    def test_get_many_expires_entries(self):
+        """Expired entries should be omitted and counted as expirations."""
+        self.cache.set_many({"a": 1, "b": 2}, ttl=1)
+        time.sleep(1.1)
+        self.assertEqual({}, self.cache.get_many(["a", "b"]))
+        self.assertEqual(2, self.cache.stats()["expirations"])
+
+    def test_set_many_respects_budget(self):
+        """A large set_many should still evict down to the entry budget."""
+        cache = InMemoryCache(max_entries=10)
+        cache.set_many({f"game:{i}": i for i in range(50)})
+        self.assertEqual(10, cache.stats()["size"])
+        self.assertEqual({"game:49": 49}, cache.get_many(["game:0", "game:49"]))
+
+
 if __name__ == "__main__":
     unittest.main()
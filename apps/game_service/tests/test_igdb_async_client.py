@@ -0,0 +1,192 @@
+"""
+Unit tests for AsyncIGDBClient using an in-process httpx mock transport.
+"""
+
+# pylint: disable=duplicate-code
+import asyncio
+import re
+import threading
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.cache import InMemoryCache
+from src.igdb.client import VOCABULARY_PAGE_SIZE
+
+
+def make_auth():
+    """Build a mock auth object exposing the async token API."""
+    auth = MagicMock()
+    auth.client_id = "fake-client-id"
+    auth.aget_token = AsyncMock(return_value="fake-token")
+    return auth
+
+
+class TestAsyncIGDBClient(unittest.IsolatedAsyncioTestCase):
+    """Tests for the async IGDB client surface."""
+
+    async def asyncSetUp(self):
+        self.requests = []
+        self.cache = InMemoryCache()
+        self.http_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(self.handler)
+        )
+        self.client = AsyncIGDBClient(
+            auth=make_auth(),
+            base_url="http://fake-igdb.com",
+            http_client=self.http_client,
+            cache=self.cache,
+        )
+
+    async def asyncTearDown(self):
+        await self.http_client.aclose()
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        """Fake IGDB endpoint returning canned rows per endpoint."""
+        self.requests.append(request)
+        if request.url.path.endswith("/genres"):
+            return httpx.Response(200, json=[{"id": 1, "name": "Action"}])
+        if request.url.path.endswith("/platforms"):
+            return httpx.Response(200, json=[{"id": 6, "name": "PC"}])
+        if b"search" in request.content:
+            return httpx.Response(200, json=[{"id": 1, "name": "Zelda"}])
+        if b"where id = (404)" in request.content:
+            return httpx.Response(200, json=[])
+        return httpx.Response(
+            200, json=[{"id": 10, "name": "X"}, {"id": 20, "name": "Y"}]
+        )
+
+    async def test_search_games_sends_auth_headers(self):
+        """search_games should call IGDB with the bearer token and map results."""
+        results = await self.client.search_games("zelda")
+        self.assertEqual("Zelda", results[0]["name"])
+        request = self.requests[0]
+        self.assertEqual("Bearer fake-token", request.headers["Authorization"])
+        self.assertEqual("fake-client-id", request.headers["Client-ID"])
+
+    async def test_get_games_by_ids_preserves_order_and_caches(self):
+        """Batch lookups keep request order and are served from cache afterwards."""
+        results = await self.client.get_games_by_ids([20, 10])
+        self.assertEqual([20, 10], [game["id"] for game in results])
+        await self.client.get_games_by_ids([10, 20])
+        self.assertEqual(1, len(self.requests))
+
+    async def test_get_game_by_id_not_found(self):
+        """A missing game should raise ValueError like the sync client."""
+        with self.assertRaises(ValueError):
+            await self.client.get_game_by_id(404)
+
+    async def test_genres_and_platforms_are_cached(self):
+        """Vocabulary lookups should be cached after the first call."""
+        self.assertEqual("Action", (await self.client.get_genres())[0]["name"])
+        self.assertEqual("PC", (await self.client.get_platforms())[0]["name"])
+        await self.client.get_genres()
+        await self.client.get_platforms()
+        self.assertEqual(2, len(self.requests))
+
+    async def test_vocabularies_are_paged(self):
+        """Vocabularies longer than one page are fetched page by page, by id."""
+        platforms = [
+            {"id": i, "name": f"P{i}"} for i in range(VOCABULARY_PAGE_SIZE + 2)
+        ]
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            self.assertIn(b"sort id asc;", request.content)
+            offset = int(re.search(rb"offset (\d+);", request.content).group(1))
+            end = offset + VOCABULARY_PAGE_SIZE
+            return httpx.Response(200, json=platforms[offset:end])
+
+        self.client.http_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        )
+        self.assertEqual(platforms, await self.client.get_platforms())
+        self.assertEqual(2, len(self.requests))
+        await self.client.http_client.aclose()
+
+    async def test_upstream_error_is_raised(self):
+        """HTTP errors from IGDB should surface as httpx.HTTPStatusError."""
+        failing_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(503))
+        )
+        self.client.http_client = failing_client
+        with self.assertRaises(httpx.HTTPStatusError):
+            await self.client.search_games("zelda")
+        await failing_client.aclose()
+
+    async def test_concurrent_requests_share_event_loop(self):
+        """Many concurrent upstream waits should run on one event loop."""
+
+        async def slow_handler(request):
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json=[{"id": 1, "name": request.url.path}])
+
+        self.client.cache = None
+        self.client.http_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(slow_handler)
+        )
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await asyncio.gather(
+            *(self.client.search_games(f"game {i}") for i in range(200))
+        )
+        elapsed = loop.time() - start
+        await self.client.http_client.aclose()
+        self.assertEqual(200, len(results))
+        self.assertLess(elapsed, 2.0)
+
+
+class ThreadRecordingCache(InMemoryCache):
+    """InMemoryCache flagged as blocking that records the threads calling it."""
+
+    blocking = True
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def get_many(self, keys):
+        self.threads.add(threading.get_ident())
+        return super().get_many(keys)
+
+    def set_many(self, items, ttl=60):
+        self.threads.add(threading.get_ident())
+        super().set_many(items, ttl=ttl)
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return super().get(key)
+
+
+class TestBlockingCache(unittest.IsolatedAsyncioTestCase):
+    """Blocking cache backends must be called off the event loop."""
+
+    async def test_cache_calls_run_on_worker_threads(self):
+        """Reads and writes of a blocking cache never run on the loop thread."""
+        cache = ThreadRecordingCache()
+
+        def handler(request):
+            if b"search" in request.content:
+                return httpx.Response(200, json=[{"id": 1, "name": "Zelda"}])
+            return httpx.Response(200, json=[{"id": 10, "name": "X"}])
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            client = AsyncIGDBClient(
+                auth=make_auth(),
+                base_url="http://fake-igdb.com",
+                http_client=http,
+                cache=cache,
+            )
+            await client.get_game_by_id(10)
+            await client.get_games_by_ids([10, 11])
+            await client.search_games("zelda")
+            self.assertEqual("Zelda", (await client.search_games("zelda"))[0]["name"])
+            await client.get_genres()
+            await client.cached_game_body(10)
+        self.assertTrue(cache.threads)
+        self.assertNotIn(threading.get_ident(), cache.threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
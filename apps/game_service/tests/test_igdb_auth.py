@@ -0,0 +1,342 @@
+"""
+Unit tests for single-flight, proactive and shared IGDB token refresh.
+"""
+
+# pylint: disable=protected-access
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.auth import REFRESH_LOCK_KEY, TOKEN_CACHE_KEY, IGDBAuth
+from src.igdb.cache import InMemoryCache
+from src.igdb.client import IGDBClient
+
+
+def new_auth(cache=None):
+    """Build a fresh IGDBAuth, bypassing the singleton."""
+    IGDBAuth._instance = None
+    auth = IGDBAuth()
+    auth.client_id = "client-id"
+    auth.client_secret = "secret"
+    auth.cache = cache
+    return auth
+
+
+class TokenServer:
+    """Fake Twitch token endpoint issuing token-1, token-2, ..."""
+
+    def __init__(self, delay=0.0, expires_in=3600):
+        self.delay = delay
+        self.expires_in = expires_in
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def _next(self):
+        with self.lock:
+            self.calls += 1
+            calls = self.calls
+        return httpx.Response(
+            200,
+            json={"access_token": f"token-{calls}", "expires_in": self.expires_in},
+            request=httpx.Request("POST", "https://id.twitch.tv/oauth2/token"),
+        )
+
+    def handler(self, _request):
+        """Sync transport handler."""
+        time.sleep(self.delay)
+        return self._next()
+
+    async def ahandler(self, _request):
+        """Async transport handler."""
+        await asyncio.sleep(self.delay)
+        return self._next()
+
+
+class TestSingleFlightRefresh(unittest.TestCase):
+    """Tests for the threaded token refresh."""
+
+    def tearDown(self):
+        IGDBAuth._instance = None
+
+    def test_concurrent_callers_share_one_fetch(self):
+        """An expired token under load is fetched once, not once per caller."""
+        server = TokenServer(delay=0.05)
+        auth = new_auth()
+        auth.http_client = httpx.Client(transport=httpx.MockTransport(server.handler))
+        tokens = []
+        threads = [
+            threading.Thread(target=lambda: tokens.append(auth.get_token()))
+            for _ in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(["token-1"] * 20, tokens)
+        self.assertEqual(1, server.calls)
+
+    def test_proactive_refresh_serves_current_token(self):
+        """Close to expiry the old token is returned while a refresh runs."""
+        server = TokenServer(delay=0.05)
+        auth = new_auth()
+        auth.http_client = httpx.Client(transport=httpx.MockTransport(server.handler))
+        self.assertEqual("token-1", auth.get_token())
+        auth._refresh_at = time.time() - 1
+        start = time.monotonic()
+        self.assertEqual(["token-1"] * 5, [auth.get_token() for _ in range(5)])
+        self.assertLess(time.monotonic() - start, 0.04)
+        deadline = time.monotonic() + 2
+        while auth._refreshing and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual("token-2", auth.get_token())
+        self.assertEqual(2, server.calls)
+
+    def test_refresh_times(self):
+        """Tokens are refreshed ahead of expiry by at most MAX_REFRESH_AHEAD."""
+        auth = new_auth()
+        auth._store_token({"access_token": "a", "expires_in": 3660})
+        self.assertAlmostEqual(300, auth._expires_at - auth._refresh_at)
+        auth._store_token({"access_token": "b", "expires_in": 120})
+        self.assertAlmostEqual(6, auth._expires_at - auth._refresh_at)
+
+    def test_invalidate_only_drops_matching_token(self):
+        """A 401 for an already replaced token keeps the newer token."""
+        auth = new_auth()
+        auth._store_token({"access_token": "new", "expires_in": 3600})
+        auth.invalidate_token("old")
+        self.assertEqual("new", auth._access_token)
+        auth.invalidate_token("new")
+        self.assertIsNone(auth._access_token)
+
+
+class TestSharedToken(unittest.TestCase):
+    """Tests for sharing the token through the cache backend."""
+
+    def setUp(self):
+        self.cache = InMemoryCache()
+        self.server = TokenServer()
+
+    def tearDown(self):
+        IGDBAuth._instance = None
+
+    def worker(self):
+        """Build an IGDBAuth standing in for one worker process."""
+        auth = new_auth(self.cache)
+        auth.http_client = httpx.Client(
+            transport=httpx.MockTransport(self.server.handler)
+        )
+        return auth
+
+    def test_one_refresh_serves_all_workers(self):
+        """A second worker adopts the token the first one fetched."""
+        first, second = self.worker(), self.worker()
+        self.assertEqual("token-1", first.get_token())
+        self.assertEqual("token-1", second.get_token())
+        self.assertEqual(1, self.server.calls)
+        self.assertIsNone(self.cache.get(REFRESH_LOCK_KEY))
+
+    def test_waits_for_refresh_in_other_worker(self):
+        """A worker that loses the refresh lock waits for the shared token."""
+        self.cache.incr(REFRESH_LOCK_KEY, 1, ttl=10)
+        shared = {
+            "access_token": "from-other-worker",
+            "expires_at": time.time() + 3600,
+            "refresh_at": time.time() + 3000,
+        }
+        timer = threading.Timer(0.1, self.cache.set, (TOKEN_CACHE_KEY, shared))
+        timer.start()
+        self.assertEqual("from-other-worker", self.worker().get_token())
+        timer.join()
+        self.assertEqual(0, self.server.calls)
+
+    def test_lock_is_free_while_waiting(self):
+        """Waiting for another worker's token does not hold the local lock."""
+        self.cache.incr(REFRESH_LOCK_KEY, 1, ttl=10)
+        auth = self.worker()
+        waiter = threading.Thread(target=auth.get_token)
+        waiter.start()
+        time.sleep(0.1)
+        self.assertTrue(auth._lock.acquire(timeout=0.5))
+        auth._lock.release()
+        self.cache.set(
+            TOKEN_CACHE_KEY,
+            {
+                "access_token": "from-other-worker",
+                "expires_at": time.time() + 3600,
+                "refresh_at": time.time() + 3000,
+            },
+        )
+        waiter.join()
+        self.assertEqual("from-other-worker", auth.get_token())
+        self.assertEqual(0, self.server.calls)
+
+    def test_invalidate_drops_shared_token(self):
+        """A token rejected by IGDB is removed for every worker."""
+        auth = self.worker()
+        token = auth.get_token()
+        auth.invalidate_token(token)
+        self.assertIsNone(self.cache.get(TOKEN_CACHE_KEY))
+        self.assertEqual("token-2", self.worker().get_token())
+
+
+class TestAsyncRefresh(unittest.IsolatedAsyncioTestCase):
+    """Tests for the asyncio token refresh."""
+
+    async def asyncSetUp(self):
+        self.server = TokenServer(delay=0.05)
+        self.auth = new_auth()
+        self.auth.async_http_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(self.server.ahandler)
+        )
+
+    async def asyncTearDown(self):
+        await self.auth.async_http_client.aclose()
+        IGDBAuth._instance = None
+
+    async def test_concurrent_callers_share_one_fetch(self):
+        """Concurrent coroutines wait on one refresh task."""
+        tokens = await asyncio.gather(*(self.auth.aget_token() for _ in range(20)))
+        self.assertEqual(["token-1"] * 20, tokens)
+        self.assertEqual(1, self.server.calls)
+
+    async def test_proactive_refresh(self):
+        """Close to expiry the old token is served while a task refreshes it."""
+        await self.auth.aget_token()
+        self.auth._refresh_at = time.time() - 1
+        tokens = await asyncio.gather(*(self.auth.aget_token() for _ in range(5)))
+        self.assertEqual(["token-1"] * 5, tokens)
+        await self.auth._async_refresh
+        self.assertEqual("token-2", await self.auth.aget_token())
+        self.assertEqual(2, self.server.calls)
+
+
+class ThreadRecordingCache(InMemoryCache):
+    """Blocking cache that records the threads it is called on."""
+
+    blocking = True
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key, value, ttl=60):
+        self.threads.add(threading.get_ident())
+        super().set(key, value, ttl=ttl)
+
+    def incr(self, key, amount=1, ttl=None):
+        self.threads.add(threading.get_ident())
+        return super().incr(key, amount, ttl=ttl)
+
+    def delete(self, key):
+        self.threads.add(threading.get_ident())
+        super().delete(key)
+
+
+class TestAsyncSharedToken(unittest.IsolatedAsyncioTestCase):
+    """Tests for sharing the token from the async refresh."""
+
+    async def test_blocking_cache_is_used_off_the_loop(self):
+        """A blocking cache backend is only called on worker threads."""
+        server = TokenServer()
+        auth = new_auth(ThreadRecordingCache())
+        auth.async_http_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(server.ahandler)
+        )
+        try:
+            token = await auth.aget_token()
+            await auth.ainvalidate_token(token)
+        finally:
+            await auth.async_http_client.aclose()
+            IGDBAuth._instance = None
+        threads = set(auth.cache.threads)
+        self.assertEqual("token-1", token)
+        self.assertIsNone(auth.cache.get(TOKEN_CACHE_KEY))
+        self.assertTrue(threads)
+        self.assertNotIn(threading.get_ident(), threads)
+
+    async def test_invalidate_does_not_block_on_the_lock(self):
+        """Invalidating waits for a held lock without stalling the event loop."""
+        auth = new_auth(InMemoryCache())
+        auth._store_token({"access_token": "revoked", "expires_in": 3600})
+        try:
+            auth._lock.acquire()  # a sync caller mid-refresh
+            task = asyncio.create_task(auth.ainvalidate_token("revoked"))
+            await asyncio.sleep(0.05)
+            self.assertFalse(task.done())
+            auth._lock.release()
+            await asyncio.wait_for(task, timeout=5)
+        finally:
+            IGDBAuth._instance = None
+        self.assertFalse(auth._has_valid_token(time.time()))
+
+
+def igdb_handler(requests, valid_token):
+    """Fake IGDB accepting only valid_token."""
+
+    def handler(request):
+        requests.append(request.headers["Authorization"])
+        if request.headers["Authorization"] != f"Bearer {valid_token}":
+            return httpx.Response(401, json={"message": "Authorization Failure"})
+        return httpx.Response(200, json=[{"id": 1, "name": "Zelda"}])
+
+    return handler
+
+
+class TestRetryOnUnauthorized(unittest.TestCase):
+    """Tests for refresh-and-retry when IGDB rejects the token."""
+
+    def setUp(self):
+        self.auth = MagicMock()
+        self.auth.client_id = "client-id"
+        self.auth.get_token.side_effect = ["revoked", "fresh"]
+        self.requests = []
+
+    def client(self, valid_token):
+        """Build an IGDBClient against a fake IGDB accepting valid_token."""
+        transport = httpx.MockTransport(igdb_handler(self.requests, valid_token))
+        return IGDBClient(auth=self.auth, http_client=httpx.Client(transport=transport))
+
+    def test_retries_once_with_new_token(self):
+        """A 401 invalidates the token and retries with a fresh one."""
+        results = self.client("fresh").search_games("zelda")
+        self.assertEqual("Zelda", results[0]["name"])
+        self.auth.invalidate_token.assert_called_once_with("revoked")
+        self.assertEqual(["Bearer revoked", "Bearer fresh"], self.requests)
+
+    def test_persistent_401_raises(self):
+        """If the fresh token is rejected too, the error is raised."""
+        with self.assertRaises(httpx.HTTPStatusError):
+            self.client("other").search_games("zelda")
+        self.assertEqual(2, len(self.requests))
+
+
+class TestAsyncRetryOnUnauthorized(unittest.IsolatedAsyncioTestCase):
+    """Tests for refresh-and-retry in the async client."""
+
+    async def test_retries_once_with_new_token(self):
+        """A 401 invalidates the token and retries with a fresh one."""
+        requests = []
+        auth = MagicMock()
+        auth.client_id = "client-id"
+        auth.aget_token = AsyncMock(side_effect=["revoked", "fresh"])
+        auth.ainvalidate_token = AsyncMock()
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(igdb_handler(requests, "fresh"))
+        ) as http_client:
+            client = AsyncIGDBClient(auth=auth, http_client=http_client)
+            results = await client.search_games("zelda")
+        self.assertEqual("Zelda", results[0]["name"])
+        auth.ainvalidate_token.assert_awaited_once_with("revoked")
+        self.assertEqual(["Bearer revoked", "Bearer fresh"], requests)
+
+
+if __name__ == "__main__":
+    unittest.main()
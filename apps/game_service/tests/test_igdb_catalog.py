@@ -0,0 +1,255 @@
+"""
+Unit tests for the local IGDB catalog mirror and its sync, run against a stub
+IGDB server.
+"""
+
+# pylint: disable=wrong-import-order,protected-access
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from src.core.config import Settings
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.cache import InMemoryCache
+from src.igdb.catalog import CatalogStore, create_catalog
+from src.igdb.catalog_sync import (
+    BULK_COMPLETE,
+    BULK_CURSOR,
+    SYNC_LEASE_KEY,
+    UPDATED_AT,
+    CatalogSync,
+)
+from src.igdb.client import IGDBClient
+from src.igdb.records import map_game
+from tests.utils.stub_igdb import StubIGDBServer, raw_game
+
+NOW = 1700000000
+
+
+def make_store():
+    """Build a catalog in a fresh in-memory SQLite database."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    store = CatalogStore(engine)
+    store.create_tables()
+    return store
+
+
+def make_auth():
+    """Build a fake IGDB auth."""
+    auth = MagicMock()
+    auth.get_token.return_value = "fake-token"
+    auth.aget_token = AsyncMock(return_value="fake-token")
+    auth.client_id = "fake-client-id"
+    return auth
+
+
+class TestCatalogStore(unittest.TestCase):
+    """Tests for CatalogStore."""
+
+    def setUp(self):
+        self.store = make_store()
+
+    def test_upsert_and_get(self):
+        """Games are inserted, replaced on conflict and read back by id."""
+        game = map_game(raw_game(1)).as_dict()
+        self.store.upsert_many([(game, 10), (map_game(raw_game(2)).as_dict(), 10)])
+        self.store.upsert_many([(dict(game, name="Renamed"), 20)])
+        found = self.store.get_many([1, 2, 3])
+        self.assertEqual([1, 2], sorted(found))
+        self.assertEqual("Renamed", found[1]["name"])
+        self.assertEqual(2, self.store.count())
+        self.assertEqual({"hits": 2, "misses": 1}, self.store.stats())
+
+    def test_state(self):
+        """Checkpoints are created and updated."""
+        self.assertIsNone(self.store.get_state(UPDATED_AT))
+        self.store.set_state(UPDATED_AT, 5)
+        self.store.set_state(UPDATED_AT, 6)
+        self.assertEqual(6, self.store.get_state(UPDATED_AT))
+
+    def test_create_catalog(self):
+        """The mirror is off unless enabled; only an engine of its own is disposed."""
+        settings = Settings()
+        settings.IGDB_CATALOG_ENABLED = False
+        self.assertIsNone(create_catalog(settings))
+        settings.IGDB_CATALOG_ENABLED = True
+        settings.IGDB_CATALOG_DATABASE_URL = ""
+        service_engine = MagicMock()
+        with patch("src.igdb.catalog.get_engine", return_value=service_engine):
+            shared = create_catalog(settings)
+        self.assertIs(service_engine, shared.engine)
+        shared.close()
+        service_engine.dispose.assert_not_called()
+        settings.IGDB_CATALOG_DATABASE_URL = "sqlite://"
+        own = create_catalog(settings)
+        with patch.object(own.engine, "dispose") as dispose:
+            own.close()
+        dispose.assert_called_once_with()
+
+
+class TestCatalogSync(unittest.TestCase):
+    """Bulk load and delta sync against the stub IGDB server."""
+
+    def setUp(self):
+        self.server = StubIGDBServer(
+            [raw_game(i, updated_at=NOW - 1000) for i in range(1, 1201)]
+        ).start()
+        self.http_client = httpx.Client()
+        self.client = IGDBClient(
+            auth=make_auth(),
+            base_url=self.server.base_url,
+            http_client=self.http_client,
+        )
+        self.store = make_store()
+        self.now = NOW
+        self.sync = CatalogSync(
+            self.client, self.store, page_size=500, clock=lambda: self.now
+        )
+
+    def tearDown(self):
+        self.http_client.close()
+        self.server.stop()
+
+    def test_bulk_load(self):
+        """The catalog is loaded in id pages and the checkpoint set below its start."""
+        self.assertEqual(1200, self.sync.run_once())
+        self.assertEqual(1200, self.store.count())
+        self.assertEqual(3, len(self.server.bodies))
+        self.assertIn("where id > 500; sort id asc; limit 500;", self.server.bodies[1])
+        self.assertEqual(1, self.store.get_state(BULK_COMPLETE))
+        self.assertEqual(NOW - 300, self.store.get_state(UPDATED_AT))
+
+    def test_bulk_load_resumes(self):
+        """An interrupted bulk load continues from the stored cursor."""
+        self.assertEqual(500, self.sync.bulk_load(max_pages=1))
+        self.assertEqual(500, self.store.get_state(BULK_CURSOR))
+        self.assertIsNone(self.store.get_state(BULK_COMPLETE))
+        resumed = CatalogSync(self.client, self.store, page_size=500)
+        self.assertEqual(700, resumed.bulk_load())
+        self.assertIn("where id > 500;", self.server.bodies[1])
+
+    def test_close_stops_bulk_load(self):
+        """A bulk load stops after the current page once the sync is closed."""
+        fetch_page = self.sync._fetch_page
+
+        def fetch_and_close(where):
+            self.sync.close()
+            return fetch_page(where)
+
+        self.sync._fetch_page = fetch_and_close
+        self.assertEqual(500, self.sync.bulk_load())
+        self.assertEqual(500, self.store.get_state(BULK_CURSOR))
+        self.assertIsNone(self.store.get_state(BULK_COMPLETE))
+
+    def test_delta_sync(self):
+        """Games changed since the checkpoint are pulled and replace their rows."""
+        self.sync.run_once()
+        self.now = NOW + 3600
+        self.server.put(raw_game(7, updated_at=NOW + 60, name="Patched"))
+        self.server.put(raw_game(1300, updated_at=NOW + 120))
+        self.server.bodies.clear()
+        self.assertEqual(2, self.sync.run_once())
+        self.assertIn("where updated_at >= 1699999700 & id > 0;", self.server.bodies[0])
+        self.assertEqual("Patched", self.store.get_many([7])[7]["name"])
+        self.assertEqual(1201, self.store.count())
+        self.assertEqual(NOW + 120, self.store.get_state(UPDATED_AT))
+
+    def test_checkpoint_keeps_overlap(self):
+        """The checkpoint never passes the round's start minus the overlap."""
+        self.sync.run_once()
+        self.server.put(raw_game(8, updated_at=NOW + 10))
+        self.sync.sync_deltas()
+        self.assertEqual(NOW - 300, self.store.get_state(UPDATED_AT))
+
+    def test_round_skipped_while_another_worker_holds_the_lease(self):
+        """Only the worker holding the shared lease syncs; the others skip."""
+        cache = InMemoryCache()
+        sync = CatalogSync(self.client, self.store, page_size=500, lease=cache)
+        cache.incr(SYNC_LEASE_KEY, 1, ttl=60)  # another worker's round
+        self.assertEqual(0, sync.run_once())
+        self.assertEqual([], self.server.bodies)
+        self.assertEqual(1, sync.stats()["skipped"])
+        cache.delete(SYNC_LEASE_KEY)
+        self.assertEqual(1200, sync.run_once())
+        self.assertIsNone(cache.get(SYNC_LEASE_KEY))
+
+    def test_lease_renewed_per_page(self):
+        """The lease is renewed between pages, and a lost lease ends the round."""
+        cache = InMemoryCache()
+        sync = CatalogSync(self.client, self.store, page_size=500, lease=cache)
+        fetch_page = sync._fetch_page
+        renewals = []
+
+        def fetch_and_expire(where):
+            renewals.append(cache._default.entries[SYNC_LEASE_KEY][1])
+            if len(renewals) == 2:
+                cache.delete(SYNC_LEASE_KEY)  # lease expired mid-round
+            return fetch_page(where)
+
+        sync._fetch_page = fetch_and_expire
+        self.assertEqual(1000, sync.run_once())
+        self.assertEqual(2, len(renewals))
+        self.assertLessEqual(renewals[0], renewals[1])
+        self.assertIsNone(self.store.get_state(BULK_COMPLETE))
+        self.assertIsNone(cache.get(SYNC_LEASE_KEY))
+
+
+class TestClientWithCatalog(unittest.TestCase):
+    """IGDB clients answer lookups from the mirror with IGDB as the fallback."""
+
+    def setUp(self):
+        self.server = StubIGDBServer([raw_game(i) for i in range(1, 4)]).start()
+        self.store = make_store()
+        self.store.upsert_many([(map_game(raw_game(i)).as_dict(), 1) for i in (1, 2)])
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_sync_client(self):
+        """Mirrored ids skip IGDB; the rest are fetched and cached as usual."""
+        with httpx.Client() as http_client:
+            client = IGDBClient(
+                auth=make_auth(),
+                base_url=self.server.base_url,
+                http_client=http_client,
+                cache=InMemoryCache(),
+                catalog=self.store,
+            )
+            self.assertEqual("Game 1", client.get_game_by_id(1)["name"])
+            games = client.get_games_by_ids([3, 2, 1])
+        self.assertEqual([3, 2, 1], [game["id"] for game in games])
+        self.assertEqual(1, len(self.server.bodies))
+        self.assertIn("where id = (3);", self.server.bodies[0])
+        self.assertIsNotNone(client.cache.get("game:2"))
+        self.assertEqual({"hits": 2, "misses": 1}, client.stats()["catalog"])
+
+
+class TestAsyncClientWithCatalog(unittest.IsolatedAsyncioTestCase):
+    """The async client reads the mirror off the event loop."""
+
+    async def test_async_client(self):
+        """Mirrored ids skip IGDB."""
+        store = make_store()
+        store.upsert_many([(map_game(raw_game(5)).as_dict(), 1)])
+        with StubIGDBServer([raw_game(5), raw_game(6)]) as server:
+            async with httpx.AsyncClient() as http_client:
+                client = AsyncIGDBClient(
+                    auth=make_auth(),
+                    base_url=server.base_url,
+                    http_client=http_client,
+                    catalog=store,
+                )
+                self.assertEqual(5, (await client.get_game_by_id(5))["id"])
+                games = await client.get_games_by_ids([6, 5])
+            self.assertEqual([6, 5], [game["id"] for game in games])
+            self.assertEqual(["where id = (6);"], [b[:15] for b in server.bodies])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+Unit tests for chunked, parallel get_games_by_ids lookups.
+"""
+
+# pylint: disable=duplicate-code
+import asyncio
+import re
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+from fastapi.testclient import TestClient
+from src.api.igdb import get_igdb_client
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.cache import InMemoryCache
+from src.igdb.client import ChunkFailure, IGDBBatchError, IGDBClient, chunk_ids
+from src.main import app
+
+
+def ids_from_body(body: str) -> list:
+    """Extract the requested ids from an Apicalypse 'where id = (...)' body."""
+    match = re.search(r"where id = \(([\d,]+)\)", body)
+    return [int(i) for i in match.group(1).split(",")]
+
+
+def make_async_auth():
+    """Build a mock auth object exposing the async token API."""
+    auth = MagicMock()
+    auth.client_id = "fake-client-id"
+    auth.aget_token = AsyncMock(return_value="fake-token")
+    return auth
+
+
+class TestChunkIds(unittest.TestCase):
+    """Tests for splitting id lists into IGDB-sized chunks."""
+
+    def test_chunks_respect_cap_and_dedupe(self):
+        """Chunks should be at most 500 ids and contain no duplicates."""
+        chunks = chunk_ids(list(range(1, 1201)) + [1, 2])
+        self.assertEqual([500, 500, 200], [len(chunk) for chunk in chunks])
+        self.assertEqual(1, chunks[0][0])
+
+
+class TestAsyncChunkedFetch(unittest.IsolatedAsyncioTestCase):
+    """AsyncIGDBClient should fetch large id sets in bounded parallel chunks."""
+
+    async def asyncSetUp(self):
+        self.active = 0
+        self.max_active = 0
+        self.bodies = []
+        self.failing_id = None
+
+    async def handler(self, request):
+        """Fake IGDB /games endpoint echoing requested ids."""
+        body = request.content.decode()
+        self.bodies.append(body)
+        game_ids = ids_from_body(body)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        if self.failing_id in game_ids:
+            return httpx.Response(503)
+        return httpx.Response(
+            200, json=[{"id": gid, "name": f"G{gid}"} for gid in game_ids]
+        )
+
+    def make_client(self, http, cache=None):
+        """Build an async client with at most two chunks in flight."""
+        return AsyncIGDBClient(
+            auth=make_async_auth(),
+            http_client=http,
+            cache=cache,
+            max_concurrent_chunks=2,
+        )
+
+    async def test_large_request_is_chunked_in_order(self):
+        """1,200 ids should go out as three bounded chunks and return in order."""
+        requested = list(range(1200, 0, -1))
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(self.handler)
+        ) as http:
+            games = await self.make_client(http).get_games_by_ids(requested)
+        self.assertEqual(requested, [game["id"] for game in games])
+        self.assertEqual(3, len(self.bodies))
+        self.assertTrue(
+            all("limit 500;" in body or "limit 200;" in body for body in self.bodies)
+        )
+        self.assertEqual(2, self.max_active)
+
+    async def test_partial_failure_reports_failed_chunk(self):
+        """A failing chunk should be reported while the other chunks are returned."""
+        self.failing_id = 700
+        cache = InMemoryCache()
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(self.handler)
+        ) as http:
+            client = self.make_client(http, cache=cache)
+            with self.assertRaises(IGDBBatchError) as ctx:
+                await client.get_games_by_ids(list(range(1, 1201)))
+        error = ctx.exception
+        self.assertEqual(3, error.chunk_count)
+        self.assertEqual(1, len(error.failures))
+        self.assertIn(700, error.failures[0].game_ids)
+        self.assertIsInstance(error.failures[0].error, httpx.HTTPStatusError)
+        self.assertEqual(700, len(error.games))
+        self.assertEqual(1, error.games[0]["id"])
+        # Successful chunks are still cached
+        self.assertIsNotNone(cache.get("game:1"))
+        self.assertIsNone(cache.get("game:700"))
+
+
+class TestSyncChunkedFetch(unittest.TestCase):
+    """IGDBClient should chunk large id sets across worker threads."""
+
+    def test_sync_client_chunks_requests(self):
+        """Each chunk should be a separate IGDB call capped at 500 ids."""
+        http_client = MagicMock()
+
+        def post(url, headers=None, content=None):  # pylint: disable=unused-argument
+            response = MagicMock()
+            response.json.return_value = [{"id": gid} for gid in ids_from_body(content)]
+            return response
+
+        http_client.post.side_effect = post
+        client = IGDBClient(auth=MagicMock(), http_client=http_client)
+        games = client.get_games_by_ids(list(range(1, 1001)))
+        self.assertEqual(list(range(1, 1001)), [game["id"] for game in games])
+        self.assertEqual(2, http_client.post.call_count)
+
+
+class TestBatchRoutePartialFailure(unittest.TestCase):
+    """GET /igdb/games should surface partial chunk failures."""
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+
+    def override_with_error(self, error):
+        """Override the IGDB client with one raising the given error."""
+        client = MagicMock()
+        client.get_games_by_ids = AsyncMock(side_effect=error)
+        client.cached_games_body = AsyncMock(return_value=None)
+        app.dependency_overrides[get_igdb_client] = lambda: client
+
+    def test_partial_failure_returns_games_with_header(self):
+        """Partial failures should return fetched games and a failed-chunk header."""
+        games = [{"id": 1, "name": "Kept"}]
+        failure = ChunkFailure([2], httpx.ConnectError("down"))
+        self.override_with_error(IGDBBatchError(games, [failure], 2))
+        response = TestClient(app).get("/igdb/games?ids=1,2")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("1/2", response.headers["X-IGDB-Failed-Chunks"])
+        self.assertEqual("Kept", response.json()[0]["name"])
+
+    def test_total_failure_returns_500(self):
+        """If no chunk succeeded the route should return 500."""
+        failure = ChunkFailure([1], httpx.ConnectError("down"))
+        self.override_with_error(IGDBBatchError([], [failure], 2))
+        response = TestClient(app).get("/igdb/games?ids=1,2")
+        self.assertEqual(500, response.status_code)
+
+
+if __name__ == "__main__":
+    unittest.main()
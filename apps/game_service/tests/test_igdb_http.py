@@ -0,0 +1,126 @@
+"""
+Unit tests for the shared, pooled IGDB HTTP transport and its lifespan wiring.
+"""
+
+# pylint: disable=duplicate-code
+import unittest
+from unittest.mock import MagicMock, patch
+
+import httpx
+from fastapi.testclient import TestClient
+from src.core.config import Settings
+from src.igdb.auth import IGDBAuth
+from src.igdb.client import IGDBClient
+from src.igdb.http import build_limits, build_timeout, create_http_client, use_http2
+from src.main import app
+
+
+class TestCreateHttpClient(unittest.TestCase):
+    """Tests for the pooled httpx.Client factory."""
+
+    def setUp(self):
+        self.settings = Settings()
+        self.settings.IGDB_MAX_CONNECTIONS = 7
+        self.settings.IGDB_MAX_KEEPALIVE_CONNECTIONS = 3
+        self.settings.IGDB_KEEPALIVE_EXPIRY = 12.0
+        self.settings.IGDB_READ_TIMEOUT = 4.0
+        self.settings.IGDB_CONNECT_TIMEOUT = 2.0
+
+    def test_limits_come_from_settings(self):
+        """Pool limits should reflect the configured settings."""
+        limits = build_limits(self.settings)
+        self.assertEqual(7, limits.max_connections)
+        self.assertEqual(3, limits.max_keepalive_connections)
+        self.assertEqual(12.0, limits.keepalive_expiry)
+
+    def test_timeouts_come_from_settings(self):
+        """Read and connect timeouts should reflect the configured settings."""
+        timeout = build_timeout(self.settings)
+        self.assertEqual(4.0, timeout.read)
+        self.assertEqual(2.0, timeout.connect)
+
+    def test_create_http_client_returns_pooled_client(self):
+        """The factory should return a reusable httpx.Client."""
+        client = create_http_client(self.settings)
+        try:
+            self.assertIsInstance(client, httpx.Client)
+            self.assertEqual(4.0, client.timeout.read)
+        finally:
+            client.close()
+
+    def test_http2_falls_back_when_h2_missing(self):
+        """HTTP/2 should be disabled when requested but 'h2' is not installed."""
+        self.settings.IGDB_HTTP2 = True
+        with patch("src.igdb.http.http2_available", return_value=False):
+            self.assertFalse(use_http2(self.settings))
+        with patch("src.igdb.http.http2_available", return_value=True):
+            self.assertTrue(use_http2(self.settings))
+
+
+class TestClientUsesInjectedTransport(unittest.TestCase):
+    """IGDBClient and IGDBAuth should send requests through the injected client."""
+
+    def setUp(self):
+        IGDBAuth._instance = None  # pylint: disable=protected-access
+        self.http_client = MagicMock()
+        response = MagicMock()
+        response.json.return_value = [{"id": 1, "name": "Pooled Game"}]
+        self.http_client.post.return_value = response
+
+    def tearDown(self):
+        IGDBAuth._instance = None  # pylint: disable=protected-access
+
+    @patch("src.igdb.client.httpx.post")
+    def test_client_uses_pooled_transport(self, mock_module_post):
+        """search_games should reuse the pooled client instead of httpx.post."""
+        auth = MagicMock()
+        auth.get_token.return_value = "token"
+        auth.client_id = "client-id"
+        client = IGDBClient(
+            auth=auth, base_url="http://fake-igdb.com", http_client=self.http_client
+        )
+
+        results = client.search_games("zelda")
+
+        self.assertEqual("Pooled Game", results[0]["name"])
+        mock_module_post.assert_not_called()
+        url = self.http_client.post.call_args.args[0]
+        self.assertEqual("http://fake-igdb.com/games", url)
+
+    @patch("src.igdb.auth.httpx.post")
+    def test_auth_uses_pooled_transport(self, mock_module_post):
+        """Token fetches should reuse the pooled client when one is injected."""
+        self.http_client.post.return_value.json.return_value = {
+            "access_token": "pooled-token",
+            "expires_in": 3600,
+        }
+        auth = IGDBAuth()
+        auth.http_client = self.http_client
+
+        self.assertEqual("pooled-token", auth.get_token())
+        mock_module_post.assert_not_called()
+        self.assertEqual(1, self.http_client.post.call_count)
+
+
+class TestLifespanOwnsTransport(unittest.TestCase):
+    """The app lifespan should create, share and close the pooled client."""
+
+    def tearDown(self):
+        IGDBAuth._instance = None  # pylint: disable=protected-access
+
+    def test_lifespan_shares_and_closes_client(self):
+        """The pooled clients are shared with IGDBAuth and closed on shutdown."""
+        with TestClient(app):
+            http_client = app.state.igdb_http_client
+            self.assertIsInstance(http_client, httpx.Client)
+            async_http_client = app.state.igdb_async_client.http_client
+            self.assertIsInstance(async_http_client, httpx.AsyncClient)
+            self.assertIs(http_client, IGDBAuth().http_client)
+            self.assertIs(async_http_client, IGDBAuth().async_http_client)
+        self.assertTrue(http_client.is_closed)
+        self.assertTrue(async_http_client.is_closed)
+        self.assertIsNone(IGDBAuth().http_client)
+
+
+if __name__ == "__main__":
+    unittest.main()
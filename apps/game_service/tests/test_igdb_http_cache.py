@@ -0,0 +1,199 @@
+"""
+Unit tests for ETags, conditional requests and Cache-Control on IGDB routes.
+"""
+
+# pylint: disable=protected-access
+import unittest
+import zlib
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+from src.api.igdb import STALE_SEARCH_CACHE_CONTROL, get_igdb_client
+from src.igdb import payload
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.cache import InMemoryCache
+from src.igdb.client import ChunkFailure, IGDBBatchError, IGDBClient
+from src.igdb.http_cache import (
+    TaggedBody,
+    body_etag,
+    cache_control,
+    etag_matches,
+    etag_of,
+)
+from src.igdb.payload import PayloadCodec, json_body
+from src.igdb.records import dump_game, dump_games
+from src.igdb.revalidate import GAME_TTL, SEARCH_TTL, VOCABULARY_TTL
+from src.main import app
+from tests.test_igdb_payload import mapped_game
+
+
+class TestValidators(unittest.TestCase):
+    """Tests for ETag and Cache-Control helpers."""
+
+    def test_etag_matches(self):
+        """If-None-Match lists, weak tags and * match."""
+        self.assertTrue(etag_matches('"a", W/"b"', '"b"'))
+        self.assertTrue(etag_matches("*", '"b"'))
+        self.assertFalse(etag_matches('"a"', '"b"'))
+        self.assertFalse(etag_matches(None, '"b"'))
+
+    def test_etag_of(self):
+        """Tagged bodies keep their stored ETag; others are hashed."""
+        self.assertEqual('"stored"', etag_of(TaggedBody(b"[]", '"stored"')))
+        self.assertEqual(body_etag(b"[]"), etag_of(b"[]"))
+        self.assertRegex(body_etag(b"[]"), r'^"[0-9a-f]{32}"$')
+
+    def test_cache_control(self):
+        """max-age is the soft TTL, stale-while-revalidate the rest."""
+        self.assertEqual("public, max-age=300", cache_control(*GAME_TTL))
+        self.assertEqual(
+            "public, max-age=300, stale-while-revalidate=1500",
+            cache_control(*SEARCH_TTL),
+        )
+        self.assertEqual(
+            "public, max-age=86400, stale-while-revalidate=518400",
+            cache_control(*VOCABULARY_TTL),
+        )
+
+
+class TestPayloadETags(unittest.TestCase):
+    """Payloads store the digest their ETag comes from."""
+
+    def setUp(self):
+        self.games = [mapped_game(i) for i in range(5)]
+
+    def test_stored_etag_is_body_hash(self):
+        """The stored ETag is the hash of the body, compressed or not."""
+        expected = body_etag(dump_games(self.games))
+        for threshold in (0, 1, 10**9):
+            entry = PayloadCodec(compress_min_bytes=threshold).encode(self.games)
+            body = json_body(entry)
+            self.assertIsInstance(body, TaggedBody)
+            self.assertEqual(expected, body.etag)
+
+    def test_untagged_payload(self):
+        """Payloads written without a digest are hashed when read."""
+        body = dump_games(self.games)
+        header = payload._HEADER.pack(payload.PAYLOAD_MAGIC, payload._COMPRESSED, 0.0)
+        entry = header + zlib.compress(body)
+        self.assertEqual(body, json_body(entry))
+        self.assertEqual(body_etag(body), json_body(entry).etag)
+        self.assertEqual(self.games, payload.decode(entry)[0])
+
+    def test_batch_etag(self):
+        """A cached batch gets the ETag of the same body fetched from IGDB."""
+        client = IGDBClient(
+            auth=MagicMock(), cache=InMemoryCache(), payload_codec=PayloadCodec()
+        )
+        client._cache_games(self.games, client.cache)
+        forward = etag_of(client.cached_games_body([1, 2]))
+        self.assertEqual(body_etag(dump_games(self.games[1:3])), forward)
+        self.assertNotEqual(forward, etag_of(client.cached_games_body([2, 1])))
+
+    def test_etag_without_codec(self):
+        """Entries cached without a codec store the ETag of their body too."""
+        client = IGDBClient(auth=MagicMock(), cache=InMemoryCache())
+        client._set_revalidating("search:zelda", self.games, SEARCH_TTL)
+        client._cache_games(self.games, client.cache)
+        self.assertEqual(
+            body_etag(dump_games(self.games)), client.cache.get("search:zelda")["etag"]
+        )
+        with patch("src.igdb.http_cache.digest") as digest:
+            search = client.cached_search_body("zelda")
+            game = client.cached_game_body(1)
+        digest.assert_not_called()
+        self.assertEqual(body_etag(search), search.etag)
+        self.assertEqual(body_etag(dump_game(self.games[1])), game.etag)
+
+
+class TestConditionalRoutes(unittest.TestCase):
+    """GET routes send validators and answer If-None-Match with 304."""
+
+    def setUp(self):
+        auth = MagicMock()
+        auth.client_id = "fake-client-id"
+        self.client = AsyncIGDBClient(
+            auth=auth, cache=InMemoryCache(), payload_codec=PayloadCodec()
+        )
+        self.games = [mapped_game(i) for i in range(1, 3)]
+        self.client._set_revalidating("search:zelda", self.games, SEARCH_TTL)
+        self.client._cache_games(self.games, self.client.cache)
+        app.dependency_overrides[get_igdb_client] = lambda: self.client
+        self.http = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+
+    def assert_revalidates(self, url, params, cache_control_value):
+        """The response has an ETag and Cache-Control, and revalidates to 304."""
+        response = self.http.get(url, params=params)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(body_etag(response.content), response.headers["etag"])
+        self.assertEqual(cache_control_value, response.headers["cache-control"])
+        again = self.http.get(
+            url, params=params, headers={"If-None-Match": response.headers["etag"]}
+        )
+        self.assertEqual(304, again.status_code)
+        self.assertEqual(b"", again.content)
+        self.assertEqual(response.headers["etag"], again.headers["etag"])
+
+    def test_cached_payloads(self):
+        """Search, batch and single game hits revalidate without IGDB."""
+        with patch.object(AsyncIGDBClient, "_post") as post:
+            self.assert_revalidates(
+                "/igdb/search", {"q": "Zelda"}, cache_control(*SEARCH_TTL)
+            )
+            self.assert_revalidates("/igdb/games/1", {}, cache_control(*GAME_TTL))
+            self.assert_revalidates(
+                "/igdb/games", {"ids": "2,1"}, cache_control(*GAME_TTL)
+            )
+        post.assert_not_called()
+
+    def test_stale_search_is_not_fresh(self):
+        """A stale search served while it is refreshed gets max-age=0."""
+        self.client.cache.set(
+            "search:zelda",
+            PayloadCodec().encode(self.games, fresh_until=0.5),
+            ttl=SEARCH_TTL.hard,
+        )
+        with patch.object(self.client, "_refresh") as refresh:
+            response = self.http.get("/igdb/search", params={"q": "zelda"})
+        refresh.assert_called_once()
+        self.assertEqual(STALE_SEARCH_CACHE_CONTROL, response.headers["cache-control"])
+        self.assertEqual("public, max-age=0", STALE_SEARCH_CACHE_CONTROL)
+
+    def test_uncached_responses(self):
+        """Bodies built per request get the same ETag a cached copy would."""
+        game = mapped_game(7)
+        with patch.object(AsyncIGDBClient, "get_game_by_id", return_value=game):
+            response = self.http.get("/igdb/games/7")
+        self.assertEqual(body_etag(dump_game(game)), response.headers["etag"])
+
+    def test_stale_etag_gets_body(self):
+        """A different ETag gets the full body."""
+        response = self.http.get("/igdb/games/1", headers={"If-None-Match": '"old"'})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, response.json()["id"])
+
+    def test_post_search_has_no_validators(self):
+        """POST searches are not cacheable."""
+        response = self.http.post("/igdb/search", json={"q": "zelda"})
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn("etag", response.headers)
+
+    def test_partial_batch_is_not_stored(self):
+        """Responses missing failed chunks are marked no-store."""
+        failure = IGDBBatchError(
+            self.games[:1], [ChunkFailure([2], OSError("down"))], 2
+        )
+        with patch.object(
+            AsyncIGDBClient, "cached_games_body", return_value=None
+        ), patch.object(AsyncIGDBClient, "get_games_by_ids", side_effect=failure):
+            response = self.http.get("/igdb/games", params={"ids": "1,2"})
+        self.assertEqual("1/2", response.headers["x-igdb-failed-chunks"])
+        self.assertEqual("no-store", response.headers["cache-control"])
+        self.assertNotIn("etag", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
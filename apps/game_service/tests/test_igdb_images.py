@@ -0,0 +1,302 @@
+"""
+Unit tests for the cover image proxy and its on-disk LRU store.
+
+Images are fetched from a local stub of the IGDB image CDN.
+"""
+
+# pylint: disable=protected-access
+import asyncio
+import io
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import httpx
+from fastapi.testclient import TestClient
+from src.api.igdb import get_igdb_client
+from src.core.config import Settings
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.cache import InMemoryCache
+from src.igdb.http_cache import etag_of
+from src.igdb.images import (
+    IMAGE_CACHE_CONTROL,
+    ImageNotFound,
+    ImageProxy,
+    ImageStore,
+    create_image_proxy,
+    image_etag,
+    pillow_available,
+)
+from src.igdb.payload import PayloadCodec
+from src.main import app
+from tests.test_igdb_payload import mapped_game
+from tests.utils.stub_images import StubImageServer
+
+COVER = b"\xff\xd8\xff\xe0 fake cover bytes \xff\xd9"
+
+
+def read_lease(store, lease):
+    """Return the contents of a lease and release it."""
+    try:
+        with open(lease, "rb") as file:
+            return file.read()
+    finally:
+        store.release(lease)
+
+
+class TempDirTestCase(unittest.TestCase):
+    """Runs each test with a fresh temporary directory."""
+
+    def setUp(self):
+        temp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp.cleanup)
+        self.directory = temp.name
+
+
+class TestImageStore(TempDirTestCase):
+    """Tests for ImageStore."""
+
+    def test_evicts_least_recently_used(self):
+        """Files beyond max_bytes are evicted, least recently served first."""
+        store = ImageStore(self.directory, max_bytes=25)
+        store.put("a.jpg", b"a" * 10)
+        store.put("b.jpg", b"b" * 10)
+        store.release(store.checkout("a.jpg"))
+        store.put("c.jpg", b"c" * 10)
+        self.assertIsNone(store.checkout("b.jpg"))
+        self.assertFalse(os.path.exists(store.path("b.jpg")))
+        self.assertEqual(b"a" * 10, read_lease(store, store.checkout("a.jpg")))
+        self.assertEqual(
+            {"files": 2, "bytes": 20, "evictions": 1},
+            {key: store.stats()[key] for key in ("files", "bytes", "evictions")},
+        )
+
+    def test_indexes_existing_files(self):
+        """A new store picks up files from a previous run and drops stale temp files."""
+        ImageStore(self.directory, 100).put("a.jpg", b"a" * 10)
+        for name in ("b.jpg.123.tmp", "c.jpg.456.tmp", "a.jpg.789.lease"):
+            with open(os.path.join(self.directory, name), "wb") as file:
+                file.write(b"partial")
+        with patch("src.igdb.images.time.time", return_value=time.time() + 7200):
+            store = ImageStore(self.directory, 100)
+        self.assertEqual(["a.jpg"], os.listdir(self.directory))
+        self.assertEqual(10, store.stats()["bytes"])
+        self.assertEqual(b"a" * 10, read_lease(store, store.checkout("a.jpg")))
+
+    def test_keeps_other_workers_temp_files(self):
+        """Recent temp files and leases may belong to another worker and are kept."""
+        for name in ("b.jpg.123.tmp", "a.jpg.789.lease"):
+            with open(os.path.join(self.directory, name), "wb") as file:
+                file.write(b"partial")
+        store = ImageStore(self.directory, 100)
+        self.assertEqual(2, len(os.listdir(self.directory)))
+        self.assertEqual(0, store.stats()["files"])
+
+    def test_missing_file_is_a_miss(self):
+        """Files removed by another worker are dropped from the index."""
+        store = ImageStore(self.directory, 100)
+        os.remove(store.put("a.jpg", b"a"))
+        self.assertIsNone(store.checkout("a.jpg"))
+        self.assertIsNone(store.modified("a.jpg"))
+        self.assertEqual(0, store.stats()["bytes"])
+        self.assertEqual((0, 1), (store.hits, store.misses))
+
+    def test_lease_outlives_eviction(self):
+        """A leased file stays readable after it is evicted."""
+        store = ImageStore(self.directory, max_bytes=15)
+        store.put("a.jpg", b"a" * 10)
+        lease = store.checkout("a.jpg")
+        store.put("b.jpg", b"b" * 10)
+        self.assertFalse(os.path.exists(store.path("a.jpg")))
+        self.assertEqual(b"a" * 10, read_lease(store, lease))
+        self.assertEqual(["b.jpg"], os.listdir(self.directory))
+
+
+class TestImageProxy(TempDirTestCase, unittest.IsolatedAsyncioTestCase):
+    """Tests for ImageProxy against a stub image server."""
+
+    async def asyncSetUp(self):
+        self.server = StubImageServer({"t_cover_big/co1.jpg": COVER})
+        self.server.__enter__()  # pylint: disable=unnecessary-dunder-call
+        self.http_client = httpx.AsyncClient()
+        self.proxy = ImageProxy(
+            ImageStore(self.directory, 1000),
+            self.http_client,
+            base_url=self.server.base_url,
+        )
+
+    async def asyncTearDown(self):
+        await self.http_client.aclose()
+        self.server.__exit__(None, None, None)
+
+    async def test_downloads_once(self):
+        """An image is downloaded on the first request and read from disk after."""
+        for _ in range(3):
+            lease = await self.proxy.get("t_cover_big", "co1")
+            self.assertEqual(COVER, read_lease(self.proxy.store, lease))
+        self.assertEqual(1, self.server.requests["t_cover_big/co1.jpg"])
+        self.assertEqual(2, self.proxy.stats()["hits"])
+
+    async def test_concurrent_misses_share_a_download(self):
+        """Concurrent requests for one image wait on a single download."""
+        self.server.gate.clear()
+        tasks = [
+            asyncio.ensure_future(self.proxy.get("t_cover_big", "co1"))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0.1)
+        self.server.gate.set()
+        leases = await asyncio.gather(*tasks)
+        self.assertEqual(
+            [COVER] * 5, [read_lease(self.proxy.store, lease) for lease in leases]
+        )
+        self.assertEqual(1, self.server.requests["t_cover_big/co1.jpg"])
+        self.assertEqual(4, self.proxy.stats()["coalesced"])
+
+    async def test_unknown_images(self):
+        """Invalid sizes and ids are rejected without a download; 404s raise."""
+        for size, image_id in [("t_huge", "co1"), ("t_thumb", "../x"), ("blur", "co1")]:
+            with self.assertRaises(ImageNotFound):
+                await self.proxy.get(size, image_id)
+        with self.assertRaises(ImageNotFound):
+            await self.proxy.get("t_thumb", "co404")
+        self.assertEqual(1, sum(self.server.requests.values()))
+
+    def test_rewrite(self):
+        """IGDB image URLs point at the proxy and the ETag changes with them."""
+        body = b'{"cover_url":"https://images.igdb.com/igdb/image/upload/t_cover_big/co1.jpg"}'
+        rewritten = self.proxy.rewrite(body)
+        self.assertEqual(b'{"cover_url":"/igdb/images/t_cover_big/co1.jpg"}', rewritten)
+        self.assertNotEqual(etag_of(body), etag_of(rewritten))
+        self.assertIs(b"[]", self.proxy.rewrite(b"[]"))
+
+    @unittest.skipUnless(pillow_available(), "Pillow is not installed")
+    async def test_placeholder(self):
+        """Placeholders are tiny JPEGs made from the thumbnail."""
+        # pylint: disable=import-outside-toplevel
+        from PIL import Image
+
+        thumb = io.BytesIO()
+        Image.new("RGB", (90, 128), (200, 40, 40)).save(thumb, "JPEG")
+        self.server.images["t_thumb/co1.jpg"] = thumb.getvalue()
+        self.proxy.placeholders = True
+        lease = await self.proxy.get("blur", "co1")
+        with Image.open(io.BytesIO(read_lease(self.proxy.store, lease))) as image:
+            self.assertEqual((16, 23), image.size)
+        self.assertEqual(2, len(os.listdir(self.directory)))
+
+    @unittest.skipIf(pillow_available(), "Pillow is installed")
+    def test_placeholders_need_pillow(self):
+        """Enabling placeholders without Pillow is an error."""
+        with self.assertRaises(RuntimeError):
+            ImageProxy(MagicMock(), MagicMock(), placeholders=True)
+
+    def test_create_image_proxy(self):
+        """The proxy is off unless IGDB_IMAGE_PROXY_ENABLED is set."""
+        settings = Settings()
+        settings.IGDB_IMAGE_PROXY_ENABLED = False
+        self.assertIsNone(create_image_proxy(settings, self.http_client))
+        settings.IGDB_IMAGE_PROXY_ENABLED = True
+        settings.IGDB_IMAGE_CACHE_DIR = self.directory
+        settings.IGDB_IMAGE_PLACEHOLDERS = False
+        proxy = create_image_proxy(settings, self.http_client)
+        self.assertEqual(self.directory, proxy.store.directory)
+
+
+class TestImageRoutes(TempDirTestCase):
+    """Tests for GET /igdb/images and cover URL rewriting."""
+
+    def setUp(self):
+        super().setUp()
+        self.server = StubImageServer({"t_cover_big/co1.jpg": COVER})
+        self.server.__enter__()  # pylint: disable=unnecessary-dunder-call
+        self.addCleanup(self.server.__exit__, None, None, None)
+        self.http_client = httpx.AsyncClient()
+        app.state.igdb_image_proxy = ImageProxy(
+            ImageStore(self.directory, 1000),
+            self.http_client,
+            base_url=self.server.base_url,
+        )
+        self.http = TestClient(app)
+
+    def tearDown(self):
+        app.state.igdb_image_proxy = None
+        app.dependency_overrides = {}
+
+    def test_serves_image(self):
+        """Images are served from disk with immutable cache headers."""
+        response = self.http.get("/igdb/images/t_cover_big/co1.jpg")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(COVER, response.content)
+        self.assertEqual("image/jpeg", response.headers["content-type"])
+        self.assertEqual(IMAGE_CACHE_CONTROL, response.headers["cache-control"])
+        self.assertEqual(image_etag("t_cover_big", "co1"), response.headers["etag"])
+        self.http.get("/igdb/images/t_cover_big/co1.jpg")
+        self.assertEqual(1, self.server.requests["t_cover_big/co1.jpg"])
+        # Leases are removed once the response is sent
+        self.assertEqual(["t_cover_big_co1.jpg"], os.listdir(self.directory))
+
+    def test_evicted_image_is_downloaded_again(self):
+        """An image removed from disk after it was indexed is fetched again."""
+        store = app.state.igdb_image_proxy.store
+        os.remove(store.put("t_cover_big_co1.jpg", COVER))
+        response = self.http.get("/igdb/images/t_cover_big/co1.jpg")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(COVER, response.content)
+        self.assertEqual(1, self.server.requests["t_cover_big/co1.jpg"])
+
+    def test_conditional_get(self):
+        """A matching If-None-Match gets 304 without a download."""
+        etag = image_etag("t_cover_big", "co1")
+        response = self.http.get(
+            "/igdb/images/t_cover_big/co1.jpg", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(0, sum(self.server.requests.values()))
+
+    def test_if_modified_since(self):
+        """If-Modified-Since gets 304 only for a cached image stored by then."""
+        url = "/igdb/images/t_cover_big/co1.jpg"
+        before = {"If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT"}
+        self.assertEqual(200, self.http.get(url, headers=before).status_code)
+        last_modified = self.http.get(url).headers["last-modified"]
+        self.assertEqual(200, self.http.get(url, headers=before).status_code)
+        response = self.http.get(url, headers={"If-Modified-Since": last_modified})
+        self.assertEqual(304, response.status_code)
+        invalid = self.http.get(url, headers={"If-Modified-Since": "yesterday"})
+        self.assertEqual(200, invalid.status_code)
+        self.assertEqual(1, self.server.requests["t_cover_big/co1.jpg"])
+
+    def test_not_found(self):
+        """Unknown images, sizes and types are 404."""
+        for url in (
+            "/igdb/images/t_cover_big/co404.jpg",
+            "/igdb/images/t_huge/co1.jpg",
+            "/igdb/images/t_cover_big/co1.png",
+            "/igdb/images/blur/co1.jpg",
+        ):
+            self.assertEqual(404, self.http.get(url).status_code, url)
+        app.state.igdb_image_proxy = None
+        self.assertEqual(
+            404, self.http.get("/igdb/images/t_cover_big/co1.jpg").status_code
+        )
+
+    def test_game_covers_point_at_proxy(self):
+        """Game responses link covers through the proxy."""
+        client = AsyncIGDBClient(
+            auth=MagicMock(), cache=InMemoryCache(), payload_codec=PayloadCodec()
+        )
+        client._cache_games([mapped_game(1)], client.cache)
+        app.dependency_overrides[get_igdb_client] = lambda: client
+        game = self.http.get("/igdb/games/1").json()
+        self.assertTrue(game["cover_url"].startswith("/igdb/images/t_cover_big/"))
+        self.assertTrue(
+            game["cover_images"]["thumb"].startswith("/igdb/images/t_thumb/")
+        )
+        self.assertIn("images", self.http.get("/igdb/stats").json())
+
+
+if __name__ == "__main__":
+    unittest.main()
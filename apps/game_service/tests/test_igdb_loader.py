@@ -0,0 +1,165 @@
+"""
+Unit tests for micro-batching of IGDB game-by-id lookups.
+"""
+
+# pylint: disable=duplicate-code
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.client import IGDBClient
+from src.igdb.loader import AsyncGameBatchLoader, GameBatchLoader
+
+
+class TestGameBatchLoader(unittest.TestCase):
+    """Tests for the thread-based batching loader."""
+
+    def setUp(self):
+        self.batches = []
+        self.loader = GameBatchLoader(window=0.05)
+
+    def fetch_many(self, game_ids):
+        """Fake batch fetch that knows every id except 404."""
+        self.batches.append(sorted(game_ids))
+        return [{"id": gid, "name": f"Game {gid}"} for gid in game_ids if gid != 404]
+
+    def test_concurrent_loads_are_batched(self):
+        """Lookups within one window should be sent as one batch."""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [
+                pool.submit(self.loader.load, gid, self.fetch_many)
+                for gid in range(1, 9)
+            ]
+            names = [future.result()["name"] for future in futures]
+        self.assertEqual([f"Game {gid}" for gid in range(1, 9)], names)
+        self.assertEqual([list(range(1, 9))], self.batches)
+        self.assertEqual(
+            {"loads": 8, "batches": 1, "largest_batch": 8}, self.loader.stats()
+        )
+
+    def test_unknown_id_resolves_to_none(self):
+        """An id missing from the batch response should resolve to None."""
+        self.assertIsNone(self.loader.load(404, self.fetch_many))
+
+    def test_batch_error_is_fanned_out(self):
+        """A failed batch should raise in every caller."""
+
+        def failing_fetch(game_ids):
+            raise httpx.ConnectError("down")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [
+                pool.submit(self.loader.load, gid, failing_fetch) for gid in (1, 2, 3)
+            ]
+            for future in futures:
+                with self.assertRaises(httpx.ConnectError):
+                    future.result()
+
+    def test_full_batch_dispatches_early(self):
+        """Reaching max_batch_size should dispatch without waiting out the window."""
+        loader = GameBatchLoader(window=5, max_batch_size=3)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [
+                pool.submit(loader.load, gid, self.fetch_many) for gid in (1, 2, 3)
+            ]
+            results = [future.result(timeout=2) for future in futures]
+        self.assertEqual([1, 2, 3], [game["id"] for game in results])
+
+
+class TestAsyncGameBatchLoader(unittest.IsolatedAsyncioTestCase):
+    """Tests for the asyncio batching loader."""
+
+    async def test_concurrent_loads_are_batched(self):
+        """Concurrent coroutine lookups should collapse into one batch."""
+        batches = []
+
+        async def fetch_many(game_ids):
+            batches.append(sorted(game_ids))
+            return [{"id": gid} for gid in game_ids]
+
+        loader = AsyncGameBatchLoader(window=0.01)
+        results = await asyncio.gather(
+            *(loader.load(gid, fetch_many) for gid in range(50))
+        )
+        self.assertEqual(list(range(50)), [game["id"] for game in results])
+        self.assertEqual([list(range(50))], batches)
+
+    async def test_max_batch_size_splits_batches(self):
+        """Lookups beyond max_batch_size should go out in additional batches."""
+        batches = []
+
+        async def fetch_many(game_ids):
+            batches.append(len(game_ids))
+            return [{"id": gid} for gid in game_ids]
+
+        loader = AsyncGameBatchLoader(window=0.01, max_batch_size=10)
+        await asyncio.gather(*(loader.load(gid, fetch_many) for gid in range(25)))
+        self.assertEqual([10, 10, 5], batches)
+
+    async def test_cancelled_batch_releases_callers(self):
+        """Cancelling an in-flight batch should cancel its callers, not hang them."""
+        started = asyncio.Event()
+
+        async def fetch_many(_game_ids):
+            started.set()
+            await asyncio.Event().wait()  # never answers
+
+        loader = AsyncGameBatchLoader(window=0.001)
+        loads = asyncio.gather(
+            *(loader.load(gid, fetch_many) for gid in range(3)),
+            return_exceptions=True,
+        )
+        await started.wait()
+        for task in list(loader._tasks):  # pylint: disable=protected-access
+            task.cancel()
+        results = await asyncio.wait_for(loads, timeout=1)
+        self.assertTrue(
+            all(isinstance(result, asyncio.CancelledError) for result in results)
+        )
+
+
+class TestClientBatching(unittest.IsolatedAsyncioTestCase):
+    """get_game_by_id should route cache misses through the loader."""
+
+    async def test_async_client_batches_detail_lookups(self):
+        """Concurrent get_game_by_id calls should issue one IGDB query."""
+        bodies = []
+
+        def handler(request):
+            bodies.append(request.content.decode())
+            return httpx.Response(
+                200, json=[{"id": gid, "name": f"Game {gid}"} for gid in (1, 2, 3)]
+            )
+
+        auth = MagicMock()
+        auth.client_id = "fake-client-id"
+        auth.aget_token = AsyncMock(return_value="fake-token")
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            client = AsyncIGDBClient(
+                auth=auth,
+                http_client=http,
+                game_loader=AsyncGameBatchLoader(window=0.01),
+            )
+            games = await asyncio.gather(
+                *(client.get_game_by_id(gid) for gid in (1, 2, 3))
+            )
+            with self.assertRaises(ValueError):
+                await client.get_game_by_id(99)
+        self.assertEqual(["Game 1", "Game 2", "Game 3"], [g["name"] for g in games])
+        self.assertIn("where id = (1,2,3)", bodies[0])
+        self.assertEqual(2, client.stats()["game_loader"]["batches"])
+
+    def test_sync_client_uses_loader(self):
+        """The sync client should load through the injected loader."""
+        loader = MagicMock()
+        loader.load.return_value = {"id": 5, "name": "Loaded"}
+        client = IGDBClient(auth=MagicMock(), game_loader=loader)
+        self.assertEqual("Loaded", client.get_game_by_id(5)["name"])
+        self.assertEqual(5, loader.load.call_args.args[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Unit tests for negative caching of game ids unknown to IGDB.
+"""
+
+# pylint: disable=duplicate-code
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.cache import InMemoryCache
+from src.igdb.client import (
+    NEGATIVE_CACHE_TTL,
+    NOT_FOUND,
+    ChunkFailure,
+    IGDBBatchError,
+    IGDBClient,
+    is_not_found,
+)
+from src.igdb.revalidate import unwrap
+
+
+def make_response(rows):
+    """Build a fake httpx response returning rows."""
+    response = MagicMock()
+    response.json.return_value = rows
+    response.raise_for_status.return_value = None
+    return response
+
+
+class TestNegativeCaching(unittest.TestCase):
+    """Tests for negative caching in the sync client."""
+
+    def setUp(self):
+        auth = MagicMock()
+        auth.get_token.return_value = "fake-token"
+        auth.client_id = "fake-client-id"
+        self.cache = InMemoryCache()
+        self.client = IGDBClient(auth=auth, cache=self.cache)
+
+    @patch("httpx.post")
+    def test_unknown_id_is_cached(self, mock_post):
+        """A second lookup of an unknown id should not reach IGDB."""
+        mock_post.return_value = make_response([])
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                self.client.get_game_by_id(999)
+        self.assertEqual(1, mock_post.call_count)
+        self.assertEqual(
+            {"hits": 2, "stores": 1}, self.client.stats()["negative_cache"]
+        )
+
+    @patch("httpx.post")
+    def test_negative_entry_has_short_ttl(self, mock_post):
+        """Negative markers should use their own short TTL."""
+        mock_post.return_value = make_response([])
+        with self.assertRaises(ValueError):
+            self.client.get_game_by_id(999)
+        partition = self.cache._default  # pylint: disable=protected-access
+        _, expire_at, _ = partition.entries["game:999"]
+        self.assertTrue(is_not_found(self.cache.get("game:999")))
+        self.assertAlmostEqual(time.time() + NEGATIVE_CACHE_TTL, expire_at, delta=5)
+
+    @patch("httpx.post")
+    def test_batch_skips_known_missing_ids(self, mock_post):
+        """get_games_by_ids should only re-fetch ids not known to be missing."""
+        mock_post.return_value = make_response([{"id": 1, "name": "Known"}])
+        result = self.client.get_games_by_ids([1, 404])
+        self.assertEqual([1], [game["id"] for game in result])
+        self.assertTrue(is_not_found(self.cache.get("game:404")))
+
+        result = self.client.get_games_by_ids([404, 1])
+        self.assertEqual([1], [game["id"] for game in result])
+        self.assertEqual(1, mock_post.call_count)
+
+    @patch("httpx.post")
+    def test_negative_entry_shared_between_paths(self, mock_post):
+        """An id found missing by a batch lookup should short-circuit get_game_by_id."""
+        mock_post.return_value = make_response([])
+        self.client.get_games_by_ids([404])
+        with self.assertRaises(ValueError):
+            self.client.get_game_by_id(404)
+        self.assertEqual(1, mock_post.call_count)
+
+    def test_failed_chunks_are_not_cached_as_missing(self):
+        """Ids from chunks that failed upstream must not be cached as not found."""
+        failure = IGDBBatchError(
+            [], [ChunkFailure([3, 4], httpx.ConnectError("down"))], 2
+        )
+        with self.assertRaises(IGDBBatchError):
+            self.client._finish_batch(  # pylint: disable=protected-access
+                [1, 2, 3, 4], [1, 2, 3, 4], [], [{"id": 1}], failure
+            )
+        self.assertEqual({"id": 1}, unwrap(self.cache.get("game:1"))[0])
+        self.assertEqual(NOT_FOUND, self.cache.get("game:2"))
+        self.assertIsNone(self.cache.get("game:3"))
+        self.assertIsNone(self.cache.get("game:4"))
+
+    @patch("httpx.post")
+    def test_upstream_error_is_not_cached(self, mock_post):
+        """Transport errors should not create negative entries."""
+        mock_post.side_effect = httpx.ConnectError("down")
+        with self.assertRaises(httpx.ConnectError):
+            self.client.get_game_by_id(5)
+        self.assertIsNone(self.cache.get("game:5"))
+
+
+class TestAsyncNegativeCaching(unittest.IsolatedAsyncioTestCase):
+    """Tests for negative caching in the async client."""
+
+    async def asyncSetUp(self):
+        self.requests = []
+        self.http_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(self.handler)
+        )
+        auth = MagicMock()
+        auth.client_id = "fake-client-id"
+        auth.aget_token = AsyncMock(return_value="fake-token")
+        self.client = AsyncIGDBClient(
+            auth=auth, http_client=self.http_client, cache=InMemoryCache()
+        )
+
+    async def asyncTearDown(self):
+        await self.http_client.aclose()
+
+    def handler(self, request):
+        """Fake IGDB that knows no games."""
+        self.requests.append(request)
+        return httpx.Response(200, json=[])
+
+    async def test_unknown_id_is_cached(self):
+        """Repeated lookups of an unknown id should hit IGDB once."""
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                await self.client.get_game_by_id(999)
+        self.assertEqual([], await self.client.get_games_by_ids([999]))
+        self.assertEqual(1, len(self.requests))
+        self.assertEqual(3, self.client.stats()["negative_cache"]["hits"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,287 @@
+"""
+Unit tests and benchmarks for pre-serialized cache payloads.
+"""
+
+# pylint: disable=protected-access
+import json
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+from src.api.igdb import get_igdb_client
+from src.core.config import Settings
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.cache import InMemoryCache, approximate_size
+from src.igdb.client import IGDBClient
+from src.igdb.payload import (
+    PayloadCodec,
+    create_payload_codec,
+    decode,
+    is_payload,
+    json_body,
+    msgpack_available,
+)
+from src.igdb.records import dump_games, map_game
+from src.igdb.redis_cache import RedisCache
+from src.igdb.revalidate import SEARCH_TTL, unwrap
+from src.igdb.schemas import GameFilters
+from src.main import app
+from tests.utils.benchmark import report, skip_unless_benchmarks
+from tests.utils.fake_redis import FakeRedisServer
+
+
+def mapped_game(game_id):
+    """Build a mapped game as cached by the IGDB client."""
+    return map_game(
+        {
+            "id": game_id,
+            "name": f"Game {game_id} é",
+            "cover": {
+                "url": f"//images.igdb.com/igdb/image/upload/t_thumb/co{game_id:05x}.jpg"
+            },
+            "summary": "A long summary of the game. " * 10,
+            "first_release_date": 1500000000 + game_id,
+            "genres": [{"name": "RPG"}, {"name": "Adventure"}],
+            "platforms": [{"name": "PC"}, {"name": "Switch"}],
+        }
+    ).as_dict()
+
+
+def make_response(rows):
+    """Build a fake httpx response returning rows."""
+    response = MagicMock()
+    response.json.return_value = rows
+    response.raise_for_status.return_value = None
+    return response
+
+
+class TestPayloadCodec(unittest.TestCase):
+    """Tests for encoding and decoding payloads."""
+
+    def setUp(self):
+        self.games = [mapped_game(i) for i in range(10)]
+
+    def test_json_round_trip(self):
+        """JSON payloads decode to GameOut data and keep the soft TTL."""
+        payload = PayloadCodec().encode(self.games, fresh_until=1234.5)
+        self.assertTrue(is_payload(payload))
+        value, fresh_until = decode(payload)
+        self.assertEqual(json.loads(dump_games(self.games)), value)
+        self.assertEqual(1234.5, fresh_until)
+        self.assertIsNone(decode(PayloadCodec().encode(self.games[0]))[1])
+
+    def test_body_is_response_json(self):
+        """json_body returns the GameOut JSON, compressed or not."""
+        expected = dump_games(self.games)
+        for threshold in (0, 1, 10**9):
+            payload = PayloadCodec(compress_min_bytes=threshold).encode(self.games)
+            self.assertEqual(expected, json_body(payload))
+
+    def test_compression_threshold(self):
+        """Bodies are compressed from the threshold on."""
+        plain = PayloadCodec(compress_min_bytes=0).encode(self.games)
+        compressed = PayloadCodec(compress_min_bytes=1024).encode(self.games)
+        small = PayloadCodec(compress_min_bytes=1024).encode(self.games[:0])
+        self.assertLess(len(compressed), len(plain) / 2)
+        self.assertEqual(b"[]", json_body(small))
+
+    def test_values_are_not_payloads(self):
+        """Plain values and JSON bytes are not mistaken for payloads."""
+        self.assertFalse(is_payload([{"id": 1}]))
+        self.assertFalse(is_payload(b'[{"id":1}]'))
+
+    def test_unknown_format(self):
+        """Unknown formats are rejected."""
+        with self.assertRaises(ValueError):
+            PayloadCodec("pickle")
+
+    @unittest.skipIf(msgpack_available(), "msgpack is installed")
+    def test_msgpack_missing(self):
+        """The msgpack format reports the missing package."""
+        with self.assertRaises(RuntimeError):
+            PayloadCodec("msgpack")
+
+    @unittest.skipUnless(msgpack_available(), "msgpack is not installed")
+    def test_msgpack_round_trip(self):
+        """msgpack payloads decode to the cached games and serialize to GameOut JSON."""
+        payload = PayloadCodec("msgpack").encode(self.games, fresh_until=1.0)
+        self.assertEqual((self.games, 1.0), decode(payload))
+        self.assertEqual(dump_games(self.games), json_body(payload))
+
+    def test_create_payload_codec(self):
+        """The codec follows IGDB_CACHE_PAYLOAD."""
+        settings = Settings()
+        settings.IGDB_CACHE_PAYLOAD = ""
+        self.assertIsNone(create_payload_codec(settings))
+        settings.IGDB_CACHE_PAYLOAD = "JSON"
+        settings.IGDB_CACHE_COMPRESS_MIN_BYTES = 0
+        codec = create_payload_codec(settings)
+        self.assertEqual(("json", 0), (codec.payload_format, codec.compress_min_bytes))
+
+
+class TestIGDBClientPayloads(unittest.TestCase):
+    """Tests for IGDBClient caching payloads."""
+
+    def setUp(self):
+        self.auth = MagicMock()
+        self.auth.get_token.return_value = "fake-token"
+        self.auth.client_id = "fake-client-id"
+        self.cache = InMemoryCache()
+        self.client = IGDBClient(
+            auth=self.auth, cache=self.cache, payload_codec=PayloadCodec()
+        )
+        self.games = [mapped_game(i) for i in range(1, 4)]
+
+    @patch("httpx.post")
+    def test_search_is_cached_as_payload(self, mock_post):
+        """Searches are stored as payloads and answered from them."""
+        mock_post.return_value = make_response([{"id": 1, "name": "Zelda"}])
+        first = self.client.search_games("Zelda")
+        self.assertTrue(is_payload(self.cache.get("search:zelda")))
+        self.assertEqual(
+            [1], [game["id"] for game in self.client.search_games("zelda")]
+        )
+        self.assertEqual(1, mock_post.call_count)
+        self.assertEqual(dump_games(first), self.client.cached_search_body(" ZELDA"))
+
+    def test_cached_search_body(self):
+        """Plain and filtered search bodies come from their own entries."""
+        filters = GameFilters(platforms=[6])
+        self.assertIsNone(self.client.cached_search_body("zelda"))
+        self.client._set_revalidating("search:zelda", self.games, SEARCH_TTL)
+        self.assertEqual(
+            dump_games(self.games), self.client.cached_search_body("zelda")
+        )
+        self.assertIsNone(self.client.cached_search_body("zelda", filters))
+        with patch("httpx.post") as mock_post:
+            mock_post.return_value = make_response([])
+            self.client.search_games_filtered("zelda", filters)
+        self.assertEqual(b"[]", self.client.cached_search_body("zelda", filters))
+
+    def test_stale_body_is_refreshed(self):
+        """A stale payload is returned while one background refresh runs."""
+        payload = PayloadCodec().encode(self.games, fresh_until=time.time() - 1)
+        self.cache.set("search:zelda", payload, ttl=600)
+        self.assertTrue(unwrap(payload)[1])
+        with patch.object(self.client.revalidator, "refresh") as refresh:
+            body = self.client.cached_search_body("zelda")
+        self.assertEqual(dump_games(self.games), body)
+        refresh.assert_called_once()
+
+    def test_games_are_cached_as_payloads(self):
+        """Games are stored as payloads and batch bodies keep request order."""
+        self.client._cache_games(self.games, self.cache)
+        self.client._cache_not_found([9], self.cache)
+        self.assertTrue(is_payload(self.cache.get("game:1")))
+        cached, to_fetch = self.client._get_games_from_cache([2, 1, 9], self.cache)
+        self.assertEqual(([2, 1], []), ([game["id"] for game in cached], to_fetch))
+        body = self.client.cached_games_body([3, 1, 9, 3])
+        self.assertEqual([3, 1, 3], [game["id"] for game in json.loads(body)])
+        self.assertIsNone(self.client.cached_games_body([1, 42]))
+        self.assertEqual(
+            json.loads(dump_games(self.games[1:2]))[0],
+            json.loads(self.client.cached_game_body(2)),
+        )
+
+    def test_off_without_codec(self):
+        """Without a codec entries stay values, and bodies are serialized from them."""
+        client = IGDBClient(auth=self.auth, cache=self.cache)
+        client._set_revalidating("search:zelda", self.games, SEARCH_TTL)
+        client._cache_games(self.games, self.cache)
+        self.assertIsInstance(self.cache.get("game:1"), dict)
+        self.assertEqual(dump_games(self.games), client.cached_search_body("zelda"))
+        self.assertEqual(dump_games(self.games[:1]), client.cached_games_body([1]))
+        # Entries written before ETags were stored are left to the client
+        self.cache.set("game:1", self.games[0], ttl=60)
+        self.assertIsNone(client.cached_games_body([1]))
+
+    def test_vocabularies_stay_values(self):
+        """Genres and platforms are not stored as payloads."""
+        self.client._set_revalidating("genres", [{"id": 1}], SEARCH_TTL)
+        self.assertIsInstance(self.cache.get("genres"), dict)
+
+
+class TestRedisCachePayloads(unittest.TestCase):
+    """Payloads are stored in Redis as they are."""
+
+    def test_round_trip(self):
+        """GET and MGET return payload bytes unchanged next to JSON values."""
+        payload = PayloadCodec().encode([mapped_game(1)], fresh_until=5.0)
+        with FakeRedisServer() as server:
+            cache = RedisCache.from_url(server.url)
+            cache.set_many({"search:zelda": payload, "genres": [{"id": 1}]})
+            self.assertEqual(payload, cache.get("search:zelda"))
+            self.assertEqual(
+                {"search:zelda": payload, "genres": [{"id": 1}]},
+                cache.get_many(["search:zelda", "genres"]),
+            )
+            self.assertEqual(payload, server.store()[b"igdb:search:zelda"][0])
+            cache.close()
+
+
+class TestPayloadRoutes(unittest.TestCase):
+    """Routes send cached payloads as the response body."""
+
+    def setUp(self):
+        auth = MagicMock()
+        auth.client_id = "fake-client-id"
+        self.client = AsyncIGDBClient(
+            auth=auth, cache=InMemoryCache(), payload_codec=PayloadCodec()
+        )
+        self.games = [mapped_game(i) for i in range(1, 3)]
+        self.client._set_revalidating("search:zelda", self.games, SEARCH_TTL)
+        self.client._cache_games(self.games, self.client.cache)
+        app.dependency_overrides[get_igdb_client] = lambda: self.client
+        self.http = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+
+    def test_hits_send_stored_bytes(self):
+        """Search, batch and single game hits are served without IGDB."""
+        with patch.object(AsyncIGDBClient, "_post") as post:
+            search = self.http.get("/igdb/search", params={"q": "Zelda"})
+            batch = self.http.get("/igdb/games", params={"ids": "2,1"})
+            single = self.http.get("/igdb/games/1")
+        post.assert_not_called()
+        self.assertEqual(dump_games(self.games), search.content)
+        self.assertEqual([2, 1], [game["id"] for game in batch.json()])
+        self.assertEqual(1, single.json()["id"])
+        self.assertEqual("application/json", single.headers["content-type"])
+
+
+class TestPayloadBenchmark(unittest.TestCase):
+    """Memory and throughput of cached search results as payloads vs values."""
+
+    def setUp(self):
+        self.games = [mapped_game(i) for i in range(10)]
+        auth = MagicMock()
+        self.value_client = IGDBClient(auth=auth, cache=InMemoryCache())
+        self.payload_client = IGDBClient(
+            auth=auth, cache=InMemoryCache(), payload_codec=PayloadCodec()
+        )
+        for client in (self.value_client, self.payload_client):
+            client._set_revalidating("search:zelda", self.games, SEARCH_TTL)
+
+    def test_memory_per_entry(self):
+        """A compressed payload takes less memory than the value."""
+        value = self.value_client.cache.get("search:zelda")
+        payload = self.payload_client.cache.get("search:zelda")
+        self.assertLess(approximate_size(payload), approximate_size(value))
+
+    @skip_unless_benchmarks
+    def test_hit_throughput(self):
+        """Serving a payload hit, against reading the value and serializing it."""
+        report(
+            "search hit, 10 games",
+            {
+                "value": lambda: dump_games(self.value_client.search_games("zelda")),
+                "payload": lambda: self.payload_client.cached_search_body("zelda"),
+            },
+            number=200,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,401 @@
+"""
+Unit tests for the IGDB rate limiter and concurrency governor.
+"""
+
+# pylint: disable=duplicate-code
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.core.config import Settings
+from src.igdb.cache import InMemoryCache
+from src.igdb.client import IGDBClient
+from src.igdb.ratelimit import (
+    Priority,
+    RateLimiter,
+    RateLimitExceeded,
+    SharedLimits,
+    TokenBucket,
+    background_priority,
+    create_rate_limiter,
+    request_priority,
+)
+from src.igdb.redis_cache import RedisCache
+from src.igdb.revalidate import wrap
+from tests.utils.fake_redis import FakeRedisServer
+
+
+def make_response(rows):
+    """Build a fake httpx response returning rows."""
+    response = MagicMock()
+    response.json.return_value = rows
+    response.raise_for_status.return_value = None
+    return response
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Tests for the token bucket."""
+
+    def test_burst_then_refill(self):
+        """A full bucket grants its capacity, then refills at the configured rate."""
+        bucket = TokenBucket(rate=4, capacity=2)
+        now = bucket.updated
+        for _ in range(2):
+            self.assertEqual(0, bucket.delay(now))
+            bucket.take(now)
+        self.assertAlmostEqual(0.25, bucket.delay(now))
+        self.assertEqual(0, bucket.delay(now + 0.25))
+
+    def test_capacity_caps_refill(self):
+        """Idle time never accumulates more than capacity tokens."""
+        bucket = TokenBucket(rate=4, capacity=2)
+        bucket.delay(bucket.updated + 100)
+        self.assertEqual(2, bucket.tokens)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Tests for the threaded acquire path."""
+
+    def test_rate_is_enforced(self):
+        """Requests beyond the burst are spaced 1/rate seconds apart."""
+        limiter = RateLimiter(rate=20, burst=2, max_concurrent=10)
+        start = time.monotonic()
+        for _ in range(6):
+            with limiter.acquire():
+                pass
+        # 2 from the burst, 4 more at 20/s
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+        self.assertEqual(6, limiter.stats()["lanes"]["interactive"]["acquired"])
+
+    def test_concurrency_is_capped(self):
+        """No more than max_concurrent requests are in flight at once."""
+        limiter = RateLimiter(rate=1000, burst=100, max_concurrent=3)
+        lock = threading.Lock()
+        state = {"current": 0, "peak": 0}
+
+        def call():
+            with limiter.acquire():
+                with lock:
+                    state["current"] += 1
+                    state["peak"] = max(state["peak"], state["current"])
+                time.sleep(0.02)
+                with lock:
+                    state["current"] -= 1
+
+        threads = [threading.Thread(target=call) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(3, state["peak"])
+        self.assertEqual(0, limiter.stats()["in_flight"])
+
+    def test_interactive_lane_goes_first(self):
+        """Queued interactive requests are served before earlier background ones."""
+        limiter = RateLimiter(rate=1000, burst=100, max_concurrent=1)
+        order = []
+        holder = limiter.acquire()
+        holder.__enter__()  # pylint: disable=unnecessary-dunder-call
+
+        def call(name, priority):
+            with limiter.acquire(priority):
+                order.append(name)
+
+        threads = [
+            threading.Thread(target=call, args=("bg1", Priority.BACKGROUND)),
+            threading.Thread(target=call, args=("bg2", Priority.BACKGROUND)),
+            threading.Thread(target=call, args=("ui", Priority.INTERACTIVE)),
+        ]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.02)
+        self.assertEqual(
+            {"interactive": 1, "background": 2},
+            {name: lane["queued"] for name, lane in limiter.stats()["lanes"].items()},
+        )
+        holder.__exit__(None, None, None)
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(["ui", "bg1", "bg2"], order)
+        interactive = limiter.stats()["lanes"]["interactive"]
+        self.assertEqual(1, interactive["waited"])
+        self.assertGreater(interactive["max_wait"], 0)
+
+    def test_fail_fast_over_budget(self):
+        """A caller whose expected wait exceeds its budget is rejected at once."""
+        limiter = RateLimiter(
+            rate=1, burst=1, max_concurrent=8, max_wait={Priority.INTERACTIVE: 0.5}
+        )
+        with limiter.acquire():
+            pass
+        start = time.monotonic()
+        with self.assertRaises(RateLimitExceeded) as ctx:
+            with limiter.acquire():
+                pass
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertAlmostEqual(1.0, ctx.exception.retry_after, delta=0.1)
+        self.assertEqual(1, limiter.stats()["lanes"]["interactive"]["rejected"])
+        self.assertEqual([], limiter._waiting)  # pylint: disable=protected-access
+
+    def test_background_lane_has_no_budget(self):
+        """Lanes without a budget wait instead of failing."""
+        limiter = RateLimiter(
+            rate=10, burst=1, max_concurrent=8, max_wait={Priority.INTERACTIVE: 0.01}
+        )
+        with limiter.acquire():
+            pass
+        with limiter.acquire(Priority.BACKGROUND):
+            pass
+        self.assertEqual(1, limiter.stats()["lanes"]["background"]["acquired"])
+
+    def test_priority_from_context(self):
+        """background_priority() switches the lane used by default."""
+        limiter = RateLimiter(rate=100, max_concurrent=8)
+        with background_priority():
+            self.assertEqual(Priority.BACKGROUND, request_priority.get())
+            with limiter.acquire():
+                pass
+        self.assertEqual(Priority.INTERACTIVE, request_priority.get())
+        self.assertEqual(1, limiter.stats()["lanes"]["background"]["acquired"])
+
+    def test_error_in_block_releases_slot(self):
+        """An exception inside the block still frees the concurrency slot."""
+        limiter = RateLimiter(rate=100, max_concurrent=1)
+        with self.assertRaises(RuntimeError):
+            with limiter.acquire():
+                raise RuntimeError("IGDB down")
+        self.assertEqual(0, limiter.stats()["in_flight"])
+
+
+class TestAsyncRateLimiter(unittest.IsolatedAsyncioTestCase):
+    """Tests for the asyncio acquire path."""
+
+    async def test_concurrency_is_capped(self):
+        """Coroutines share the concurrency cap."""
+        limiter = RateLimiter(rate=1000, burst=100, max_concurrent=2)
+        state = {"current": 0, "peak": 0}
+
+        async def call():
+            async with limiter.acquire_async():
+                state["current"] += 1
+                state["peak"] = max(state["peak"], state["current"])
+                await asyncio.sleep(0.01)
+                state["current"] -= 1
+
+        await asyncio.gather(*(call() for _ in range(8)))
+        self.assertEqual(2, state["peak"])
+        self.assertEqual(8, limiter.stats()["lanes"]["interactive"]["acquired"])
+
+    async def test_shared_with_threads(self):
+        """A slot released by a thread wakes a waiting coroutine."""
+        limiter = RateLimiter(rate=1000, burst=100, max_concurrent=1)
+        holder = limiter.acquire()
+        holder.__enter__()  # pylint: disable=unnecessary-dunder-call
+        timer = threading.Timer(0.05, holder.__exit__, (None, None, None))
+        timer.start()
+        start = time.monotonic()
+        async with limiter.acquire_async():
+            waited = time.monotonic() - start
+        timer.join()
+        self.assertGreaterEqual(waited, 0.04)
+        self.assertLess(waited, 1)
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        """A cancelled coroutine is removed from the queue."""
+        limiter = RateLimiter(rate=1000, burst=100, max_concurrent=1)
+        async with limiter.acquire_async():
+            task = asyncio.ensure_future(limiter.acquire_async().__aenter__())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        self.assertEqual([], limiter._waiting)  # pylint: disable=protected-access
+        self.assertEqual(0, limiter.stats()["in_flight"])
+
+    async def test_shared_limits_run_off_the_loop_and_lock(self):
+        """Shared counters are claimed on a worker thread without the limiter lock."""
+        limiter = RateLimiter(rate=1000, burst=100)
+        calls = []
+
+        class BlockingCache(InMemoryCache):
+            """InMemoryCache flagged as blocking that records its callers."""
+
+            blocking = True
+
+            def incr(self, key, amount=1, ttl=None):
+                lock = limiter._lock  # pylint: disable=protected-access
+                calls.append((threading.get_ident(), lock.locked()))
+                return super().incr(key, amount, ttl)
+
+        limiter.shared = SharedLimits(BlockingCache(), rate=100, max_concurrent=4)
+        async with limiter.acquire_async():
+            pass
+        with limiter.acquire():
+            pass
+        self.assertEqual(6, len(calls))
+        self.assertNotIn(True, [locked for _, locked in calls])
+        self.assertNotIn(threading.get_ident(), [thread for thread, _ in calls[:3]])
+
+
+class TestSharedLimits(unittest.TestCase):
+    """Tests for limits shared through the cache backend."""
+
+    def test_concurrency_across_limiters(self):
+        """Two limiters on one cache share the in-flight cap."""
+        shared = SharedLimits(InMemoryCache(), rate=100, max_concurrent=1)
+        self.assertEqual(0, shared.try_acquire())
+        self.assertGreater(shared.try_acquire(), 0)
+        shared.release()
+        self.assertEqual(0, shared.try_acquire())
+
+    def test_rate_window(self):
+        """Requests beyond the per-second budget wait for the next window."""
+        shared = SharedLimits(InMemoryCache(), rate=2, max_concurrent=10)
+        with patch("src.igdb.ratelimit.time.time", return_value=1000.25):
+            self.assertEqual(0, shared.try_acquire())
+            self.assertEqual(0, shared.try_acquire())
+            self.assertAlmostEqual(0.75, shared.try_acquire())
+        with patch("src.igdb.ratelimit.time.time", return_value=1001.0):
+            self.assertEqual(0, shared.try_acquire())
+
+    def test_rejected_polls_do_not_use_up_the_window(self):
+        """Polls refused by the rate window are taken back out of it."""
+        cache = InMemoryCache()
+        shared = SharedLimits(cache, rate=2, max_concurrent=10)
+        with patch("src.igdb.ratelimit.time.time", return_value=1000.25):
+            for _ in range(5):
+                shared.try_acquire()
+            self.assertEqual(2, cache.get("ratelimit:window:1000"))
+            self.assertEqual(2, cache.get("ratelimit:in_flight"))
+
+    def test_in_flight_ttl_is_set_on_creation(self):
+        """Later increments do not extend the in-flight counter's TTL."""
+        with FakeRedisServer() as server:
+            cache = RedisCache.from_url(server.url)
+            shared = SharedLimits(cache, rate=100, max_concurrent=10, in_flight_ttl=60)
+            shared.try_acquire()
+            expire_at = server.store()[b"igdb:ratelimit:in_flight"][1]
+            time.sleep(0.05)
+            shared.try_acquire()
+            shared.release()
+            self.assertEqual(expire_at, server.store()[b"igdb:ratelimit:in_flight"][1])
+            self.assertEqual(1, cache.get("ratelimit:in_flight"))
+            cache.close()
+
+    def test_workers_share_redis_counters(self):
+        """Limiters in different processes coordinate through redis."""
+        with FakeRedisServer() as server:
+            first = RedisCache.from_url(server.url)
+            second = RedisCache.from_url(server.url)
+            worker_a = RateLimiter(rate=100, shared=SharedLimits(first, 100, 1))
+            worker_b = RateLimiter(rate=100, shared=SharedLimits(second, 100, 1))
+            acquired = threading.Event()
+
+            def call():
+                with worker_b.acquire():
+                    acquired.set()
+
+            with worker_a.acquire():
+                waiter = threading.Thread(target=call)
+                waiter.start()
+                self.assertFalse(acquired.wait(0.1))
+            self.assertTrue(acquired.wait(2))
+            waiter.join(2)
+            self.assertEqual(0, second.get("ratelimit:in_flight"))
+            first.close()
+            second.close()
+
+    def test_unavailable_backend_is_skipped(self):
+        """If the shared backend is down only the local limits apply."""
+        cache = RedisCache.from_url("redis://127.0.0.1:1/0", timeout=0.1)
+        limiter = RateLimiter(rate=100, shared=SharedLimits(cache, 100, 1))
+        with self.assertLogs("igdb.cache", level="WARNING"):
+            with limiter.acquire():
+                with limiter.acquire():
+                    pass
+        cache.close()
+
+
+class TestCreateRateLimiter(unittest.TestCase):
+    """Tests for building the limiter from settings."""
+
+    def make_settings(self, rps=4.0, max_wait=5.0):
+        """Build settings with the given rate limit."""
+        settings = Settings()
+        settings.IGDB_RATE_LIMIT_RPS = rps
+        settings.IGDB_RATE_LIMIT_MAX_WAIT = max_wait
+        return settings
+
+    def test_defaults(self):
+        """Defaults follow IGDB's 4 requests/second and 8 concurrent requests."""
+        limiter = create_rate_limiter(self.make_settings(), InMemoryCache())
+        self.assertEqual(4, limiter.bucket.rate)
+        self.assertEqual(8, limiter.max_concurrent)
+        self.assertEqual({Priority.INTERACTIVE: 5.0}, limiter.max_wait)
+        self.assertIsNone(limiter.shared)
+
+    def test_disabled(self):
+        """A zero rate disables the limiter."""
+        self.assertIsNone(create_rate_limiter(self.make_settings(rps=0)))
+
+    def test_redis_cache_shares_limits(self):
+        """A redis-backed cache carries the cross-worker limits."""
+        cache = RedisCache.from_url("redis://localhost:6379/0")
+        limiter = create_rate_limiter(self.make_settings(), cache)
+        self.assertIsInstance(limiter.shared, SharedLimits)
+        cache.close()
+
+
+class TestIGDBClientRateLimiting(unittest.TestCase):
+    """Tests for the limiter around IGDBClient upstream calls."""
+
+    def setUp(self):
+        auth = MagicMock()
+        auth.get_token.return_value = "fake-token"
+        auth.client_id = "fake-client-id"
+        self.cache = InMemoryCache()
+        self.limiter = RateLimiter(rate=100, max_concurrent=8)
+        self.client = IGDBClient(auth=auth, cache=self.cache, rate_limiter=self.limiter)
+
+    @patch("httpx.post")
+    def test_upstream_calls_are_limited(self, mock_post):
+        """Every upstream call goes through the limiter and shows up in stats."""
+        mock_post.return_value = make_response([{"id": 1, "name": "Zelda"}])
+        self.client.search_games("zelda")
+        self.client.get_genres()
+        lanes = self.client.stats()["rate_limiter"]["lanes"]
+        self.assertEqual(2, lanes["interactive"]["acquired"])
+
+    @patch("httpx.post")
+    def test_background_refresh_uses_background_lane(self, mock_post):
+        """Stale-while-revalidate refreshes queue behind interactive requests."""
+        mock_post.return_value = make_response([{"id": 1, "name": "New"}])
+        self.cache.set("genres", wrap([{"id": 1, "name": "Old"}], -1), ttl=60)
+        self.client.get_genres()
+        deadline = time.monotonic() + 2
+        while (
+            self.client.revalidator.stats()["in_progress"]
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.01)
+        lanes = self.limiter.stats()["lanes"]
+        self.assertEqual(0, lanes["interactive"]["acquired"])
+        self.assertEqual(1, lanes["background"]["acquired"])
+
+    @patch("httpx.post")
+    def test_over_budget_raises(self, mock_post):
+        """An exhausted budget surfaces as RateLimitExceeded, not a network call."""
+        self.client.rate_limiter = RateLimiter(
+            rate=0.1, burst=1, max_wait={Priority.INTERACTIVE: 1}
+        )
+        mock_post.return_value = make_response([])
+        self.client.search_games("a")
+        with self.assertRaises(RateLimitExceeded):
+            self.client.search_games("b")
+        self.assertEqual(1, mock_post.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,219 @@
+"""
+Unit tests and benchmarks for game records, the single-pass mapper and the
+direct response serializer.
+"""
+
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from src.api.igdb import get_igdb_client
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.records import (
+    GameRecord,
+    dump_game,
+    dump_games,
+    map_game,
+)
+from src.igdb.schemas import GameOut
+from src.main import app
+from tests.utils.benchmark import report, skip_unless_benchmarks
+
+IMAGE_BASE = "https://images.igdb.com/igdb/image/upload"
+
+
+def raw_game(game_id, cover_url=None):
+    """Build a raw IGDB game as returned for client.GAME_FIELDS."""
+    game = {
+        "id": game_id,
+        "name": f"Game {game_id} é",
+        "summary": 'A "quoted" summary. ' * 10,
+        "first_release_date": 1500000000 + game_id,
+        "genres": [{"id": 12, "name": "RPG"}, {"id": 31, "name": "Adventure"}],
+        "platforms": [{"id": 6, "name": "PC"}, {"id": 48}],
+    }
+    if cover_url:
+        game["cover"] = {"id": game_id, "url": cover_url}
+    return game
+
+
+def validate_like_fastapi(games):
+    """Serialize games the way a GameOut response_model does."""
+    adapter = TypeAdapter(list[GameOut])
+    data = adapter.dump_python(adapter.validate_python(games), mode="json")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class TestMapGame(unittest.TestCase):
+    """Tests for map_game and GameRecord."""
+
+    def test_igdb_cover(self):
+        """IGDB cover URLs are filled into every size template."""
+        record = map_game(
+            raw_game(1, "//images.igdb.com/igdb/image/upload/t_thumb/co1r6b.jpg")
+        )
+        self.assertEqual(f"{IMAGE_BASE}/t_cover_big/co1r6b.jpg", record.cover_url)
+        self.assertEqual(
+            {
+                "thumb": f"{IMAGE_BASE}/t_thumb/co1r6b.jpg",
+                "small": f"{IMAGE_BASE}/t_cover_small/co1r6b.jpg",
+                "medium": f"{IMAGE_BASE}/t_cover_big/co1r6b.jpg",
+                "large": f"{IMAGE_BASE}/t_720p/co1r6b.jpg",
+            },
+            record.as_dict()["cover_images"],
+        )
+        self.assertEqual(("RPG", "Adventure"), record.genres)
+        self.assertEqual(("PC",), record.platforms)
+        self.assertEqual(1500000001, record.release_date)
+
+    def test_no_cover(self):
+        """Games without a cover map to no URL and empty cover images."""
+        mapped = map_game({"id": 2, "name": "Bare"}).as_dict()
+        self.assertIsNone(mapped["cover_url"])
+        self.assertEqual({}, mapped["cover_images"])
+        self.assertIsNone(mapped["genres"])
+        self.assertIsNone(mapped["platforms"])
+
+    def test_other_cover_urls(self):
+        """Sizeless and non-IGDB cover URLs are handled as before."""
+        sizeless = map_game(
+            raw_game(3, "//images.igdb.com/igdb/image/upload/co2abc.jpg")
+        )
+        self.assertEqual(f"{IMAGE_BASE}/t_cover_big/co2abc.jpg", sizeless.cover_url)
+        other = map_game(raw_game(4, "https://example.com/cover.jpg")).as_dict()
+        self.assertEqual("https://example.com/cover.jpg", other["cover_url"])
+        self.assertEqual({}, other["cover_images"])
+
+    def test_record_is_compact(self):
+        """Records and their cover images are slotted, without an instance dict."""
+        record = map_game(
+            raw_game(5, "//images.igdb.com/igdb/image/upload/t_thumb/co5.jpg")
+        )
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertFalse(hasattr(record.cover_images, "__dict__"))
+
+    def test_dict_round_trip(self):
+        """A record rebuilt from its dict is equal to the original."""
+        record = map_game(
+            raw_game(6, "//images.igdb.com/igdb/image/upload/t_thumb/co6.jpg")
+        )
+        self.assertEqual(record, GameRecord.from_dict(record.as_dict()))
+
+
+class TestDumpGames(unittest.TestCase):
+    """Tests for the direct serializer."""
+
+    def test_matches_game_out(self):
+        """Records and dicts serialize to what GameOut validation would produce."""
+        games = [
+            map_game(
+                raw_game(1, "//images.igdb.com/igdb/image/upload/t_thumb/co1.jpg")
+            ),
+            map_game(raw_game(2)),
+            map_game(raw_game(3, "https://example.com/cover.jpg")),
+        ]
+        dicts = [game.as_dict() for game in games]
+        expected = json.loads(validate_like_fastapi(dicts))
+        self.assertEqual(expected, json.loads(dump_games(games)))
+        self.assertEqual(expected, json.loads(dump_games(dicts)))
+        self.assertEqual(expected[0], json.loads(dump_game(dicts[0])))
+
+    def test_partial_dicts(self):
+        """Missing optional fields are null and extra keys are dropped."""
+        data = json.loads(dump_games([{"id": 7, "name": "Sparse", "extra": 1}]))
+        self.assertEqual(
+            [
+                {
+                    "id": 7,
+                    "name": "Sparse",
+                    "cover_url": None,
+                    "cover_images": None,
+                    "summary": None,
+                    "release_date": None,
+                    "genres": None,
+                    "platforms": None,
+                }
+            ],
+            data,
+        )
+
+
+class TestRouteBodies(unittest.TestCase):
+    """Route bodies written by dump_games are what GameOut validation would send."""
+
+    def setUp(self):
+        auth = MagicMock()
+        auth.client_id = "fake-client-id"
+        client = AsyncIGDBClient(auth=auth)
+        app.dependency_overrides[get_igdb_client] = lambda: client
+        self.http = TestClient(app)
+        self.games = [
+            map_game(
+                raw_game(1, "//images.igdb.com/igdb/image/upload/t_thumb/co1.jpg")
+            ).as_dict(),
+            map_game(raw_game(2)).as_dict(),
+        ]
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+
+    def test_bodies_validate_as_game_out(self):
+        """Search, batch and single game bodies pass the routes' response_model."""
+        with patch.object(
+            AsyncIGDBClient, "search_games", return_value=self.games
+        ), patch.object(
+            AsyncIGDBClient, "get_games_by_ids", return_value=self.games
+        ), patch.object(
+            AsyncIGDBClient, "get_game_by_id", return_value=self.games[0]
+        ):
+            search = self.http.get("/igdb/search", params={"q": "game"})
+            batch = self.http.get("/igdb/games", params={"ids": "1,2"})
+            single = self.http.get("/igdb/games/1")
+        expected = validate_like_fastapi(self.games)
+        self.assertEqual(expected, search.content)
+        self.assertEqual(expected, batch.content)
+        game = GameOut.model_validate_json(single.content)
+        self.assertEqual(json.loads(expected)[0], game.model_dump(mode="json"))
+
+
+class TestMappingBenchmark(unittest.TestCase):
+    """Benchmarks for mapping and serializing 500 games; see tests/utils/benchmark.py."""
+
+    def setUp(self):
+        self.raw = [
+            raw_game(i, f"//images.igdb.com/igdb/image/upload/t_thumb/co{i:05x}.jpg")
+            for i in range(500)
+        ]
+
+    @skip_unless_benchmarks
+    def test_map_and_serialize_500_games(self):
+        """Mapping to records and dumping them, against dicts validated through GameOut."""
+        report(
+            "map and serialize 500 games",
+            {
+                "records": lambda: dump_games([map_game(game) for game in self.raw]),
+                "GameOut validation": lambda: validate_like_fastapi(
+                    [map_game(game).as_dict() for game in self.raw]
+                ),
+            },
+            number=5,
+        )
+
+    @skip_unless_benchmarks
+    def test_serialize_500_cached_games(self):
+        """Serializing cached dicts directly, against a GameOut validation pass."""
+        cached = [map_game(game).as_dict() for game in self.raw]
+        report(
+            "serialize 500 cached games",
+            {
+                "dump_games": lambda: dump_games(cached),
+                "GameOut validation": lambda: validate_like_fastapi(cached),
+            },
+            number=5,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,329 @@
+"""
+Unit tests for IGDB retries with backoff and per-endpoint circuit breakers.
+"""
+
+# pylint: disable=duplicate-code
+import threading
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+from src.core.config import Settings
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.cache import InMemoryCache
+from src.igdb.client import IGDBClient
+from src.igdb.ratelimit import RateLimitExceeded
+from src.igdb.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakers,
+    CircuitOpenError,
+    RetryPolicy,
+    create_circuit_breakers,
+    create_retry_policy,
+    is_transient,
+)
+from src.igdb.revalidate import wrap
+
+
+def status_error(status_code):
+    """Build an HTTPStatusError for a response with the given status."""
+    request = httpx.Request("POST", "https://api.igdb.com/v4/games")
+    response = httpx.Response(status_code, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+def fail(breaker, exc):
+    """Run one failing call through a breaker."""
+    try:
+        with breaker.protect():
+            raise exc
+    except type(exc):
+        pass
+
+
+def succeed(breaker):
+    """Run one successful call through a breaker."""
+    with breaker.protect():
+        pass
+
+
+class TestClassification(unittest.TestCase):
+    """Tests for transient error detection."""
+
+    def test_transient_errors(self):
+        """Timeouts, connection errors, 429 and 5xx are transient."""
+        self.assertTrue(is_transient(httpx.ReadTimeout("slow")))
+        self.assertTrue(is_transient(httpx.ConnectError("down")))
+        for status in (429, 500, 502, 503, 504):
+            self.assertTrue(is_transient(status_error(status)))
+
+    def test_permanent_errors(self):
+        """Client errors and local errors are not retried."""
+        for status in (400, 401, 404):
+            self.assertFalse(is_transient(status_error(status)))
+        self.assertFalse(is_transient(ValueError("bad")))
+        self.assertFalse(is_transient(RateLimitExceeded(2, 1)))
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Tests for retries with jittered backoff."""
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Delays are random, grow exponentially and never exceed max_delay."""
+        policy = RetryPolicy(attempts=5, base_delay=0.1, max_delay=0.3)
+        for attempt, cap in ((0, 0.1), (1, 0.2), (2, 0.3), (6, 0.3)):
+            delays = [policy.backoff(attempt) for _ in range(50)]
+            self.assertTrue(all(0 <= delay <= cap for delay in delays))
+            self.assertGreater(len(set(delays)), 1)
+
+    def test_transient_failure_is_retried(self):
+        """A 503 followed by success returns the result."""
+        policy = RetryPolicy(attempts=3, base_delay=0)
+        fn = MagicMock(side_effect=[status_error(503), "ok"])
+        self.assertEqual("ok", policy.call(fn))
+        self.assertEqual(2, fn.call_count)
+        self.assertEqual({"retries": 1, "recovered": 1, "exhausted": 0}, policy.stats())
+
+    def test_gives_up_after_attempts(self):
+        """The last error is raised once all attempts failed."""
+        policy = RetryPolicy(attempts=3, base_delay=0)
+        fn = MagicMock(side_effect=httpx.ConnectError("down"))
+        with self.assertRaises(httpx.ConnectError):
+            policy.call(fn)
+        self.assertEqual(3, fn.call_count)
+        self.assertEqual(1, policy.stats()["exhausted"])
+
+    def test_permanent_failure_is_not_retried(self):
+        """A 404 is raised at once."""
+        policy = RetryPolicy(attempts=3, base_delay=0)
+        fn = MagicMock(side_effect=status_error(404))
+        with self.assertRaises(httpx.HTTPStatusError):
+            policy.call(fn)
+        self.assertEqual(1, fn.call_count)
+
+
+class TestAsyncRetryPolicy(unittest.IsolatedAsyncioTestCase):
+    """Tests for retries of coroutines."""
+
+    async def test_transient_failure_is_retried(self):
+        """A timeout followed by success returns the result."""
+        policy = RetryPolicy(attempts=3, base_delay=0)
+        fn = AsyncMock(side_effect=[httpx.ReadTimeout("slow"), "ok"])
+        self.assertEqual("ok", await policy.acall(fn))
+        self.assertEqual(1, policy.stats()["recovered"])
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Tests for the per-endpoint circuit breaker."""
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(
+            "games", failure_rate=0.5, min_calls=4, window=10, open_seconds=0.05
+        )
+
+    def test_opens_past_failure_rate(self):
+        """The circuit opens once enough calls fail, then fails fast."""
+        succeed(self.breaker)
+        fail(self.breaker, status_error(500))
+        succeed(self.breaker)
+        self.assertEqual(CLOSED, self.breaker.state)
+        fail(self.breaker, httpx.ReadTimeout("slow"))
+        self.assertEqual(OPEN, self.breaker.state)
+        with self.assertRaises(CircuitOpenError) as ctx:
+            succeed(self.breaker)
+        self.assertEqual("games", ctx.exception.endpoint)
+        self.assertGreater(ctx.exception.retry_after, 0)
+        stats = self.breaker.stats()
+        self.assertEqual(1, stats["rejected"])
+        self.assertEqual({"closed->open": 1}, stats["transitions"])
+
+    def test_min_calls(self):
+        """A few failures alone do not open the circuit."""
+        for _ in range(3):
+            fail(self.breaker, status_error(502))
+        self.assertEqual(CLOSED, self.breaker.state)
+
+    def test_non_transient_errors_count_as_success(self):
+        """A 404 shows IGDB is answering; local errors are ignored."""
+        for _ in range(4):
+            fail(self.breaker, status_error(404))
+            fail(self.breaker, RateLimitExceeded(2, 1))
+        self.assertEqual(CLOSED, self.breaker.state)
+        self.assertEqual(4, self.breaker.stats()["window_calls"])
+
+    def open_circuit(self):
+        """Open the circuit and wait out the cool-down."""
+        for _ in range(4):
+            fail(self.breaker, status_error(500))
+        time.sleep(0.06)
+
+    def test_successful_probe_closes(self):
+        """After the cool-down a successful probe closes the circuit."""
+        self.open_circuit()
+        succeed(self.breaker)
+        self.assertEqual(CLOSED, self.breaker.state)
+        self.assertEqual(
+            {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1},
+            self.breaker.stats()["transitions"],
+        )
+
+    def test_failed_probe_reopens(self):
+        """A failed probe re-opens the circuit for another cool-down."""
+        self.open_circuit()
+        fail(self.breaker, httpx.ConnectError("down"))
+        self.assertEqual(OPEN, self.breaker.state)
+        with self.assertRaises(CircuitOpenError):
+            succeed(self.breaker)
+
+    def test_single_probe(self):
+        """Only one probe runs at a time while half-open."""
+        self.open_circuit()
+        entered, release = threading.Event(), threading.Event()
+
+        def probe():
+            with self.breaker.protect():
+                entered.set()
+                release.wait(1)
+
+        thread = threading.Thread(target=probe)
+        thread.start()
+        entered.wait(1)
+        self.assertEqual(HALF_OPEN, self.breaker.state)
+        with self.assertRaises(CircuitOpenError):
+            succeed(self.breaker)
+        release.set()
+        thread.join(1)
+        self.assertEqual(CLOSED, self.breaker.state)
+
+    def test_group_has_breaker_per_endpoint(self):
+        """Endpoints fail independently."""
+        breakers = CircuitBreakers(min_calls=1, open_seconds=10)
+        fail(breakers.get("genres"), status_error(500))
+        self.assertEqual(OPEN, breakers.get("genres").state)
+        self.assertEqual(CLOSED, breakers.get("games").state)
+        self.assertEqual({"games", "genres", "platforms"}, set(breakers.stats()))
+
+
+class TestFactories(unittest.TestCase):
+    """Tests for building retries and breakers from settings."""
+
+    def test_defaults(self):
+        """Defaults retry 3 times and build a breaker per endpoint."""
+        settings = Settings()
+        self.assertEqual(3, create_retry_policy(settings).attempts)
+        breakers = create_circuit_breakers(settings)
+        self.assertEqual(15, breakers.get("games").open_seconds)
+
+    def test_disabled(self):
+        """A single attempt and a zero open time disable both features."""
+        settings = Settings()
+        settings.IGDB_RETRY_ATTEMPTS = 1
+        settings.IGDB_BREAKER_OPEN_SECONDS = 0
+        self.assertIsNone(create_retry_policy(settings))
+        self.assertIsNone(create_circuit_breakers(settings))
+
+
+class FakeIGDB:
+    """Fake IGDB answering with a scripted list of status codes."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.requests = 0
+
+    def handler(self, _request):
+        """Return the next scripted status, then 200s."""
+        self.requests += 1
+        status = self.statuses.pop(0) if self.statuses else 200
+        if status != 200:
+            return httpx.Response(status)
+        return httpx.Response(200, json=[{"id": 1, "name": "Zelda"}])
+
+
+class TestIGDBClientResilience(unittest.TestCase):
+    """Tests for retries and breakers around IGDBClient calls."""
+
+    def make_client(self, igdb, **kwargs):
+        """Build a client against the fake IGDB."""
+        auth = MagicMock()
+        auth.get_token.return_value = "token"
+        auth.client_id = "client-id"
+        http_client = httpx.Client(transport=httpx.MockTransport(igdb.handler))
+        return IGDBClient(auth=auth, http_client=http_client, **kwargs)
+
+    def test_retries_transient_upstream_errors(self):
+        """A 502 and a 503 are retried transparently."""
+        igdb = FakeIGDB([502, 503])
+        client = self.make_client(
+            igdb, retry_policy=RetryPolicy(attempts=3, base_delay=0)
+        )
+        self.assertEqual("Zelda", client.search_games("zelda")[0]["name"])
+        self.assertEqual(3, igdb.requests)
+        self.assertEqual(2, client.stats()["retries"]["retries"])
+
+    def test_open_circuit_fails_fast(self):
+        """Once the games circuit opens, IGDB is no longer called."""
+        igdb = FakeIGDB([500] * 10)
+        client = self.make_client(
+            igdb,
+            circuit_breakers=CircuitBreakers(min_calls=2, open_seconds=10),
+        )
+        for query in ("a", "b"):
+            with self.assertRaises(httpx.HTTPStatusError):
+                client.search_games(query)
+        with self.assertRaises(CircuitOpenError):
+            client.search_games("c")
+        self.assertEqual(2, igdb.requests)
+        breakers = client.stats()["circuit_breakers"]
+        self.assertEqual("open", breakers["games"]["state"])
+        self.assertEqual("closed", breakers["genres"]["state"])
+
+    def test_stale_entries_served_while_open(self):
+        """Stale cached genres are still served while the circuit is open."""
+        igdb = FakeIGDB([])
+        cache = InMemoryCache()
+        cache.set("genres", wrap([{"id": 1, "name": "RPG"}], -1), ttl=60)
+        breakers = CircuitBreakers(min_calls=1, open_seconds=10)
+        fail(breakers.get("genres"), status_error(500))
+        client = self.make_client(igdb, cache=cache, circuit_breakers=breakers)
+        with self.assertLogs("igdb.revalidate", level="WARNING"):
+            self.assertEqual("RPG", client.get_genres()[0]["name"])
+            deadline = time.monotonic() + 2
+            while (
+                client.revalidator.stats()["in_progress"]
+                and time.monotonic() < deadline
+            ):
+                time.sleep(0.01)
+        self.assertEqual(0, igdb.requests)
+
+
+class TestAsyncIGDBClientResilience(unittest.IsolatedAsyncioTestCase):
+    """Tests for retries and breakers around AsyncIGDBClient calls."""
+
+    async def test_retries_inside_breaker(self):
+        """Retried calls count once towards the breaker."""
+        igdb = FakeIGDB([504])
+        auth = MagicMock()
+        auth.client_id = "client-id"
+        auth.aget_token = AsyncMock(return_value="token")
+        breakers = CircuitBreakers(min_calls=1)
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(igdb.handler)
+        ) as http_client:
+            client = AsyncIGDBClient(
+                auth=auth,
+                http_client=http_client,
+                retry_policy=RetryPolicy(attempts=2, base_delay=0),
+                circuit_breakers=breakers,
+            )
+            self.assertEqual("Zelda", (await client.get_genres())[0]["name"])
+        self.assertEqual(2, igdb.requests)
+        stats = breakers.get("genres").stats()
+        self.assertEqual((1, 0), (stats["window_calls"], stats["window_failures"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
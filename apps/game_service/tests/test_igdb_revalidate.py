@@ -0,0 +1,209 @@
+"""
+Unit tests for stale-while-revalidate serving of IGDB search, genres and platforms.
+"""
+
+# pylint: disable=duplicate-code
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.cache import InMemoryCache
+from src.igdb.client import IGDBClient
+from src.igdb.revalidate import (
+    SEARCH_TTL,
+    AsyncRevalidator,
+    Revalidator,
+    TTLPolicy,
+    unwrap,
+    wrap,
+)
+
+
+def make_response(rows):
+    """Build a fake httpx response returning rows."""
+    response = MagicMock()
+    response.json.return_value = rows
+    response.raise_for_status.return_value = None
+    return response
+
+
+class TestEntryFormat(unittest.TestCase):
+    """Tests for wrap/unwrap."""
+
+    def test_fresh_and_stale(self):
+        """Entries are fresh before the soft TTL and stale after it."""
+        entry = wrap([1], soft_ttl=10, now=100)
+        self.assertEqual(([1], False), unwrap(entry, now=105))
+        self.assertEqual(([1], True), unwrap(entry, now=110))
+
+    def test_plain_values_are_fresh(self):
+        """Values cached without a policy are returned unchanged and never stale."""
+        self.assertEqual(([{"id": 1}], False), unwrap([{"id": 1}]))
+        self.assertEqual(({"id": 1}, False), unwrap({"id": 1}))
+
+
+class TestRevalidator(unittest.TestCase):
+    """Tests for the threaded revalidator."""
+
+    def test_one_refresh_per_key(self):
+        """Concurrent stale hits for one key should start a single refresh."""
+        revalidator = Revalidator()
+        release = threading.Event()
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            release.wait(1)
+
+        started = [revalidator.refresh("genres", refresh) for _ in range(5)]
+        release.set()
+        self.assertEqual([True, False, False, False, False], started)
+        time.sleep(0.05)
+        self.assertEqual(1, len(calls))
+        stats = revalidator.stats()
+        self.assertEqual(
+            (5, 1, 0), (stats["stale_hits"], stats["refreshes"], stats["in_progress"])
+        )
+
+    def test_refresh_errors_are_counted(self):
+        """A failing refresh should be logged and counted, not raised."""
+        revalidator = Revalidator()
+
+        def refresh():
+            raise RuntimeError("IGDB down")
+
+        with self.assertLogs("igdb.revalidate", level="WARNING"):
+            revalidator.refresh("genres", refresh)
+            time.sleep(0.05)
+        self.assertEqual(1, revalidator.stats()["refresh_errors"])
+
+
+class TestIGDBClientStaleWhileRevalidate(unittest.TestCase):
+    """Tests for SWR serving in the sync client."""
+
+    def setUp(self):
+        self.auth = MagicMock()
+        self.auth.get_token.return_value = "fake-token"
+        self.auth.client_id = "fake-client-id"
+        self.cache = InMemoryCache()
+        self.client = IGDBClient(auth=self.auth, cache=self.cache)
+
+    def wait_for_refreshes(self):
+        """Wait until background refreshes have finished."""
+        deadline = time.monotonic() + 2
+        while (
+            self.client.revalidator.stats()["in_progress"]
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.01)
+
+    def test_results_are_cached_with_soft_and_hard_ttl(self):
+        """A fetched search should be stored fresh with the search policy."""
+        with patch(
+            "httpx.post", return_value=make_response([{"id": 1, "name": "Zelda"}])
+        ):
+            self.client.search_games("zelda")
+        value, stale = unwrap(self.cache.get("search:zelda"))
+        self.assertEqual("Zelda", value[0]["name"])
+        self.assertFalse(stale)
+        partition = self.cache._default  # pylint: disable=protected-access
+        expire_at = partition.entries["search:zelda"][1]
+        self.assertAlmostEqual(time.time() + SEARCH_TTL.hard, expire_at, delta=5)
+
+    def test_stale_search_is_served_and_refreshed_in_background(self):
+        """Past the soft TTL the stale value is returned and refreshed once."""
+        self.cache.set("search:zelda", wrap([{"id": 1, "name": "Old"}], -1), ttl=60)
+        release = threading.Event()
+
+        def slow_post(*_args, **_kwargs):
+            release.wait(1)
+            return make_response([{"id": 1, "name": "New"}])
+
+        with patch("httpx.post", side_effect=slow_post) as mock_post:
+            results = [self.client.search_games("zelda") for _ in range(3)]
+            self.assertEqual(["Old"] * 3, [r[0]["name"] for r in results])
+            release.set()
+            self.wait_for_refreshes()
+        self.assertEqual(1, mock_post.call_count)
+        self.assertEqual("New", self.client.search_games("zelda")[0]["name"])
+
+    def test_stale_vocabulary_is_served(self):
+        """Stale genres should be served while refreshing."""
+        self.cache.set("genres", wrap([{"id": 1, "name": "Old"}], -1), ttl=60)
+        with patch(
+            "httpx.post", return_value=make_response([{"id": 1, "name": "New"}])
+        ):
+            self.assertEqual("Old", self.client.get_genres()[0]["name"])
+            self.wait_for_refreshes()
+        self.assertEqual("New", self.client.get_genres()[0]["name"])
+
+    def test_failed_refresh_keeps_stale_value(self):
+        """If the background refresh fails the stale value keeps being served."""
+        self.cache.set("platforms", wrap([{"id": 6, "name": "PC"}], -1), ttl=60)
+        with patch("httpx.post", side_effect=httpx.ConnectError("down")):
+            with self.assertLogs("igdb.revalidate", level="WARNING"):
+                self.client.get_platforms()
+                self.wait_for_refreshes()
+            self.assertEqual(1, self.client.revalidator.stats()["refresh_errors"])
+            self.assertEqual("PC", self.client.get_platforms()[0]["name"])
+            self.wait_for_refreshes()
+
+    def test_past_hard_ttl_fetches_synchronously(self):
+        """Once the hard TTL has passed the caller waits for a fresh fetch."""
+        policy = TTLPolicy(soft=0, hard=1)
+        self.client._set_revalidating(  # pylint: disable=protected-access
+            "search:mario", [{"id": 1, "name": "Old"}], policy
+        )
+        time.sleep(1.1)
+        with patch(
+            "httpx.post", return_value=make_response([{"id": 1, "name": "New"}])
+        ):
+            self.assertEqual("New", self.client.search_games("mario")[0]["name"])
+        self.assertEqual(0, self.client.revalidator.stats()["refreshes"])
+
+
+class TestAsyncIGDBClientStaleWhileRevalidate(unittest.IsolatedAsyncioTestCase):
+    """Tests for SWR serving in the async client."""
+
+    async def asyncSetUp(self):
+        self.requests = []
+        self.http_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(self.handler)
+        )
+        auth = MagicMock()
+        auth.client_id = "fake-client-id"
+        auth.aget_token = AsyncMock(return_value="fake-token")
+        self.cache = InMemoryCache()
+        self.client = AsyncIGDBClient(
+            auth=auth, http_client=self.http_client, cache=self.cache
+        )
+
+    async def asyncTearDown(self):
+        await self.http_client.aclose()
+
+    async def handler(self, request):
+        """Fake IGDB returning fresh rows after a short delay."""
+        self.requests.append(request)
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, json=[{"id": 1, "name": "New"}])
+
+    async def test_stale_entries_are_refreshed_once(self):
+        """Concurrent stale reads return immediately and trigger one refresh task."""
+        self.assertIsInstance(self.client.revalidator, AsyncRevalidator)
+        self.cache.set("search:zelda", wrap([{"id": 1, "name": "Old"}], -1), ttl=60)
+        results = await asyncio.gather(
+            *(self.client.search_games("zelda") for _ in range(10))
+        )
+        self.assertEqual({"Old"}, {r[0]["name"] for r in results})
+        await asyncio.sleep(0.1)
+        self.assertEqual(1, len(self.requests))
+        self.assertEqual("New", (await self.client.search_games("zelda"))[0]["name"])
+        self.assertEqual(1, self.client.stats()["revalidator"]["refreshes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
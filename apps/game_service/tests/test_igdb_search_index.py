@@ -0,0 +1,298 @@
+"""
+Unit tests for the local full-text search index over the IGDB catalog mirror.
+"""
+
+# pylint: disable=protected-access
+import unittest
+from unittest.mock import MagicMock, patch
+
+import httpx
+from sqlalchemy.dialects.postgresql import psycopg2
+from src.core.config import Settings
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.cache import InMemoryCache
+from src.igdb.catalog import BULK_COMPLETE
+from src.igdb.client import IGDBClient
+from src.igdb.records import map_game
+from src.igdb.resilience import CircuitOpenError
+from src.igdb.search_index import (
+    CANDIDATE_LIMIT,
+    PostgresSearchIndex,
+    SearchIndex,
+    SQLiteSearchIndex,
+    create_search_index,
+    score,
+    trigrams,
+    words,
+)
+from tests.test_igdb_catalog import make_auth, make_store
+from tests.utils.benchmark import report, skip_unless_benchmarks
+from tests.utils.stub_igdb import raw_game
+
+NAMES = [
+    "The Legend of Zelda",
+    "The Legend of Zelda: Breath of the Wild",
+    "Zelda II: The Adventure of Link",
+    "Super Mario Odyssey",
+    "Dark Souls",
+    "Dark Souls III",
+    "Hollow Knight",
+]
+
+
+def make_index(names=NAMES, complete=False):
+    """Build a SQLite index over a catalog holding games with the given names."""
+    store = make_store()
+    store.upsert_many(
+        [
+            (map_game(raw_game(game_id, name=name)).as_dict(), 1)
+            for game_id, name in enumerate(names, start=1)
+        ]
+    )
+    if complete:
+        store.set_state(BULK_COMPLETE, 1)
+    index = SQLiteSearchIndex(store)
+    index.create()
+    return index
+
+
+def names_of(games):
+    """Return the names of games."""
+    return [game["name"] for game in games]
+
+
+class TestScoring(unittest.TestCase):
+    """Tests for trigram scoring."""
+
+    def test_trigrams(self):
+        """Words are padded like pg_trgm."""
+        self.assertEqual({"  a", " ab", "ab "}, trigrams("ab"))
+
+    def test_words(self):
+        """Names split into canonical words without punctuation."""
+        self.assertEqual(["zelda", "ii", "link"], words("ZELDA II: Link"))
+
+    def test_score(self):
+        """Exact words and the typed prefix score 1, typos score partially."""
+        self.assertEqual(1.0, score(["dark", "sou"], "Dark Souls"))
+        self.assertLess(score(["sou", "dark"], "Dark Souls"), 1.0)
+        typo = score(["hollow", "knigt"], "Hollow Knight")
+        self.assertTrue(0.5 < typo < 1.0)
+        self.assertEqual(0.0, score(["zelda"], None))
+
+
+class TestSQLiteSearchIndex(unittest.TestCase):
+    """Tests for the FTS5 trigram index."""
+
+    def test_ranking(self):
+        """Best matches come first, shorter names break ties."""
+        result = make_index().search("zelda")
+        self.assertEqual(
+            [
+                "The Legend of Zelda",
+                "Zelda II: The Adventure of Link",
+                "The Legend of Zelda: Breath of the Wild",
+            ],
+            names_of(result.games),
+        )
+
+    def test_confident_once_complete(self):
+        """Strong matches answer a search only once the catalog is complete."""
+        self.assertFalse(make_index().search("dark souls").confident)
+        result = make_index(complete=True).search("dark souls")
+        self.assertTrue(result.confident)
+        self.assertEqual(["Dark Souls", "Dark Souls III"], names_of(result.games))
+
+    def test_full_page_is_confident(self):
+        """A full page of strong matches is confident in an incomplete catalog."""
+        index = make_index([f"Mega Man {i}" for i in range(1, 13)])
+        result = index.search("mega man")
+        self.assertTrue(result.confident)
+        self.assertEqual(10, len(result.games))
+
+    def test_typos_are_not_confident(self):
+        """Typos still match, but never replace IGDB's results."""
+        result = make_index(complete=True).search("legend of zelad")
+        self.assertFalse(result.confident)
+        self.assertEqual("The Legend of Zelda", result.games[0]["name"])
+        self.assertEqual([], make_index().search("xyz").games)
+
+    def test_completion_is_rechecked(self):
+        """The bulk load flag is re-read after COMPLETE_RECHECK seconds."""
+        index = make_index()
+        now = [0.0]
+        index.clock = lambda: now[0]
+        self.assertFalse(index.search("dark souls").confident)
+        index.catalog.set_state(BULK_COMPLETE, 1)
+        self.assertFalse(index.search("dark souls").confident)
+        now[0] = 60.0
+        self.assertTrue(index.search("dark souls").confident)
+
+    def test_follows_catalog_updates(self):
+        """Triggers keep the index in sync with upserts."""
+        index = make_index(complete=True)
+        index.catalog.upsert_many(
+            [(map_game(raw_game(5, name="Bloodborne")).as_dict(), 2)]
+        )
+        self.assertEqual(["Bloodborne"], names_of(index.search("bloodborne").games))
+        self.assertEqual(["Dark Souls III"], names_of(index.search("dark souls").games))
+
+    def test_indexes_existing_games(self):
+        """Games mirrored before the index was created are searchable."""
+        index = make_index(complete=True)
+        SQLiteSearchIndex(index.catalog).create()
+        self.assertEqual(["Hollow Knight"], names_of(index.search("hollow").games))
+
+    def test_short_words(self):
+        """Queries without a three-letter word find nothing."""
+        self.assertIsNone(SQLiteSearchIndex.match_expression("ds 2"))
+        self.assertEqual([], make_index().search("ds").games)
+        self.assertEqual(
+            '"ark" OR "dar"', SQLiteSearchIndex.match_expression('dark "ab"')
+        )
+
+    def test_create_search_index(self):
+        """The index is off unless IGDB_SEARCH_INDEX is set and there is a catalog."""
+        settings = Settings()
+        settings.IGDB_SEARCH_INDEX = True
+        self.assertIsNone(create_search_index(settings, None))
+        index = create_search_index(settings, make_store())
+        self.assertIsInstance(index, SQLiteSearchIndex)
+        settings.IGDB_SEARCH_INDEX = False
+        self.assertIsNone(create_search_index(settings, index.catalog))
+
+
+class TestPostgresSearchIndex(unittest.TestCase):
+    """Query construction of the pg_trgm index, checked without a server."""
+
+    def setUp(self):
+        self.catalog = MagicMock()
+        self.conn = self.catalog.engine.begin.return_value.__enter__.return_value
+        self.index = PostgresSearchIndex(self.catalog, match_score=0.4)
+
+    def test_search_index_is_abstract(self):
+        """Indexes without a candidate query cannot be built."""
+        with self.assertRaises(TypeError):
+            SearchIndex(self.catalog)  # pylint: disable=abstract-class-instantiated
+
+    def test_candidate_query(self):
+        """The query compiles for psycopg2 with its % operators escaped."""
+        sql = str(
+            PostgresSearchIndex.CANDIDATE_QUERY.compile(dialect=psycopg2.dialect())
+        )
+        self.assertIn("WHERE %(query)s <%% name", sql)
+        self.assertIn("@@ plainto_tsquery('simple', %(query)s)", sql)
+        self.assertIn("ORDER BY word_similarity(%(query)s, name) DESC", sql)
+        self.assertIn("LIMIT %(limit)s", sql)
+
+    def test_candidates(self):
+        """The similarity threshold is set in the transaction the query runs in."""
+        self.conn.execute.return_value.all.return_value = [("Zelda", {"id": 1})]
+        self.assertEqual([("Zelda", {"id": 1})], self.index._candidates("zelda"))
+        threshold, candidates = [call.args for call in self.conn.execute.call_args_list]
+        self.assertEqual(
+            (PostgresSearchIndex.THRESHOLD_QUERY, {"threshold": "0.4"}), threshold
+        )
+        self.assertEqual(
+            (
+                PostgresSearchIndex.CANDIDATE_QUERY,
+                {"query": "zelda", "limit": CANDIDATE_LIMIT},
+            ),
+            candidates,
+        )
+
+    def test_create_runs_no_ddl(self):
+        """The extension and the name indexes are left to the Alembic migration."""
+        self.index.create()
+        self.catalog.engine.begin.assert_not_called()
+        self.catalog.engine.connect.assert_not_called()
+
+
+class TestClientWithSearchIndex(unittest.TestCase):
+    """IGDBClient answers searches from the index."""
+
+    def setUp(self):
+        self.cache = InMemoryCache()
+
+    def make_client(self, index):
+        """Build a client using index."""
+        return IGDBClient(auth=make_auth(), cache=self.cache, search_index=index)
+
+    def test_confident_search_skips_igdb(self):
+        """Confident matches are returned without an upstream call or caching."""
+        client = self.make_client(make_index(complete=True))
+        with patch.object(IGDBClient, "_post") as post:
+            games = client.search_games("Dark Souls")
+        post.assert_not_called()
+        self.assertEqual(["Dark Souls", "Dark Souls III"], names_of(games))
+        self.assertIsNone(self.cache.get("search:dark souls"))
+        self.assertEqual({"hits": 1, "fallbacks": 0}, client.stats()["search_index"])
+
+    def test_igdb_answers_when_not_confident(self):
+        """IGDB's results are used and cached when the index is not confident."""
+        client = self.make_client(make_index())
+        with patch.object(IGDBClient, "_post", return_value=[raw_game(9)]) as post:
+            games = client.search_games("dark souls")
+        post.assert_called_once()
+        self.assertEqual([9], [game["id"] for game in games])
+
+    def test_falls_back_when_igdb_fails(self):
+        """Local matches, typos included, answer a search IGDB fails."""
+        client = self.make_client(make_index())
+        failure = httpx.ConnectError("down")
+        with patch.object(IGDBClient, "_post", side_effect=failure):
+            games = client.search_games("hollow knigt")
+        self.assertEqual(["Hollow Knight"], names_of(games))
+        self.assertEqual(1, client.stats()["search_index"]["fallbacks"])
+
+    def test_failure_without_matches_raises(self):
+        """The upstream error is raised when the index has nothing."""
+        client = self.make_client(make_index())
+        failure = CircuitOpenError("games", 5.0)
+        with patch.object(IGDBClient, "_post", side_effect=failure):
+            with self.assertRaises(CircuitOpenError):
+                client.search_games("xyz")
+
+
+class TestAsyncClientWithSearchIndex(unittest.IsolatedAsyncioTestCase):
+    """AsyncIGDBClient queries the index off the event loop."""
+
+    async def test_confident_and_fallback(self):
+        """Confident searches skip IGDB and failed searches fall back."""
+        auth = MagicMock()
+        auth.client_id = "fake-client-id"
+        client = AsyncIGDBClient(
+            auth=auth, cache=InMemoryCache(), search_index=make_index(complete=True)
+        )
+        with patch.object(
+            AsyncIGDBClient, "_post", side_effect=httpx.ReadTimeout("slow")
+        ) as post:
+            confident = await client.search_games("mario")
+            post.assert_not_called()
+            fallback = await client.search_games("legend of zelad")
+        self.assertEqual(["Super Mario Odyssey"], names_of(confident))
+        self.assertEqual("The Legend of Zelda", fallback[0]["name"])
+        self.assertEqual({"hits": 1, "fallbacks": 1}, client.stats()["search_index"])
+
+
+class TestSearchIndexBenchmark(unittest.TestCase):
+    """Latency of local searches over a mid-sized catalog."""
+
+    @skip_unless_benchmarks
+    def test_search_latency(self):
+        """Searches over 20k games, to compare with an IGDB round trip."""
+        names = [f"Game {word} {i}" for i in range(2000) for word in ("alpha", "beta")]
+        names += [f"Title number {i}" for i in range(16000)] + NAMES
+        index = make_index(names, complete=True)
+        report(
+            "local search over 20k games",
+            {
+                query: lambda query=query: index.search(query)
+                for query in ("zelda", "dark souls", "hollow knigt", "super mario")
+            },
+            number=20,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,273 @@
+"""
+Unit tests for search query canonicalization, prefix result reuse and
+filter-aware search cache keys.
+"""
+
+# pylint: disable=duplicate-code
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.cache import InMemoryCache
+from src.igdb.client import IGDBClient
+from src.igdb.query_builder import build_igdb_query
+from src.igdb.revalidate import SEARCH_TTL, wrap
+from src.igdb.schemas import GameFilters, YearRange
+from src.igdb.search import (
+    canonicalize_filters,
+    canonicalize_query,
+    escape_search_term,
+    filter_results,
+    filtered_search_cache_key,
+    reuse_candidates,
+)
+
+
+def make_response(rows):
+    """Build a fake httpx response returning rows."""
+    response = MagicMock()
+    response.json.return_value = rows
+    response.raise_for_status.return_value = None
+    return response
+
+
+class TestCanonicalizeQuery(unittest.TestCase):
+    """Tests for canonicalize_query."""
+
+    def test_case_and_whitespace(self):
+        """Case, surrounding and repeated whitespace do not matter."""
+        for raw in ("Zelda", "zelda ", "ZELDA", "\tzelda\n"):
+            self.assertEqual("zelda", canonicalize_query(raw))
+        self.assertEqual(
+            "zelda breath of the wild",
+            canonicalize_query("  Zelda   Breath\tof the  WILD "),
+        )
+
+    def test_unicode(self):
+        """Full-width characters are NFKC-normalized and case is folded fully."""
+        self.assertEqual("zelda", canonicalize_query("ＺＥＬＤＡ"))
+        self.assertEqual("strasse", canonicalize_query("STRASSE"))
+        self.assertEqual(canonicalize_query("Straße"), canonicalize_query("STRASSE"))
+        self.assertEqual("pokémon", canonicalize_query("Pokémon"))
+
+
+class TestEscaping(unittest.TestCase):
+    """Tests for escaping search terms in Apicalypse bodies."""
+
+    def test_escape_search_term(self):
+        """Quotes and backslashes are escaped."""
+        self.assertEqual('say \\"hi\\" \\\\', escape_search_term('say "hi" \\'))
+
+    def test_search_query_is_escaped(self):
+        """A quote in the query cannot terminate the search string early."""
+        body = IGDBClient._search_query('x"; fields *; limit 500; "')
+        self.assertTrue(body.startswith('search "x\\"; fields *; limit 500; \\"";'))
+        self.assertTrue(body.endswith("limit 10;"))
+
+    def test_query_builder_escapes(self):
+        """build_igdb_query escapes the search term too."""
+        self.assertTrue(build_igdb_query('a"b').startswith('search "a\\"b";'))
+
+
+class TestReuseHelpers(unittest.TestCase):
+    """Tests for prefix candidates and local filtering."""
+
+    def test_candidates(self):
+        """Prefixes are tried longest first, skipping those ending in a space."""
+        self.assertEqual(
+            ["search:zelda o", "search:zelda", "search:zeld", "search:zel"],
+            reuse_candidates("zelda oc"),
+        )
+        self.assertEqual([], reuse_candidates("zel"))
+
+    def test_filter_results(self):
+        """Only games whose name contains every word are kept."""
+        games = [
+            {"id": 1, "name": "The Legend of Zelda: Ocarina of Time"},
+            {"id": 2, "name": "Zelda II"},
+            {"id": 3, "name": None},
+        ]
+        self.assertEqual([1], [g["id"] for g in filter_results(games, "zelda oca")])
+        self.assertEqual([1, 2], [g["id"] for g in filter_results(games, "zelda")])
+
+
+class TestFilterKeys(unittest.TestCase):
+    """Tests for canonical filters and filtered search cache keys."""
+
+    def test_equivalent_filters_share_a_key(self):
+        """Order and duplicates in filter lists do not change the key."""
+        first = GameFilters(platforms=[48, 6], genres=[12, 31, 12])
+        second = GameFilters(genres=[31, 12], platforms=[6, 48, 48], themes=[])
+        self.assertEqual(
+            filtered_search_cache_key("zelda", canonicalize_filters(first)),
+            filtered_search_cache_key("zelda", canonicalize_filters(second)),
+        )
+
+    def test_different_filters_differ(self):
+        """Different filter values, or the same values on another field, differ."""
+        keys = {
+            filtered_search_cache_key("zelda", canonicalize_filters(filters))
+            for filters in (
+                GameFilters(platforms=[6]),
+                GameFilters(platforms=[48]),
+                GameFilters(genres=[6]),
+                GameFilters(year_range=YearRange(start=2000, end=2010)),
+                GameFilters(min_rating=75),
+            )
+        }
+        self.assertEqual(5, len(keys))
+        self.assertTrue(all(key.startswith("fsearch:") for key in keys))
+        self.assertTrue(all(key.endswith(":zelda") for key in keys))
+
+    def test_empty_filters(self):
+        """No filter values canonicalize to None."""
+        self.assertIsNone(canonicalize_filters(None))
+        self.assertIsNone(canonicalize_filters(GameFilters()))
+        self.assertIsNone(canonicalize_filters(GameFilters(platforms=[], genres=[])))
+
+
+class TestIGDBClientSearchKeys(unittest.TestCase):
+    """Tests for canonical cache keys and prefix reuse in IGDBClient."""
+
+    def setUp(self):
+        self.auth = MagicMock()
+        self.auth.get_token.return_value = "fake-token"
+        self.auth.client_id = "fake-client-id"
+        self.cache = InMemoryCache()
+        self.games = [
+            {"id": 1, "name": "The Legend of Zelda: Ocarina of Time"},
+            {"id": 2, "name": "Zelda II: The Adventure of Link"},
+            {"id": 3, "name": "Zelda's Adventure"},
+        ]
+
+    def make_client(self, **kwargs):
+        """Build a client with the in-memory cache."""
+        return IGDBClient(auth=self.auth, cache=self.cache, **kwargs)
+
+    @patch("httpx.post")
+    def test_variants_share_one_entry(self, mock_post):
+        """Case and whitespace variants hit the same cache entry."""
+        mock_post.return_value = make_response(self.games)
+        client = self.make_client()
+        for query in ("Zelda", "zelda ", "ZELDA", " ｚｅｌｄａ"):
+            self.assertEqual(3, len(client.search_games(query)))
+        self.assertEqual(1, mock_post.call_count)
+        self.assertIn('search "zelda";', mock_post.call_args.kwargs["content"])
+        self.assertIsNotNone(self.cache.get("search:zelda"))
+
+    def test_prefix_reuse(self):
+        """A longer query is answered from a complete cached prefix result."""
+        client = self.make_client(search_prefix_reuse=True)
+        client._set_revalidating(  # pylint: disable=protected-access
+            "search:zelda", self.games, SEARCH_TTL
+        )
+        with patch("httpx.post") as mock_post:
+            results = client.search_games("Zelda  Adventure")
+        mock_post.assert_not_called()
+        self.assertEqual([2, 3], [game["id"] for game in results])
+        self.assertEqual({"prefix_hits": 1}, client.stats()["search"])
+
+    @patch("httpx.post")
+    def test_incomplete_prefix_is_not_reused(self, mock_post):
+        """A prefix result at the search limit may be missing matches."""
+        mock_post.return_value = make_response([])
+        full = [{"id": i, "name": f"Zelda {i}"} for i in range(10)]
+        self.cache.set("search:zelda", wrap(full, 300), ttl=600)
+        self.make_client(search_prefix_reuse=True).search_games("zelda ocarina")
+        self.assertEqual(1, mock_post.call_count)
+
+    @patch("httpx.post")
+    def test_stale_prefix_is_not_reused(self, mock_post):
+        """Only fresh prefix results are filtered locally."""
+        mock_post.return_value = make_response([])
+        self.cache.set("search:zelda", wrap(self.games, -1), ttl=600)
+        self.make_client(search_prefix_reuse=True).search_games("zelda ocarina")
+        self.assertEqual(1, mock_post.call_count)
+
+    @patch("httpx.post")
+    def test_reuse_is_off_by_default(self, mock_post):
+        """Without search_prefix_reuse every new query goes upstream."""
+        mock_post.return_value = make_response([])
+        self.cache.set("search:zelda", wrap(self.games, 300), ttl=600)
+        self.make_client().search_games("zelda ocarina")
+        self.assertEqual(1, mock_post.call_count)
+
+    @patch("httpx.post")
+    def test_filtered_search(self, mock_post):
+        """Equivalent filter sets share one upstream query built by build_igdb_query."""
+        mock_post.return_value = make_response(self.games)
+        client = self.make_client()
+        client.search_games_filtered("Zelda", GameFilters(platforms=[48, 6]))
+        client.search_games_filtered(" zelda", GameFilters(platforms=[6, 48, 6]))
+        self.assertEqual(1, mock_post.call_count)
+        self.assertEqual(
+            build_igdb_query("zelda", GameFilters(platforms=[6, 48])),
+            mock_post.call_args.kwargs["content"],
+        )
+        client.search_games_filtered("zelda", GameFilters(platforms=[6]))
+        self.assertEqual(2, mock_post.call_count)
+
+    @patch("httpx.post")
+    def test_filtered_search_without_filters(self, mock_post):
+        """Empty filters fall back to the plain search entry."""
+        mock_post.return_value = make_response(self.games)
+        client = self.make_client()
+        client.search_games("zelda")
+        client.search_games_filtered("zelda", GameFilters(genres=[]))
+        self.assertEqual(1, mock_post.call_count)
+
+
+class TestAsyncIGDBClientSearchKeys(unittest.IsolatedAsyncioTestCase):
+    """Tests for canonical cache keys in AsyncIGDBClient."""
+
+    async def test_variants_share_one_request(self):
+        """Case and whitespace variants cause one upstream search."""
+        bodies = []
+
+        def handler(request):
+            bodies.append(request.content.decode())
+            return httpx.Response(200, json=[{"id": 1, "name": "Zelda"}])
+
+        auth = MagicMock()
+        auth.client_id = "fake-client-id"
+        auth.aget_token = AsyncMock(return_value="fake-token")
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as http_client:
+            client = AsyncIGDBClient(
+                auth=auth, http_client=http_client, cache=InMemoryCache()
+            )
+            for query in ("Zelda", "  ZELDA  "):
+                await client.search_games(query)
+        self.assertEqual(1, len(bodies))
+        self.assertTrue(bodies[0].startswith('search "zelda";'))
+
+    async def test_filtered_search(self):
+        """Reordered filters cause one upstream search with a where clause."""
+        bodies = []
+
+        def handler(request):
+            bodies.append(request.content.decode())
+            return httpx.Response(200, json=[{"id": 1, "name": "Zelda"}])
+
+        auth = MagicMock()
+        auth.client_id = "fake-client-id"
+        auth.aget_token = AsyncMock(return_value="fake-token")
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as http_client:
+            client = AsyncIGDBClient(
+                auth=auth, http_client=http_client, cache=InMemoryCache()
+            )
+            for genres in ([31, 12], [12, 31]):
+                results = await client.search_games_filtered(
+                    "Zelda", GameFilters(genres=genres)
+                )
+        self.assertEqual([1], [game["id"] for game in results])
+        self.assertEqual(1, len(bodies))
+        self.assertIn("where genres = (12,31);", bodies[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,8 +9,15 @@ Tests the construction of IGDB API query strings with various filter c        ex
 """
 
 import unittest
-from src.igdb.query_builder import build_igdb_query
+from src.igdb.query_builder import (
+    build_igdb_query,
+    clear_query_caches,
+    compile_filters,
+    query_cache_info,
+)
 from src.igdb.schemas import GameFilters, YearRange
+from tests.utils import legacy_query_builder
+from tests.utils.benchmark import report, skip_unless_benchmarks
 
 
 # pylint: disable=too-many-public-methods
@@ -120,8 +127,8 @@ class TestIGDBQueryBuilder(unittest.TestCase):
 
     def test_year_filter_multiple_years(self):
         """
-        Test building a search query with multiple discrete years.
-        Expect OR conditions for each year range.
+        Test building a search query with multiple adjacent discrete years.
+        Expect one range from the start of the first to the end of the last year.
         """
         # Arrange
         search_term = "halo"
@@ -133,9 +140,30 @@ class TestIGDBQueryBuilder(unittest.TestCase):
         # Assert
         # 2020: 1577836800 to 1609459200, 2021: 1609459200 to 1640995200
         expected = (
-            'search "halo"; where (first_release_date >= 1577836800 & '
-            "first_release_date < 1609459200) | (first_release_date >= 1609459200 & "
-            "first_release_date < 1640995200); fields id,name,cover.url,summary,"
+            'search "halo"; where first_release_date >= 1577836800 & '
+            "first_release_date < 1640995200; fields id,name,cover.url,summary,"
+            "first_release_date,genres.name,platforms.name; limit 10;"
+        )
+        self.assertEqual(expected, query)
+
+    def test_year_filter_separate_years(self):
+        """
+        Test building a search query with years that are not adjacent.
+        Expect OR conditions for each run of adjacent years, in year order.
+        """
+        # Arrange
+        search_term = "halo"
+        filters = GameFilters(years=[2020, 2017, 2018, 2020])
+
+        # Act
+        query = build_igdb_query(search_term, filters)
+
+        # Assert
+        # 2017-2018: 1483228800 to 1546300800, 2020: 1577836800 to 1609459200
+        expected = (
+            'search "halo"; where (first_release_date >= 1483228800 & '
+            "first_release_date < 1546300800) | (first_release_date >= 1577836800 & "
+            "first_release_date < 1609459200); fields id,name,cover.url,summary,"
             "first_release_date,genres.name,platforms.name; limit 10;"
         )
         self.assertEqual(expected, query)
@@ -869,3 +897,80 @@ class TestIGDBQueryBuilder(unittest.TestCase):
             "genres.name,platforms.name; limit 10;"
         )
         self.assertEqual(expected, query)
+
+
+class TestCompiledQueryBuilder(unittest.TestCase):
+    """Unit tests for compiled filters and the query builder caches."""
+
+    def setUp(self):
+        clear_query_caches()
+
+    def test_compile_filters_is_hashable_and_skips_empty(self):
+        """Compiled filters drop empty values and de-duplicate ids."""
+        compiled = compile_filters(
+            GameFilters(platforms=[48, 6, 48], genres=[], years=[2021, 2020])
+        )
+        self.assertEqual((("platforms", (48, 6)), ("years", (2020, 2021))), compiled)
+        self.assertEqual(
+            hash(compiled),
+            hash(compile_filters(GameFilters(years=[2020, 2021], platforms=[48, 6]))),
+        )
+
+    def test_queries_and_fragments_are_memoized(self):
+        """Repeated builds hit the query LRU; shared clauses hit the fragment cache."""
+        build_igdb_query("halo", GameFilters(platforms=[6], genres=[4]))
+        build_igdb_query("Halo", GameFilters(platforms=[6], genres=[4]))
+        build_igdb_query("halo", GameFilters(platforms=[6], genres=[4]))
+        build_igdb_query("halo", GameFilters(platforms=[6], themes=[1]))
+        info = query_cache_info()
+        self.assertEqual(1, info["queries"]["hits"])
+        self.assertEqual(3, info["queries"]["misses"])
+        self.assertEqual(3, info["fragments"]["hits"])
+        self.assertEqual(3, info["fragments"]["misses"])
+
+    def test_decade_of_years_is_one_range(self):
+        """Ten adjacent years produce one condition instead of ten."""
+        query = build_igdb_query("halo", GameFilters(years=list(range(2010, 2020))))
+        self.assertEqual(1, query.count("first_release_date >="))
+
+
+class TestQueryBuilderBenchmark(unittest.TestCase):
+    """Microbenchmark of the memoized query builder against the previous one."""
+
+    FILTERS = GameFilters(
+        platforms=[6, 48, 130],
+        years=list(range(2010, 2021)),
+        genres=[4, 12, 31],
+        themes=[17, 18],
+        game_modes=[1, 2],
+        min_rating=70,
+        max_rating=95,
+        collections=[3],
+    )
+
+    def test_matches_previous_builder(self):
+        """Apart from merged years, queries are identical to the previous builder's."""
+        filters = self.FILTERS.model_copy(update={"years": [2012]})
+        self.assertEqual(
+            legacy_query_builder.build_igdb_query("halo", filters),
+            build_igdb_query("halo", filters),
+        )
+
+    @skip_unless_benchmarks
+    def test_benchmark(self):
+        """Time the previous builder, a cold build and a memoized build."""
+
+        def cold():
+            clear_query_caches()
+            build_igdb_query("halo", self.FILTERS)
+
+        report(
+            "build_igdb_query, 8 filters with 11 years",
+            {
+                "previous builder": lambda: legacy_query_builder.build_igdb_query(
+                    "halo", self.FILTERS
+                ),
+                "cold": cold,
+                "memoized": lambda: build_igdb_query("halo", self.FILTERS),
+            },
+        )
@@ -0,0 +1,167 @@
+"""
+Unit tests for single-flight coalescing of concurrent identical IGDB lookups.
+"""
+
+# pylint: disable=duplicate-code
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.client import IGDBClient
+from src.igdb.singleflight import AsyncSingleFlight, SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Tests for the thread-based single-flight group."""
+
+    def setUp(self):
+        self.group = SingleFlight()
+        self.calls = 0
+        self.release = threading.Event()
+
+    def slow_fetch(self):
+        """Upstream stand-in that blocks until released."""
+        self.calls += 1
+        self.release.wait(timeout=2)
+        return ["result"]
+
+    def test_concurrent_callers_share_one_call(self):
+        """Concurrent callers with the same key should trigger one fetch."""
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            futures = [
+                pool.submit(self.group.do, "search:zelda", self.slow_fetch)
+                for _ in range(10)
+            ]
+            time.sleep(0.1)
+            self.release.set()
+            results = [future.result() for future in futures]
+        self.assertEqual(1, self.calls)
+        self.assertEqual([["result"]] * 10, results)
+        self.assertEqual(
+            {"executed": 1, "coalesced": 9, "in_flight": 0}, self.group.stats()
+        )
+
+    def test_exception_is_shared(self):
+        """Waiters should receive the leader's exception."""
+
+        def failing_fetch():
+            self.release.wait(timeout=2)
+            raise ValueError("Game with id 1 not found")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [
+                pool.submit(self.group.do, "game:1", failing_fetch) for _ in range(3)
+            ]
+            time.sleep(0.1)
+            self.release.set()
+            for future in futures:
+                with self.assertRaises(ValueError):
+                    future.result()
+
+    def test_sequential_calls_are_not_coalesced(self):
+        """Once a call completes, the next call runs again."""
+        self.release.set()
+        self.group.do("genres", self.slow_fetch)
+        self.group.do("genres", self.slow_fetch)
+        self.assertEqual(2, self.calls)
+        self.assertEqual(0, self.group.stats()["coalesced"])
+
+
+class TestAsyncSingleFlight(unittest.IsolatedAsyncioTestCase):
+    """Tests for the asyncio single-flight group."""
+
+    async def test_concurrent_coroutines_share_one_call(self):
+        """Concurrent coroutines with the same key should trigger one fetch."""
+        group = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "value"
+
+        results = await asyncio.gather(
+            *(group.do("platforms", fetch) for _ in range(20))
+        )
+        self.assertEqual(["value"] * 20, results)
+        self.assertEqual(1, len(calls))
+        self.assertEqual(
+            {"executed": 1, "coalesced": 19, "in_flight": 0}, group.stats()
+        )
+
+    async def test_cancelled_leader_does_not_cancel_waiters(self):
+        """A cancelled leader should not cancel the shared call for waiters."""
+        group = AsyncSingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "value"
+
+        leader = asyncio.ensure_future(group.do("game:7", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(group.do("game:7", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        self.assertEqual("value", await waiter)
+
+
+class TestClientCoalescing(unittest.IsolatedAsyncioTestCase):
+    """IGDB clients should coalesce identical concurrent lookups."""
+
+    async def test_async_client_coalesces_search(self):
+        """Concurrent identical searches should issue one IGDB request."""
+        requests = []
+
+        async def handler(request):
+            requests.append(request)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json=[{"id": 1, "name": "Zelda"}])
+
+        auth = MagicMock()
+        auth.client_id = "fake-client-id"
+        auth.aget_token = AsyncMock(return_value="fake-token")
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            client = AsyncIGDBClient(auth=auth, http_client=http)
+            results = await asyncio.gather(
+                *(client.search_games("zelda") for _ in range(25))
+            )
+        self.assertEqual(1, len(requests))
+        self.assertTrue(all(r[0]["name"] == "Zelda" for r in results))
+        self.assertEqual(24, client.stats()["single_flight"]["coalesced"])
+
+    def test_sync_clients_share_group(self):
+        """Separate sync clients sharing a group should coalesce game lookups."""
+        group = SingleFlight()
+        release = threading.Event()
+        http_client = MagicMock()
+
+        def post(*args, **kwargs):  # pylint: disable=unused-argument
+            release.wait(timeout=2)
+            response = MagicMock()
+            response.json.return_value = [{"id": 42, "name": "Shared"}]
+            return response
+
+        http_client.post.side_effect = post
+        auth = MagicMock()
+        auth.get_token.return_value = "token"
+
+        def lookup():
+            client = IGDBClient(auth=auth, http_client=http_client, single_flight=group)
+            return client.get_game_by_id(42)
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [pool.submit(lookup) for _ in range(5)]
+            time.sleep(0.1)
+            release.set()
+            names = [future.result()["name"] for future in futures]
+        self.assertEqual(["Shared"] * 5, names)
+        self.assertEqual(1, http_client.post.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,308 @@
+"""
+Unit tests and a benchmark for the typeahead suggestion index.
+
+The benchmark runs with RUN_IGDB_BENCHMARKS=1 and indexes 50k names; also set
+RUN_SUGGEST_BENCHMARK=1 to index 1M names instead.
+"""
+
+# pylint: disable=protected-access
+import os
+import random
+import statistics
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+from src.api.igdb import get_igdb_client
+from src.core.config import Settings
+from src.igdb.async_client import AsyncIGDBClient
+from src.igdb.client import IGDBClient
+from src.igdb.records import map_game
+from src.igdb import suggest
+from src.igdb.suggest import SuggestIndex, create_suggest_index, suggest_key
+from src.main import app
+from tests.test_igdb_catalog import make_store
+from tests.utils.benchmark import skip_unless_benchmarks
+from tests.utils.stub_igdb import raw_game
+
+NAMES = {
+    1: "The Legend of Zelda",
+    2: "The Legend of Zelda: Breath of the Wild",
+    3: "Zelda II: The Adventure of Link",
+    4: "Super Mario Odyssey",
+    5: "Dark Souls",
+}
+
+
+def make_index(names=None):
+    """Build an index over names (id -> name)."""
+    index = SuggestIndex()
+    index.build((names or NAMES).items())
+    return index
+
+
+def ids_of(suggestions):
+    """Return the ids of suggestions."""
+    return [suggestion["id"] for suggestion in suggestions]
+
+
+class TestSuggestIndex(unittest.TestCase):
+    """Tests for SuggestIndex."""
+
+    def test_suggest_key(self):
+        """Keys are canonical words without punctuation."""
+        self.assertEqual("zelda ii the", suggest_key("  ZELDA II: The"))
+
+    def test_prefix_of_any_word(self):
+        """A prefix matches any word; names starting with it come first."""
+        index = make_index()
+        self.assertEqual([3, 1, 2], ids_of(index.suggest("zel")))
+        self.assertEqual([1, 2], ids_of(index.suggest("Legend of Z")))
+        self.assertEqual(
+            [{"id": 5, "name": "Dark Souls"}], index.suggest("dark s", limit=1)
+        )
+        self.assertEqual([], index.suggest("zeldas"))
+        self.assertEqual([], index.suggest(" :: "))
+
+    def test_add_is_searchable_before_merge(self):
+        """Added names are found in the pending run."""
+        index = make_index()
+        index.add([(6, "Zelda's Adventure")])
+        self.assertEqual([6, 3, 1, 2], ids_of(index.suggest("zelda")))
+        self.assertEqual(0, index.stats()["merges"])
+
+    def test_merge(self):
+        """The pending run is spliced into the main arrays once it is large."""
+        index = make_index()
+        with patch.object(suggest, "MERGE_MIN", 4):
+            index.add([(6, "Mario Kart 8"), (7, "Paper Mario")])
+        self.assertEqual(1, index.stats()["merges"])
+        self.assertEqual([], index._pending)
+        keys = [
+            index._slot_keys[slot][offset:]
+            for slot, offset in zip(index._main_slots, index._main_offsets)
+        ]
+        self.assertEqual(sorted(keys), keys)
+        self.assertEqual([6, 7, 4], ids_of(index.suggest("mario")))
+
+    def test_rename(self):
+        """Renamed games are found under their new name only."""
+        index = make_index()
+        index.add([(5, "Dark Souls Remastered"), (4, "Super Mario Odyssey")])
+        self.assertEqual(
+            [{"id": 5, "name": "Dark Souls Remastered"}], index.suggest("dark")
+        )
+        self.assertEqual([], index.suggest("souls r", limit=5)[1:])
+        self.assertEqual(5, len(index))
+
+    def test_stale_keys_are_dropped(self):
+        """Keys of renamed games are dropped once they add up."""
+        index = make_index()
+        with patch.object(suggest, "MERGE_MIN", 4):
+            index.add([(1, "Zelda"), (2, "Zelda Two"), (5, "Souls")])
+        self.assertEqual(0, index._stale)
+        self.assertEqual(
+            len(index._main_slots),
+            sum(
+                len(suggest.word_starts(index._slot_keys[slot]))
+                for slot in index._slot_of.values()
+            ),
+        )
+        self.assertEqual([1, 2, 3], ids_of(index.suggest("zelda")))
+
+    def test_build_discards_merge_in_progress(self):
+        """A merge that started before build() does not overwrite the new index."""
+        index = make_index()
+        merge = index._merge
+
+        def build_then_merge(slots, offsets, generation):
+            index.build([(9, "Hollow Knight")])
+            merge(slots, offsets, generation)
+
+        with patch.object(suggest, "MERGE_MIN", 4), patch.object(
+            index, "_merge", build_then_merge
+        ):
+            index.add([(6, "Mario Kart 8"), (7, "Paper Mario")])
+        self.assertEqual(0, index.stats()["merges"])
+        self.assertEqual([], index._merging)
+        self.assertEqual([], index.suggest("mario"))
+        self.assertEqual([9], ids_of(index.suggest("hol")))
+
+    def test_queued_games_wait_for_drain(self):
+        """Queued games are only indexed when the queue is drained."""
+        index = make_index()
+        index.queue([(6, "Zelda's Adventure")])
+        self.assertEqual([3, 1, 2], ids_of(index.suggest("zelda")))
+        self.assertEqual(1, index.stats()["queued"])
+        self.assertEqual(1, index.drain())
+        self.assertEqual([6, 3, 1, 2], ids_of(index.suggest("zelda")))
+
+    def test_background_thread_indexes_queued_games(self):
+        """Without a catalog the thread still indexes queued search results."""
+        index = make_index()
+        index.start()
+        try:
+            index.queue([(6, "Hollow Knight")])
+            for _ in range(100):
+                if index.suggest("hol"):
+                    break
+                time.sleep(0.01)
+        finally:
+            index.close()
+        self.assertEqual([6], ids_of(index.suggest("hol")))
+
+    def test_refresh_from_catalog(self):
+        """The first refresh builds the index, later ones read recently written rows."""
+        now = [1000]
+        store = make_store()
+        store.clock = lambda: now[0]
+        store.upsert_many([(map_game(raw_game(i)).as_dict(), 100) for i in (1, 2)])
+        index = SuggestIndex()
+        self.assertEqual(2, index.refresh(store))
+        now[0] += 10
+        store.upsert_many([(map_game(raw_game(3, name="Hades")).as_dict(), 200)])
+        # Rows within REFRESH_OVERLAP of the newest one seen are read again
+        self.assertEqual(3, index.refresh(store))
+        now[0] += suggest.REFRESH_OVERLAP + 30
+        store.upsert_many([(map_game(raw_game(4, name="Celeste")).as_dict(), 300)])
+        self.assertEqual(4, index.refresh(store))
+        # Older rows drop out once a newer row is seen
+        self.assertEqual(1, index.refresh(store))
+        self.assertEqual([3], ids_of(index.suggest("had")))
+        self.assertEqual([1, 2], ids_of(index.suggest("game")))
+
+    def test_refresh_finds_late_rows_with_old_updated_at(self):
+        """Rows loaded after a refresh are indexed whatever their IGDB updated_at."""
+        store = make_store()
+        store.upsert_many([(map_game(raw_game(1, name="Zelda")).as_dict(), 200)])
+        index = SuggestIndex()
+        index.refresh(store)
+        store.upsert_many([(map_game(raw_game(2, name="Zero Mission")).as_dict(), 100)])
+        index.refresh(store)
+        self.assertEqual([2], ids_of(index.suggest("zero")))
+
+    def test_create_suggest_index(self):
+        """The index is off unless IGDB_SUGGEST_ENABLED is set."""
+        settings = Settings()
+        settings.IGDB_SUGGEST_ENABLED = False
+        self.assertIsNone(create_suggest_index(settings))
+        settings.IGDB_SUGGEST_ENABLED = True
+        self.assertIsInstance(create_suggest_index(settings), SuggestIndex)
+
+
+class TestClientFeedsSuggestions(unittest.TestCase):
+    """Searches that reach IGDB add their games to the index."""
+
+    def test_search_results_are_indexed(self):
+        """Plain search results become suggestions."""
+        auth = MagicMock()
+        auth.get_token.return_value = "fake-token"
+        index = SuggestIndex()
+        client = IGDBClient(auth=auth, suggest_index=index)
+        with patch.object(
+            IGDBClient, "_post", return_value=[raw_game(9, name="Hollow Knight")]
+        ):
+            client.search_games("hollow")
+        # Queued on the request path and indexed by the background thread
+        self.assertEqual([], index.suggest("knig"))
+        index.drain()
+        self.assertEqual([9], ids_of(index.suggest("knig")))
+        self.assertEqual(1, client.stats()["suggest"]["games"])
+
+
+class TestSuggestRoute(unittest.TestCase):
+    """Tests for GET /igdb/suggest."""
+
+    def setUp(self):
+        auth = MagicMock()
+        auth.client_id = "fake-client-id"
+        self.client = AsyncIGDBClient(auth=auth, suggest_index=make_index())
+        app.dependency_overrides[get_igdb_client] = lambda: self.client
+        self.http = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+
+    def test_suggest(self):
+        """Suggestions are served without IGDB."""
+        with patch.object(AsyncIGDBClient, "_post") as post:
+            response = self.http.get("/igdb/suggest", params={"q": "Zel", "limit": 2})
+        post.assert_not_called()
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            [
+                {"id": 3, "name": "Zelda II: The Adventure of Link"},
+                {"id": 1, "name": "The Legend of Zelda"},
+            ],
+            response.json(),
+        )
+
+    def test_limit_is_validated(self):
+        """The limit must be between 1 and 20."""
+        response = self.http.get("/igdb/suggest", params={"q": "zel", "limit": 21})
+        self.assertEqual(422, response.status_code)
+
+    def test_disabled(self):
+        """Without an index the route answers 404."""
+        self.client.suggest_index = None
+        response = self.http.get("/igdb/suggest", params={"q": "zel"})
+        self.assertEqual(404, response.status_code)
+
+
+class TestSuggestBenchmark(unittest.TestCase):
+    """Lookup latency over a large index."""
+
+    WORDS = [
+        "legend",
+        "zelda",
+        "mario",
+        "dark",
+        "souls",
+        "hollow",
+        "knight",
+        "final",
+        "fantasy",
+        "star",
+        "wars",
+        "dragon",
+        "quest",
+        "super",
+        "space",
+        "racing",
+    ]
+
+    @skip_unless_benchmarks
+    def test_lookup_latency(self):
+        """Median lookup latency; about 0.2 ms over 1M names."""
+        count = 1_000_000 if os.getenv("RUN_SUGGEST_BENCHMARK") else 50_000
+        rng = random.Random(7)
+        index = SuggestIndex()
+        index.build(
+            (
+                game_id,
+                " ".join(rng.choices(self.WORDS, k=rng.randint(1, 4))) + f" {game_id}",
+            )
+            for game_id in range(count)
+        )
+        timings = []
+        for query in [
+            "zel",
+            "dark s",
+            "legend of",
+            "fin",
+            "1234",
+            "x",
+            "super mario 9",
+        ]:
+            for _ in range(50):
+                started = time.perf_counter()
+                index.suggest(query)
+                timings.append(time.perf_counter() - started)
+        print(
+            f"\nsuggest over {count} names: {statistics.median(timings) * 1e6:.1f} us median"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Unit tests for the two-tier L1/L2 cache with pub/sub invalidation.
+"""
+
+import time
+import unittest
+
+from src.igdb.redis_cache import RedisCache
+from src.igdb.tiered_cache import TieredCache, hit_rate
+from tests.utils.fake_redis import FakeRedisServer
+
+CHANNEL = "test:invalidate"
+
+
+def wait_for(predicate, timeout=2.0):
+    """Poll until predicate() is true or the timeout elapses."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestTieredCache(unittest.TestCase):
+    """Tests for TieredCache backed by the fake RESP server."""
+
+    def setUp(self):
+        self.server = FakeRedisServer().start()
+        self.caches = []
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.close()
+        self.server.stop()
+
+    def make_cache(self, l1_ttl=10):
+        """Build a TieredCache (one per simulated worker) and wait until subscribed."""
+        cache = TieredCache(
+            RedisCache.from_url(self.server.url, key_prefix="test:"),
+            l1_ttl=l1_ttl,
+            channel=CHANNEL,
+            retry_interval=0.05,
+        )
+        self.caches.append(cache)
+        subscriber = cache._subscriber  # pylint: disable=protected-access
+        self.assertTrue(subscriber.ready.wait(2))
+        return cache
+
+    def test_l1_serves_repeat_reads_without_network(self):
+        """Repeated reads should be L1 hits and not reach the server."""
+        cache = self.make_cache()
+        cache.set("genres", [{"id": 1, "name": "Action"}], ttl=86400)
+        gets_before = self.server.commands.count(b"GET")
+        for _ in range(10):
+            self.assertEqual("Action", cache.get("genres")[0]["name"])
+        self.assertEqual(gets_before, self.server.commands.count(b"GET"))
+        self.assertEqual(10, cache.stats()["l1"]["hits"])
+
+    def test_l2_hit_fills_l1(self):
+        """A value written by another worker is read from L2 once, then from L1."""
+        writer, reader = self.make_cache(), self.make_cache()
+        writer.set("game:1", {"id": 1})
+        self.assertEqual({"id": 1}, reader.get("game:1"))
+        self.assertEqual({"id": 1}, reader.get("game:1"))
+        stats = reader.stats()
+        self.assertEqual((1, 1), (stats["l1"]["hits"], stats["l1"]["misses"]))
+        self.assertEqual((1, 0), (stats["l2"]["hits"], stats["l2"]["misses"]))
+        self.assertEqual(0.5, stats["l1"]["hit_rate"])
+
+    def test_rewrite_invalidates_other_workers_l1(self):
+        """Rewriting a key should evict stale L1 copies in other workers."""
+        writer, reader = self.make_cache(), self.make_cache()
+        writer.set("game:1", {"id": 1, "name": "Old"})
+        self.assertEqual("Old", reader.get("game:1")["name"])
+        writer.set("game:1", {"id": 1, "name": "New"})
+        self.assertTrue(wait_for(lambda: reader.get("game:1")["name"] == "New"))
+        self.assertGreaterEqual(reader.stats()["invalidations_received"], 1)
+
+    def test_delete_and_clear_propagate(self):
+        """delete() and clear() should drop L1 entries in other workers."""
+        writer, reader = self.make_cache(), self.make_cache()
+        writer.set("game:1", {"id": 1})
+        writer.set("game:2", {"id": 2})
+        reader.get("game:1")
+        reader.get("game:2")
+        writer.delete("game:1")
+        self.assertTrue(wait_for(lambda: reader.get("game:1") is None))
+        writer.clear()
+        self.assertTrue(wait_for(lambda: reader.get("game:2") is None))
+
+    def test_get_many_fills_l1_from_one_l2_batch(self):
+        """get_many should read L1 first and fetch the rest with one MGET."""
+        writer, reader = self.make_cache(), self.make_cache()
+        writer.set_many({"game:1": {"id": 1}, "game:2": {"id": 2}}, ttl=60)
+        reader.get("game:1")
+        self.server.commands.clear()
+        found = reader.get_many(["game:1", "game:2", "game:3"])
+        self.assertEqual({"game:1", "game:2"}, set(found))
+        self.assertEqual([b"MGET"], self.server.commands)
+        self.assertEqual({"id": 2}, reader.l1.get("game:2"))
+
+    def test_set_many_publishes_one_invalidation(self):
+        """set_many should invalidate all keys with a single message."""
+        writer, reader = self.make_cache(), self.make_cache()
+        writer.set_many({"game:1": {"id": 1}, "game:2": {"id": 2}})
+        reader.get_many(["game:1", "game:2"])
+        self.server.commands.clear()
+        writer.set_many({"game:1": {"id": 10}, "game:2": {"id": 20}})
+        self.assertEqual(1, self.server.commands.count(b"PUBLISH"))
+        self.assertTrue(
+            wait_for(
+                lambda: reader.get_many(["game:1", "game:2"])
+                == {"game:1": {"id": 10}, "game:2": {"id": 20}}
+            )
+        )
+
+    def test_own_invalidations_are_ignored(self):
+        """A worker should keep its own freshly written L1 entry."""
+        cache = self.make_cache()
+        cache.set("game:1", {"id": 1})
+        self.assertTrue(wait_for(lambda: b"PUBLISH" in self.server.commands))
+        time.sleep(0.05)
+        self.assertEqual(0, cache.stats()["invalidations_received"])
+        self.assertEqual({"id": 1}, cache.l1.get("game:1"))
+
+    def test_l1_ttl_is_capped(self):
+        """L1 copies should expire after l1_ttl even if the L2 TTL is longer."""
+        cache = self.make_cache(l1_ttl=0.1)
+        cache.set("platforms", [{"id": 6}], ttl=86400)
+        time.sleep(0.15)
+        self.assertIsNone(cache.l1.get("platforms"))
+        self.assertEqual([{"id": 6}], cache.get("platforms"))
+        self.assertEqual(1, cache.stats()["l2"]["hits"])
+
+    def test_reconnect_clears_l1(self):
+        """After a lost subscription the L1 is cleared, as invalidations may be missed."""
+        cache = self.make_cache()
+        cache.set("game:1", {"id": 1})
+        self.server.disconnect_subscribers()
+        self.assertTrue(wait_for(lambda: cache.l1.get("game:1") is None))
+        self.assertTrue(wait_for(lambda: self.server.subscriber_count(CHANNEL) == 1))
+        self.assertEqual({"id": 1}, cache.get("game:1"))
+
+
+class TestHitRate(unittest.TestCase):
+    """Tests for the hit rate helper."""
+
+    def test_hit_rate(self):
+        """hit_rate should handle zero lookups."""
+        self.assertEqual(0.0, hit_rate(0, 0))
+        self.assertEqual(0.75, hit_rate(3, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
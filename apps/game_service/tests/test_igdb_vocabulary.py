@@ -0,0 +1,167 @@
+"""
+Unit tests for the preloaded genre and platform vocabularies.
+"""
+
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import httpx
+from fastapi.testclient import TestClient
+from src.api.igdb import (
+    SNAPSHOT_CACHE_CONTROL,
+    VOCABULARY_CACHE_CONTROL,
+    get_vocabularies,
+)
+from src.igdb.enums import Genre, Platform
+from src.igdb.vocabulary import IGDB, SNAPSHOT, Vocabulary, VocabularyStore
+from src.igdb.vocabulary_snapshot import GENRES, PLATFORMS
+from src.main import app
+
+
+def enum_ids(enum):
+    """Return the integer constants of an enums.py class."""
+    return {value for name, value in vars(enum).items() if name.isupper()}
+
+
+def make_client(genres=None, platforms=None, error=None):
+    """Return a mock sync client serving the given rows, or raising error."""
+    client = MagicMock()
+    client.get_genres.return_value = genres or []
+    client.get_platforms.return_value = platforms or []
+    if error is not None:
+        client.get_genres.side_effect = error
+        client.get_platforms.side_effect = error
+    return client
+
+
+class TestVocabulary(unittest.TestCase):
+    """Tests for Vocabulary."""
+
+    def test_maps_are_frozen(self):
+        """Rows are sorted by id and the maps cannot be changed."""
+        vocabulary = Vocabulary.from_rows([(31, "Adventure"), (5, "Shooter")], IGDB, 0)
+        self.assertEqual(((5, "Shooter"), (31, "Adventure")), vocabulary.rows)
+        self.assertEqual("Adventure", vocabulary.by_id[31])
+        self.assertEqual(5, vocabulary.id_of("  SHOOTER "))
+        self.assertIsNone(vocabulary.id_of("Racing"))
+        with self.assertRaises(TypeError):
+            vocabulary.by_id[1] = "Action"
+        with self.assertRaises(AttributeError):
+            vocabulary.etag = '"x"'
+
+    def test_body_and_etag(self):
+        """The body is the serialized list; the ETag depends on it alone."""
+        first = Vocabulary.from_rows([(5, "Shooter"), (31, "Adventure")], IGDB, 0)
+        same = Vocabulary.from_rows([(31, "Adventure"), (5, "Shooter")], SNAPSHOT, 9)
+        renamed = Vocabulary.from_rows([(5, "Shooters"), (31, "Adventure")], IGDB, 0)
+        self.assertEqual(
+            b'[{"id":5,"name":"Shooter"},{"id":31,"name":"Adventure"}]', first.body
+        )
+        self.assertEqual(first.etag, same.etag)
+        self.assertNotEqual(first.etag, renamed.etag)
+        self.assertRegex(first.etag, r'^"[0-9a-f]{32}"$')
+
+    def test_snapshot_covers_enums(self):
+        """Every id in enums.py is named by the snapshot."""
+        self.assertLessEqual(enum_ids(Genre), {row_id for row_id, _ in GENRES})
+        self.assertLessEqual(enum_ids(Platform), {row_id for row_id, _ in PLATFORMS})
+
+
+class TestVocabularyStore(unittest.TestCase):
+    """Tests for VocabularyStore."""
+
+    def test_starts_from_snapshot(self):
+        """The snapshot is served before any load."""
+        store = VocabularyStore()
+        self.assertEqual(SNAPSHOT, store.get("genres").source)
+        self.assertEqual("Adventure", store.get("genres").by_id[31])
+        self.assertEqual(len(PLATFORMS), store.stats()["platforms"]["count"])
+
+    def test_load_swaps_tables(self):
+        """A load replaces each table with IGDB's rows and a new ETag."""
+        store = VocabularyStore()
+        snapshot = store.get("genres")
+        store.load(
+            make_client(
+                genres=[{"id": 1, "name": "Action"}],
+                platforms=[{"id": 6, "name": "PC"}],
+            )
+        )
+        genres = store.get("genres")
+        self.assertEqual(IGDB, genres.source)
+        self.assertEqual(((1, "Action"),), genres.rows)
+        self.assertNotEqual(snapshot.etag, genres.etag)
+        # The replaced table is untouched
+        self.assertEqual(SNAPSHOT, snapshot.source)
+        self.assertEqual(2, store.stats()["loads"])
+
+    def test_failed_or_empty_load_keeps_tables(self):
+        """Errors and empty responses keep the current tables."""
+        store = VocabularyStore()
+        snapshot = store.get("platforms")
+        store.load(make_client(error=httpx.ConnectError("down")))
+        store.load(make_client())
+        self.assertIs(snapshot, store.get("platforms"))
+        self.assertEqual(2, store.stats()["errors"])
+        self.assertEqual(0, store.stats()["loads"])
+
+    def test_background_load(self):
+        """start loads at once, then every interval, until closed."""
+        store = VocabularyStore()
+        client = make_client(genres=[{"id": 1, "name": "Action"}])
+        store.start(client, 0.01)
+        deadline = time.monotonic() + 5
+        while client.get_genres.call_count < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        store.close()
+        self.assertGreaterEqual(client.get_genres.call_count, 2)
+        self.assertEqual(IGDB, store.get("genres").source)
+
+
+class TestVocabularyRoutes(unittest.TestCase):
+    """Tests for GET /igdb/genres and /igdb/platforms."""
+
+    def setUp(self):
+        self.store = VocabularyStore()
+        app.dependency_overrides[get_vocabularies] = lambda: self.store
+        self.http = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+
+    def test_served_with_cache_headers(self):
+        """The snapshot is served with its ETag and revalidated on every use."""
+        response = self.http.get("/igdb/genres")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.store.get("genres").body, response.content)
+        self.assertEqual(self.store.get("genres").etag, response.headers["etag"])
+        self.assertEqual(SNAPSHOT_CACHE_CONTROL, response.headers["cache-control"])
+        self.assertEqual("no-cache", SNAPSHOT_CACHE_CONTROL)
+
+    def test_loaded_tables_are_cached_longer(self):
+        """Tables loaded from IGDB get the long Cache-Control."""
+        self.store.load(make_client(genres=[{"id": 1, "name": "Action"}]))
+        response = self.http.get("/igdb/genres")
+        self.assertEqual(VOCABULARY_CACHE_CONTROL, response.headers["cache-control"])
+        self.assertEqual(
+            "public, max-age=86400, stale-while-revalidate=518400",
+            VOCABULARY_CACHE_CONTROL,
+        )
+        # Platforms came back empty, so the snapshot is still served
+        platforms = self.http.get("/igdb/platforms")
+        self.assertEqual(SNAPSHOT_CACHE_CONTROL, platforms.headers["cache-control"])
+
+    def test_not_modified(self):
+        """A matching If-None-Match gets 304 without a body."""
+        etag = self.store.get("platforms").etag
+        response = self.http.get("/igdb/platforms", headers={"If-None-Match": etag})
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b"", response.content)
+        self.assertEqual(etag, response.headers["etag"])
+        stale = self.http.get("/igdb/platforms", headers={"If-None-Match": '"old"'})
+        self.assertEqual(200, stale.status_code)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+"""
+Helpers for opt-in microbenchmarks.
+
+Benchmarks compare an optimized code path against the one it replaced and
+print the timings; they never assert on them, since wall-clock ratios vary
+with the machine and its load. Set RUN_IGDB_BENCHMARKS=1 to run them.
+"""
+
+import os
+import timeit
+import unittest
+from typing import Callable, Dict
+
+BENCHMARKS_ENABLED = bool(os.getenv("RUN_IGDB_BENCHMARKS"))
+
+skip_unless_benchmarks = unittest.skipUnless(
+    BENCHMARKS_ENABLED, "Set RUN_IGDB_BENCHMARKS=1 to run benchmarks"
+)
+
+
+def report(
+    name: str, cases: Dict[str, Callable[[], object]], number: int = 1000
+) -> Dict[str, float]:
+    """
+    Time each case and print microseconds per call.
+
+    Args:
+        name (str): Benchmark name, printed as a heading.
+        cases (dict): Case label -> function to time.
+        number (int): Calls per timing run; the best of five runs is kept.
+
+    Returns:
+        dict: Case label -> seconds per call.
+    """
+    timings = {
+        label: min(timeit.repeat(fn, number=number, repeat=5)) / number
+        for label, fn in cases.items()
+    }
+    print(f"\n{name}")
+    for label, seconds in timings.items():
+        print(f"  {label:<24} {seconds * 1e6:10.1f} us/call")
+    return timings
@@ -0,0 +1,235 @@
+"""
+In-process fake Redis server speaking RESP2, for cache backend tests.
+
+Implements the subset of commands used by src/igdb/redis_cache.py on a plain
+dict with TTLs, plus PUBLISH/SUBSCRIBE. The server runs on a background thread bound to an ephemeral
+localhost port.
+"""
+
+import fnmatch
+import socket
+import socketserver
+import threading
+import time
+
+
+def _bulk(value):
+    """Encode a bulk string reply (None encodes as a null bulk)."""
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _array(items):
+    """Encode an array of bulk strings or pre-encoded replies."""
+    parts = [b"*%d\r\n" % len(items)]
+    for item in items:
+        parts.append(item if isinstance(item, _Raw) else _bulk(item))
+    return b"".join(parts)
+
+
+class _Raw(bytes):
+    """A reply that is already RESP encoded."""
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """Threaded fake Redis server; use as a context manager or call start/stop."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, password=None):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.password = password
+        self.lock = threading.Lock()
+        # db -> key -> (value, expire_at)
+        self.data = {}
+        self.commands = []
+        # channel -> handlers subscribed to it
+        self.subscribers = {}
+        self._thread = None
+
+    @property
+    def url(self):
+        """redis:// URL for this server."""
+        host, port = self.server_address
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}{host}:{port}/0"
+
+    def start(self):
+        """Serve on a background thread."""
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def disconnect_subscribers(self):
+        """Drop every subscribed connection, as a server restart would."""
+        with self.lock:
+            handlers = [h for group in self.subscribers.values() for h in group]
+        for handler in handlers:
+            handler.connection.shutdown(socket.SHUT_RDWR)
+
+    def subscriber_count(self, channel):
+        """Return how many connections are subscribed to a channel."""
+        with self.lock:
+            return len(self.subscribers.get(channel.encode(), []))
+
+    def store(self, db=0):
+        """Return the key space of a logical database, purging expired keys."""
+        space = self.data.setdefault(db, {})
+        now = time.time()
+        for key in [k for k, (_, exp) in space.items() if exp and exp < now]:
+            del space[key]
+        return space
+
+
+# pylint: disable=attribute-defined-outside-init
+class _Handler(socketserver.StreamRequestHandler):
+    """Parses RESP commands from one client connection and replies."""
+
+    def handle(self):
+        self.db = 0
+        self.authenticated = self.server.password is None
+        self.write_lock = threading.Lock()
+        try:
+            while True:
+                args = self._read_command()
+                if args is None:
+                    return
+                self.server.commands.append(args[0].upper())
+                with self.server.lock:
+                    reply = self._dispatch(args)
+                self.send(reply)
+        except OSError:
+            return
+        finally:
+            with self.server.lock:
+                for group in self.server.subscribers.values():
+                    if self in group:
+                        group.remove(self)
+
+    def send(self, data):
+        """Write a reply or pushed message to this client."""
+        with self.write_lock:
+            self.wfile.write(data)
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line.endswith(b"\r\n"):
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _dispatch(self, args):
+        name = args[0].decode().upper()
+        if name == "AUTH":
+            if args[-1].decode() != self.server.password:
+                return b"-WRONGPASS invalid password\r\n"
+            self.authenticated = True
+            return b"+OK\r\n"
+        if not self.authenticated:
+            return b"-NOAUTH Authentication required.\r\n"
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            return b"-ERR unknown command '%s'\r\n" % name.encode()
+        return handler(args[1:])
+
+    def cmd_ping(self, _args):
+        return b"+PONG\r\n"
+
+    def cmd_select(self, args):
+        self.db = int(args[0])
+        return b"+OK\r\n"
+
+    def cmd_get(self, args):
+        item = self.server.store(self.db).get(args[0])
+        return _bulk(item[0] if item else None)
+
+    def cmd_mget(self, args):
+        space = self.server.store(self.db)
+        return _array([space[key][0] if key in space else None for key in args])
+
+    def cmd_set(self, args):
+        key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+        expire_at = None
+        if b"EX" in options:
+            expire_at = time.time() + int(args[2 + options.index(b"EX") + 1])
+        space = self.server.store(self.db)
+        if b"NX" in options and key in space:
+            return _bulk(None)
+        space[key] = (value, expire_at)
+        return b"+OK\r\n"
+
+    def cmd_incrby(self, args):
+        space = self.server.store(self.db)
+        value, expire_at = space.get(args[0], (b"0", None))
+        new_value = int(value) + int(args[1])
+        space[args[0]] = (str(new_value).encode(), expire_at)
+        return b":%d\r\n" % new_value
+
+    def cmd_expire(self, args):
+        space = self.server.store(self.db)
+        if args[0] not in space:
+            return b":0\r\n"
+        space[args[0]] = (space[args[0]][0], time.time() + int(args[1]))
+        return b":1\r\n"
+
+    def cmd_del(self, args):
+        space = self.server.store(self.db)
+        removed = sum(1 for key in args if space.pop(key, None) is not None)
+        return b":%d\r\n" % removed
+
+    def cmd_flushdb(self, _args):
+        self.server.store(self.db).clear()
+        return b"+OK\r\n"
+
+    def cmd_scan(self, args):
+        pattern = "*"
+        options = [a.upper() for a in args]
+        if b"MATCH" in options:
+            pattern = args[options.index(b"MATCH") + 1].decode()
+        keys = [
+            key
+            for key in self.server.store(self.db)
+            if fnmatch.fnmatchcase(key.decode(), pattern)
+        ]
+        return _array([_Raw(_bulk(b"0")), _Raw(_array(keys))])
+
+    def cmd_subscribe(self, args):
+        replies = []
+        for channel in args:
+            group = self.server.subscribers.setdefault(channel, [])
+            if self not in group:
+                group.append(self)
+            replies.append(
+                _array([b"subscribe", channel, _Raw(b":%d\r\n" % len(group))])
+            )
+        return b"".join(replies)
+
+    def cmd_publish(self, args):
+        channel, message = args
+        receivers = list(self.server.subscribers.get(channel, []))
+        payload = _array([b"message", channel, message])
+        for handler in receivers:
+            try:
+                handler.send(payload)
+            except OSError:
+                pass
+        return b":%d\r\n" % len(receivers)
@@ -0,0 +1,113 @@
+"""
+In-process stub of the IGDB games endpoint, for catalog sync tests.
+
+Understands the Apicalypse bodies sent by the IGDB client and the catalog sync
+(``where id = (...)``, ``where id > n``, ``where updated_at >= t & id > n``,
+``sort id asc`` and ``limit``) over a dict of raw games. The server runs on a
+background thread bound to an ephemeral localhost port.
+"""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def raw_game(game_id, updated_at=1600000000, name=None):
+    """Build a raw IGDB game with the fields the client requests."""
+    return {
+        "id": game_id,
+        "name": name or f"Game {game_id}",
+        "cover": {
+            "url": f"//images.igdb.com/igdb/image/upload/t_thumb/co{game_id}.jpg"
+        },
+        "first_release_date": 1500000000 + game_id,
+        "genres": [{"name": "RPG"}],
+        "platforms": [{"name": "PC"}],
+        "updated_at": updated_at,
+    }
+
+
+class StubIGDBServer(ThreadingHTTPServer):
+    """Threaded stub IGDB server; use as a context manager or call start/stop."""
+
+    daemon_threads = True
+
+    def __init__(self, games=None):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        # id -> raw game
+        self.games = {game["id"]: game for game in games or []}
+        self.bodies = []
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """IGDB API base URL for this server."""
+        host, port = self.server_address
+        return f"http://{host}:{port}/v4"
+
+    def put(self, game):
+        """Add or replace a raw game."""
+        with self.lock:
+            self.games[game["id"]] = game
+
+    def start(self):
+        """Serve on a background thread."""
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def query(self, body):
+        """Return the games matching an Apicalypse body."""
+        with self.lock:
+            games = sorted(self.games.values(), key=lambda game: game["id"])
+        ids = re.search(r"where id = \(([\d,]+)\)", body)
+        if ids:
+            wanted = {int(i) for i in ids.group(1).split(",")}
+            games = [game for game in games if game["id"] in wanted]
+        after = re.search(r"id > (\d+)", body)
+        if after:
+            games = [game for game in games if game["id"] > int(after.group(1))]
+        since = re.search(r"updated_at >= (-?\d+)", body)
+        if since:
+            games = [
+                game for game in games if game["updated_at"] >= int(since.group(1))
+            ]
+        limit = re.search(r"limit (\d+);", body)
+        return games[: int(limit.group(1))] if limit else games[:10]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answers POST /v4/games with the matching games."""
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Handle one Apicalypse query."""
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode()
+        self.server.bodies.append(body)
+        if not self.path.endswith("/games"):
+            self.send_error(404)
+            return
+        data = json.dumps(self.server.query(body)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Keep test output quiet."""
@@ -0,0 +1,75 @@
+"""
+In-process stub of the IGDB image CDN, for image proxy tests.
+
+Serves ``/{size}/{image_id}.jpg`` from a dict of image bytes and counts the
+requests per path. Paths it does not hold get 404. The server runs on a
+background thread bound to an ephemeral localhost port.
+"""
+
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubImageServer(ThreadingHTTPServer):
+    """Threaded stub image server; use as a context manager."""
+
+    daemon_threads = True
+
+    def __init__(self, images=None):
+        """
+        Args:
+            images (dict, optional): "{size}/{image_id}.jpg" -> image bytes.
+        """
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.images = dict(images or {})
+        self.requests = Counter()
+        # Set to hold every response until released
+        self.gate = threading.Event()
+        self.gate.set()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """Image base URL for this server."""
+        host, port = self.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.gate.set()
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves the stub server's images."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answer an image request."""
+        server = self.server
+        path = self.path.lstrip("/")
+        with server.lock:
+            server.requests[path] += 1
+            data = server.images.get(path)
+        server.gate.wait(5)
+        if data is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Keep test output quiet."""
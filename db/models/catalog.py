@@ -0,0 +1,46 @@
+"""
+IGDB catalog mirror model definitions for the gaming library database.
+
+Defines the CatalogGame and CatalogSyncState classes used by the game service
+to keep a local copy of the IGDB games catalog.
+"""
+
+from sqlalchemy import JSON, BigInteger, Column, Integer, String
+
+from .user import Base
+
+
+class CatalogGame(Base):
+    """
+    SQLAlchemy model for a game mirrored from IGDB.
+    Stores the mapped game as served by the game service, keyed by IGDB id.
+    """
+
+    __tablename__ = "igdb_catalog"
+
+    igdb_id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String, nullable=True, index=True)
+    updated_at = Column(BigInteger, nullable=True, index=True)
+    # Local Unix time the row was last written, for readers following changes
+    synced_at = Column(BigInteger, nullable=True, index=True)
+    data = Column(JSON, nullable=False)
+
+    def __repr__(self) -> str:
+        """String representation for debugging purposes."""
+        return f"<CatalogGame(igdb_id={self.igdb_id}, name={self.name})>"
+
+
+class CatalogSyncState(Base):
+    """
+    SQLAlchemy model for a named catalog sync checkpoint.
+    Holds values such as the bulk load cursor and the updated_at checkpoint.
+    """
+
+    __tablename__ = "igdb_catalog_sync"
+
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False)
+
+    def __repr__(self) -> str:
+        """String representation for debugging purposes."""
+        return f"<CatalogSyncState(name={self.name}, value={self.value})>"
@@ -10,6 +10,7 @@ import unittest
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
+from db.models.catalog import CatalogGame, CatalogSyncState
 from db.models.collection import Collection, CollectionEntry
 from db.models.game import Game
 from db.models.user import Base, User
@@ -404,5 +405,25 @@ class TestRelationships(BaseModelTestCase):
         self.assertEqual(self.session.query(CollectionEntry).count(), 0)
 
 
+class TestCatalogModels(BaseModelTestCase):
+    """
+    Tests for the IGDB catalog mirror models.
+    """
+
+    def test_create_catalog_game(self):
+        """Test storing a mirrored game keyed by its IGDB id."""
+        game = CatalogGame(
+            igdb_id=1942, name="The Witcher 3", updated_at=1700000000, data={"id": 1942}
+        )
+        self.session.add(game)
+        self.session.add(CatalogSyncState(name="updated_at", value=1700000000))
+        self.session.commit()
+        stored = self.session.get(CatalogGame, 1942)
+        self.assertEqual({"id": 1942}, stored.data)
+        self.assertEqual(
+            1700000000, self.session.get(CatalogSyncState, "updated_at").value
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,53 @@
+"""Add IGDB catalog mirror tables
+
+Revision ID: 5b2f0c7d9e41
+Revises: e4165b238dd7
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5b2f0c7d9e41"
+down_revision: Union[str, Sequence[str], None] = "e4165b238dd7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "igdb_catalog",
+        sa.Column("igdb_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint("igdb_id"),
+    )
+    op.create_index(
+        op.f("ix_igdb_catalog_name"), "igdb_catalog", ["name"], unique=False
+    )
+    op.create_index(
+        op.f("ix_igdb_catalog_updated_at"),
+        "igdb_catalog",
+        ["updated_at"],
+        unique=False,
+    )
+    op.create_table(
+        "igdb_catalog_sync",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("igdb_catalog_sync")
+    op.drop_index(op.f("ix_igdb_catalog_updated_at"), table_name="igdb_catalog")
+    op.drop_index(op.f("ix_igdb_catalog_name"), table_name="igdb_catalog")
+    op.drop_table("igdb_catalog")
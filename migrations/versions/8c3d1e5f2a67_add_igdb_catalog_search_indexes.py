@@ -0,0 +1,42 @@
+"""Add full-text search indexes on IGDB catalog names
+
+Revision ID: 8c3d1e5f2a67
+Revises: 5b2f0c7d9e41
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c3d1e5f2a67"
+down_revision: Union[str, Sequence[str], None] = "5b2f0c7d9e41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm and tsvector indexes are PostgreSQL only; SQLite catalogs get
+    # their FTS5 table from the game service at startup
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_igdb_catalog_name_trgm "
+        "ON igdb_catalog USING gin (name gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_igdb_catalog_name_tsv "
+        "ON igdb_catalog USING gin (to_tsvector('simple', coalesce(name, '')))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_igdb_catalog_name_tsv")
+    op.execute("DROP INDEX IF EXISTS ix_igdb_catalog_name_trgm")
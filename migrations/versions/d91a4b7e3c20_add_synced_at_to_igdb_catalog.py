@@ -0,0 +1,37 @@
+"""Add synced_at to the IGDB catalog
+
+Revision ID: d91a4b7e3c20
+Revises: 8c3d1e5f2a67
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d91a4b7e3c20"
+down_revision: Union[str, Sequence[str], None] = "8c3d1e5f2a67"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "igdb_catalog", sa.Column("synced_at", sa.BigInteger(), nullable=True)
+    )
+    op.create_index(
+        op.f("ix_igdb_catalog_synced_at"),
+        "igdb_catalog",
+        ["synced_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_igdb_catalog_synced_at"), table_name="igdb_catalog")
+    op.drop_column("igdb_catalog", "synced_at")